@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: TWAP / VWAP / iceberg parents worked by one ExecutionScheduler on the simulator.
+
+Replays a random-walk trade tape through a SimulatedExchange on a manual
+clock while a single scheduler works a mix of parent orders through an
+AsyncOrderManager. Reports fill ratio and slippage against the arrival
+price per algorithm, and the scheduler's own cost per parent wake-up
+(which includes placing and amending children through the manager).
+
+Usage: python benchmarks/bench_execution.py [parents] [trade prints]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trading_bot.bot.backtest import replay_with_scheduler, simulated_scheduler
+from trading_bot.bot.execution import TWAP, VWAPAlgo, ExecutionAlgo, Iceberg
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.simulator import MarketData, SimulatedClock, SimulatedExchange
+
+START_MS = 1_700_000_000_000
+
+
+def random_tape(events: int, start: float = 50000.0, seed: int = 11) -> MarketData:
+    """Trade prints 50-400 ms apart with a random-walk price and random sizes."""
+    rng = random.Random(seed)
+    times, prices, quantities = [], [], []
+    now, price = START_MS, start
+    for _ in range(events):
+        now += rng.randint(50, 400)
+        price *= 1 + rng.gauss(0, 0.0002)
+        times.append(now)
+        prices.append(round(price, 1))
+        quantities.append(round(rng.random() * 0.5 + 0.001, 3))
+    return MarketData(times, prices, quantities)
+
+
+def make_parents(count: int, seed: int = 5) -> List[ExecutionAlgo]:
+    rng = random.Random(seed)
+    parents: List[ExecutionAlgo] = []
+    for index in range(count):
+        side = rng.choice(('BUY', 'SELL'))
+        quantity = f'{rng.randint(50, 500) / 1000:.3f}'
+        start = START_MS / 1000 + rng.randint(0, 600)
+        kind = index % 3
+        if kind == 0:
+            parents.append(TWAP('BTCUSDT', side, quantity, duration=rng.choice((300, 600, 900)), interval=30,
+                                offset_bps=rng.choice((-2, 0, 2)), start_time=start))
+        elif kind == 1:
+            parents.append(VWAPAlgo('BTCUSDT', side, quantity, participation='0.01', duration=1200, interval=10,
+                                offset_bps=1, start_time=start))
+        else:
+            parents.append(Iceberg('BTCUSDT', side, quantity, display='0.02', offset_bps=-1, duration=1200,
+                                   interval=10, start_time=start))
+    return parents
+
+
+async def run(parents: int, events: int) -> Dict[str, Any]:
+    exchange = SimulatedExchange(balance=10_000_000, clock=SimulatedClock(START_MS))
+    exchange.set_price('BTCUSDT', 50000, 1)
+    metrics = MetricsRegistry()
+    scheduler = simulated_scheduler(exchange, metrics=metrics, max_child_orders_per_second=20)
+    algos = make_parents(parents)
+    for algo in algos:
+        scheduler.submit(algo)
+
+    # Time the scheduler's share of the replay
+    run_due = scheduler.run_due
+    spent = {'seconds': 0.0, 'steps': 0}
+
+    async def timed_run_due(now=None):
+        started = time.perf_counter()
+        steps = await run_due(now)
+        spent['seconds'] += time.perf_counter() - started
+        spent['steps'] += steps
+        return steps
+
+    scheduler.run_due = timed_run_due
+    tape = random_tape(events)
+    start = time.perf_counter()
+    await replay_with_scheduler(scheduler, exchange, 'BTCUSDT', tape)
+    elapsed = time.perf_counter() - start
+    await scheduler.close()
+    counters = {(counter['name'], counter['labels'].get('action')): counter['value']
+                for counter in metrics.snapshot()['counters']}
+    return {'algos': algos, 'elapsed': elapsed, 'spent': spent, 'counters': counters,
+            'market_seconds': (tape.times[-1] - tape.times[0]) / 1000}
+
+
+def main():
+    parents = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    logging.getLogger('trading_bot').setLevel(logging.ERROR)
+    result = asyncio.run(run(parents, events))
+    spent = result['spent']
+    print(f"replayed {events} prints ({result['market_seconds'] / 60:.0f} min of market time) with {parents} parents "
+          f"in {result['elapsed']:.2f}s")
+    print(f"scheduler: {spent['steps']} wake-ups, {spent['seconds'] / max(spent['steps'], 1) * 1e6:.0f} us each, "
+          f"{spent['seconds'] / result['elapsed']:.0%} of the run")
+    counters = result['counters']
+    print("child orders: " + ', '.join(f"{counters.get(('execution_child_orders_total', action), 0):.0f} {action}"
+                                       for action in ('place', 'amend', 'cancel', 'error'))
+          + f", budget waits: {counters.get(('execution_budget_waits_total', None), 0):.0f}")
+
+    by_kind: Dict[str, List[ExecutionAlgo]] = defaultdict(list)
+    for algo in result['algos']:
+        by_kind[algo.kind].append(algo)
+    for kind, algos in by_kind.items():
+        slippages = [float(algo.slippage_bps) for algo in algos if algo.slippage_bps is not None]
+        filled = sum(algo.filled for algo in algos) / sum(algo.quantity for algo in algos)
+        statuses = defaultdict(int)
+        for algo in algos:
+            statuses[algo.status] += 1
+        print(f"  {kind:<8} {len(algos)} parents, filled {filled:.1%}, "
+              f"slippage mean {statistics.mean(slippages) if slippages else 0:+.2f} bps "
+              f"(median {statistics.median(slippages) if slippages else 0:+.2f}), "
+              f"{sum(len(algo.children) for algo in algos) / len(algos):.1f} children each, {dict(statuses)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-tick cost of incremental indicator updates across many symbols.
+
+Feeds random-walk ticks round-robin to a full indicator set per symbol
+(SMA, EMA, RSI, ATR, VWAP, Bollinger, z-score and an EMA crossover signal),
+reports the cost of one update per indicator and per symbol-tick, and
+checks that the batch functions reproduce the incremental values bit for bit.
+
+Usage: python benchmarks/bench_indicators.py [symbols] [ticks_per_symbol]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from trading_bot.bot import indicators
+
+
+def random_walks(symbols: int, ticks: int) -> np.ndarray:
+    rng = np.random.default_rng(42)
+    starts = rng.uniform(1, 50000, size=(symbols, 1))
+    return starts + np.cumsum(rng.normal(0, starts / 2000, size=(symbols, ticks)), axis=1)
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    prices = random_walks(symbols, ticks)
+    rng = random.Random(7)
+    volumes = [[rng.random() for _ in range(ticks)] for _ in range(symbols)]
+    price_lists = prices.tolist()
+
+    factories = {
+        'SMA(20)': lambda: indicators.SMA(20),
+        'EMA(20)': lambda: indicators.EMA(20),
+        'RSI(14)': lambda: indicators.RSI(14),
+        'ATR(14)': lambda: indicators.ATR(14),
+        'VWAP': lambda: indicators.VWAP(),
+        'Bollinger(20)': lambda: indicators.Bollinger(20),
+        'ZScore(20)': lambda: indicators.ZScore(20),
+    }
+    print(f"{symbols} symbols x {ticks} ticks")
+    total_per_tick = 0.0
+    for name, factory in factories.items():
+        states = [factory() for _ in range(symbols)]
+        updates = [state.update for state in states]
+        start = time.perf_counter()
+        for tick in range(ticks):
+            for index in range(symbols):
+                price = price_lists[index][tick]
+                if name == 'ATR(14)':
+                    updates[index](price + 1.0, price - 1.0, price)
+                elif name == 'VWAP':
+                    updates[index](price, volumes[index][tick])
+                else:
+                    updates[index](price)
+        micros = (time.perf_counter() - start) / (symbols * ticks) * 1e6
+        total_per_tick += micros
+        print(f"  {name:<14} {micros:6.3f} us/update")
+
+    engine = indicators.SignalEngine(indicators.EMACrossover)
+    names = [f'SYM{index}USDT' for index in range(symbols)]
+    signals = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        for index in range(symbols):
+            if engine.on_price(names[index], price_lists[index][tick]) is not None:
+                signals += 1
+    micros = (time.perf_counter() - start) / (symbols * ticks) * 1e6
+    total_per_tick += micros
+    print(f"  {'EMACrossover':<14} {micros:6.3f} us/update ({signals} signals)")
+    print(f"all indicators: {total_per_tick:.2f} us per symbol-tick, "
+          f"{total_per_tick * symbols / 1000:.2f} ms per tick across {symbols} symbols")
+
+    start = time.perf_counter()
+    batch = [indicators.zscore(row, 20) for row in prices]
+    elapsed = time.perf_counter() - start
+    print(f"batch zscore: {elapsed / (symbols * ticks) * 1e9:.1f} ns/value")
+    mismatches = 0
+    for row, expected in zip(price_lists, batch):
+        state = indicators.ZScore(20)
+        if not np.array_equal(np.array([state.update(price) for price in row]), expected, equal_nan=True):
+            mismatches += 1
+    print(f"batch vs incremental: {'bit-identical' if not mismatches else f'{mismatches} symbols differ'}")
+
+
+if __name__ == '__main__':
+    main()
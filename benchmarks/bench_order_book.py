@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local order book maintenance replayed from a depth recording.
+
+Replays a JSON-lines depth recording (as written by
+``DepthStream(record_path=...)``, or generated here for hundreds of symbols
+with occasional sequence gaps) through OrderBookManager, then times the
+book queries. A generated recording also has its final books checked
+against the generator's own.
+
+Usage: python benchmarks/bench_order_book.py [symbols | path/to/recording.jsonl] [events per symbol]
+"""
+
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.order_book import SNAPSHOT_EVENT, OrderBookManager, read_recording, replay_recording
+
+Book = Tuple[Dict[float, float], Dict[float, float]]
+
+
+def write_depth_recording(path: str, symbols: int = 300, events: int = 1000, gap_every: int = 5000,
+                          seed: int = 7) -> Dict[str, Book]:
+    """Write a recording of ``events`` depth updates per symbol; returns each symbol's final (bids, asks).
+
+    Each symbol starts with one buffered event and a snapshot taken inside
+    it, as a live sync does. Every ``gap_every`` events per symbol one event
+    is left out, followed a few events later by a fresh snapshot.
+    """
+    rng = random.Random(seed)
+    names = [f'SYM{index:03d}USDT' for index in range(symbols)]
+    mids = {name: rng.randint(1000, 500000) for name in names}  # in 0.1 ticks
+    books: Dict[str, Tuple[Dict[int, str], Dict[int, str]]] = {name: ({}, {}) for name in names}
+    last_ids = {name: (index + 1) * 1_000_000 for index, name in enumerate(names)}
+    counts = {name: 0 for name in names}
+    resnapshot: Dict[str, int] = {}
+    event_time = 1_700_000_000_000
+
+    def price(tick: int) -> str:
+        return f'{tick / 10:.1f}'
+
+    def snapshot_record(name: str, last_update_id: int) -> Dict:
+        bids, asks = books[name]
+        return {'e': SNAPSHOT_EVENT, 's': name, 'lastUpdateId': last_update_id, 'E': event_time, 'T': event_time,
+                'bids': [[price(tick), qty] for tick, qty in sorted(bids.items(), reverse=True)],
+                'asks': [[price(tick), qty] for tick, qty in sorted(asks.items())]}
+
+    def next_event(name: str) -> Dict:
+        bids, asks = books[name]
+        random = rng.random
+        mid = mids[name] = mids[name] + int(random() * 4) // 3 - (random() < 0.25)
+        changes: Tuple[List[List[str]], List[List[str]]] = ([], [])
+        # The mid moves one tick at most, so only a level at the new mid can cross
+        for side, levels in enumerate((bids, asks)):
+            if levels.pop(mid, None) is not None:
+                changes[side].append([price(mid), '0'])
+        for _ in range(int(random() * 20) + 1):
+            side = int(random() * 2)
+            offset = int(abs(rng.gauss(0, 40))) + 1
+            tick = mid - offset if side == 0 else mid + offset
+            levels = books[name][side]
+            if random() < 0.3:
+                if levels.pop(tick, None) is not None:
+                    changes[side].append([price(tick), '0'])
+            else:
+                qty = f'{int(random() * 5000 + 1) / 1000:.3f}'
+                levels[tick] = qty
+                changes[side].append([price(tick), qty])
+        first = last_ids[name] + 1
+        last = last_ids[name] = first + int(random() * 6)
+        return {'e': 'depthUpdate', 'E': event_time, 'T': event_time, 's': name, 'U': first, 'u': last,
+                'pu': first - 1, 'b': changes[0], 'a': changes[1]}
+
+    with open(path, 'w', encoding='utf-8') as f:
+        def write(record: Dict) -> None:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+        for name in names:
+            for _ in range(rng.randint(200, 600)):
+                next_event(name)  # Pre-existing book, never streamed
+            event = next_event(name)
+            write(event)
+            write(snapshot_record(name, event['U']))
+        pending = [name for name in names for _ in range(events - 1)]
+        rng.shuffle(pending)
+        for name in pending:
+            event_time += 1
+            event = next_event(name)
+            counts[name] += 1
+            if gap_every and counts[name] % gap_every == 0:
+                resnapshot[name] = 3
+                continue  # Lost in transit
+            write(event)
+            if name in resnapshot:
+                resnapshot[name] -= 1
+                if not resnapshot[name]:
+                    del resnapshot[name]
+                    write(snapshot_record(name, event['U']))
+        for name in resnapshot:
+            write(snapshot_record(name, last_ids[name]))
+    return {name: ({tick / 10: float(qty) for tick, qty in bids.items()}, {tick / 10: float(qty) for tick, qty in asks.items()})
+            for name, (bids, asks) in books.items()}
+
+
+def time_queries(manager: OrderBookManager, rounds: int = 20) -> Dict[str, float]:
+    """Microseconds per call of each book query, over every synced book."""
+    books = [book for book in manager.books.values() if book.synced and book.bids.keys and book.asks.keys]
+    sizes = [book.bids.depth(10) / 2 for book in books]
+    queries = {
+        'best bid/ask': lambda book, size: (book.best_bid(), book.best_ask()),
+        'depth(20)': lambda book, size: book.bids.depth(20),
+        'levels(10)': lambda book, size: book.asks.levels(10),
+        'vwap(size)': lambda book, size: book.vwap('SELL', size),
+    }
+    timings = {}
+    for name, query in queries.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for book, size in zip(books, sizes):
+                query(book, size)
+        timings[name] = (time.perf_counter() - start) / (rounds * len(books)) * 1e6
+    return timings
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else '300'
+    events_per_symbol = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    # Every sequence gap is logged as a warning; keep them off the terminal
+    logging.getLogger('trading_bot').setLevel(logging.ERROR)
+    expected = None
+    path = source
+    if source.isdigit():
+        path = os.path.join(tempfile.mkdtemp(prefix='depth-'), 'depth.jsonl')
+        start = time.perf_counter()
+        expected = write_depth_recording(path, int(source), events_per_symbol, gap_every=max(events_per_symbol // 3, 1))
+        print(f"generated {path} ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    records = list(read_recording(path))
+    print(f"loaded {len(records)} records in {time.perf_counter() - start:.2f}s")
+    # A live stream holds one event at a time; keep the loaded recording out of the GC's scans
+    gc.collect()
+    gc.freeze()
+
+    symbols = sorted({record['s'] for record in records})
+    manager = OrderBookManager(symbols, metrics=MetricsRegistry())
+    start = time.perf_counter()
+    count = replay_recording(manager, records)
+    elapsed = time.perf_counter() - start
+    stats = manager.stats()
+    print(f"replayed {count} records for {len(symbols)} symbols in {elapsed:.2f}s: "
+          f"{count / elapsed:,.0f} records/s, {elapsed / count * 1e6:.1f} us/record")
+    print(f"synced {stats['synced']}/{stats['symbols']}, resyncs: {stats['resyncs']}, buffered: {stats['buffered_events']}")
+
+    if expected is not None:
+        mismatched = [symbol for symbol, (bids, asks) in expected.items()
+                      if dict(manager.books[symbol].bids.levels(len(bids))) != bids
+                      or dict(manager.books[symbol].asks.levels(len(asks))) != asks]
+        print(f"books matching the generator: {len(symbols) - len(mismatched)}/{len(symbols)}")
+
+    for name, micros in time_queries(manager).items():
+        print(f"  {name:<14} {micros:.2f} us")
+
+
+if __name__ == '__main__':
+    main()
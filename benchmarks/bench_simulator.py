@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: market-data replay throughput of the simulated exchange.
+
+Replays trade prints (a random walk, or a Binance public-data CSV) through
+SimulatedExchange with resting orders on both sides and a strategy callback
+that places a limit order every ten minutes of market time.
+
+Usage: python benchmarks/bench_simulator.py [events | path/to/trades-or-klines.csv] [symbol]
+"""
+
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trading_bot.bot.models import Order
+from trading_bot.bot.simulator import MarketData, SimulatedExchange, SimulatorError, load_market_csv
+
+
+def random_walk(events: int, start: float = 50000.0) -> MarketData:
+    rng = random.Random(42)
+    price = start
+    prices = []
+    for _ in range(events):
+        price += rng.gauss(0, 2)
+        prices.append(round(price, 1))
+    start_ms = 1_700_000_000_000
+    return MarketData(list(range(start_ms, start_ms + events * 10, 10)), prices, [0.01] * events)
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else '2000000'
+    symbol = sys.argv[2] if len(sys.argv) > 2 else 'BTCUSDT'
+
+    start = time.perf_counter()
+    data = random_walk(int(source)) if source.isdigit() else load_market_csv(source)
+    print(f"loaded {len(data.prices)} events in {time.perf_counter() - start:.2f}s")
+
+    exchange = SimulatedExchange(balance=1_000_000)
+    first = Decimal(repr(data.prices[0]))
+    exchange.set_price(symbol, first)
+    # About 1000 USDT per resting order and 50 USDT per strategy order, whatever the price level
+    quantity = (Decimal(1000) / first).quantize(Decimal('0.001'))
+    exchange.place_order(Order.create(symbol, 'BUY', 'LIMIT', quantity, (first * Decimal('0.98')).quantize(Decimal('0.1'))))
+    exchange.place_order(Order.create(symbol, 'SELL', 'LIMIT', quantity, (first * Decimal('1.02')).quantize(Decimal('0.1'))))
+
+    def on_tick(ex: SimulatedExchange, now_ms: int) -> None:
+        last = ex.get_last_price(symbol)
+        try:
+            ex.place_order(Order.create(symbol, 'BUY', 'LIMIT', (Decimal(50) / last).quantize(Decimal('0.001')),
+                                        (last * Decimal('0.999')).quantize(Decimal('0.1'))))
+        except SimulatorError:
+            pass
+
+    start = time.perf_counter()
+    events = exchange.replay(symbol, data, on_tick=on_tick, tick_interval_ms=600_000)
+    elapsed = time.perf_counter() - start
+    print(f"replayed {events} events in {elapsed:.2f}s: {events / elapsed / 1e6:.2f}M events/s")
+    print(f"fills: {exchange.trade_count}, wallet: {exchange.wallet_balance:.2f} USDT, fees: {exchange.fees_paid:.4f}")
+
+
+if __name__ == '__main__':
+    main()
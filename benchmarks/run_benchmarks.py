@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: client, validators and order pipeline against a local stub exchange.
+
+Runs each benchmark in-process (the order pipeline against
+``stub_server.StubExchange`` on localhost) and writes the results as JSON to
+``benchmarks/results/<commit>.json``, together with the commit, Python
+version and machine they were measured on. Each metric records its unit and
+whether higher or lower is better, so two result files can be compared:
+``--compare`` prints the change of every metric against a baseline file and
+exits with status 1 if any got worse by more than ``--threshold``.
+
+Benchmarks:
+  signing            request encoding + HMAC signature of an order (ops/s)
+  validators         OrderFilterEngine.prepare on orders that need snapping (ops/s)
+  risk_checks        RiskEngine.check + release against 50 resting orders and every limit set (us)
+  exchange_info      json parse + SymbolRegistry.load of a 300-symbol exchangeInfo (ms)
+  order_book         OrderBookManager replay of a generated 200-symbol depth recording, and book queries (us)
+  execution          ExecutionScheduler working 150 TWAP/VWAP/iceberg parents on the simulator: cost per wake-up (us)
+  accounts           AccountManager with 20 key pairs: start-up and balance fan-out, vs one client per key (ms)
+  order_pipeline     OrderManager.place_order round trips: orders/s and p50/p99/p99.9 latency
+  order_pipeline_async  AsyncOrderManager with concurrent orders
+  order_pipeline_faults OrderManager with a journal while the stub injects 503/429/-1021 errors
+  cli_cold_start     `python trading_bot/cli.py --help` in a fresh interpreter (ms)
+  cli_via_daemon     `cli.py --via-daemon` orders against a TradingDaemon on the stub (ms), and the bare RPC
+
+Usage: python benchmarks/run_benchmarks.py [--quick] [--only name,...] [--latency 0.001]
+                                           [--output path] [--compare baseline.json] [--threshold 0.1]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_execution import run as run_execution
+from benchmarks.bench_order_book import time_queries, write_depth_recording
+from benchmarks.stub_server import StubExchange, make_exchange_info
+from trading_bot.bot.accounts import AccountManager
+from trading_bot.bot.async_client import AsyncBinanceFuturesClient
+from trading_bot.bot.client import BinanceFuturesClient, encode_params
+from trading_bot.bot.daemon import DaemonClient, TradingDaemon, order_to_wire, ping_daemon
+from trading_bot.bot.journal import OrderJournal
+from trading_bot.bot.metrics import Histogram, MetricsRegistry
+from trading_bot.bot.models import Order
+from trading_bot.bot.orders import AsyncOrderManager, OrderManager
+from trading_bot.bot.open_orders import OpenOrderIndex
+from trading_bot.bot.order_book import OrderBookManager, read_recording, replay_recording
+from trading_bot.bot.rate_limiter import RateLimiter
+from trading_bot.bot.risk import RiskEngine, RiskLimits
+from trading_bot.bot.signing import HmacSigner
+from trading_bot.bot.streams import AccountStateCache
+from trading_bot.bot.symbols import SymbolRegistry
+from trading_bot.bot.validators import OrderFilterEngine
+
+API_KEY = 'k' * 64
+API_SECRET = 'x' * 64
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+Metrics = Dict[str, Dict[str, Any]]
+
+
+def metric(value: float, unit: str, better: str = 'higher') -> Dict[str, Any]:
+    return {'value': round(value, 6), 'unit': unit, 'better': better}
+
+
+def best_rate(func: Callable[[], Any], iterations: int, repeats: int = 5) -> float:
+    """Best-of-``repeats`` calls per second."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return iterations / best
+
+
+def latency_metrics(histogram: Histogram, orders: int, elapsed: float) -> Metrics:
+    return {
+        'orders_per_sec': metric(orders / elapsed, 'orders/s'),
+        'p50_ms': metric(histogram.percentile(0.5) * 1000, 'ms', 'lower'),
+        'p99_ms': metric(histogram.percentile(0.99) * 1000, 'ms', 'lower'),
+        'p999_ms': metric(histogram.percentile(0.999) * 1000, 'ms', 'lower'),
+        'max_ms': metric((histogram.max or 0) / 1000, 'ms', 'lower'),
+    }
+
+
+def unthrottled_limiter() -> RateLimiter:
+    """A limiter that never waits, so the stub rather than the local budget sets the pace."""
+    return RateLimiter(request_weight_per_minute=10 ** 9, orders_per_10s=10 ** 9, orders_per_minute=10 ** 9)
+
+
+def benchmark_orders(count: int) -> List[Order]:
+    """LIMIT orders on both sides whose quantity and price need snapping to the BTCUSDT filters."""
+    return [Order.create('BTCUSDT', 'BUY' if index % 2 else 'SELL', 'LIMIT', '0.0015', f'45000.{index % 100:02d}3')
+            for index in range(count)]
+
+
+# --- benchmarks -------------------------------------------------------------
+
+def bench_signing(args) -> Metrics:
+    signer = HmacSigner(API_SECRET)
+    order = Order.create('BTCUSDT', 'BUY', 'LIMIT', '0.001', '45000.10')
+
+    def sign():
+        params = order.to_params()
+        params['timestamp'] = 1700000000000
+        return encode_params(params, signer)
+
+    rate = best_rate(sign, args.iterations)
+    return {'ops_per_sec': metric(rate, 'ops/s'), 'us_per_op': metric(1e6 / rate, 'us', 'lower')}
+
+
+def bench_validators(args) -> Metrics:
+    registry = SymbolRegistry()
+    registry.load(make_exchange_info())
+    engine = OrderFilterEngine(registry)
+    orders = benchmark_orders(100)
+    manager = OrderManager(BinanceFuturesClient(API_KEY, API_SECRET, symbol_registry=registry, metrics=MetricsRegistry()))
+
+    def prepare():
+        for order in orders:
+            engine.prepare(order)
+
+    def validate():
+        for order in orders:
+            manager.validate_order_params(order)
+
+    iterations = max(args.iterations // 100, 1)
+    prepare_rate = best_rate(prepare, iterations) * len(orders)
+    validate_rate = best_rate(validate, iterations) * len(orders)
+    return {
+        'prepare_ops_per_sec': metric(prepare_rate, 'ops/s'),
+        'validate_params_ops_per_sec': metric(validate_rate, 'ops/s'),
+    }
+
+
+def bench_risk_checks(args) -> Metrics:
+    cache = AccountStateCache()
+    cache.apply_account_snapshot({
+        'assets': [{'asset': 'USDT', 'walletBalance': '100000', 'crossWalletBalance': '100000'}],
+        'positions': [{'symbol': f'SYM{index}USDT', 'positionAmt': '10', 'entryPrice': '1'} for index in range(20)]
+                     + [{'symbol': 'BTCUSDT', 'positionAmt': '0.5', 'entryPrice': '44000'}],
+    })
+    cache.handle_event({'e': 'markPriceUpdate', 's': 'BTCUSDT', 'p': '45000'})
+    open_orders = OpenOrderIndex()
+    for index, order in enumerate(benchmark_orders(50)):
+        open_orders.update({'orderId': index + 1, 'clientOrderId': f'b{index}', 'symbol': order.symbol, 'side': order.side,
+                            'origQty': '0.001', 'executedQty': '0', 'price': '45000', 'status': 'NEW'})
+    limits = RiskLimits(max_position={'BTCUSDT': '5'}, max_position_notional=250000, max_gross_notional=500000,
+                        max_net_notional=400000, max_leverage=5)
+    engine = RiskEngine(limits, cache, metrics=MetricsRegistry())
+    order = Order.create('BTCUSDT', 'BUY', 'LIMIT', '0.001', '45000')
+
+    def check():
+        engine.check(order, open_orders)
+        engine.release(order)
+
+    rate = best_rate(check, args.iterations)
+    return {'check_us': metric(1e6 / rate, 'us', 'lower')}
+
+
+def bench_exchange_info(args) -> Metrics:
+    body = json.dumps(make_exchange_info(300))
+    symbols = 300
+
+    def parse():
+        SymbolRegistry().load(json.loads(body))
+
+    rate = best_rate(parse, max(args.iterations // 1000, 5))
+    return {
+        'load_ms': metric(1000 / rate, 'ms', 'lower'),
+        'us_per_symbol': metric(1e6 / rate / symbols, 'us', 'lower'),
+        'payload_kb': metric(len(body) / 1024, 'KiB', 'lower'),
+    }
+
+
+def bench_order_book(args) -> Metrics:
+    symbols = 200
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'depth.jsonl')
+        write_depth_recording(path, symbols, events=max(args.iterations // 100, 10), gap_every=50)
+        records = list(read_recording(path))
+
+    def replay():
+        replay_recording(OrderBookManager(sorted({record['s'] for record in records}), metrics=MetricsRegistry()), records)
+
+    rate = best_rate(replay, 1, repeats=3)
+    manager = OrderBookManager(sorted({record['s'] for record in records}), metrics=MetricsRegistry())
+    replay_recording(manager, records)
+    queries = time_queries(manager)
+    return {
+        'replay_us_per_record': metric(1e6 / rate / len(records), 'us', 'lower'),
+        'best_bid_ask_us': metric(queries['best bid/ask'], 'us', 'lower'),
+        'vwap_us': metric(queries['vwap(size)'], 'us', 'lower'),
+    }
+
+
+def bench_execution(args) -> Metrics:
+    result = asyncio.run(run_execution(150, max(args.iterations // 5, 2000)))
+    spent = result['spent']
+    children = result['counters'].get(('execution_child_orders_total', 'place'), 0)
+    return {
+        'wakeup_us': metric(spent['seconds'] / max(spent['steps'], 1) * 1e6, 'us', 'lower'),
+        'child_orders_per_s': metric(children / result['elapsed'], 'orders/s'),
+    }
+
+
+def bench_accounts(args, accounts: int = 20) -> Metrics:
+    async def shared(stub):
+        manager = AccountManager(stub.base_url, max_connections=args.concurrency, rate_limiter=unthrottled_limiter(),
+                                 metrics=MetricsRegistry())
+        for index in range(accounts):
+            manager.add_account(f'account{index}', f'{index:02d}' * 32, API_SECRET)
+        start = time.perf_counter()
+        async with manager:
+            await manager.snapshot_balances()
+            startup = time.perf_counter() - start
+            fanout = float('inf')
+            for _ in range(10):
+                started = time.perf_counter()
+                await manager.snapshot_balances()
+                fanout = min(fanout, time.perf_counter() - started)
+        return startup, fanout
+
+    async def independent(stub):
+        clients = [AsyncBinanceFuturesClient(f'{index:02d}' * 32, API_SECRET, base_url=stub.base_url, max_connections=2,
+                                             rate_limiter=unthrottled_limiter(), metrics=MetricsRegistry())
+                   for index in range(accounts)]
+        start = time.perf_counter()
+        await asyncio.gather(*(asyncio.gather(client.refresh_symbols(), client.sync_time()) for client in clients))
+        await asyncio.gather(*(client.get_account_info() for client in clients))
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*(client.close() for client in clients))
+        return elapsed
+
+    with StubExchange(latency=args.latency) as stub:
+        startup, fanout = asyncio.run(shared(stub))
+        shared_counts = (stub.requests.get(('GET', '/fapi/v1/exchangeInfo'), 0), stub.connections)
+    with StubExchange(latency=args.latency) as stub:
+        independent_startup = asyncio.run(independent(stub))
+        independent_counts = (stub.requests.get(('GET', '/fapi/v1/exchangeInfo'), 0), stub.connections)
+    return {
+        'startup_ms': metric(startup * 1000, 'ms', 'lower'),
+        'independent_startup_ms': metric(independent_startup * 1000, 'ms', 'lower'),
+        'balances_fanout_ms': metric(fanout * 1000, 'ms', 'lower'),
+        'exchange_info_downloads': metric(shared_counts[0], 'requests', 'lower'),
+        'independent_exchange_info_downloads': metric(independent_counts[0], 'requests', 'none'),
+        'connections': metric(shared_counts[1], 'connections', 'lower'),
+        'independent_connections': metric(independent_counts[1], 'connections', 'none'),
+    }
+
+
+def bench_order_pipeline(args) -> Metrics:
+    with StubExchange(latency=args.latency) as stub:
+        client = BinanceFuturesClient(API_KEY, API_SECRET, base_url=stub.base_url, rate_limiter=unthrottled_limiter(),
+                                      metrics=MetricsRegistry())
+        manager = OrderManager(client, metrics=client.metrics)
+        client.symbol_registry.refresh()
+        for order in benchmark_orders(20):
+            manager.place_order(order)
+        http = client.metrics.histogram('request_stage_seconds', stage='http', endpoint='/fapi/v1/order')
+        warmup_http = http.total
+
+        latencies = Histogram()
+        orders = benchmark_orders(args.orders)
+        start = time.perf_counter()
+        for order in orders:
+            started = time.perf_counter()
+            manager.place_order(order)
+            latencies.record(time.perf_counter() - started)
+        elapsed = time.perf_counter() - start
+        client.session.close()
+    results = latency_metrics(latencies, len(orders), elapsed)
+    # Time spent in the bot rather than waiting for the stub's response
+    results['overhead_us'] = metric((latencies.total - (http.total - warmup_http)) / len(orders), 'us', 'lower')
+    return results
+
+
+def bench_order_pipeline_async(args) -> Metrics:
+    async def run():
+        with StubExchange(latency=args.latency) as stub:
+            client = AsyncBinanceFuturesClient(API_KEY, API_SECRET, base_url=stub.base_url,
+                                               max_connections=args.concurrency, rate_limiter=unthrottled_limiter(),
+                                               metrics=MetricsRegistry())
+            async with client:
+                manager = AsyncOrderManager(client, metrics=client.metrics)
+                await client.refresh_symbols()
+                await manager.place_orders_concurrently(benchmark_orders(args.concurrency))
+
+                latencies = Histogram()
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def place(order):
+                    async with semaphore:
+                        started = time.perf_counter()
+                        await manager.place_order(order)
+                        latencies.record(time.perf_counter() - started)
+
+                orders = benchmark_orders(args.orders)
+                start = time.perf_counter()
+                await asyncio.gather(*(place(order) for order in orders))
+                return latency_metrics(latencies, len(orders), time.perf_counter() - start)
+
+    results = asyncio.run(run())
+    results['concurrency'] = metric(args.concurrency, 'tasks', 'none')
+    return results
+
+
+def bench_order_pipeline_faults(args) -> Metrics:
+    errors = {'503': 0.01, '429': 0.005, '-1021': 0.005}
+    with tempfile.TemporaryDirectory() as directory, StubExchange(latency=args.latency, errors=errors) as stub:
+        client = BinanceFuturesClient(API_KEY, API_SECRET, base_url=stub.base_url, rate_limiter=unthrottled_limiter(),
+                                      metrics=MetricsRegistry())
+        with OrderJournal(os.path.join(directory, 'orders.wal')) as journal:
+            manager = OrderManager(client, metrics=client.metrics, journal=journal)
+            # The stub has no matching-engine lag to wait out before concluding an order was lost
+            manager.recovery_interval = args.latency
+            client.symbol_registry.refresh()
+            failed = 0
+            latencies = Histogram()
+            orders = benchmark_orders(args.orders)
+            start = time.perf_counter()
+            for order in orders:
+                started = time.perf_counter()
+                try:
+                    manager.place_order(order)
+                except Exception:
+                    failed += 1
+                latencies.record(time.perf_counter() - started)
+            elapsed = time.perf_counter() - start
+            unresolved = len(journal.unresolved())
+        client.session.close()
+    results = latency_metrics(latencies, len(orders), elapsed)
+    results['failed_orders'] = metric(failed, 'orders', 'lower')
+    results['unresolved_orders'] = metric(unresolved, 'orders', 'lower')
+    injected = sum(stub.injected.values())
+    if not injected:
+        raise RuntimeError(f"No faults injected over {len(orders)} orders; raise --orders")
+    results['injected_errors'] = metric(injected, 'requests', 'none')
+    return results
+
+
+def bench_cli_cold_start(args) -> Metrics:
+    command = [sys.executable, os.path.join(ROOT, 'trading_bot', 'cli.py'), '--help']
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    subprocess.run(command, capture_output=True, check=True, env=env)  # warm the OS file cache and .pyc files
+    timings = []
+    for _ in range(args.cold_starts):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True, env=env)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {'best_ms': metric(min(timings), 'ms', 'lower'), 'median_ms': metric(statistics.median(timings), 'ms', 'lower')}
+
+
+def bench_cli_via_daemon(args) -> Metrics:
+    with tempfile.TemporaryDirectory() as directory, StubExchange(latency=args.latency) as stub:
+        client = BinanceFuturesClient(API_KEY, API_SECRET, base_url=stub.base_url, rate_limiter=unthrottled_limiter(),
+                                      metrics=MetricsRegistry())
+        path = os.path.join(directory, 'daemon.sock')
+        daemon = TradingDaemon(OrderManager(client, metrics=client.metrics), path)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        while not ping_daemon(path):
+            time.sleep(0.01)
+        try:
+            order = order_to_wire(benchmark_orders(1)[0])
+            with DaemonClient(path) as rpc:
+                rpc_rate = best_rate(lambda: rpc.call('place_order', order=order), max(args.orders // 10, 10))
+            command = [sys.executable, os.path.join(ROOT, 'trading_bot', 'cli.py'), '--via-daemon', '--socket', path, '--yes',
+                       '--symbol', 'BTCUSDT', '--side', 'BUY', '--type', 'LIMIT', '--quantity', '0.001', '--price', '45000']
+            subprocess.run(command, capture_output=True, check=True)
+            timings = []
+            for _ in range(args.cold_starts):
+                start = time.perf_counter()
+                subprocess.run(command, capture_output=True, check=True)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            daemon.stop()
+            thread.join(5)
+            client.session.close()
+    return {
+        'best_ms': metric(min(timings), 'ms', 'lower'),
+        'median_ms': metric(statistics.median(timings), 'ms', 'lower'),
+        'rpc_order_ms': metric(1000 / rpc_rate, 'ms', 'lower'),
+    }
+
+
+BENCHMARKS = {
+    'signing': bench_signing,
+    'validators': bench_validators,
+    'risk_checks': bench_risk_checks,
+    'exchange_info': bench_exchange_info,
+    'order_book': bench_order_book,
+    'execution': bench_execution,
+    'accounts': bench_accounts,
+    'order_pipeline': bench_order_pipeline,
+    'order_pipeline_async': bench_order_pipeline_async,
+    'order_pipeline_faults': bench_order_pipeline_faults,
+    'cli_cold_start': bench_cli_cold_start,
+    'cli_via_daemon': bench_cli_via_daemon,
+}
+
+
+# --- results ----------------------------------------------------------------
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if dirty else commit
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Print every metric's change against ``baseline``; returns the names of regressed metrics."""
+    regressions = []
+    print(f"\nvs {baseline['meta']['commit']} ({baseline['meta']['timestamp']}):")
+    for name, metrics in current['benchmarks'].items():
+        for key, entry in metrics.items():
+            old = baseline['benchmarks'].get(name, {}).get(key)
+            if old is None or entry['better'] == 'none' or not old['value']:
+                continue
+            change = (entry['value'] - old['value']) / abs(old['value'])
+            worse = -change if entry['better'] == 'higher' else change
+            flag = ''
+            if worse > threshold:
+                flag = '  REGRESSION'
+                regressions.append(f'{name}.{key}')
+            elif worse < -threshold:
+                flag = '  improved'
+            print(f"  {name + '.' + key:<42} {old['value']:>12.3f} -> {entry['value']:>12.3f} {entry['unit']:<8} "
+                  f"{change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trading bot benchmark suite')
+    parser.add_argument('--quick', action='store_true', help='Fewer iterations, for a smoke run')
+    parser.add_argument('--only', help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--latency', type=float, default=0.001, help='Stub response latency in seconds')
+    parser.add_argument('--orders', type=int, help='Orders per pipeline benchmark')
+    parser.add_argument('--concurrency', type=int, default=32, help='In-flight orders for the async pipeline')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='Baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative change that counts as a regression')
+    args = parser.parse_args()
+    args.iterations = 2000 if args.quick else 20000
+    args.orders = args.orders or (100 if args.quick else 1000)
+    args.cold_starts = 3 if args.quick else 10
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+    # Per-order INFO logs are part of the measured cost; only keep them off the terminal
+    logging.getLogger('trading_bot').setLevel(logging.CRITICAL)
+
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'quick': args.quick,
+            'latency': args.latency,
+        },
+        'benchmarks': {},
+    }
+    for name in names:
+        print(f"{name} ...", flush=True)
+        metrics = BENCHMARKS[name](args)
+        results['benchmarks'][name] = metrics
+        for key, entry in metrics.items():
+            print(f"  {key:<28} {entry['value']:>14.3f} {entry['unit']}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Binance USD-M futures REST endpoints used by the bot.
+
+Answers exchangeInfo, time, order (place/query/modify/cancel), batchOrders,
+allOpenOrders, openOrders, positionRisk, account and listenKey with
+well-formed responses, so clients pointed at it with ``base_url`` run their
+full request path (signing, rate limiting, HTTP, parsing) without touching
+the testnet. Signatures are not checked.
+
+Every response can be delayed by a fixed latency plus uniform jitter, and a
+fraction of requests can be failed on purpose: ``errors`` maps an error kind
+to its probability, where the kind is an HTTP status (503, 429, ...),
+``'-1021'`` for a timestamp rejection, or ``'drop'`` to close the connection
+without answering. Failures are spread through the run at seeded offsets, so
+a kind with probability p fails about p * requests of them, never zero once
+the run has 1/p requests.
+
+``StubWebSocketServer`` is the matching stand-in for the stream endpoints:
+it accepts websocket connections on any path, pushes the events a test
+gives it, and can drop every connection to exercise reconnects.
+
+Usage: python benchmarks/stub_server.py [--port 8080] [--symbols 300] [--latency 0.002]
+                                        [--jitter 0.001] [--errors 503:0.01,429:0.005]
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+
+def make_exchange_info(symbols: int = 300) -> Dict[str, Any]:
+    """A futures exchangeInfo payload with BTCUSDT, ETHUSDT and ``symbols - 2`` generated perpetuals."""
+    rng = random.Random(1)
+    entries = [_symbol_entry('BTCUSDT', '0.10', '0.001', 3), _symbol_entry('ETHUSDT', '0.01', '0.001', 3)]
+    for index in range(max(symbols - 2, 0)):
+        tick = rng.choice(['0.1', '0.01', '0.001', '0.0001', '0.00001'])
+        step, quantity_precision = rng.choice([('1', 0), ('0.1', 1), ('0.01', 2), ('0.001', 3)])
+        entries.append(_symbol_entry(f'SYM{index}USDT', tick, step, quantity_precision))
+    return {
+        'timezone': 'UTC',
+        'serverTime': int(time.time() * 1000),
+        'rateLimits': [
+            {'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1, 'limit': 2400},
+            {'rateLimitType': 'ORDERS', 'interval': 'MINUTE', 'intervalNum': 1, 'limit': 1200},
+            {'rateLimitType': 'ORDERS', 'interval': 'SECOND', 'intervalNum': 10, 'limit': 300},
+        ],
+        'assets': [{'asset': 'USDT', 'marginAvailable': True, 'autoAssetExchange': '-10000'}],
+        'symbols': entries,
+    }
+
+
+def _symbol_entry(symbol: str, tick_size: str, step_size: str, quantity_precision: int) -> Dict[str, Any]:
+    return {
+        'symbol': symbol, 'pair': symbol, 'contractType': 'PERPETUAL', 'status': 'TRADING',
+        'baseAsset': symbol[:-4], 'quoteAsset': 'USDT', 'marginAsset': 'USDT',
+        'pricePrecision': len(tick_size.partition('.')[2]), 'quantityPrecision': quantity_precision,
+        'baseAssetPrecision': 8, 'quotePrecision': 8, 'underlyingType': 'COIN',
+        'settlePlan': 0, 'triggerProtect': '0.0500', 'liquidationFee': '0.012500', 'marketTakeBound': '0.05',
+        'orderTypes': ['LIMIT', 'MARKET', 'STOP', 'STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET', 'TRAILING_STOP_MARKET'],
+        'timeInForce': ['GTC', 'IOC', 'FOK', 'GTX', 'GTD'],
+        'filters': [
+            {'filterType': 'PRICE_FILTER', 'tickSize': tick_size, 'minPrice': tick_size, 'maxPrice': '4529764'},
+            {'filterType': 'LOT_SIZE', 'stepSize': step_size, 'minQty': step_size, 'maxQty': '1000000'},
+            {'filterType': 'MARKET_LOT_SIZE', 'stepSize': step_size, 'minQty': step_size, 'maxQty': '120000'},
+            {'filterType': 'MAX_NUM_ORDERS', 'limit': 200},
+            {'filterType': 'MAX_NUM_ALGO_ORDERS', 'limit': 10},
+            {'filterType': 'MIN_NOTIONAL', 'notional': '5'},
+            {'filterType': 'PERCENT_PRICE', 'multiplierUp': '1.0500', 'multiplierDown': '0.9500', 'multiplierDecimal': '4'},
+        ],
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops bursts of new connections into a 1s SYN retry
+    request_queue_size = 128
+
+
+class StubExchange:
+    """Threaded HTTP server implementing the futures endpoints the bot calls.
+
+    Orders are accepted as NEW and kept in memory, so they can be queried,
+    amended and cancelled; nothing ever fills. ``requests`` counts calls per
+    ``(method, path)``, ``connections`` counts TCP connections accepted and
+    ``injected`` counts the failures injected per kind.
+    """
+
+    def __init__(self, port: int = 0, symbols: int = 300, latency: float = 0.0, jitter: float = 0.0,
+                 errors: Optional[Dict[str, float]] = None, seed: int = 7):
+        self.exchange_info = make_exchange_info(symbols)
+        self.exchange_info_body = json.dumps(self.exchange_info).encode('utf-8')
+        self.latency = latency
+        self.jitter = jitter
+        self.errors = dict(errors or {})
+        self.requests: Dict[Tuple[str, str], int] = {}
+        self.injected: Dict[str, int] = {}
+        self._error_credit: Dict[str, float] = {}
+        self.connections = 0
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self._client_ids: Dict[str, int] = {}
+        self._next_order_id = 1
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.server = _Server(('127.0.0.1', port), _make_handler(self))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StubExchange':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='stub-exchange', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'StubExchange':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # --- request handling ------------------------------------------------
+
+    def _pick_error(self, signed: bool) -> Optional[str]:
+        """Error to inject into this request, if any.
+
+        Each kind builds up credit by its probability on every request and
+        fails one when the credit reaches 1. From a seeded random starting
+        credit this fails ``probability * requests`` requests (rounded
+        either way) whatever the seed, so short runs still see errors.
+        """
+        if not self.errors:
+            return None
+        with self._lock:
+            chosen = None
+            for kind, probability in self.errors.items():
+                if kind == '-1021' and not signed:
+                    continue  # Only signed requests carry a timestamp
+                credit = self._error_credit.get(kind)
+                credit = (self._random.random() if credit is None else credit) + probability
+                if chosen is None and credit >= 1:
+                    chosen = kind
+                    credit -= 1
+                self._error_credit[kind] = credit
+            if chosen is not None:
+                self.injected[chosen] = self.injected.get(chosen, 0) + 1
+            return chosen
+
+    def _delay(self) -> None:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def handle(self, method: str, path: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        with self._lock:
+            self.requests[(method, path)] = self.requests.get((method, path), 0) + 1
+        if path == '/fapi/v1/time':
+            return 200, {'serverTime': int(time.time() * 1000)}
+        if path == '/fapi/v1/exchangeInfo':
+            return 200, self.exchange_info_body
+        if path == '/fapi/v1/premiumIndex':
+            return 200, self._premium_index(params.get('symbol'))
+        if path == '/fapi/v1/order':
+            return self._order(method, params)
+        if path == '/fapi/v1/batchOrders':
+            if method == 'POST':
+                return 200, [self._new_order(order) for order in json.loads(params.get('batchOrders', '[]'))]
+            ids = json.loads(params.get('orderIdList') or params.get('origClientOrderIdList') or '[]')
+            key = 'orderId' if 'orderIdList' in params else 'origClientOrderId'
+            return 200, [self._cancel({'symbol': params.get('symbol'), key: value})[1] for value in ids]
+        if path == '/fapi/v1/allOpenOrders':
+            with self._lock:
+                for order_id in [i for i, o in self.orders.items() if o['symbol'] == params.get('symbol')]:
+                    self._client_ids.pop(self.orders.pop(order_id)['clientOrderId'], None)
+            return 200, {'code': 200, 'msg': 'The operation of cancel all open order is done.'}
+        if path == '/fapi/v1/openOrders':
+            with self._lock:
+                return 200, [o for o in self.orders.values() if params.get('symbol') in (None, o['symbol'])]
+        if path in ('/fapi/v2/positionRisk', '/fapi/v3/positionRisk'):
+            return 200, []
+        if path in ('/fapi/v2/account', '/fapi/v3/account'):
+            return 200, {'totalWalletBalance': '10000.00000000', 'availableBalance': '10000.00000000',
+                         'assets': [], 'positions': []}
+        if path == '/fapi/v1/listenKey':
+            return 200, {'listenKey': 'stub-listen-key'}
+        return 404, {'code': -1000, 'msg': f'Unknown endpoint {method} {path}'}
+
+    def _premium_index(self, symbol: Optional[str]) -> Any:
+        entries = [{'symbol': entry['symbol'], 'markPrice': '50000.00000000', 'lastFundingRate': '0.00010000',
+                    'time': int(time.time() * 1000)}
+                   for entry in self.exchange_info['symbols'] if symbol in (None, entry['symbol'])]
+        return entries[0] if symbol else entries
+
+    def _order(self, method: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        if method == 'POST':
+            result = self._new_order(params)
+            return (400, result) if 'code' in result else (200, result)
+        if method == 'DELETE':
+            return self._cancel(params)
+        order = self._find(params)
+        if order is None:
+            return 400, {'code': -2013, 'msg': 'Order does not exist.'}
+        if method == 'PUT':
+            with self._lock:
+                order.update(price=params.get('price', order['price']), origQty=params.get('quantity', order['origQty']),
+                             updateTime=int(time.time() * 1000))
+        return 200, order
+
+    def _new_order(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        now = int(time.time() * 1000)
+        with self._lock:
+            client_order_id = params.get('newClientOrderId') or f'stub{self._next_order_id}'
+            if client_order_id in self._client_ids:
+                return {'code': -4116, 'msg': 'ClientOrderId is duplicated.'}
+            order_id = self._next_order_id
+            self._next_order_id += 1
+            order = {
+                'orderId': order_id, 'symbol': params.get('symbol'), 'status': 'NEW', 'clientOrderId': client_order_id,
+                'price': params.get('price', '0'), 'avgPrice': '0.00', 'origQty': params.get('quantity', '0'),
+                'executedQty': '0', 'cumQuote': '0.00000', 'timeInForce': params.get('timeInForce', 'GTC'),
+                'type': params.get('type'), 'reduceOnly': params.get('reduceOnly') == 'true', 'closePosition': False,
+                'side': params.get('side'), 'positionSide': params.get('positionSide', 'BOTH'),
+                'stopPrice': params.get('stopPrice', '0'), 'workingType': 'CONTRACT_PRICE', 'priceProtect': False,
+                'origType': params.get('type'), 'priceMatch': 'NONE', 'selfTradePreventionMode': 'NONE',
+                'goodTillDate': 0, 'updateTime': now,
+            }
+            self.orders[order_id] = order
+            self._client_ids[client_order_id] = order_id
+        return order
+
+    def _find(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if params.get('orderId') is not None:
+                return self.orders.get(int(params['orderId']))
+            order_id = self._client_ids.get(params.get('origClientOrderId'))
+            return self.orders.get(order_id) if order_id is not None else None
+
+    def _cancel(self, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        order = self._find(params)
+        if order is None:
+            return 400, {'code': -2011, 'msg': 'Unknown order sent.'}
+        with self._lock:
+            self.orders.pop(order['orderId'], None)
+            self._client_ids.pop(order['clientOrderId'], None)
+        return 200, dict(order, status='CANCELED')
+
+
+def _make_handler(exchange: StubExchange):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately; without this, delayed ACKs add ~40ms per response
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def setup(self) -> None:
+            super().setup()
+            with exchange._lock:
+                exchange.connections += 1
+
+        def _dispatch(self) -> None:
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query))
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                params.update(parse_qsl(self.rfile.read(length).decode('utf-8')))
+            exchange._delay()
+            error = exchange._pick_error('signature' in params)
+            if error == 'drop':
+                self.close_connection = True
+                return
+            if error == '-1021':
+                status, body = 400, {'code': -1021, 'msg': "Timestamp for this request is outside of the recvWindow."}
+            elif error is not None:
+                status, body = int(error), {'code': -1003 if error == '429' else -1001, 'msg': 'Injected error'}
+            else:
+                status, body = exchange.handle(self.command, url.path, params)
+            self._send(status, body, retry_after=error == '429')
+
+        def _send(self, status: int, body: Any, retry_after: bool = False) -> None:
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            if retry_after:
+                self.send_header('Retry-After', '0')
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    return Handler
+
+
+_WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class StubWebSocketServer:
+    """Asyncio websocket server standing in for the Binance stream endpoints.
+
+    Every connection is accepted whatever its path (``paths`` records them,
+    e.g. ``/ws/<listenKey>``). ``send`` pushes a JSON event, or raw text,
+    to every open connection; ``drop`` closes them all without a close
+    frame, as a network failure would. Client frames are read and ignored.
+    """
+
+    def __init__(self, port: int = 0):
+        self.port = port
+        self.paths: List[str] = []
+        self._writers: List[asyncio.StreamWriter] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connected = asyncio.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    @property
+    def connections(self) -> int:
+        return len(self._writers)
+
+    async def start(self) -> 'StubWebSocketServer':
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        await self.drop()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> 'StubWebSocketServer':
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def wait_connected(self, count: int = 1, timeout: float = 5.0) -> None:
+        """Wait until at least ``count`` connections are open."""
+        async def wait():
+            while len(self._writers) < count:
+                self._connected.clear()
+                await self._connected.wait()
+        await asyncio.wait_for(wait(), timeout)
+
+    async def send(self, message: Union[Dict[str, Any], str]) -> None:
+        payload = (message if isinstance(message, str) else json.dumps(message)).encode('utf-8')
+        length = len(payload)
+        if length < 126:
+            header = bytes([0x81, length])
+        elif length < 2 ** 16:
+            header = bytes([0x81, 126]) + struct.pack('!H', length)
+        else:
+            header = bytes([0x81, 127]) + struct.pack('!Q', length)
+        for writer in list(self._writers):
+            writer.write(header + payload)
+            await writer.drain()
+
+    async def drop(self) -> None:
+        writers, self._writers = self._writers, []
+        for writer in writers:
+            writer.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        lines = request.decode('latin-1').split('\r\n')
+        headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(':') for line in lines[1:])}
+        accept = base64.b64encode(hashlib.sha1(headers.get('sec-websocket-key', '').encode() + _WS_GUID).digest()).decode()
+        writer.write((f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+        self.paths.append(lines[0].split(' ')[1])
+        self._writers.append(writer)
+        self._connected.set()
+        try:
+            # Discard client frames (pongs, close) until the client goes away
+            while await reader.read(65536):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            if writer in self._writers:
+                self._writers.remove(writer)
+            writer.close()
+
+
+def parse_errors(spec: str) -> Dict[str, float]:
+    """Parse ``'503:0.01,429:0.005'`` into ``{'503': 0.01, '429': 0.005}``."""
+    errors = {}
+    for item in filter(None, spec.split(',')):
+        kind, _, probability = item.partition(':')
+        errors[kind.strip()] = float(probability)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Binance futures REST stub')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.0, help='Fixed delay per response, in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra uniform delay of up to this many seconds')
+    parser.add_argument('--errors', default='', help="Injected failures, e.g. '503:0.01,429:0.005,-1021:0.001,drop:0.001'")
+    args = parser.parse_args()
+
+    exchange = StubExchange(args.port, args.symbols, args.latency, args.jitter, parse_errors(args.errors))
+    print(f"Stub exchange listening on {exchange.base_url} (Ctrl+C to stop)")
+    try:
+        exchange.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exchange.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import asyncio
+
+from benchmarks.stub_server import StubExchange
+from trading_bot.bot.accounts import AccountManager
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.models import Order
+from trading_bot.bot.rate_limiter import RateLimiter
+
+API_SECRET = 'x' * 64
+NAMES = ('alpha', 'beta', 'gamma')
+
+
+def account_manager(exchange: StubExchange, metrics: MetricsRegistry) -> AccountManager:
+    manager = AccountManager(exchange.base_url, max_connections=4, rate_limiter=RateLimiter(), metrics=metrics)
+    for index, name in enumerate(NAMES):
+        manager.add_account(name, f'{index:02d}' * 32, API_SECRET)
+    return manager
+
+
+def errors_by_account(metrics: MetricsRegistry, operation: str) -> dict:
+    return {entry['labels']['account']: entry['value'] for entry in metrics.snapshot()['counters']
+            if entry['name'] == 'account_errors_total' and entry['labels']['operation'] == operation}
+
+
+def test_accounts_share_one_pool_registry_and_time_sync():
+    async def run(exchange):
+        async with account_manager(exchange, MetricsRegistry()) as manager:
+            clients = [manager.get(name).client for name in NAMES]
+            assert len({client.api_key for client in clients}) == len(NAMES)
+            assert all(client.pool is manager.public.pool for client in clients)
+            assert all(client.symbol_registry is manager.symbol_registry for client in clients)
+            assert all(client.time_sync is manager.time_sync for client in clients)
+            # Request weight is per IP, order counts per account
+            limiters = [manager.get(name).rate_limiter for name in NAMES]
+            assert all(limiter.weight is manager.rate_limiter.weight for limiter in limiters)
+            assert len({id(limiter.orders_10s) for limiter in limiters}) == len(NAMES)
+            assert all(manager.get(name).cache.mark_prices is manager.market.mark_prices for name in NAMES)
+
+            await asyncio.gather(*(manager.get(name).manager.place_order(Order.create('BTCUSDT', 'BUY', 'LIMIT', '0.01', '40000'))
+                                   for name in NAMES))
+            return manager.time_sync.samples_per_sync
+
+    with StubExchange(symbols=5) as exchange:
+        samples_per_sync = asyncio.run(run(exchange))
+    assert exchange.requests[('GET', '/fapi/v1/exchangeInfo')] == 1
+    assert exchange.requests[('GET', '/fapi/v1/time')] == samples_per_sync  # one clock sync
+    assert exchange.requests[('POST', '/fapi/v1/order')] == len(NAMES)
+    assert exchange.connections <= 4
+
+
+def test_snapshot_balances_reports_failures_per_account():
+    metrics = MetricsRegistry()
+
+    async def run(exchange):
+        async with account_manager(exchange, metrics) as manager:
+            async def unreachable():
+                raise ConnectionError("connection reset")
+
+            manager.get('beta').client.get_account_info = unreachable
+            return await manager.snapshot_balances()
+
+    with StubExchange(symbols=5) as exchange:
+        results = asyncio.run(run(exchange))
+    assert list(results) == list(NAMES)
+    assert results['alpha']['totalWalletBalance'] == '10000.00000000'
+    assert results['gamma']['totalWalletBalance'] == '10000.00000000'
+    assert isinstance(results['beta'], ConnectionError)
+    assert exchange.requests[('GET', '/fapi/v2/account')] == 2
+    assert errors_by_account(metrics, 'snapshot_balances') == {'beta': 1}
+
+
+def test_cancel_all_orders_fans_out_and_reports_failures_per_account():
+    metrics = MetricsRegistry()
+
+    async def run(exchange):
+        async with account_manager(exchange, metrics) as manager:
+            alpha = manager.get('alpha').manager
+            await alpha.place_order(Order.create('ETHUSDT', 'SELL', 'LIMIT', '0.1', '3000'))
+            assert len(alpha.open_orders.orders()) == 1
+
+            async def rejected(symbol):
+                raise ValueError("API Error -2015: Invalid API-key")
+
+            manager.get('gamma').manager.client.cancel_all_orders = rejected
+            named = await manager.cancel_all_orders(['btcusdt'])
+            # Without symbols, each account lists its open orders first
+            listed = await manager.cancel_all_orders(names=['alpha'])
+            return named, listed, alpha.open_orders.orders()
+
+    with StubExchange(symbols=5) as exchange:
+        named, listed, alpha_open = asyncio.run(run(exchange))
+    assert named['alpha'] == named['beta'] == ['BTCUSDT']
+    assert isinstance(named['gamma'], ValueError)
+    assert listed == {'alpha': ['ETHUSDT']}
+    assert alpha_open == []
+    assert exchange.orders == {}
+    assert exchange.requests[('DELETE', '/fapi/v1/allOpenOrders')] == 3
+    assert errors_by_account(metrics, 'cancel_all_orders') == {'gamma': 1}
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from trading_bot.bot.async_client import AsyncBinanceFuturesClient, AsyncHTTPConnectionPool
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.rate_limiter import RateLimiter
+
+RESPONSE = b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\n{}'
+
+
+async def serve_then_drop(requests):
+    """Answer the first request on each connection, then read the next one and close without answering."""
+    async def handle(reader, writer):
+        answered = False
+        while True:
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = int(next((line.split(b':')[1] for line in head.split(b'\r\n')
+                               if line.lower().startswith(b'content-length')), b'0'))
+            await reader.readexactly(length)
+            requests.append(head.split(b' ', 1)[0].decode())
+            if answered:
+                writer.close()
+                return
+            writer.write(RESPONSE)
+            await writer.drain()
+            answered = True
+
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+@pytest.mark.parametrize('method, attempts', [('POST', 1), ('GET', 2)])
+def test_dropped_keepalive_request_is_only_resent_for_get(method, attempts):
+    async def run():
+        requests = []
+        server = await serve_then_drop(requests)
+        port = server.sockets[0].getsockname()[1]
+        pool = AsyncHTTPConnectionPool(f'http://127.0.0.1:{port}', max_connections=1, timeout=2.0)
+        await pool.request('GET', '/warmup')
+        requests.clear()
+        try:
+            if method == 'POST':
+                with pytest.raises(OSError):
+                    await pool.request('POST', '/fapi/v1/order', body=b'symbol=BTCUSDT')
+            else:
+                status, _, _ = await pool.request('GET', '/fapi/v1/time')
+                assert status == 200
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+        return requests
+
+    assert asyncio.run(run()) == [method] * attempts
+
+
+def test_signed_timestamp_is_taken_after_rate_limit_wait():
+    async def run():
+        received = []
+
+        async def handle(reader, writer):
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    return
+                target = head.split(b' ')[1].decode()
+                received.append((time.time() * 1000, parse_qs(urlsplit(target).query)))
+                writer.write(RESPONSE)
+                await writer.drain()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        limiter = RateLimiter()
+        client = AsyncBinanceFuturesClient('k' * 64, 'x' * 64, base_url=f'http://127.0.0.1:{port}', rate_limiter=limiter,
+                                           metrics=MetricsRegistry())
+        client.time_sync.record_sample(time.time(), int(time.time() * 1000), time.time())
+        client.time_sync.mark_synced()
+        limiter.pause(0.5)
+        await client.get_account_info()
+        await client.close()
+        server.close()
+        await server.wait_closed()
+        return received
+
+    arrived_ms, query = asyncio.run(run())[-1]
+    assert arrived_ms - int(query['timestamp'][0]) < 250
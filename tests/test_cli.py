@@ -0,0 +1,22 @@
+from trading_bot import cli
+
+
+def daemon_args(tmp_path, *extra):
+    return cli.create_parser().parse_args(['--via-daemon', '--yes', '--socket', str(tmp_path / 'missing.sock'), *extra])
+
+
+def test_bad_batch_file_is_not_reported_as_missing_daemon(tmp_path, capsys):
+    batch = tmp_path / 'orders.csv'
+    batch.write_text('symbol,side,type,quantity\nBTCUSDT,BUY,LIMIT,abc\n')
+    assert cli.run_via_daemon(daemon_args(tmp_path, '--batch-file', str(batch))) == 1
+    output = capsys.readouterr().out
+    assert "invalid quantity 'abc'" in output and 'no daemon reachable' not in output
+
+    assert cli.run_via_daemon(daemon_args(tmp_path, '--batch-file', str(tmp_path / 'absent.csv'))) == 1
+    assert 'no daemon reachable' not in capsys.readouterr().out
+
+
+def test_missing_daemon_is_reported(tmp_path, capsys):
+    args = daemon_args(tmp_path, '--symbol', 'BTCUSDT', '--side', 'BUY', '--type', 'MARKET', '--quantity', '0.01')
+    assert cli.run_via_daemon(args) == 1
+    assert 'no daemon reachable' in capsys.readouterr().out
@@ -0,0 +1,32 @@
+import json
+import socket
+import threading
+from types import SimpleNamespace
+
+from trading_bot.bot import daemon
+from trading_bot.bot.daemon import TradingDaemon
+
+
+def test_oversized_request_gets_one_error_and_the_connection_is_closed(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon, 'MAX_MESSAGE_BYTES', 64)
+    server = TradingDaemon(SimpleNamespace(client=None), str(tmp_path / 'daemon.sock'))
+    server._bind()
+    thread = threading.Thread(target=server._server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(5)
+            connection.connect(server.path)
+            reader = connection.makefile('rb')
+            connection.sendall(b'{"method": "ping"}\n')
+            assert json.loads(reader.readline())['ok']
+
+            # The tail of the long line must not be parsed as a request of its own
+            connection.sendall(b'{"method": "ping", "params": {}, "padding": "' + b'x' * 100 + b'"}\n{"method": "ping"}\n')
+            response = json.loads(reader.readline())
+            assert not response['ok'] and 'longer than 64 bytes' in response['error']
+            assert reader.readline() == b''
+    finally:
+        server.stop()
+        server._server.server_close()
+        thread.join(5)
@@ -0,0 +1,151 @@
+import asyncio
+import random
+from decimal import Decimal
+
+import pytest
+
+from trading_bot.bot.backtest import replay_with_scheduler, simulated_scheduler
+from trading_bot.bot.execution import CANCELED, FAILED, FILLED, TWAP, ExecutionScheduler, Iceberg, VWAPAlgo
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.orders import AsyncOrderManager
+from trading_bot.bot.risk import RiskEngine, RiskLimits
+from trading_bot.bot.simulator import AsyncSimulatedExchange, MarketData, SimulatedClock, SimulatedExchange
+from trading_bot.bot.streams import AccountStateCache
+
+
+def test_scheduler_needs_a_reference_price():
+    client = AsyncSimulatedExchange(SimulatedExchange())
+    with pytest.raises(ValueError):
+        ExecutionScheduler(AsyncOrderManager(client, metrics=MetricsRegistry()), metrics=MetricsRegistry())
+
+    cache = AccountStateCache()
+    scheduler = ExecutionScheduler(AsyncOrderManager(client, cache, MetricsRegistry()), metrics=MetricsRegistry())
+    assert scheduler.price_source('BTCUSDT') is None
+    cache.handle_event({'e': 'markPriceUpdate', 's': 'BTCUSDT', 'p': '50000'})
+    assert scheduler.price_source('BTCUSDT') == Decimal('50000')
+    cache.handle_event({'e': 'bookTicker', 's': 'BTCUSDT', 'u': 1, 'b': '50100', 'B': '1', 'a': '50110', 'A': '1'})
+    assert scheduler.price_source('BTCUSDT') == Decimal('50105')
+
+
+START_MS = 1_700_000_000_000
+
+
+def simulated(risk=None):
+    """A simulated exchange at 50000 with a scheduler on its manual clock."""
+    exchange = SimulatedExchange(balance=1_000_000, clock=SimulatedClock(START_MS))
+    exchange.set_price('BTCUSDT', '50000')
+    manager = None
+    if risk is not None:
+        manager = AsyncOrderManager(AsyncSimulatedExchange(exchange), risk.state_cache, MetricsRegistry(), risk=risk)
+        exchange.add_listener(manager.open_orders.handle_event)
+    return exchange, simulated_scheduler(exchange, manager, metrics=MetricsRegistry())
+
+
+def run_at(exchange: SimulatedExchange, scheduler, seconds: float) -> None:
+    exchange.clock.set(START_MS + int(seconds * 1000))
+    asyncio.run(scheduler.run_due())
+
+
+def open_orders(exchange: SimulatedExchange) -> list:
+    return exchange.get_open_orders('BTCUSDT')
+
+
+def test_twap_sends_one_slice_per_interval():
+    exchange, scheduler = simulated()
+    algo_id = scheduler.submit(TWAP('BTCUSDT', 'BUY', '0.3', duration=30, interval=10, offset_bps=-10))
+    algo = scheduler.algos[algo_id]
+
+    run_at(exchange, scheduler, 0)
+    assert [child.quantity for child in algo.children] == [Decimal('0.1')]
+    assert algo.children[0].price == Decimal('49950')   # 10 bps passive
+    assert scheduler._wakes[algo_id] == START_MS / 1000 + 10
+
+    exchange.set_price('BTCUSDT', '49940', '1')          # a print through the child's price fills it
+    assert algo.filled == Decimal('0.1') and algo.working is None
+    run_at(exchange, scheduler, 5)                        # ahead of schedule: nothing new before the next slice
+    assert len(algo.children) == 1
+
+    run_at(exchange, scheduler, 10)
+    assert [child.quantity for child in algo.children] == [Decimal('0.1'), Decimal('0.1')]
+    run_at(exchange, scheduler, 20)                       # second slice unfilled: leftover child grows to the shortfall
+    assert len(algo.children) == 2 and algo.working.quantity == Decimal('0.2')
+    assert [order['origQty'] for order in open_orders(exchange)] == ['0.2']
+
+    run_at(exchange, scheduler, 30)                       # duration elapsed: rest goes out at market
+    assert algo.status == FILLED and algo.filled == Decimal('0.3')
+    assert algo.children[-1].price is None and not open_orders(exchange)
+
+
+def test_iceberg_shows_only_the_display_quantity():
+    exchange, scheduler = simulated()
+    algo = scheduler.algos[scheduler.submit(Iceberg('BTCUSDT', 'SELL', '1', display='0.25', limit_price='50100'))]
+
+    run_at(exchange, scheduler, 0)
+    assert [(order['origQty'], order['price']) for order in open_orders(exchange)] == [('0.25', '50100')]
+    assert algo.remaining == Decimal('1')
+
+    for filled in ('0.25', '0.5', '0.75'):
+        exchange.set_price('BTCUSDT', '50110', '5')      # the visible part trades; the next one is sent at once
+        exchange.set_price('BTCUSDT', '50000', '0.001')
+        run_at(exchange, scheduler, 0)
+        assert algo.filled == Decimal(filled)
+        assert [order['origQty'] for order in open_orders(exchange)] == ['0.25']
+    exchange.set_price('BTCUSDT', '50110', '5')
+    run_at(exchange, scheduler, 0)
+    assert algo.status == FILLED and len(algo.children) == 4 and not open_orders(exchange)
+
+
+def test_vwap_stays_under_its_participation():
+    exchange, scheduler = simulated()
+    algo = scheduler.algos[scheduler.submit(VWAPAlgo('BTCUSDT', 'BUY', '5', participation='0.1', interval=1,
+                                                     offset_bps=5))]
+    rng = random.Random(3)
+    times = [START_MS + 250 * index for index in range(240)]
+    prices = [50000 + rng.uniform(-20, 20) for _ in times]
+    quantities = [round(rng.uniform(0.01, 0.2), 3) for _ in times]
+    asyncio.run(replay_with_scheduler(scheduler, exchange, 'BTCUSDT', MarketData(times, prices, quantities)))
+
+    # Volume counts from the first wake-up, after the first one-second window
+    assert float(algo.market_volume) == pytest.approx(sum(quantities[4:]))
+    cap = algo.market_volume * Decimal('0.1')
+    assert cap - Decimal('0.1') <= algo.filled <= cap
+    assert not algo.is_finished
+
+
+def test_leftover_child_is_repriced_in_place():
+    exchange, scheduler = simulated()
+    algo = scheduler.algos[scheduler.submit(TWAP('BTCUSDT', 'BUY', '0.2', duration=20, interval=10, offset_bps=-10,
+                                                 reprice_bps=5))]
+    run_at(exchange, scheduler, 0)
+    child = algo.working
+    assert child.price == Decimal('49950')
+
+    exchange.set_price('BTCUSDT', '50010')               # 2 bps: below the re-price threshold
+    run_at(exchange, scheduler, 1)
+    assert child.price == Decimal('49950')
+
+    exchange.set_price('BTCUSDT', '50200')
+    run_at(exchange, scheduler, 10)
+    assert algo.children == [child] and algo.working is child
+    assert child.price == Decimal('50149.8') and child.quantity == Decimal('0.2')
+    assert [(order['price'], order['origQty']) for order in open_orders(exchange)] == [('50149.8', '0.2')]
+
+
+def test_cancel_and_kill_switch_finish_parents():
+    exchange, scheduler = simulated()
+    algo_id = scheduler.submit(TWAP('BTCUSDT', 'BUY', '0.2', duration=20, interval=10, offset_bps=-10))
+    run_at(exchange, scheduler, 0)
+    assert open_orders(exchange)
+    assert scheduler.cancel(algo_id)
+    run_at(exchange, scheduler, 0)
+    assert scheduler.algos[algo_id].status == CANCELED and not open_orders(exchange)
+
+    risk = RiskEngine(RiskLimits(), AccountStateCache(), MetricsRegistry())
+    exchange, scheduler = simulated(risk)
+    algo = scheduler.algos[scheduler.submit(TWAP('BTCUSDT', 'BUY', '0.2', duration=20, interval=10, offset_bps=-10))]
+    run_at(exchange, scheduler, 0)
+    assert algo.working is not None
+    risk.trip_kill_switch('test')
+    run_at(exchange, scheduler, 10)
+    assert algo.status == FAILED and 'Kill switch' in algo.reason
+    assert not open_orders(exchange)
@@ -0,0 +1,44 @@
+import math
+
+import numpy as np
+
+from trading_bot.bot.indicators import SMA, Bollinger, ZScore, bollinger, sma, zscore
+
+
+def drifting_series(count: int, seed: int = 3) -> np.ndarray:
+    """30k -> 60k drift with 0.05 noise, like a long live stream."""
+    rng = np.random.default_rng(seed)
+    return np.linspace(30000.0, 60000.0, count) + rng.normal(0.0, 0.05, count)
+
+
+def exact_mean_std(values: np.ndarray, period: int):
+    windows = np.lib.stride_tricks.sliding_window_view(values, period)
+    return windows.mean(axis=1), windows.std(axis=1)
+
+
+def test_incremental_matches_batch_bit_for_bit_across_rebases():
+    values = drifting_series(5000)
+    for period in (1, 20, 1500):
+        middle, upper, _ = bollinger(values, period)
+        scores = zscore(values, period)
+        averages = sma(values, period)
+        bands, zs, moving = Bollinger(period), ZScore(period), SMA(period)
+        for index, value in enumerate(values):
+            live_middle, live_upper, _ = bands.update(value)
+            live_score = zs.update(value)
+            live_average = moving.update(value)
+            for live, batch in ((live_middle, middle[index]), (live_upper, upper[index]),
+                                (live_score, scores[index]), (live_average, averages[index])):
+                assert live == batch or (math.isnan(live) and math.isnan(batch)), (period, index)
+
+
+def test_long_series_stays_accurate():
+    values = drifting_series(2_000_000)
+    period = 20
+    mean, std = exact_mean_std(values, period)
+    middle, upper, _ = bollinger(values, period)
+    got_std = (upper - middle)[period - 1:] / 2.0
+    assert np.max(np.abs(middle[period - 1:] - mean)) < 1e-6
+    assert np.max(np.abs(got_std - std) / std) < 1e-3
+    scores = zscore(values, period)[period - 1:]
+    assert np.max(np.abs(scores - (values[period - 1:] - mean) / std)) < 1e-2
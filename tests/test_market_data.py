@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+from trading_bot.bot.market_data import MarketDataStore, agg_trade_columns, day_start, to_ms
+from trading_bot.bot.simulator import SimulatedExchange, market_data_from_columns
+
+
+def test_market_data_does_not_import_simulator():
+    code = "import sys, trading_bot.bot.market_data; print('trading_bot.bot.simulator' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_stored_agg_trades_replay_in_simulator(tmp_path):
+    start = to_ms('2024-01-03')
+    trades = [{'a': i, 'p': str(100 + i), 'q': '0.5', 'f': i, 'l': i, 'T': start + i * 1000, 'm': False} for i in range(3)]
+    store = MarketDataStore(str(tmp_path))
+    store.write_day('aggTrades', 'BTCUSDT', day_start(start), agg_trade_columns(trades), complete=True)
+
+    data = market_data_from_columns(store.agg_trades('BTCUSDT', '2024-01-03', '2024-01-04'))
+    assert data.times == [start, start + 1000, start + 2000]
+    assert data.prices == [100.0, 101.0, 102.0]
+    assert all(type(value) is int for value in data.times)
+
+    exchange = SimulatedExchange()
+    assert exchange.replay('BTCUSDT', data) == 3
+    assert exchange.get_last_price('BTCUSDT') == 102
@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+
+from trading_bot.bot import order_book
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.order_book import (SNAPSHOT_EVENT, OrderBook, OrderBookGap, OrderBookManager, read_recording,
+                                        replay_recording)
+
+
+def snapshot(last_update_id: int = 100) -> dict:
+    return {'lastUpdateId': last_update_id, 'E': 1,
+            'bids': [['100.0', '1'], ['99.0', '2'], ['98.0', '0']],
+            'asks': [['101.0', '1'], ['102.0', '3']]}
+
+
+def diff(first: int, final: int, previous: int, bids=(), asks=(), symbol: str = 'BTCUSDT') -> dict:
+    return {'e': 'depthUpdate', 'E': final, 's': symbol, 'U': first, 'u': final, 'pu': previous,
+            'b': [list(level) for level in bids], 'a': [list(level) for level in asks]}
+
+
+def counter(metrics: MetricsRegistry, name: str) -> float:
+    return sum(entry['value'] for entry in metrics.snapshot()['counters'] if entry['name'] == name)
+
+
+def test_snapshot_and_diffs_build_the_book():
+    book = OrderBook('BTCUSDT')
+    book.apply_snapshot(snapshot())
+    assert book.bids.levels(5) == [(100.0, 1.0), (99.0, 2.0)]  # zero-quantity levels are not loaded
+    assert (book.best_bid(), book.best_ask(), book.spread(), book.mid_price()) == (100.0, 101.0, 1.0, 100.5)
+
+    # The first event spans the snapshot; later ones chain on the previous event's u
+    assert book.apply_diff(diff(95, 105, 94, bids=[('100.0', '0'), ('99.5', '4')], asks=[('101.0', '2')]))
+    assert book.apply_diff(diff(106, 110, 105, asks=[('100.5', '1'), ('102.0', '0')]))
+    assert book.bids.levels(5) == [(99.5, 4.0), (99.0, 2.0)]
+    assert book.asks.levels(5) == [(100.5, 1.0), (101.0, 2.0)]
+    assert (book.last_update_id, book.event_time, book.updates) == (110, 110, 2)
+    assert book.vwap('BUY', 2) == pytest.approx(100.75)
+    assert book.impact_price('SELL', 5) == 99.0
+    assert book.vwap('SELL', 10) is None
+
+
+def test_events_older_than_the_book_are_dropped():
+    book = OrderBook('BTCUSDT')
+    book.apply_snapshot(snapshot(100))
+    assert not book.apply_diff(diff(90, 99, 89, bids=[('100.0', '9')]))
+    assert book.apply_diff(diff(100, 100, 99, bids=[('100.0', '5')]))  # u == lastUpdateId still spans it
+    assert not book.apply_diff(diff(100, 100, 99, bids=[('100.0', '7')]))  # ... but only once
+    assert book.bids.best() == (100.0, 5.0)
+    assert book.updates == 1
+
+
+def test_first_event_must_span_the_snapshot():
+    book = OrderBook('BTCUSDT')
+    with pytest.raises(OrderBookGap):
+        book.apply_diff(diff(101, 105, 100))  # no snapshot yet
+    book.apply_snapshot(snapshot(100))
+    with pytest.raises(OrderBookGap):
+        book.apply_diff(diff(101, 105, 100, bids=[('100.0', '9')]))  # U > lastUpdateId: updates were missed
+    assert book.bids.best() == (100.0, 1.0)
+    assert book.last_update_id == 100
+
+
+def test_broken_pu_chain_raises_and_leaves_the_book_unchanged():
+    book = OrderBook('BTCUSDT')
+    book.apply_snapshot(snapshot(100))
+    book.apply_diff(diff(95, 105, 94))
+    with pytest.raises(OrderBookGap):
+        book.apply_diff(diff(107, 110, 106, bids=[('100.0', '9')]))
+    assert book.bids.best() == (100.0, 1.0)
+    assert book.last_update_id == 105
+
+
+def test_manager_buffers_events_until_the_snapshot():
+    manager = OrderBookManager(['btcusdt'], metrics=MetricsRegistry())
+    manager.handle_event(diff(90, 99, 89, bids=[('100.0', '9')]))  # older than the snapshot below
+    manager.handle_event(diff(100, 104, 99, bids=[('99.0', '5')]))
+    manager.handle_event(diff(105, 108, 104, asks=[('101.0', '0')]))
+    manager.handle_event(diff(1, 2, 0, symbol='ETHUSDT'))  # not tracked
+    assert manager.get('BTCUSDT') is None
+    assert manager.stats()['buffered_events'] == 3
+
+    assert manager.apply_snapshot('BTCUSDT', snapshot(102))
+    book = manager.get('btcusdt')
+    assert book.bids.levels(5) == [(100.0, 1.0), (99.0, 5.0)]
+    assert book.best_ask() == 102.0
+    assert book.last_update_id == 108
+    assert manager.stats() == {'symbols': 1, 'synced': 1, 'resyncs': 0, 'buffered_events': 0}
+
+    manager.handle_event(diff(109, 110, 108, bids=[('100.5', '1')]))
+    assert book.best_bid() == 100.5
+
+
+def test_manager_waits_for_a_newer_snapshot_when_buffered_events_skip_ahead():
+    manager = OrderBookManager(['BTCUSDT'], metrics=MetricsRegistry())
+    manager.handle_event(diff(110, 115, 109))
+    assert not manager.apply_snapshot('BTCUSDT', snapshot(100))
+    assert manager.get('BTCUSDT') is None
+    assert manager.stats()['buffered_events'] == 1
+    assert manager.apply_snapshot('BTCUSDT', snapshot(112))
+    assert manager.get('BTCUSDT').last_update_id == 115
+
+
+def test_pu_gap_triggers_a_resync_from_a_new_snapshot(monkeypatch):
+    monkeypatch.setattr(order_book, 'backoff_delay', lambda attempt, **kwargs: 0.01)
+    metrics = MetricsRegistry()
+    fetched = []
+
+    async def fetch_snapshot(symbol):
+        fetched.append(symbol)
+        if len(fetched) == 1:
+            raise ConnectionError("snapshot request failed")
+        return snapshot(120)
+
+    async def run():
+        manager = OrderBookManager(['BTCUSDT'], fetch_snapshot=fetch_snapshot, metrics=metrics)
+        manager.apply_snapshot('BTCUSDT', snapshot(100))
+        manager.handle_event(diff(95, 105, 94))
+        assert manager.get('BTCUSDT').last_update_id == 105
+
+        manager.handle_event(diff(111, 118, 110, bids=[('99.0', '7')]))  # pu 110 != 105: updates were lost
+        assert manager.get('BTCUSDT') is None
+        assert manager.resyncs == 1
+        manager.handle_event(diff(119, 125, 118, asks=[('101.0', '4')]))
+        assert manager.stats()['buffered_events'] == 2
+
+        for _ in range(200):
+            if manager.get('BTCUSDT') is not None:
+                break
+            await asyncio.sleep(0.01)
+        await manager.close()
+        return manager
+
+    manager = asyncio.run(run())
+    book = manager.get('BTCUSDT')
+    assert fetched == ['BTCUSDT', 'BTCUSDT']  # retried after the failed fetch
+    assert book.last_update_id == 125  # the event before the snapshot was dropped, the spanning one applied
+    assert book.bids.best() == (100.0, 1.0)
+    assert book.asks.best() == (101.0, 4.0)
+    assert counter(metrics, 'order_book_resyncs_total') == 1
+
+
+def test_replay_recording_reads_snapshots_and_combined_stream_messages(tmp_path):
+    records = [
+        {'stream': 'btcusdt@depth', 'data': diff(98, 101, 97, bids=[('99.0', '3')])},
+        {'e': SNAPSHOT_EVENT, 's': 'BTCUSDT', **snapshot(100)},
+        diff(102, 104, 101, asks=[('101.5', '2')]),
+        {'e': 'bookTicker', 's': 'BTCUSDT'},
+        diff(106, 107, 105),  # gap: the book resyncs and waits for the next snapshot record
+        {'e': SNAPSHOT_EVENT, 's': 'BTCUSDT', **snapshot(106)},
+    ]
+    path = tmp_path / 'depth.jsonl'
+    path.write_text('\n'.join(json.dumps(record) for record in records) + '\n\n', encoding='utf-8')
+
+    manager = OrderBookManager(['BTCUSDT'], metrics=MetricsRegistry())
+    assert replay_recording(manager, read_recording(str(path))) == len(records)
+    book = manager.get('BTCUSDT')
+    assert manager.resyncs == 1
+    assert book.last_update_id == 107
+    assert book.bids.levels(5) == [(100.0, 1.0), (99.0, 2.0)]
+    assert book.asks.levels(5) == [(101.0, 1.0), (102.0, 3.0)]
@@ -0,0 +1,86 @@
+import asyncio
+import inspect
+from decimal import Decimal
+
+import pytest
+
+from trading_bot.bot.indicators import Signal
+from trading_bot.bot.journal import DUPLICATE_CLIENT_ORDER_ID, ORDER_DOES_NOT_EXIST, OrderJournal
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.models import Order, OrderResult
+from trading_bot.bot.orders import AsyncOrderManager, OrderManager
+from trading_bot.bot.simulator import AsyncSimulatedExchange, SimulatedExchange
+
+
+class ApiError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"API error {code}")
+        self.error_data = {'code': code}
+
+
+class LateExchange:
+    """Loses the response to the first order; the order only becomes visible after ``visible_after`` queries."""
+
+    symbol_registry = None
+
+    def __init__(self, visible_after: int):
+        self.visible_after = visible_after
+        self.placed = []
+        self.queries = 0
+
+    def place_order(self, order: Order) -> OrderResult:
+        self.placed.append(order.client_order_id)
+        if len(self.placed) == 1:
+            raise ConnectionError("connection reset")
+        if self.visible_after is not None:
+            raise ApiError(DUPLICATE_CLIENT_ORDER_ID)
+        return OrderResult(order_id=2, client_order_id=order.client_order_id, symbol=order.symbol, status='NEW')
+
+    def query_order(self, symbol: str, order_id=None, orig_client_order_id=None) -> OrderResult:
+        self.queries += 1
+        if self.visible_after is None or self.queries <= self.visible_after:
+            raise ApiError(ORDER_DOES_NOT_EXIST)
+        return OrderResult(order_id=1, client_order_id=orig_client_order_id, symbol=symbol, status='FILLED')
+
+
+def submit(tmp_path, exchange: LateExchange, order: Order):
+    manager = OrderManager(exchange)
+    manager.recovery_interval = 0.0
+    with OrderJournal(str(tmp_path / 'orders.wal')) as journal:
+        manager.journal = journal
+        return manager._submit(journal.assign_client_order_id(order))
+
+
+def test_late_order_is_found_by_a_later_poll_without_resending(tmp_path):
+    exchange = LateExchange(visible_after=2)
+    result = submit(tmp_path, exchange, Order.create('BTCUSDT', 'BUY', 'MARKET', '0.01'))
+    assert result.status == 'FILLED'
+    assert len(exchange.placed) == 1
+
+
+def test_lost_market_order_is_not_resent(tmp_path):
+    exchange = LateExchange(visible_after=None)
+    with pytest.raises(ConnectionError):
+        submit(tmp_path, exchange, Order.create('BTCUSDT', 'BUY', 'MARKET', '0.01'))
+    assert len(exchange.placed) == 1
+    assert exchange.queries == OrderManager.recovery_polls
+
+
+def test_lost_limit_order_is_resent_once(tmp_path):
+    exchange = LateExchange(visible_after=None)
+    result = submit(tmp_path, exchange, Order.create('BTCUSDT', 'BUY', 'LIMIT', '0.01', '40000'))
+    assert result.status == 'NEW'
+    assert len(exchange.placed) == 2
+
+
+def test_async_manager_awaits_signal_orders():
+    exchange = SimulatedExchange()
+    exchange.set_price('BTCUSDT', '45000')
+    manager = AsyncOrderManager(AsyncSimulatedExchange(exchange), metrics=MetricsRegistry())
+    assert manager.recovery_polls == OrderManager.recovery_polls and len(manager.open_orders) == 0
+
+    assert inspect.iscoroutinefunction(manager.place_signal)
+    signal = Signal('BTCUSDT', 'BUY', 'crossover', price=Decimal('44000'))
+    result = asyncio.run(manager.place_signal(signal, '0.01', 'LIMIT'))
+    assert isinstance(result, OrderResult) and result.status == 'NEW'
+    assert manager.open_orders.get(result.order_id) is not None
@@ -0,0 +1,80 @@
+import pytest
+
+from trading_bot.bot import rate_limiter
+from trading_bot.bot.rate_limiter import RateLimiter, TokenBucket, backoff_delay, should_retry
+
+
+def test_token_bucket_refills_continuously_up_to_capacity():
+    bucket = TokenBucket(capacity=10, window=10.0)  # one token per second
+    start = bucket.updated
+    assert bucket.reserve(10, start) == 0.0
+    assert bucket.reserve(2, start) == pytest.approx(2.0)  # overdrawn: wait for two tokens
+    assert bucket.reserve(1, start + 4) == 0.0  # -2 + 4 refilled - 1
+    assert bucket.tokens == pytest.approx(1.0)
+    bucket.reserve(0, start + 1000)
+    assert bucket.tokens == 10  # never above capacity
+
+    bucket.sync_used(7, start + 1000)
+    assert bucket.tokens == 3
+    bucket.sync_used(1, start + 1000)  # the server seeing less use does not add tokens
+    assert bucket.tokens == 3
+
+
+def test_orders_reserve_order_budgets_and_other_calls_only_weight():
+    limiter = RateLimiter(request_weight_per_minute=100, orders_per_10s=10, orders_per_minute=100, headroom=0.0)
+    assert limiter.endpoint_cost('GET', '/fapi/v2/account') == (5, 0, 0)
+    assert limiter.endpoint_cost('GET', '/fapi/v1/depth', {'limit': 1000}) == (20, 0, 0)
+    assert limiter.endpoint_cost('GET', '/fapi/v1/unlisted') == (1, 0, 0)
+
+    for _ in range(10):
+        assert limiter.reserve('POST', '/fapi/v1/order') == 0.0
+    assert limiter.reserve('POST', '/fapi/v1/order') > 0  # 11th order in 10s
+    assert limiter.reserve('GET', '/fapi/v2/account') == 0.0
+    assert limiter.metrics()['delayed_requests'] == 1
+
+
+def test_account_limiters_share_request_weight_and_pauses_but_not_order_counts():
+    ip = RateLimiter(request_weight_per_minute=20, headroom=0.0)
+    first = ip.for_account(orders_per_10s=2)
+    second = ip.for_account(orders_per_10s=2)
+    assert first.weight is second.weight is ip.weight
+    assert first.headroom == ip.headroom
+
+    for _ in range(4):
+        assert first.reserve('GET', '/fapi/v2/account') == 0.0  # 20 weight used up
+    assert second.reserve('GET', '/fapi/v1/openOrders') > 0
+
+    # A new order costs no weight; order counts are per account
+    assert [first.reserve('POST', '/fapi/v1/order') for _ in range(3)][2] > 0
+    assert second.reserve('POST', '/fapi/v1/order') == 0.0
+
+    second.pause(30)
+    assert ip.metrics()['paused_for_seconds'] > 29
+    assert first.reserve('GET', '/fapi/v1/time') > 29
+
+
+def test_backoff_delay_grows_exponentially_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(rate_limiter.random, 'uniform', lambda low, high: high)
+    assert [backoff_delay(attempt, base=0.5, cap=5.0) for attempt in range(6)] == [0.5, 1.0, 2.0, 4.0, 5.0, 5.0]
+    assert backoff_delay(0, retry_after='3') == 3.0  # never shorter than Retry-After
+    assert backoff_delay(0, retry_after='soon') == 0.5
+
+    monkeypatch.undo()
+    delays = [backoff_delay(3, base=0.5, cap=30.0) for _ in range(200)]
+    assert all(0 <= delay <= 4.0 for delay in delays)  # full jitter
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize('method, status, expected', [
+    ('GET', 429, True),
+    ('POST', 429, True),
+    ('POST', 418, True),
+    ('GET', 503, True),
+    ('POST', 500, False),
+    ('POST', 503, False),
+    ('DELETE', 502, False),
+    ('GET', 400, False),
+    ('get', 500, True),
+])
+def test_should_retry_never_resends_a_non_get_after_a_server_error(method, status, expected):
+    assert should_retry(method, status) is expected
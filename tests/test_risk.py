@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+import pytest
+
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.models import Order, OrderResult
+from trading_bot.bot.orders import OrderManager
+from trading_bot.bot.risk import RiskEngine, RiskLimits, RiskRejected
+from trading_bot.bot.simulator import SimulatedClock, SimulatedExchange
+from trading_bot.bot.streams import AccountStateCache
+
+
+def account_update(symbol: str, amount: str, event_time: int) -> dict:
+    return {'e': 'ACCOUNT_UPDATE', 'E': event_time, 'T': event_time,
+            'a': {'m': 'ORDER', 'B': [], 'P': [{'s': symbol, 'pa': amount, 'ep': '50000', 'up': '0', 'ps': 'BOTH'}]}}
+
+
+def make_engine(**limits) -> RiskEngine:
+    cache = AccountStateCache()
+    cache.handle_event({'e': 'markPriceUpdate', 's': 'BTCUSDT', 'p': '50000', 'r': '0.0001'})
+    return RiskEngine(RiskLimits(**limits), cache, MetricsRegistry())
+
+
+def fill(order: Order, update_time: int, order_id: int = 1) -> OrderResult:
+    return OrderResult(order_id=order_id, symbol=order.symbol, status='FILLED', executed_qty=order.quantity,
+                       avg_price=Decimal('50000'), update_time=update_time)
+
+
+def feed(engine: RiskEngine, event: dict) -> None:
+    engine.state_cache.handle_event(event)
+    engine.handle_event(event)
+
+
+def test_fill_confirmed_before_result_is_counted_once():
+    engine = make_engine()
+    order = Order.create('BTCUSDT', 'BUY', 'MARKET', '0.01')
+    engine.check(order)
+    feed(engine, account_update('BTCUSDT', '0.01', 1000))
+    engine.release(order, fill(order, 1000))
+    assert engine._position('BTCUSDT') == Decimal('0.01')
+
+
+def test_fill_confirmed_after_result_is_counted_once():
+    engine = make_engine()
+    order = Order.create('BTCUSDT', 'BUY', 'MARKET', '0.01')
+    engine.check(order)
+    engine.release(order, fill(order, 1000))
+    assert engine._position('BTCUSDT') == Decimal('0.01')
+    feed(engine, account_update('BTCUSDT', '0.01', 1000))
+    assert engine._position('BTCUSDT') == Decimal('0.01')
+
+
+def test_older_account_update_does_not_confirm_newer_fill():
+    engine = make_engine()
+    first = Order.create('BTCUSDT', 'BUY', 'MARKET', '0.01')
+    second = Order.create('BTCUSDT', 'BUY', 'MARKET', '0.02')
+    engine.check(first)
+    engine.check(second)
+    engine.release(first, fill(first, 1000, order_id=1))
+    engine.release(second, fill(second, 2000, order_id=2))
+    feed(engine, account_update('BTCUSDT', '0.01', 1000))
+    assert engine._position('BTCUSDT') == Decimal('0.03')
+    feed(engine, account_update('BTCUSDT', '0.03', 2000))
+    assert engine._position('BTCUSDT') == Decimal('0.03')
+
+
+def test_simulated_fill_does_not_block_next_order():
+    exchange = SimulatedExchange(balance=100000, clock=SimulatedClock(1_700_000_000_000))
+    exchange.set_price('BTCUSDT', 50000, 1)
+    cache = AccountStateCache()
+    risk = RiskEngine(RiskLimits(max_position={'BTCUSDT': '0.015'}), cache, MetricsRegistry())
+    exchange.add_listener(cache.handle_event)
+    exchange.add_listener(risk.handle_event)
+    manager = OrderManager(exchange, cache, MetricsRegistry(), risk=risk)
+
+    manager.place_order(Order.create('BTCUSDT', 'BUY', 'MARKET', '0.01'))
+    assert risk._position('BTCUSDT') == Decimal('0.01')
+    manager.place_order(Order.create('BTCUSDT', 'BUY', 'MARKET', '0.004'))
+    with pytest.raises(RiskRejected):
+        manager.place_order(Order.create('BTCUSDT', 'BUY', 'MARKET', '0.004'))
+
+
+def test_price_band_leaves_stop_losses_alone_by_default():
+    engine = make_engine()
+    engine.check(Order.create('BTCUSDT', 'SELL', 'STOP_MARKET', '0.01', stop_price='45000'))  # 10% stop-loss
+    with pytest.raises(RiskRejected) as rejected:
+        engine.check(Order.create('BTCUSDT', 'SELL', 'LIMIT', '0.01', '45000'))
+    assert rejected.value.check == 'price_band'
+
+    banded = make_engine(stop_price_band='0.05')
+    with pytest.raises(RiskRejected):
+        banded.check(Order.create('BTCUSDT', 'SELL', 'STOP_MARKET', '0.01', stop_price='45000'))
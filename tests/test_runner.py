@@ -0,0 +1,69 @@
+import asyncio
+import os
+
+from trading_bot.bot.indicators import Signal
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.runner import StrategyRunner
+
+
+class Registry:
+    is_stale = False
+
+
+class RecordingManager:
+    """Stands in for AsyncOrderManager: records the signals it is asked to trade."""
+
+    def __init__(self):
+        self.client = type('Client', (), {'symbol_registry': Registry()})()
+        self.signals = []
+
+    async def place_signal(self, signal, quantity, order_type='MARKET', reduce_only=False):
+        self.signals.append(signal)
+
+
+class Flaky:
+    """Signals on every tick; a price of 0 raises, a price of -1 kills the worker process."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    def update(self, price: float, time=None):
+        if price == -1:
+            os._exit(1)
+        if price == 0:
+            raise ZeroDivisionError('bad tick')
+        return Signal(self.symbol, 'BUY', 'test', None, time)
+
+
+def batch_errors(metrics: MetricsRegistry) -> float:
+    return sum(counter['value'] for counter in metrics.snapshot()['counters'] if counter['name'] == 'runner_batch_errors_total')
+
+
+async def run_ticks(workers: int, prices) -> tuple:
+    manager, metrics = RecordingManager(), MetricsRegistry()
+    runner = StrategyRunner(manager, ['BTCUSDT'], '0.01', strategy_factory=Flaky, workers=workers, metrics=metrics)
+    task = asyncio.ensure_future(runner.run())
+    while not runner._accepting:
+        await asyncio.sleep(0.01)
+    for time_ms, price in enumerate(prices):
+        runner.on_tick('BTCUSDT', price, time_ms)
+        # One tick per batch, so a failing tick does not take the others with it
+        for _ in range(500):
+            await asyncio.sleep(0.01)
+            if not runner._pending[0] and batch_errors(metrics) + len(manager.signals) > time_ms:
+                break
+    runner.stop()
+    await task
+    return manager.signals, batch_errors(metrics)
+
+
+def test_shard_survives_a_raising_strategy():
+    signals, errors = asyncio.run(run_ticks(0, [1.0, 0, 2.0, 3.0]))
+    assert errors == 1
+    assert [signal.time for signal in signals] == [0, 2, 3]
+
+
+def test_shard_replaces_a_dead_worker():
+    signals, errors = asyncio.run(run_ticks(1, [1.0, -1, 2.0]))
+    assert errors == 1
+    assert [signal.time for signal in signals] == [0, 2]
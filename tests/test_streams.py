@@ -0,0 +1,69 @@
+import asyncio
+
+from benchmarks.stub_server import StubExchange, StubWebSocketServer
+from trading_bot.bot import streams
+from trading_bot.bot.async_client import AsyncBinanceFuturesClient
+from trading_bot.bot.metrics import MetricsRegistry
+from trading_bot.bot.models import Order
+from trading_bot.bot.rate_limiter import RateLimiter
+from trading_bot.bot.streams import AccountStateCache, UserDataStream
+
+
+def order_update(order_id: int, status: str = 'NEW') -> dict:
+    return {'e': 'ORDER_TRADE_UPDATE', 'E': 1, 'o': {
+        'i': order_id, 'c': f'web{order_id}', 's': 'BTCUSDT', 'S': 'BUY', 'o': 'LIMIT', 'f': 'GTC', 'X': status,
+        'p': '40000', 'q': '0.01', 'z': '0', 'T': 1}}
+
+
+async def eventually(predicate, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_user_stream_survives_bad_frames_and_resyncs_after_reconnect(monkeypatch):
+    monkeypatch.setattr(streams, 'backoff_delay', lambda attempt, **kwargs: 0.05)
+
+    async def run():
+        with StubExchange(symbols=5) as exchange:
+            async with StubWebSocketServer() as ws_server:
+                client = AsyncBinanceFuturesClient('k' * 64, 'x' * 64, base_url=exchange.base_url, max_retries=0,
+                                                   rate_limiter=RateLimiter(), metrics=MetricsRegistry())
+                resting = await client.place_order(Order.create('BTCUSDT', 'BUY', 'LIMIT', '0.01', '40000'))
+                cache = AccountStateCache()
+                snapshots = []
+                stream = UserDataStream(client, cache, ws_server.base_url)
+                stream.add_snapshot_listener(lambda account_info, open_orders: snapshots.append(open_orders))
+                task = asyncio.ensure_future(stream.run())
+
+                await ws_server.wait_connected()
+                await eventually(lambda: snapshots)
+                assert ws_server.paths == ['/ws/stub-listen-key']
+                assert set(cache.open_orders) == {resting.order_id}
+
+                # A malformed frame and an event the cache cannot parse are skipped
+                await ws_server.send('not json')
+                await ws_server.send({'e': 'ORDER_TRADE_UPDATE', 'o': {}})
+                await ws_server.send(order_update(999))
+                await eventually(lambda: 999 in cache.open_orders)
+
+                # While disconnected the resting order is cancelled and the resync fails once
+                await ws_server.drop()
+                exchange.errors = {'503': 1.0}
+                exchange.orders.clear()
+                await eventually(lambda: exchange.injected.get('503', 0) >= 2)
+                exchange.errors = {}
+                await eventually(lambda: len(snapshots) == 2)
+                assert cache.open_orders == {}
+                assert not task.done()
+
+                await ws_server.wait_connected()
+                await ws_server.send(order_update(1000))
+                await eventually(lambda: 1000 in cache.open_orders)
+
+                await stream.stop()
+                await asyncio.wait_for(task, 5)
+                await client.close()
+
+    asyncio.run(run())
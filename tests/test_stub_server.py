@@ -0,0 +1,14 @@
+from benchmarks.stub_server import StubExchange
+
+
+def test_error_counts_follow_probabilities_for_any_seed():
+    for seed in range(20):
+        stub = StubExchange(symbols=1, errors={'503': 0.01, '429': 0.005, '-1021': 0.005}, seed=seed)
+        try:
+            picks = [stub._pick_error(signed=True) for _ in range(1000)]
+        finally:
+            stub.server.server_close()
+        assert abs(stub.injected['503'] - 10) <= 1
+        assert abs(stub.injected['429'] - 5) <= 1 and abs(stub.injected['-1021'] - 5) <= 1
+        assert sum(pick is not None for pick in picks) == sum(stub.injected.values())
+        assert not any(stub._pick_error(signed=False) == '-1021' for _ in range(1000))
@@ -0,0 +1,47 @@
+import random
+from decimal import ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_UP, Decimal
+
+from trading_bot.bot.models import Order
+from trading_bot.bot.symbols import SymbolFilters, SymbolRegistry
+from trading_bot.bot.validators import OrderFilterEngine, check_order_filters, snap_to_step
+
+
+def symbol_info(min_price: str = '0.10', tick_size: str = '0.10') -> dict:
+    return {'symbol': 'BTCUSDT', 'status': 'TRADING', 'filters': [
+        {'filterType': 'PRICE_FILTER', 'minPrice': min_price, 'maxPrice': '1000000', 'tickSize': tick_size},
+        {'filterType': 'LOT_SIZE', 'minQty': '0.001', 'maxQty': '1000', 'stepSize': '0.001'},
+    ]}
+
+
+def engine(**kwargs) -> OrderFilterEngine:
+    registry = SymbolRegistry()
+    registry.load({'symbols': [symbol_info(**kwargs)]})
+    return OrderFilterEngine(registry)
+
+
+def test_snap_matches_divide_and_round():
+    rng = random.Random(5)
+    modes = {'down': ROUND_FLOOR, 'up': ROUND_CEILING, 'nearest': ROUND_HALF_UP}
+    for _ in range(2000):
+        step = Decimal(rng.choice(['0.1', '0.001', '0.5', '5', '0.0025']))
+        value = Decimal(rng.randint(-10 ** 6, 10 ** 6)) / 1000
+        if rng.random() < 0.3:
+            value = step * rng.randint(-1000, 1000)
+        for rounding, mode in modes.items():
+            assert snap_to_step(value, step, rounding) == (value / step).to_integral_value(mode) * step
+
+
+def test_aligned_values_are_returned_unchanged():
+    value = Decimal('45000.1')
+    assert snap_to_step(value, Decimal('0.1'), 'up') is value
+    order = Order.create('BTCUSDT', 'BUY', 'LIMIT', '0.002', '45000.1')
+    assert engine().prepare(order) is order
+
+
+def test_tick_is_counted_from_min_price():
+    filters = SymbolFilters(symbol_info(min_price='0.05', tick_size='0.10'))
+    assert check_order_filters(filters, 'BUY', 'LIMIT', Decimal('1'), Decimal('100.05')) is None
+    assert 'tick size' in check_order_filters(filters, 'BUY', 'LIMIT', Decimal('1'), Decimal('100.10'))
+
+    order = engine(min_price='0.05', tick_size='0.10').prepare(Order.create('BTCUSDT', 'BUY', 'LIMIT', '1', '100.12'))
+    assert order.price == Decimal('100.05')
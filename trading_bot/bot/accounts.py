@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import os
+import time
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+from .async_client import AsyncBinanceFuturesClient
+from .client import TESTNET_BASE_URL
+from .journal import OrderJournal
+from .metrics import MetricsRegistry, get_metrics
+from .orders import AsyncOrderManager
+from .rate_limiter import RateLimiter, get_shared_rate_limiter
+from .risk import RiskEngine, RiskLimits
+from .signing import create_signer
+from .streams import TESTNET_WS_URL, AccountStateCache, UserDataStream
+from .validators import validate_api_credentials
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = 'BINANCE_'
+
+
+def credentials_from_env(environ: Optional[Mapping[str, str]] = None) -> Dict[str, Tuple[str, str]]:
+    """Key pairs from ``BINANCE_<NAME>_API_KEY`` / ``BINANCE_<NAME>_API_SECRET``, by lower-cased name.
+
+    The plain ``BINANCE_API_KEY`` / ``BINANCE_API_SECRET`` pair is the
+    ``default`` account.
+    """
+    environ = os.environ if environ is None else environ
+    credentials = {}
+    for variable, api_key in sorted(environ.items()):
+        if not variable.startswith(ENV_PREFIX) or not variable.endswith('_API_KEY'):
+            continue
+        name = variable[len(ENV_PREFIX):-len('_API_KEY')].lower() or 'default'
+        api_secret = environ.get(variable[:-len('KEY')] + 'SECRET')
+        if not api_secret:
+            raise ValueError(f"{variable} is set but {variable[:-len('KEY')]}SECRET is not")
+        if not validate_api_credentials(api_key, api_secret):
+            raise ValueError(f"Invalid API credentials format for account {name}")
+        credentials[name] = (api_key, api_secret)
+    return credentials
+
+
+class Account:
+    """One key pair: its client (own signer and order budgets), order manager and account state."""
+
+    def __init__(self, name: str, client: AsyncBinanceFuturesClient, cache: AccountStateCache, manager: AsyncOrderManager,
+                 risk: Optional[RiskEngine] = None):
+        self.name = name
+        self.client = client
+        self.cache = cache
+        self.manager = manager
+        self.risk = risk
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self.client.rate_limiter
+
+    def user_stream(self, ws_base_url: str = TESTNET_WS_URL) -> UserDataStream:
+        """A user-data stream that keeps this account's cache, open orders and risk state current."""
+        stream = UserDataStream(self.client, self.cache, ws_base_url)
+        stream.add_listener(self.manager.open_orders.handle_event)
+        stream.add_snapshot_listener(lambda account_info, open_orders: self.manager.open_orders.replace(open_orders))
+        if self.risk is not None:
+            stream.add_listener(self.risk.handle_event)
+            stream.add_snapshot_listener(lambda account_info, open_orders: self.risk.sync())
+        return stream
+
+    def __repr__(self) -> str:
+        return f"Account({self.name})"
+
+
+class AccountManager:
+    """Many key pairs over one connection pool and one cache of public data.
+
+    Every account gets its own client (API key, signer, and order-count
+    budgets, which Binance counts per account) built with
+    ``AsyncBinanceFuturesClient.for_account``, so all of them share:
+
+    - one keep-alive connection pool of ``max_connections``;
+    - one request-weight budget and 429 pause (weight is counted per IP);
+    - one symbol registry and clock sync, each downloaded once however
+      many accounts need it;
+    - one market state (book tickers, mark prices, funding rates) in
+      ``market``, which every account's AccountStateCache reads.
+
+    Fan-out operations run across accounts concurrently and return one
+    result, or the exception raised, per account name.
+    """
+
+    def __init__(self, base_url: str = TESTNET_BASE_URL, max_connections: int = 20, timeout: float = 10.0,
+                 rate_limiter: Optional[RateLimiter] = None, recv_window: Optional[int] = 5000,
+                 mark_price_ttl: Optional[float] = 1.0, metrics: Optional[MetricsRegistry] = None):
+        self.metrics = metrics or get_metrics()
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        # Keyless client for public endpoints; accounts are made from it and share its pool
+        self.public = AsyncBinanceFuturesClient('', '', base_url=base_url, max_connections=max_connections, timeout=timeout,
+                                                rate_limiter=self.rate_limiter, recv_window=recv_window, metrics=self.metrics)
+        self.symbol_registry = self.public.symbol_registry
+        self.time_sync = self.public.time_sync
+        self.market = AccountStateCache()
+        self.mark_price_ttl = mark_price_ttl
+        self.accounts: Dict[str, Account] = {}
+        self._mark_prices_at = 0.0
+        self._mark_price_refresh: Optional[asyncio.Future] = None
+        self.metrics.register_gauges('accounts', self.stats)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            'accounts': len(self.accounts),
+            'kill_switches': sum(1 for account in self.accounts.values()
+                                 if account.risk is not None and account.risk.kill_switch_reason is not None),
+            'available_weight': self.rate_limiter.weight.tokens,
+        }
+        for name, account in self.accounts.items():
+            stats[f'{name}_available_orders_10s'] = account.rate_limiter.orders_10s.tokens
+            stats[f'{name}_queue_depth'] = account.rate_limiter.queue_depth
+        return stats
+
+    # --- accounts --------------------------------------------------------
+
+    def add_account(self, name: str, api_key: str, api_secret: Optional[str] = None, private_key: Optional[Union[str, bytes]] = None,
+                    orders_per_10s: int = 300, orders_per_minute: int = 1200, risk_limits: Optional[RiskLimits] = None,
+                    journal: Optional[OrderJournal] = None) -> Account:
+        """Register a key pair (HMAC secret or Ed25519 private key) under ``name``."""
+        if name in self.accounts:
+            raise ValueError(f"Account {name} already exists")
+        limiter = self.rate_limiter.for_account(orders_per_10s, orders_per_minute)
+        client = self.public.for_account(api_key, api_secret, signer=create_signer(api_secret, private_key), rate_limiter=limiter)
+        cache = AccountStateCache(market=self.market)
+        risk = RiskEngine(risk_limits, cache, metrics=self.metrics) if risk_limits is not None else None
+        account = Account(name, client, cache, AsyncOrderManager(client, cache, self.metrics, journal, risk), risk)
+        self.accounts[name] = account
+        logger.info(f"Added account {name}")
+        return account
+
+    def add_accounts_from_env(self, environ: Optional[Mapping[str, str]] = None, **kwargs) -> List[Account]:
+        """Add every key pair found by ``credentials_from_env``."""
+        return [self.add_account(name, api_key, api_secret, **kwargs)
+                for name, (api_key, api_secret) in credentials_from_env(environ).items()]
+
+    def remove_account(self, name: str) -> None:
+        self.accounts.pop(name, None)
+
+    def get(self, name: str) -> Account:
+        account = self.accounts.get(name)
+        if account is None:
+            raise ValueError(f"Unknown account: {name}")
+        return account
+
+    def _select(self, names: Optional[Iterable[str]]) -> List[Account]:
+        return list(self.accounts.values()) if names is None else [self.get(name) for name in names]
+
+    # --- shared public data ----------------------------------------------
+
+    async def start(self) -> None:
+        """Load exchangeInfo and sync the clock once, for every account."""
+        await asyncio.gather(self.public.refresh_symbols(), self.public.sync_time())
+
+    async def close(self) -> None:
+        await self.public.close()
+
+    async def __aenter__(self) -> 'AccountManager':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def refresh_mark_prices(self) -> Dict[str, Decimal]:
+        """Load the mark price and funding rate of every symbol into ``market`` with one request."""
+        if self._mark_price_refresh is None or self._mark_price_refresh.done():
+            self._mark_price_refresh = asyncio.ensure_future(self._load_mark_prices())
+        await asyncio.shield(self._mark_price_refresh)
+        return self.market.mark_prices
+
+    async def _load_mark_prices(self) -> None:
+        for entry in await self.public.get_mark_price():
+            self.market.handle_event({'e': 'markPriceUpdate', 's': entry['symbol'], 'p': entry['markPrice'],
+                                      'r': entry.get('lastFundingRate')})
+        self._mark_prices_at = time.monotonic()
+
+    async def get_mark_price(self, symbol: str) -> Optional[Decimal]:
+        """Mark price from the shared cache, reloading all symbols when older than ``mark_price_ttl``.
+
+        With ``mark_price_ttl=None`` (e.g. when a MarketDataStream feeds
+        ``market``) prices are only loaded for a symbol not seen yet.
+        """
+        symbol = symbol.upper()
+        stale = self.mark_price_ttl is not None and time.monotonic() - self._mark_prices_at > self.mark_price_ttl
+        if stale or symbol not in self.market.mark_prices:
+            await self.refresh_mark_prices()
+        return self.market.get_mark_price(symbol)
+
+    # --- fan-out ---------------------------------------------------------
+
+    async def gather(self, operation: Callable[[Account], Awaitable[Any]], names: Optional[Iterable[str]] = None,
+                     label: str = 'gather') -> Dict[str, Any]:
+        """Run ``operation(account)`` for every account (or ``names``) concurrently.
+
+        Returns the result per account name; an account whose operation
+        failed maps to the exception, so one bad key does not hide the
+        other results.
+        """
+        accounts = self._select(names)
+        with self.metrics.timer('account_fanout_seconds', operation=label):
+            results = await asyncio.gather(*(operation(account) for account in accounts), return_exceptions=True)
+        for account, result in zip(accounts, results):
+            if isinstance(result, Exception):
+                self.metrics.inc('account_errors_total', account=account.name, operation=label)
+                logger.error(f"{label} failed for account {account.name}: {result}")
+        return {account.name: result for account, result in zip(accounts, results)}
+
+    async def snapshot_balances(self, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Fetch every account's balances and positions into its cache; returns the /fapi/v2/account response per name."""
+        async def snapshot(account: Account) -> Dict[str, Any]:
+            info = await account.client.get_account_info()
+            account.cache.apply_account_snapshot(info)
+            return info
+
+        return await self.gather(snapshot, names, 'snapshot_balances')
+
+    async def refresh_open_orders(self, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Reload every account's open-order index; returns the open orders per name."""
+        return await self.gather(lambda account: account.manager.refresh_open_orders(), names, 'refresh_open_orders')
+
+    async def cancel_all_orders(self, symbols: Optional[Iterable[str]] = None, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Cancel open orders in every account; returns the symbols cancelled per name.
+
+        Without ``symbols``, each account's open orders are listed first and
+        every symbol that has one is cancelled.
+        """
+        symbols = [symbol.upper() for symbol in symbols] if symbols is not None else None
+
+        async def cancel(account: Account) -> List[str]:
+            targets = symbols
+            if targets is None:
+                targets = sorted({order['symbol'] for order in await account.manager.refresh_open_orders()})
+            await asyncio.gather(*(account.manager.cancel_all_orders(symbol) for symbol in targets))
+            return targets
+
+        return await self.gather(cancel, names, 'cancel_all_orders')
@@ -0,0 +1,490 @@
+import asyncio
+import json
+import logging
+import ssl
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from .client import (BATCH_CANCEL_LIMIT, BODY_METHODS, FORM_HEADERS, SUPPORTED_METHODS, TESTNET_BASE_URL, chunk_orders,
+                     encode_params, modify_order_params, order_query_params)
+from .models import Number, Order, OrderResult
+from .rate_limiter import RATE_LIMIT_STATUSES, RateLimiter, backoff_delay, get_shared_rate_limiter, should_retry
+from .signing import Signer, create_signer
+from .logging_config import correlation_scope
+from .metrics import MetricsRegistry, get_metrics
+from .symbols import SymbolRegistry
+from .time_sync import TIMESTAMP_OUTSIDE_RECV_WINDOW, TimeSync
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncHTTPError(Exception):
+    """Non-2xx HTTP response from the API."""
+
+    def __init__(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        try:
+            self.error_data = json.loads(body)
+        except ValueError:
+            self.error_data = None
+        super().__init__(f"HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+
+
+class _Connection:
+    __slots__ = ('reader', 'writer', 'last_used')
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncHTTPConnectionPool:
+    """Minimal HTTP/1.1 keep-alive connection pool built on asyncio streams.
+
+    At most ``max_connections`` requests are in flight at once; finished
+    connections go back to an idle list and are reused until they have been
+    idle for ``keepalive_timeout`` seconds.
+
+    A GET that fails on a reused connection (the server closed it while it
+    was idle) is resent once on a fresh one. Other methods are not: their
+    bytes may already have reached the exchange, so the error is left to
+    the caller to resolve (e.g. by the order journal's recovery).
+    """
+
+    def __init__(self, base_url: str, max_connections: int = 10, timeout: float = 10.0, keepalive_timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.secure = parts.scheme == 'https'
+        self.port = parts.port or (443 if self.secure else 80)
+        self.host_header = self.host if parts.port is None else f"{self.host}:{self.port}"
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self._ssl_context = ssl.create_default_context() if self.secure else None
+        self._idle: List[_Connection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self._ssl_context)
+        return _Connection(reader, writer)
+
+    def _take_idle(self) -> Optional[_Connection]:
+        now = time.monotonic()
+        while self._idle:
+            conn = self._idle.pop()
+            if now - conn.last_used < self.keepalive_timeout and not conn.reader.at_eof() and not conn.writer.is_closing():
+                return conn
+            conn.close()
+        return None
+
+    async def request(self, method: str, path: str, headers: Optional[Dict[str, str]] = None, body: bytes = b'',
+                      timeout: Optional[float] = None,
+                      prepare: Optional[Callable[[], Tuple[str, bytes]]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Send a request and return (status, headers, body).
+
+        ``prepare``, if given, is called once a connection slot is free and
+        returns the (path, body) to send, so time-sensitive parts such as a
+        signed timestamp are built after any wait for the pool.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+
+        async with self._semaphore:
+            if prepare is not None:
+                path, body = prepare()
+            conn = self._take_idle()
+            reused = conn is not None
+            if conn is None:
+                conn = await asyncio.wait_for(self._open(), timeout or self.timeout)
+            try:
+                try:
+                    result = await asyncio.wait_for(self._roundtrip(conn, method, path, headers, body), timeout or self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not reused or method != 'GET':
+                        raise
+                    # The server closed an idle keep-alive connection; retry once on a fresh one
+                    conn.close()
+                    conn = await asyncio.wait_for(self._open(), timeout or self.timeout)
+                    result = await asyncio.wait_for(self._roundtrip(conn, method, path, headers, body), timeout or self.timeout)
+            except asyncio.IncompleteReadError as e:
+                conn.close()
+                # As an OSError, callers treat it as a transport failure whose outcome is unknown
+                raise ConnectionResetError("Connection closed before the response was complete") from e
+            except BaseException:
+                conn.close()
+                raise
+
+            status, response_headers, response_body, keep_alive = result
+            if keep_alive:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+            else:
+                conn.close()
+            return status, response_headers, response_body
+
+    async def _roundtrip(self, conn: _Connection, method: str, path: str, headers: Optional[Dict[str, str]],
+                         body: bytes) -> Tuple[int, Dict[str, str], bytes, bool]:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}", "Connection: keep-alive",
+                 "Accept-Encoding: identity", f"Content-Length: {len(body)}"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        conn.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readuntil(b'\r\n')
+        parts = status_line.decode('latin-1').split(' ', 2)
+        if len(parts) < 2:
+            raise ConnectionError(f"Malformed status line: {status_line!r}")
+        version, status = parts[0], int(parts[1])
+
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await conn.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        connection = response_headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            response_body = b''
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            response_body = await self._read_chunked(conn.reader)
+        elif 'content-length' in response_headers:
+            response_body = await conn.reader.readexactly(int(response_headers['content-length']))
+        else:
+            response_body = await conn.reader.read()
+            keep_alive = False
+
+        return status, response_headers, response_body, keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size_line = await reader.readuntil(b'\r\n')
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if size == 0:
+                # Skip trailers
+                while await reader.readuntil(b'\r\n') != b'\r\n':
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def close(self) -> None:
+        """Close all idle connections."""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class AsyncBinanceFuturesClient:
+    """Asyncio Binance Futures Testnet API client.
+
+    Mirrors ``BinanceFuturesClient`` but sends requests over a pooled
+    keep-alive transport so many calls can be in flight concurrently.
+    Without an API key and secret the client can only call public
+    endpoints.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, symbol_registry: Optional[SymbolRegistry] = None,
+                 base_url: str = TESTNET_BASE_URL, max_connections: int = 10, timeout: float = 10.0,
+                 rate_limiter: Optional[RateLimiter] = None, max_retries: int = 3, signer: Optional[Signer] = None,
+                 time_sync: Optional[TimeSync] = None, recv_window: Optional[int] = 5000,
+                 metrics: Optional[MetricsRegistry] = None, pool: Optional[AsyncHTTPConnectionPool] = None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.signer = signer or (create_signer(api_secret) if api_secret else None)
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._owns_pool = pool is None
+        self.pool = pool or AsyncHTTPConnectionPool(self.base_url, max_connections=max_connections, timeout=timeout)
+        self.headers = {'X-MBX-APIKEY': self.api_key} if api_key else {}
+        self.body_headers = dict(self.headers, **FORM_HEADERS)
+        self.symbol_registry = symbol_registry or SymbolRegistry()
+        self.time_sync = time_sync or TimeSync()
+        self.recv_window = recv_window
+        self.metrics = metrics or get_metrics()
+        self.metrics.register_gauges('rate_limiter', self.rate_limiter.metrics)
+        self.metrics.register_gauges('time_sync', self.time_sync.metrics)
+        # In-flight clock sync / exchangeInfo download, shared with clients made by for_account
+        self._refreshes: Dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self) -> 'AsyncBinanceFuturesClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close pooled connections (unless the pool belongs to another client)."""
+        if self._owns_pool:
+            await self.pool.close()
+
+    def for_account(self, api_key: str, api_secret: Optional[str] = None, signer: Optional[Signer] = None,
+                    rate_limiter: Optional[RateLimiter] = None) -> 'AsyncBinanceFuturesClient':
+        """A client for another key pair that reuses this one's connection pool, symbol registry and clock sync.
+
+        Only the key, the signer and (optionally) the rate limiter are its
+        own; concurrent exchangeInfo downloads and clock syncs are shared
+        with this client. Closing it leaves the pool open.
+        """
+        client = AsyncBinanceFuturesClient(api_key, api_secret or '', self.symbol_registry, self.base_url, timeout=self.timeout,
+                                           rate_limiter=rate_limiter or self.rate_limiter, max_retries=self.max_retries,
+                                           signer=signer or create_signer(api_secret), time_sync=self.time_sync,
+                                           recv_window=self.recv_window, metrics=self.metrics, pool=self.pool)
+        client._refreshes = self._refreshes
+        # Keep the gauges on this client's limiter; account limiters are reported by their owner
+        self.metrics.register_gauges('rate_limiter', self.rate_limiter.metrics)
+        return client
+
+    async def _make_request(self, method: str, endpoint: str, params: Dict[str, Any] = None, signed: bool = False,
+                            timeout: Optional[float] = None) -> Any:
+        """Make HTTP request to Binance API under a log correlation ID (reusing the caller's, if any)."""
+        with correlation_scope():
+            return await self._send_request(method, endpoint, params, signed, timeout)
+
+    async def _send_request(self, method: str, endpoint: str, params: Dict[str, Any] = None, signed: bool = False,
+                            timeout: Optional[float] = None) -> Any:
+        """Send one API call, with the same rate limiting and retries as the sync client."""
+        if params is None:
+            params = {}
+
+        method = method.upper()
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        if signed and self.signer is None:
+            raise ValueError(f"{endpoint} is a signed endpoint and this client has no API secret")
+
+        def prepare() -> Tuple[str, bytes]:
+            # Stamp and sign once the limiter and the pool let the request go, so no wait can outlast recvWindow
+            request_params = dict(params)
+            if signed:
+                if self.recv_window is not None:
+                    request_params['recvWindow'] = self.recv_window
+                request_params['timestamp'] = self.time_sync.timestamp()
+            started = time.perf_counter()
+            payload = encode_params(request_params, self.signer if signed else None)
+            self.metrics.observe('request_stage_seconds', time.perf_counter() - started, stage='sign', endpoint=endpoint)
+            logger.debug("Request %s %s params=%s", method, endpoint, request_params)
+            if method in BODY_METHODS:
+                return endpoint, payload.encode('utf-8')
+            return (f"{endpoint}?{payload}" if payload else endpoint), b''
+
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            await self.rate_limiter.acquire_async(method, endpoint, params)
+            self.metrics.observe('request_stage_seconds', time.perf_counter() - started, stage='rate_limit_wait', endpoint=endpoint)
+            if signed and self.time_sync.needs_sync:
+                await self.sync_time()
+
+            started = time.perf_counter()
+            try:
+                headers = self.body_headers if method in BODY_METHODS else self.headers
+                status, headers, body = await self.pool.request(method, endpoint, headers, timeout=timeout, prepare=prepare)
+            except (OSError, asyncio.TimeoutError) as e:
+                self.metrics.inc('api_errors_total', endpoint=endpoint, code='transport')
+                if method == 'GET' and attempt < self.max_retries:
+                    delay = backoff_delay(attempt)
+                    logger.warning("%s %s failed: %r; retrying in %.2fs (attempt %d/%d)", method, endpoint, e, delay, attempt + 1, self.max_retries)
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error("API request failed: %r", e)
+                raise
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.metrics.observe('request_stage_seconds', latency_ms / 1000, stage='http', endpoint=endpoint)
+            logger.info("%s %s -> %s in %.1fms", method, endpoint, status, latency_ms,
+                        extra={'method': method, 'endpoint': endpoint, 'status': status,
+                               'latency_ms': round(latency_ms, 3), 'attempt': attempt})
+
+            self.rate_limiter.update_from_headers(headers)
+
+            error = AsyncHTTPError(status, body, headers) if status >= 400 else None
+            if error is not None:
+                code = error.error_data.get('code') if isinstance(error.error_data, dict) else None
+                self.metrics.inc('api_errors_total', endpoint=endpoint, code=str(code or f'http_{status}'))
+
+            if should_retry(method, status) and attempt < self.max_retries:
+                delay = backoff_delay(attempt, retry_after=headers.get('retry-after'))
+                logger.warning("%s %s returned HTTP %s; retrying in %.2fs (attempt %d/%d)", method, endpoint, status, delay, attempt + 1, self.max_retries)
+                if status in RATE_LIMIT_STATUSES:
+                    self.rate_limiter.pause(delay)
+                else:
+                    await asyncio.sleep(delay)
+                continue
+
+            if error is not None:
+                if (signed and status == 400 and attempt < self.max_retries and isinstance(error.error_data, dict)
+                        and error.error_data.get('code') == TIMESTAMP_OUTSIDE_RECV_WINDOW):
+                    logger.warning("%s %s rejected for timestamp outside recvWindow; resyncing clock", method, endpoint)
+                    self.time_sync.reset()
+                    continue
+                logger.error("API request failed: %s", error)
+                if error.error_data is not None:
+                    logger.error("API Error Details: %s", error.error_data)
+                raise error
+
+            started = time.perf_counter()
+            result = json.loads(body)
+            self.metrics.observe('request_stage_seconds', time.perf_counter() - started, stage='parse', endpoint=endpoint)
+            logger.debug("Response %s %s: %s", method, endpoint, result)
+            return result
+
+    async def get_account_info(self) -> Dict[str, Any]:
+        """Get account information."""
+        return await self._make_request('GET', '/fapi/v2/account', signed=True)
+
+    async def start_user_data_stream(self) -> str:
+        """Create a user data stream listenKey."""
+        return (await self._make_request('POST', '/fapi/v1/listenKey'))['listenKey']
+
+    async def keepalive_user_data_stream(self) -> None:
+        """Extend the current listenKey's validity by 60 minutes."""
+        await self._make_request('PUT', '/fapi/v1/listenKey')
+
+    async def close_user_data_stream(self) -> None:
+        """Close the current user data stream."""
+        await self._make_request('DELETE', '/fapi/v1/listenKey')
+
+    async def get_server_time(self) -> int:
+        """Get the server time in milliseconds."""
+        return (await self._make_request('GET', '/fapi/v1/time'))['serverTime']
+
+    async def sync_time(self) -> None:
+        """Sample server time, sharing one sync between concurrent callers."""
+        task = self._refreshes.get('time')
+        if task is None or task.done():
+            task = self._refreshes['time'] = asyncio.ensure_future(self._sync_time())
+        await asyncio.shield(task)
+
+    async def _sync_time(self) -> None:
+        for _ in range(self.time_sync.samples_per_sync):
+            sent_at = time.time()
+            server_time = await self.get_server_time()
+            self.time_sync.record_sample(sent_at, server_time, time.time())
+        self.time_sync.mark_synced()
+
+    async def get_exchange_info(self) -> Dict[str, Any]:
+        """Download the full exchange information."""
+        return await self._make_request('GET', '/fapi/v1/exchangeInfo')
+
+    async def refresh_symbols(self) -> None:
+        """Reload the symbol registry, sharing one download between concurrent callers."""
+        task = self._refreshes.get('symbols')
+        if task is None or task.done():
+            task = self._refreshes['symbols'] = asyncio.ensure_future(self._load_symbols())
+        await asyncio.shield(task)
+
+    async def _load_symbols(self) -> None:
+        self.symbol_registry.load(await self.get_exchange_info())
+
+    async def get_mark_price(self, symbol: Optional[str] = None) -> Any:
+        """Mark price, index price and funding rate of ``symbol``, or a list for every symbol."""
+        return await self._make_request('GET', '/fapi/v1/premiumIndex', {'symbol': symbol} if symbol else None)
+
+    async def get_order_book(self, symbol: str, limit: int = 1000) -> Dict[str, Any]:
+        """Get an order book snapshot (``lastUpdateId``, ``bids``, ``asks``) of up to ``limit`` levels per side."""
+        return await self._make_request('GET', '/fapi/v1/depth', {'symbol': symbol, 'limit': limit})
+
+    async def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get symbol information from the cached exchange info."""
+        if self.symbol_registry.is_stale:
+            await self.refresh_symbols()
+        return self.symbol_registry.get_symbol_info(symbol)
+
+    async def place_order(self, order: Order) -> OrderResult:
+        """Place an order on Binance Futures."""
+        return OrderResult.from_response(await self._make_request('POST', '/fapi/v1/order', order.to_params(), signed=True))
+
+    async def query_order(self, symbol: str, order_id: Optional[int] = None,
+                          orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Current state of an order, by exchange order ID or client order ID."""
+        params = order_query_params(symbol, order_id, orig_client_order_id)
+        return OrderResult.from_response(await self._make_request('GET', '/fapi/v1/order', params, signed=True))
+
+    async def cancel_order(self, symbol: str, order_id: Optional[int] = None,
+                           orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Cancel an open order, by exchange order ID or client order ID."""
+        params = order_query_params(symbol, order_id, orig_client_order_id)
+        return OrderResult.from_response(await self._make_request('DELETE', '/fapi/v1/order', params, signed=True))
+
+    async def cancel_orders(self, symbol: str, order_ids: Optional[List[int]] = None,
+                            orig_client_order_ids: Optional[List[str]] = None) -> List[OrderResult]:
+        """Cancel many orders of one symbol, sending all DELETE /fapi/v1/batchOrders chunks concurrently.
+
+        Results follow the same conventions as ``BinanceFuturesClient.cancel_orders``.
+        """
+        async def _send(key: str, chunk: List[Any]) -> List[OrderResult]:
+            params = {'symbol': symbol.upper(), key: json.dumps(chunk, separators=(',', ':'))}
+            try:
+                responses = await self._make_request('DELETE', '/fapi/v1/batchOrders', params, signed=True)
+            except AsyncHTTPError as e:
+                if isinstance(e.error_data, dict) and 'code' in e.error_data:
+                    return [OrderResult.from_response(e.error_data)] * len(chunk)
+                return [OrderResult.failure(str(e))] * len(chunk)
+            except (OSError, asyncio.TimeoutError) as e:
+                return [OrderResult.failure(repr(e))] * len(chunk)
+            return [OrderResult.from_response(response) for response in responses]
+
+        sends = [
+            _send(key, ids[i:i + BATCH_CANCEL_LIMIT])
+            for key, ids in (('orderIdList', order_ids), ('origClientOrderIdList', orig_client_order_ids))
+            for i in range(0, len(ids or ()), BATCH_CANCEL_LIMIT)
+        ]
+        chunk_results = await asyncio.gather(*sends)
+        return [result for chunk_result in chunk_results for result in chunk_result]
+
+    async def cancel_all_orders(self, symbol: str) -> Dict[str, Any]:
+        """Cancel every open order of ``symbol``."""
+        return await self._make_request('DELETE', '/fapi/v1/allOpenOrders', {'symbol': symbol.upper()}, signed=True)
+
+    async def modify_order(self, symbol: str, side: str, quantity: Number, price: Number, order_id: Optional[int] = None,
+                           orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Amend the price and/or quantity of an open LIMIT order in place (PUT /fapi/v1/order)."""
+        params = modify_order_params(symbol, side, quantity, price, order_id, orig_client_order_id)
+        return OrderResult.from_response(await self._make_request('PUT', '/fapi/v1/order', params, signed=True))
+
+    async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Open orders of one symbol, or of all symbols (40x the request weight)."""
+        return await self._make_request('GET', '/fapi/v1/openOrders', {'symbol': symbol.upper()} if symbol else {}, signed=True)
+
+    async def get_position_risk(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Position, entry/mark/liquidation price and leverage per symbol."""
+        return await self._make_request('GET', '/fapi/v2/positionRisk', {'symbol': symbol.upper()} if symbol else {}, signed=True)
+
+    async def place_orders(self, orders: List[Order]) -> List[OrderResult]:
+        """Place many orders through /fapi/v1/batchOrders, sending all chunks concurrently.
+
+        Results follow the same conventions as ``BinanceFuturesClient.place_orders``.
+        """
+        chunks = chunk_orders([order.to_params() for order in orders])
+
+        async def _send(chunk: List[Dict[str, str]]) -> List[OrderResult]:
+            params = {'batchOrders': json.dumps(chunk, separators=(',', ':'))}
+            try:
+                responses = await self._make_request('POST', '/fapi/v1/batchOrders', params, signed=True)
+            except AsyncHTTPError as e:
+                if isinstance(e.error_data, dict) and 'code' in e.error_data:
+                    return [OrderResult.from_response(e.error_data)] * len(chunk)
+                return [OrderResult.failure(str(e))] * len(chunk)
+            except (OSError, asyncio.TimeoutError) as e:
+                return [OrderResult.failure(repr(e))] * len(chunk)
+            return [OrderResult.from_response(response) for response in responses]
+
+        chunk_results = await asyncio.gather(*(_send(chunk) for chunk in chunks))
+        return [result for chunk_result in chunk_results for result in chunk_result]
@@ -0,0 +1,48 @@
+from bisect import bisect_left
+from typing import Optional
+from .execution import ExecutionScheduler
+from .orders import AsyncOrderManager
+from .simulator import AsyncSimulatedExchange, MarketData, SimulatedExchange
+
+# Glue between the live trading components and the simulator, so that
+# execution.py and friends never import the backtest engine themselves.
+
+
+def simulated_scheduler(exchange: SimulatedExchange, manager: Optional[AsyncOrderManager] = None,
+                        **kwargs) -> ExecutionScheduler:
+    """An ExecutionScheduler on ``exchange`` and its clock, fed by the exchange's events.
+
+    ``manager`` defaults to an AsyncOrderManager over an
+    AsyncSimulatedExchange; the reference price is the last trade.
+    """
+    if manager is None:
+        manager = AsyncOrderManager(AsyncSimulatedExchange(exchange), metrics=kwargs.get('metrics'))
+        exchange.add_listener(manager.open_orders.handle_event)
+    kwargs.setdefault('price_source', exchange.get_last_price)
+    kwargs.setdefault('client_id_prefix', 'algo')
+    scheduler = ExecutionScheduler(manager, clock=exchange.clock.time, **kwargs)
+    exchange.add_listener(scheduler.handle_event)
+    return scheduler
+
+
+async def replay_with_scheduler(scheduler: ExecutionScheduler, exchange: SimulatedExchange, symbol: str,
+                                data: MarketData, step_ms: int = 1000) -> int:
+    """Replay trade prints through ``exchange`` in ``step_ms`` windows, running due parents between windows.
+
+    Each window's volume is reported to ``scheduler.on_trade``, and the
+    exchange clock is moved to the window's end before the scheduler runs,
+    so children placed there trade against the following prints. Returns
+    the number of prints replayed.
+    """
+    times, prices, quantities = data
+    count = len(times)
+    start = 0
+    while start < count:
+        boundary = int(times[start]) - int(times[start]) % step_ms + step_ms
+        end = bisect_left(times, boundary, start)
+        exchange.replay(symbol, MarketData(times[start:end], prices[start:end], quantities[start:end]))
+        scheduler.on_trade(symbol, repr(float(sum(quantities[start:end]))))
+        exchange.clock.set(boundary)
+        await scheduler.run_due()
+        start = end
+    return count
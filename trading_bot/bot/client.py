@@ -1,110 +1,340 @@
 import requests
 import time
-import hmac
-import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional
-from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from .models import Number, Order, OrderResult, format_decimal, to_decimal
+from .signing import Signer, build_query_string, create_signer, sign_query_string
+from .rate_limiter import RATE_LIMIT_STATUSES, RateLimiter, backoff_delay, get_shared_rate_limiter, should_retry
+from .logging_config import correlation_scope
+from .metrics import MetricsRegistry, get_metrics
+from .symbols import SymbolRegistry
+from .time_sync import TIMESTAMP_OUTSIDE_RECV_WINDOW, TimeSync
 
 logger = logging.getLogger(__name__)
 
+TESTNET_BASE_URL = "https://testnet.binancefuture.com"
+
+# Maximum number of orders accepted by /fapi/v1/batchOrders per request
+BATCH_ORDER_LIMIT = 5
+# DELETE /fapi/v1/batchOrders accepts at most 10 order IDs per request
+BATCH_CANCEL_LIMIT = 10
+
+SUPPORTED_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+BODY_METHODS = ('POST', 'PUT')
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
 class BinanceFuturesClient:
-    """Binance Futures Testnet API client."""
+    """Binance Futures Testnet API client.
     
-    def __init__(self, api_key: str, api_secret: str):
+    Clients for several key pairs can share one ``session`` (and so one
+    connection pool); the API key is sent per request.
+    """
+    
+    def __init__(self, api_key: str, api_secret: str, symbol_registry: Optional[SymbolRegistry] = None, base_url: str = TESTNET_BASE_URL,
+                 rate_limiter: Optional[RateLimiter] = None, max_retries: int = 3, timeout: Optional[float] = 10.0,
+                 signer: Optional[Signer] = None, time_sync: Optional[TimeSync] = None, recv_window: Optional[int] = 5000,
+                 metrics: Optional[MetricsRegistry] = None, session: Optional[requests.Session] = None):
         self.api_key = api_key
         self.api_secret = api_secret
-        self.base_url = "https://testnet.binancefuture.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'X-MBX-APIKEY': self.api_key,
-            'Content-Type': 'application/json'
-        })
-    
-    def _generate_signature(self, params: Dict[str, Any]) -> str:
-        """Generate HMAC SHA256 signature for API requests."""
-        query_string = urlencode(params)
-        return hmac.new(
-            self.api_secret.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        self.signer = signer or create_signer(api_secret)
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.headers = {'X-MBX-APIKEY': self.api_key}
+        self.body_headers = dict(self.headers, **FORM_HEADERS)
+        self.symbol_registry = symbol_registry or SymbolRegistry(self.get_exchange_info)
+        self.time_sync = time_sync or TimeSync(self.get_server_time)
+        self.recv_window = recv_window
+        self.metrics = metrics or get_metrics()
+        self.metrics.register_gauges('rate_limiter', self.rate_limiter.metrics)
+        self.metrics.register_gauges('time_sync', self.time_sync.metrics)
     
     def _make_request(self, method: str, endpoint: str, params: Dict[str, Any] = None, signed: bool = False) -> Dict[str, Any]:
-        """Make HTTP request to Binance API."""
+        """Make HTTP request to Binance API under a log correlation ID (reusing the caller's, if any)."""
+        with correlation_scope():
+            return self._send_request(method, endpoint, params, signed)
+    
+    def _send_request(self, method: str, endpoint: str, params: Dict[str, Any] = None, signed: bool = False) -> Dict[str, Any]:
+        """Send one API call, including retries.
+        
+        Waits on the shared rate limiter before sending and retries
+        rate-limited (429/418) and, for GET, 5xx responses and connection
+        errors with jittered exponential backoff. Signed requests carry a
+        server-time corrected timestamp and are resent after a clock resync
+        if the exchange rejects the timestamp (-1021).
+        """
         if params is None:
             params = {}
         
         url = f"{self.base_url}{endpoint}"
+        method = method.upper()
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
         
-        if signed:
-            params['timestamp'] = int(time.time() * 1000)
-            params['signature'] = self._generate_signature(params)
-        
-        try:
-            logger.info(f"Making {method} request to {endpoint} with params: {params}")
-            
-            if method.upper() == 'GET':
-                response = self.session.get(url, params=params)
-            elif method.upper() == 'POST':
-                response = self.session.post(url, params=params)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            self.rate_limiter.acquire(method, endpoint, params)
+            waited_at = time.perf_counter()
+            self.metrics.observe('request_stage_seconds', waited_at - started, stage='rate_limit_wait', endpoint=endpoint)
             
-            response.raise_for_status()
-            result = response.json()
+            # Stamp and sign only once the request may go out, so a rate-limit wait cannot outlast recvWindow
+            request_params = dict(params)
+            if signed:
+                self.time_sync.ensure_synced()
+                if self.recv_window is not None:
+                    request_params['recvWindow'] = self.recv_window
+                request_params['timestamp'] = self.time_sync.timestamp()
+            started = time.perf_counter()
+            payload = encode_params(request_params, self.signer if signed else None)
+            self.metrics.observe('request_stage_seconds', time.perf_counter() - started, stage='sign', endpoint=endpoint)
             
-            logger.info(f"API Response: {result}")
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_data = e.response.json()
-                    logger.error(f"API Error Details: {error_data}")
-                except:
-                    logger.error(f"API Error Response: {e.response.text}")
-            raise
+            try:
+                logger.debug("Request %s %s params=%s", method, endpoint, request_params)
+                started = time.perf_counter()
+                # Send exactly the bytes that were signed: as the body for POST/PUT, the query string otherwise
+                if method in BODY_METHODS:
+                    response = self.session.request(method, url, data=payload, headers=self.body_headers, timeout=self.timeout)
+                else:
+                    response = self.session.request(method, f"{url}?{payload}" if payload else url, headers=self.headers,
+                                                    timeout=self.timeout)
+                latency_ms = (time.perf_counter() - started) * 1000
+                self.metrics.observe('request_stage_seconds', latency_ms / 1000, stage='http', endpoint=endpoint)
+                logger.info("%s %s -> %s in %.1fms", method, endpoint, response.status_code, latency_ms,
+                            extra={'method': method, 'endpoint': endpoint, 'status': response.status_code,
+                                   'latency_ms': round(latency_ms, 3), 'attempt': attempt})
+                
+                self.rate_limiter.update_from_headers(response.headers)
+                if response.status_code >= 400:
+                    self.metrics.inc('api_errors_total', endpoint=endpoint, code=str(_error_code(response) or f'http_{response.status_code}'))
+                
+                if should_retry(method, response.status_code) and attempt < self.max_retries:
+                    delay = backoff_delay(attempt, retry_after=response.headers.get('Retry-After'))
+                    logger.warning("%s %s returned HTTP %s; retrying in %.2fs (attempt %d/%d)", method, endpoint, response.status_code, delay, attempt + 1, self.max_retries)
+                    if response.status_code in RATE_LIMIT_STATUSES:
+                        # Hold back every client sharing the limiter, not just this call
+                        self.rate_limiter.pause(delay)
+                    else:
+                        time.sleep(delay)
+                    continue
+                
+                if signed and response.status_code == 400 and attempt < self.max_retries and _error_code(response) == TIMESTAMP_OUTSIDE_RECV_WINDOW:
+                    logger.warning("%s %s rejected for timestamp outside recvWindow; resyncing clock", method, endpoint)
+                    self.time_sync.reset()
+                    continue
+                
+                response.raise_for_status()
+                started = time.perf_counter()
+                result = response.json()
+                self.metrics.observe('request_stage_seconds', time.perf_counter() - started, stage='parse', endpoint=endpoint)
+                
+                logger.debug("Response %s %s: %s", method, endpoint, result)
+                return result
+                
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.metrics.inc('api_errors_total', endpoint=endpoint, code='transport')
+                if method == 'GET' and attempt < self.max_retries:
+                    delay = backoff_delay(attempt)
+                    logger.warning("%s %s failed: %s; retrying in %.2fs (attempt %d/%d)", method, endpoint, e, delay, attempt + 1, self.max_retries)
+                    time.sleep(delay)
+                    continue
+                logger.error("API request failed: %s", e)
+                raise
+            except requests.exceptions.RequestException as e:
+                logger.error("API request failed: %s", e)
+                if hasattr(e, 'response') and e.response is not None:
+                    try:
+                        error_data = e.response.json()
+                        logger.error("API Error Details: %s", error_data)
+                    except:
+                        logger.error("API Error Response: %s", e.response.text)
+                raise
     
     def get_account_info(self) -> Dict[str, Any]:
         """Get account information."""
         return self._make_request('GET', '/fapi/v2/account', signed=True)
     
+    def start_user_data_stream(self) -> str:
+        """Create a user data stream listenKey."""
+        return self._make_request('POST', '/fapi/v1/listenKey')['listenKey']
+    
+    def keepalive_user_data_stream(self) -> None:
+        """Extend the current listenKey's validity by 60 minutes."""
+        self._make_request('PUT', '/fapi/v1/listenKey')
+    
+    def close_user_data_stream(self) -> None:
+        """Close the current user data stream."""
+        self._make_request('DELETE', '/fapi/v1/listenKey')
+    
+    def get_server_time(self) -> int:
+        """Get the server time in milliseconds."""
+        return self._make_request('GET', '/fapi/v1/time')['serverTime']
+    
+    def get_exchange_info(self) -> Dict[str, Any]:
+        """Download the full exchange information."""
+        return self._make_request('GET', '/fapi/v1/exchangeInfo')
+    
     def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get symbol information from exchange info."""
-        exchange_info = self._make_request('GET', '/fapi/v1/exchangeInfo')
-        
-        for symbol_info in exchange_info.get('symbols', []):
-            if symbol_info['symbol'] == symbol.upper():
-                return symbol_info
-        return None
+        """Get symbol information from the cached exchange info."""
+        return self.symbol_registry.get_symbol_info(symbol)
     
-    def place_order(self, symbol: str, side: str, order_type: str, quantity: float, price: Optional[float] = None, stop_price: Optional[float] = None) -> Dict[str, Any]:
+    def get_klines(self, symbol: str, interval: str, start_time: Optional[int] = None, end_time: Optional[int] = None,
+                   limit: int = 1000) -> List[List[Any]]:
+        """Get candlesticks, oldest first (at most ``limit`` per call)."""
+        params: Dict[str, Any] = {'symbol': symbol, 'interval': interval, 'limit': limit}
+        if start_time is not None:
+            params['startTime'] = start_time
+        if end_time is not None:
+            params['endTime'] = end_time
+        return self._make_request('GET', '/fapi/v1/klines', params)
+    
+    def get_agg_trades(self, symbol: str, from_id: Optional[int] = None, start_time: Optional[int] = None,
+                       end_time: Optional[int] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Get compressed/aggregate trades, by ID or within a time window of at most one hour."""
+        params: Dict[str, Any] = {'symbol': symbol, 'limit': limit}
+        if from_id is not None:
+            params['fromId'] = from_id
+        if start_time is not None:
+            params['startTime'] = start_time
+        if end_time is not None:
+            params['endTime'] = end_time
+        return self._make_request('GET', '/fapi/v1/aggTrades', params)
+    
+    def get_mark_price(self, symbol: Optional[str] = None) -> Any:
+        """Mark price, index price and funding rate of ``symbol``, or a list for every symbol."""
+        return self._make_request('GET', '/fapi/v1/premiumIndex', {'symbol': symbol} if symbol else None)
+    
+    def get_order_book(self, symbol: str, limit: int = 1000) -> Dict[str, Any]:
+        """Get an order book snapshot (``lastUpdateId``, ``bids``, ``asks``) of up to ``limit`` levels per side."""
+        return self._make_request('GET', '/fapi/v1/depth', {'symbol': symbol, 'limit': limit})
+    
+    def place_order(self, order: Order) -> OrderResult:
         """Place an order on Binance Futures."""
-        params = {
-            'symbol': symbol.upper(),
-            'side': side.upper(),
-            'type': order_type.upper(),
-            'quantity': str(quantity)
-        }
+        return OrderResult.from_response(self._make_request('POST', '/fapi/v1/order', order.to_params(), signed=True))
+    
+    def query_order(self, symbol: str, order_id: Optional[int] = None, orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Current state of an order, by exchange order ID or client order ID."""
+        return OrderResult.from_response(self._make_request('GET', '/fapi/v1/order', order_query_params(symbol, order_id, orig_client_order_id), signed=True))
+    
+    def cancel_order(self, symbol: str, order_id: Optional[int] = None, orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Cancel an open order, by exchange order ID or client order ID."""
+        return OrderResult.from_response(self._make_request('DELETE', '/fapi/v1/order', order_query_params(symbol, order_id, orig_client_order_id), signed=True))
+    
+    def cancel_orders(self, symbol: str, order_ids: Optional[List[int]] = None,
+                      orig_client_order_ids: Optional[List[str]] = None) -> List[OrderResult]:
+        """Cancel many orders of one symbol through DELETE /fapi/v1/batchOrders.
         
-        if order_type.upper() == 'LIMIT':
-            if price is None:
-                raise ValueError("Price is required for LIMIT orders")
-            params['price'] = str(price)
-            params['timeInForce'] = 'GTC'  # Good Till Cancelled
+        IDs are sent BATCH_CANCEL_LIMIT per request; one result per ID is
+        returned in input order, with failed OrderResults for orders that
+        could not be cancelled.
+        """
+        results = []
+        for key, ids in (('orderIdList', order_ids), ('origClientOrderIdList', orig_client_order_ids)):
+            for i in range(0, len(ids or ()), BATCH_CANCEL_LIMIT):
+                chunk = ids[i:i + BATCH_CANCEL_LIMIT]
+                params = {'symbol': symbol.upper(), key: json.dumps(chunk, separators=(',', ':'))}
+                try:
+                    responses = self._make_request('DELETE', '/fapi/v1/batchOrders', params, signed=True)
+                except requests.exceptions.RequestException as e:
+                    results.extend([batch_error_result(e)] * len(chunk))
+                    continue
+                results.extend(OrderResult.from_response(response) for response in responses)
+        return results
+    
+    def cancel_all_orders(self, symbol: str) -> Dict[str, Any]:
+        """Cancel every open order of ``symbol``."""
+        return self._make_request('DELETE', '/fapi/v1/allOpenOrders', {'symbol': symbol.upper()}, signed=True)
+    
+    def modify_order(self, symbol: str, side: str, quantity: Number, price: Number, order_id: Optional[int] = None,
+                     orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Amend the price and/or quantity of an open LIMIT order in place (PUT /fapi/v1/order)."""
+        params = modify_order_params(symbol, side, quantity, price, order_id, orig_client_order_id)
+        return OrderResult.from_response(self._make_request('PUT', '/fapi/v1/order', params, signed=True))
+    
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Open orders of one symbol, or of all symbols (40x the request weight)."""
+        return self._make_request('GET', '/fapi/v1/openOrders', {'symbol': symbol.upper()} if symbol else {}, signed=True)
+    
+    def get_position_risk(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Position, entry/mark/liquidation price and leverage per symbol."""
+        return self._make_request('GET', '/fapi/v2/positionRisk', {'symbol': symbol.upper()} if symbol else {}, signed=True)
+    
+    def place_orders(self, orders: List[Order], max_workers: int = 4) -> List[OrderResult]:
+        """Place many orders through /fapi/v1/batchOrders.
         
-        elif order_type.upper() == 'STOP_MARKET':
-            if stop_price is None:
-                raise ValueError("Stop price is required for STOP_MARKET orders")
-            params['stopPrice'] = str(stop_price)
+        Orders are sent in chunks of BATCH_ORDER_LIMIT, chunks are sent
+        concurrently, and one result per order is returned in input order.
+        A rejected order (or every order of a chunk whose request failed)
+        yields a failed OrderResult instead of raising.
+        """
+        chunks = chunk_orders([order.to_params() for order in orders])
+        if not chunks:
+            return []
         
-        elif order_type.upper() == 'STOP':
-            if price is None or stop_price is None:
-                raise ValueError("Both price and stop price are required for STOP orders")
-            params['price'] = str(price)
-            params['stopPrice'] = str(stop_price)
-            params['timeInForce'] = 'GTC'
+        def _send(chunk: List[Dict[str, str]]) -> List[OrderResult]:
+            params = {'batchOrders': json.dumps(chunk, separators=(',', ':'))}
+            try:
+                responses = self._make_request('POST', '/fapi/v1/batchOrders', params, signed=True)
+            except requests.exceptions.RequestException as e:
+                return [batch_error_result(e)] * len(chunk)
+            return [OrderResult.from_response(response) for response in responses]
         
-        return self._make_request('POST', '/fapi/v1/order', params, signed=True)
\ No newline at end of file
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            chunk_results = list(executor.map(_send, chunks))
+        return [result for chunk_result in chunk_results for result in chunk_result]
+
+
+def chunk_orders(orders: List[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+    """Split order params into batchOrders-sized chunks."""
+    return [orders[i:i + BATCH_ORDER_LIMIT] for i in range(0, len(orders), BATCH_ORDER_LIMIT)]
+
+
+def order_query_params(symbol: str, order_id: Optional[int] = None, orig_client_order_id: Optional[str] = None) -> Dict[str, Any]:
+    """Parameters identifying one order; Binance requires orderId or origClientOrderId."""
+    if order_id is None and orig_client_order_id is None:
+        raise ValueError("Either order_id or orig_client_order_id is required")
+    params: Dict[str, Any] = {'symbol': symbol.upper()}
+    if order_id is not None:
+        params['orderId'] = order_id
+    if orig_client_order_id is not None:
+        params['origClientOrderId'] = orig_client_order_id
+    return params
+
+
+def modify_order_params(symbol: str, side: str, quantity: Number, price: Number, order_id: Optional[int] = None,
+                        orig_client_order_id: Optional[str] = None) -> Dict[str, Any]:
+    """Parameters for PUT /fapi/v1/order; Binance requires side, quantity and price on every amendment."""
+    params = order_query_params(symbol, order_id, orig_client_order_id)
+    params.update({'side': side.upper(), 'quantity': format_decimal(to_decimal(quantity)), 'price': format_decimal(to_decimal(price))})
+    return params
+
+
+def batch_error_result(error: Exception) -> OrderResult:
+    """Turn a failed batch request into a per-order error result."""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        try:
+            error_data = response.json()
+            if isinstance(error_data, dict) and 'code' in error_data:
+                return OrderResult.from_response(error_data)
+        except ValueError:
+            pass
+    return OrderResult.failure(str(error))
+
+
+def _error_code(response: requests.Response) -> Optional[int]:
+    """Binance error code from an error response body, if present."""
+    try:
+        error_data = response.json()
+    except ValueError:
+        return None
+    return error_data.get('code') if isinstance(error_data, dict) else None
+
+
+def encode_params(params: Dict[str, Any], signer: Optional[Signer] = None) -> str:
+    """Encode request parameters once and, if a signer is given, append the signature of that exact string."""
+    query_string = build_query_string(params)
+    return sign_query_string(query_string, signer) if signer is not None else query_string
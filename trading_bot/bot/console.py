@@ -0,0 +1,65 @@
+from typing import Any, Dict, List
+from .models import Order, OrderResult, format_decimal
+
+
+def print_order_summary(order: Order):
+    """Print order request summary."""
+    print("\n" + "="*50)
+    print("ORDER REQUEST SUMMARY")
+    print("="*50)
+    print(f"Symbol: {order.symbol}")
+    print(f"Side: {order.side}")
+    print(f"Type: {order.order_type}")
+    print(f"Quantity: {format_decimal(order.quantity)}")
+    if order.price is not None:
+        print(f"Price: {format_decimal(order.price)}")
+    if order.stop_price is not None:
+        print(f"Stop Price: {format_decimal(order.stop_price)}")
+    print("="*50)
+
+
+def print_batch_response(orders: List[Order], results: List[OrderResult]):
+    """Print per-order batch results."""
+    print("\nBATCH ORDER RESULTS")
+    print("="*50)
+    for i, (order, result) in enumerate(zip(orders, results), 1):
+        if not result.ok:
+            print(f"{i:>3}. ❌ {order.describe()}: {result.error_msg} (code {result.error_code})")
+        else:
+            print(f"{i:>3}. ✅ {order.describe()}: order {result.order_id} {result.status or 'N/A'}")
+    failed = sum(1 for result in results if not result.ok)
+    print("="*50)
+    print(f"{len(results) - failed} placed, {failed} failed")
+
+
+def print_order_response(response: OrderResult):
+    """Print order response details."""
+    print("\nORDER RESPONSE DETAILS")
+    print("="*50)
+    print(f"Order ID: {response.order_id or 'N/A'}")
+    print(f"Status: {response.status or 'N/A'}")
+    print(f"Executed Quantity: {format_decimal(response.executed_qty)}")
+
+    if response.avg_price != 0:
+        print(f"Average Price: {format_decimal(response.avg_price)}")
+
+    print(f"Client Order ID: {response.client_order_id or 'N/A'}")
+    print(f"Update Time: {response.update_time or 'N/A'}")
+    print("="*50)
+
+    # Success message
+    if response.status in ['FILLED', 'NEW', 'PARTIALLY_FILLED']:
+        print("✅ ORDER PLACED SUCCESSFULLY!")
+    else:
+        print("⚠️  ORDER STATUS UNCLEAR - CHECK LOGS")
+
+
+def print_account_info(account_info: Dict[str, Any]):
+    """Print wallet balances from an account response."""
+    print("\n" + "="*50)
+    print("ACCOUNT INFORMATION")
+    print("="*50)
+    print(f"Total Wallet Balance: {account_info.get('totalWalletBalance', 'N/A')} USDT")
+    print(f"Available Balance: {account_info.get('availableBalance', 'N/A')} USDT")
+    print(f"Total Unrealized PnL: {account_info.get('totalUnrealizedProfit', 'N/A')} USDT")
+    print("="*50)
@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from .models import Order, OrderResult, format_decimal
+
+if TYPE_CHECKING:
+    from .orders import OrderManager  # requests/asyncio; the CLI side of the socket must not pay for them
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = 'run/trading_bot.sock'
+# Large enough for a batch file of a few thousand orders
+MAX_MESSAGE_BYTES = 8 * 1024 * 1024
+
+
+class DaemonError(Exception):
+    """A request the daemon received but answered with an error."""
+
+    def __init__(self, message: str, error_type: Optional[str] = None):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def order_to_wire(order: Order) -> Dict[str, Any]:
+    return {
+        'symbol': order.symbol, 'side': order.side, 'type': order.order_type,
+        'quantity': format_decimal(order.quantity),
+        'price': format_decimal(order.price) if order.price is not None else None,
+        'stop_price': format_decimal(order.stop_price) if order.stop_price is not None else None,
+    }
+
+
+def order_from_wire(data: Dict[str, Any]) -> Order:
+    return Order.create(data['symbol'], data['side'], data['type'], data['quantity'], data.get('price'), data.get('stop_price'))
+
+
+def result_to_wire(result: OrderResult) -> Dict[str, Any]:
+    return {
+        'order_id': result.order_id, 'client_order_id': result.client_order_id, 'symbol': result.symbol,
+        'status': result.status, 'executed_qty': format_decimal(result.executed_qty),
+        'avg_price': format_decimal(result.avg_price), 'update_time': result.update_time,
+        'error_code': result.error_code, 'error_msg': result.error_msg,
+    }
+
+
+def result_from_wire(data: Dict[str, Any]) -> OrderResult:
+    return OrderResult(**dict(data, executed_qty=Decimal(data['executed_qty']), avg_price=Decimal(data['avg_price'])))
+
+
+class TradingDaemon:
+    """Serves CLI requests over a Unix socket from one long-lived order manager.
+
+    The daemon keeps what a fresh ``cli.py`` process would otherwise rebuild
+    on every call: the HTTP session and its TLS connections, the
+    exchangeInfo symbol cache (refreshed in the background) and the server
+    clock offset (resynced in the background, which also keeps the
+    connection warm). Requests are newline-delimited JSON objects,
+    ``{"method": ..., "params": {...}}``, answered with ``{"ok": true,
+    "result": ...}`` or ``{"ok": false, "error": ..., "type": ...}``; one
+    connection may carry several requests. The socket is created with mode
+    0600, since anyone who can connect can trade on the daemon's account.
+    """
+
+    def __init__(self, manager: 'OrderManager', path: str = DEFAULT_SOCKET_PATH):
+        self.manager = manager
+        self.client = manager.client
+        self.path = path
+        self.started_at = time.time()
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self.methods: Dict[str, Callable[..., Any]] = {
+            'ping': self.ping,
+            'place_order': self.place_order,
+            'place_orders': self.place_orders,
+            'cancel_order': self.cancel_order,
+            'open_orders': self.open_orders,
+            'account_info': self.account_info,
+            'stats': self.stats,
+            'shutdown': self.shutdown,
+        }
+
+    # --- methods ---------------------------------------------------------
+
+    def ping(self) -> Dict[str, Any]:
+        return {'pid': os.getpid(), 'uptime': time.time() - self.started_at}
+
+    def place_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        return result_to_wire(self.manager.place_order(order_from_wire(order)))
+
+    def place_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [result_to_wire(result) for result in self.manager.place_orders([order_from_wire(order) for order in orders])]
+
+    def cancel_order(self, symbol: str, order_id: Optional[int] = None, client_order_id: Optional[str] = None) -> Dict[str, Any]:
+        return result_to_wire(self.manager.cancel_order(symbol, order_id, client_order_id))
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.manager.refresh_open_orders(symbol)
+
+    def account_info(self) -> Dict[str, Any]:
+        return self.client.get_account_info()
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.ping(), requests_served=self.requests_served, metrics=self.manager.metrics.snapshot())
+
+    def shutdown(self) -> Dict[str, Any]:
+        # serve_forever must be stopped from another thread than the one handling this request
+        threading.Thread(target=self.stop, name='daemon-shutdown', daemon=True).start()
+        return {'stopping': True}
+
+    # --- serving ---------------------------------------------------------
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method = self.methods.get(request.get('method'))
+        if method is None:
+            return {'ok': False, 'error': f"Unknown method {request.get('method')!r}", 'type': 'ValueError'}
+        with self._lock:
+            self.requests_served += 1
+        try:
+            return {'ok': True, 'result': method(**request.get('params', {}))}
+        except Exception as e:
+            logger.error(f"Daemon request {request.get('method')} failed: {e}")
+            return {'ok': False, 'error': str(e), 'type': type(e).__name__}
+
+    def warm_up(self) -> None:
+        """Load symbols and sync the clock now, then keep both fresh in the background."""
+        started = time.perf_counter()
+        self.client.symbol_registry.refresh()
+        self.client.time_sync.sync()
+        self.client.symbol_registry.start_background_refresh()
+        self.client.time_sync.start_background_sync()
+        logger.info(f"Daemon warm-up done in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def serve_forever(self) -> None:
+        """Warm up, listen on ``path`` and serve until ``stop``, SIGTERM or Ctrl+C."""
+        self._bind()
+        installed = threading.current_thread() is threading.main_thread()
+        if installed:
+            previous = signal.signal(signal.SIGTERM, lambda signum, frame: self.shutdown())
+        try:
+            self.warm_up()
+            logger.info(f"Trading daemon listening on {self.path} (pid {os.getpid()})")
+            self._server.serve_forever()
+        finally:
+            if installed:
+                signal.signal(signal.SIGTERM, previous)
+            self.client.symbol_registry.stop_background_refresh()
+            self.client.time_sync.stop_background_sync()
+            self._server.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            logger.info("Trading daemon stopped")
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+
+    def _bind(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            if ping_daemon(self.path):
+                raise RuntimeError(f"A daemon is already listening on {self.path}")
+            os.unlink(self.path)  # Left behind by a daemon that did not shut down cleanly
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    line = self.rfile.readline(MAX_MESSAGE_BYTES)
+                    if not line:
+                        return
+                    if not line.endswith(b'\n'):
+                        # Too long (or cut off): the rest of the line cannot be told from the next request
+                        self._respond({'ok': False, 'error': f"Request longer than {MAX_MESSAGE_BYTES} bytes "
+                                                             f"or not newline-terminated", 'type': 'ValueError'})
+                        return
+                    try:
+                        request = json.loads(line)
+                    except ValueError as e:
+                        response = {'ok': False, 'error': f"Malformed request: {e}", 'type': 'ValueError'}
+                    else:
+                        response = daemon.dispatch(request)
+                    self._respond(response)
+
+            def _respond(self, response: Dict[str, Any]) -> None:
+                self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+
+        old_umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon_threads = True
+
+
+class DaemonClient:
+    """Client side of the daemon socket; one connection, reused for every ``call``."""
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = 60.0):
+        self.path = path
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._reader = self._socket.makefile('rb')
+
+    def call(self, method: str, **params: Any) -> Any:
+        """Run ``method`` in the daemon; raises DaemonError if it failed there."""
+        self._socket.sendall(json.dumps({'method': method, 'params': params}).encode('utf-8') + b'\n')
+        line = self._reader.readline(MAX_MESSAGE_BYTES)
+        if not line.endswith(b'\n'):
+            raise ConnectionError(f"Daemon at {self.path} closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Unknown daemon error'), response.get('type'))
+        return response.get('result')
+
+    def close(self) -> None:
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self) -> 'DaemonClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def ping_daemon(path: str = DEFAULT_SOCKET_PATH, timeout: float = 1.0) -> bool:
+    """Whether a daemon answers on ``path``."""
+    try:
+        with DaemonClient(path, timeout) as client:
+            client.call('ping')
+        return True
+    except (OSError, ValueError, DaemonError):
+        return False
@@ -0,0 +1,646 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .journal import ORDER_DOES_NOT_EXIST, error_code
+from .metrics import MetricsRegistry, get_metrics
+from .models import Number, Order, OrderResult, to_decimal
+from .open_orders import UNKNOWN_ORDER
+from .orders import AsyncOrderManager
+from .rate_limiter import TokenBucket
+from .risk import RiskRejected
+from .streams import TERMINAL_ORDER_STATUSES
+from .symbols import SymbolFilters
+from .validators import check_order_filters, snap_price, snap_quantity, validate_side
+
+logger = logging.getLogger(__name__)
+
+# Parent order states
+PENDING = 'PENDING'
+WORKING = 'WORKING'
+FILLED = 'FILLED'
+EXPIRED = 'EXPIRED'
+CANCELED = 'CANCELED'
+FAILED = 'FAILED'
+FINISHED_STATES = frozenset((FILLED, EXPIRED, CANCELED, FAILED))
+
+_ZERO = Decimal(0)
+_BPS = Decimal(10000)
+
+
+class ChildOrder:
+    """One LIMIT (or final MARKET) order sent for a parent."""
+
+    __slots__ = ('client_order_id', 'order_id', 'price', 'quantity', 'executed_qty', 'cost', 'status')
+
+    def __init__(self, client_order_id: str, price: Optional[Decimal], quantity: Decimal):
+        self.client_order_id = client_order_id
+        self.order_id: Optional[int] = None
+        self.price = price
+        self.quantity = quantity
+        self.executed_qty = _ZERO
+        self.cost = _ZERO
+        self.status = 'NEW'
+
+    @property
+    def is_open(self) -> bool:
+        return self.status not in TERMINAL_ORDER_STATUSES
+
+    @property
+    def remaining(self) -> Decimal:
+        return self.quantity - self.executed_qty
+
+    def update(self, executed_qty: Decimal, avg_price: Decimal, status: Optional[str], order_id: Optional[int] = None) -> Decimal:
+        """Apply a report from a result, query or stream event; returns the newly filled quantity.
+
+        Reports can arrive out of order (a REST result after the stream
+        event that already covered it), so executed quantity only grows and
+        a terminal status is final.
+        """
+        if order_id is not None:
+            self.order_id = order_id
+        filled = executed_qty - self.executed_qty
+        if filled > 0:
+            self.executed_qty = executed_qty
+            self.cost = executed_qty * avg_price
+        if status is not None and self.is_open:
+            self.status = status
+        return max(filled, _ZERO)
+
+    def apply_result(self, result: OrderResult) -> Decimal:
+        return self.update(result.executed_qty, result.avg_price, result.status, result.order_id)
+
+    def __repr__(self) -> str:
+        return f"ChildOrder({self.client_order_id}, {self.status}, {self.executed_qty}/{self.quantity} @ {self.price})"
+
+
+class ExecutionAlgo(ABC):
+    """A parent order worked through child LIMIT orders, one resting at a time.
+
+    ``target(now)`` is how much of ``quantity`` should be filled by ``now``;
+    on every wake-up the working child is sized to the shortfall and priced
+    ``offset_bps`` through the reference price (positive = more aggressive,
+    negative = passive), never past ``limit_price``. A leftover child is
+    amended when the price moved by ``reprice_bps`` or its size no longer
+    matches. After ``duration`` seconds the working child is cancelled and,
+    with ``finish_with_market``, the rest is sent as a MARKET order.
+    """
+
+    kind = 'ALGO'
+    finish_with_market = True
+
+    def __init__(self, symbol: str, side: str, quantity: Number, duration: Optional[float] = None, interval: float = 10.0,
+                 limit_price: Optional[Number] = None, offset_bps: Number = 0, reprice_bps: Number = 1,
+                 finish_with_market: Optional[bool] = None, start_time: Optional[float] = None):
+        if not validate_side(side):
+            raise ValueError(f"Invalid side: {side}")
+        self.quantity = to_decimal(quantity)
+        if self.quantity <= 0:
+            raise ValueError("Parent quantity must be positive")
+        if interval <= 0 or (duration is not None and duration <= 0):
+            raise ValueError("Interval and duration must be positive")
+        self.symbol = symbol.upper()
+        self.side = side.upper()
+        self.duration = duration
+        self.interval = interval
+        self.limit_price = to_decimal(limit_price) if limit_price is not None else None
+        self.offset_bps = to_decimal(offset_bps)
+        self.reprice_bps = to_decimal(reprice_bps)
+        if finish_with_market is not None:
+            self.finish_with_market = finish_with_market
+        self.id: Optional[str] = None
+        self.status = PENDING
+        self.reason: Optional[str] = None
+        self.start_time = start_time
+        self.end_time: Optional[float] = None
+        self.finish_time: Optional[float] = None
+        self.arrival_price: Optional[Decimal] = None
+        self.children: List[ChildOrder] = []
+        self.working: Optional[ChildOrder] = None
+        self.errors = 0
+        self.cancel_requested = False
+        self.done = asyncio.Event()
+
+    # --- progress --------------------------------------------------------
+
+    @property
+    def filled(self) -> Decimal:
+        return sum((child.executed_qty for child in self.children), _ZERO)
+
+    @property
+    def remaining(self) -> Decimal:
+        return self.quantity - self.filled
+
+    @property
+    def avg_price(self) -> Optional[Decimal]:
+        filled = self.filled
+        return sum((child.cost for child in self.children), _ZERO) / filled if filled else None
+
+    @property
+    def slippage_bps(self) -> Optional[Decimal]:
+        """Average fill price against the arrival price, in basis points; positive is a cost."""
+        avg = self.avg_price
+        if avg is None or not self.arrival_price:
+            return None
+        signed = avg - self.arrival_price if self.side == 'BUY' else self.arrival_price - avg
+        return signed / self.arrival_price * _BPS
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def summary(self) -> Dict[str, Any]:
+        slippage = self.slippage_bps
+        return {
+            'id': self.id, 'kind': self.kind, 'symbol': self.symbol, 'side': self.side, 'status': self.status,
+            'quantity': str(self.quantity), 'filled': str(self.filled),
+            'avg_price': str(self.avg_price) if self.avg_price is not None else None,
+            'arrival_price': str(self.arrival_price) if self.arrival_price is not None else None,
+            'slippage_bps': float(slippage) if slippage is not None else None,
+            'children': len(self.children), 'reason': self.reason,
+        }
+
+    # --- schedule --------------------------------------------------------
+
+    def start(self, now: float) -> None:
+        if self.start_time is None or self.start_time > now:
+            self.start_time = now
+        if self.duration is not None:
+            self.end_time = self.start_time + self.duration
+        self.status = WORKING
+
+    @abstractmethod
+    def target(self, now: float) -> Decimal:
+        """Quantity that should be filled by ``now``."""
+
+    def display_quantity(self) -> Optional[Decimal]:
+        """Largest size shown in one child, or None for no cap."""
+        return None
+
+    def next_wake(self, now: float) -> float:
+        """Next slice boundary after ``now`` (clamped to the end time)."""
+        elapsed = max(now - self.start_time, 0.0)
+        wake = self.start_time + (math.floor(elapsed / self.interval + 1e-9) + 1) * self.interval
+        return min(wake, self.end_time) if self.end_time is not None else wake
+
+    def child_price(self, reference: Decimal, filters: SymbolFilters) -> Decimal:
+        sign = 1 if self.side == 'BUY' else -1
+        price = reference * (1 + sign * self.offset_bps / _BPS)
+        if self.limit_price is not None:
+            price = min(price, self.limit_price) if self.side == 'BUY' else max(price, self.limit_price)
+        return snap_price(filters, price, self.side)
+
+    def child_quantity(self, now: float, filters: SymbolFilters) -> Decimal:
+        """Size the working child should have now: the shortfall, capped and snapped to the step size."""
+        quantity = min(self.target(now), self.quantity) - self.filled
+        display = self.display_quantity()
+        if display is not None:
+            quantity = min(quantity, display)
+        if filters.max_qty is not None:
+            quantity = min(quantity, filters.max_qty)
+        return snap_quantity(filters, quantity, 'LIMIT') if quantity > 0 else _ZERO
+
+    def __repr__(self) -> str:
+        return f"{self.kind}({self.id}, {self.side} {self.quantity} {self.symbol}, {self.status}, filled {self.filled})"
+
+
+class TWAP(ExecutionAlgo):
+    """Time-weighted: ``quantity`` spread evenly over ``duration`` in slices of ``interval`` seconds."""
+
+    kind = 'TWAP'
+
+    def __init__(self, symbol: str, side: str, quantity: Number, duration: float, interval: float = 10.0, **kwargs):
+        super().__init__(symbol, side, quantity, duration, interval, **kwargs)
+        self.slices = max(math.ceil(duration / interval - 1e-9), 1)
+
+    def target(self, now: float) -> Decimal:
+        elapsed = max(now - self.start_time, 0.0)
+        done = min(math.floor(elapsed / self.interval + 1e-9) + 1, self.slices)
+        return self.quantity * done / self.slices
+
+
+class VWAPAlgo(ExecutionAlgo):
+    """Volume participation: keeps fills at ``participation`` of the market volume traded since the start.
+
+    Volume comes from ``ExecutionScheduler.on_trade`` (aggTrade events or a
+    replay). Without a ``duration`` it works until filled or cancelled, and
+    by default does not chase the remainder with a MARKET order.
+    """
+
+    kind = 'VWAP'
+    finish_with_market = False
+
+    def __init__(self, symbol: str, side: str, quantity: Number, participation: Number = Decimal('0.1'),
+                 duration: Optional[float] = None, interval: float = 5.0, **kwargs):
+        super().__init__(symbol, side, quantity, duration, interval, **kwargs)
+        self.participation = to_decimal(participation)
+        if not 0 < self.participation <= 1:
+            raise ValueError("Participation must be in (0, 1]")
+        self.market_volume = _ZERO
+
+    def on_trade(self, quantity: Decimal) -> None:
+        if self.status == WORKING:
+            self.market_volume += quantity
+
+    def target(self, now: float) -> Decimal:
+        return min(self.quantity, self.market_volume * self.participation)
+
+
+class Iceberg(ExecutionAlgo):
+    """Shows at most ``display`` at a time; the hidden reserve is sent as each child fills.
+
+    With ``limit_price`` the children rest at that price; otherwise they are
+    pegged ``offset_bps`` from the reference price.
+    """
+
+    kind = 'ICEBERG'
+    finish_with_market = False
+
+    def __init__(self, symbol: str, side: str, quantity: Number, display: Number, limit_price: Optional[Number] = None,
+                 duration: Optional[float] = None, interval: float = 5.0, **kwargs):
+        super().__init__(symbol, side, quantity, duration, interval, limit_price=limit_price, **kwargs)
+        self.display = to_decimal(display)
+        if self.display <= 0:
+            raise ValueError("Display quantity must be positive")
+
+    def target(self, now: float) -> Decimal:
+        return self.quantity
+
+    def display_quantity(self) -> Optional[Decimal]:
+        return self.display
+
+    def child_price(self, reference: Decimal, filters: SymbolFilters) -> Decimal:
+        if self.limit_price is not None and self.offset_bps == 0:
+            return snap_price(filters, self.limit_price, self.side)
+        return super().child_price(reference, filters)
+
+
+class ExecutionScheduler:
+    """Works many parent orders on one asyncio loop through a shared AsyncOrderManager.
+
+    Parents sleep in a heap keyed by their next wake-up (slice boundary,
+    fill or cancel request). Child orders and amendments share a budget of
+    ``max_child_orders_per_second`` across all parents, on top of the
+    client's own rate limiter; a parent over budget is retried when its
+    token is due. Risk rejections are retried on the next slice, except
+    the kill switch, which fails the parent. After ``max_errors`` other
+    errors a parent is cancelled as FAILED.
+
+    Fills are tracked from the child results, and from the user-data
+    stream when ``handle_event`` is registered as a listener (it also
+    takes aggTrade events as market volume). ``price_source(symbol)``
+    gives the reference price; by default the book ticker mid, or mark
+    price, from the manager's state cache (one of the two is required).
+    ``clock`` returns seconds, so a simulated exchange's clock can drive a
+    run deterministically through ``run_due``.
+    """
+
+    def __init__(self, manager: AsyncOrderManager, price_source: Optional[Callable[[str], Optional[Number]]] = None,
+                 clock: Callable[[], float] = time.time, max_child_orders_per_second: float = 10, max_errors: int = 5,
+                 client_id_prefix: Optional[str] = None, metrics: Optional[MetricsRegistry] = None):
+        if price_source is None and manager.state_cache is None:
+            raise ValueError("ExecutionScheduler needs a price_source or a manager with a state cache")
+        self.manager = manager
+        self.price_source = price_source or self._cached_price
+        self.clock = clock
+        self.max_errors = max_errors
+        self.prefix = client_id_prefix if client_id_prefix is not None else f"x{uuid.uuid4().hex[:6]}-"
+        self.metrics = metrics or get_metrics()
+        self.algos: Dict[str, ExecutionAlgo] = {}
+        self._children: Dict[str, Tuple[ExecutionAlgo, ChildOrder]] = {}
+        self._budget = TokenBucket(max_child_orders_per_second, 1.0)
+        self._budget.updated = clock()
+        self._heap: List[Tuple[float, int, ExecutionAlgo]] = []
+        self._wakes: Dict[str, float] = {}
+        self._sequence = itertools.count()
+        self._ids = itertools.count(1)
+        self._child_ids = itertools.count(1)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.metrics.register_gauges('execution', self.stats)
+
+    def stats(self) -> Dict[str, Any]:
+        active = [algo for algo in self.algos.values() if not algo.is_finished]
+        return {
+            'parents': len(self.algos),
+            'active_parents': len(active),
+            'working_children': sum(1 for algo in active if algo.working is not None),
+            'scheduled': len(self._wakes),
+        }
+
+    # --- parents ---------------------------------------------------------
+
+    def submit(self, algo: ExecutionAlgo) -> str:
+        """Start working ``algo`` at its ``start_time`` (or now); returns its ID."""
+        if self.manager.client.symbol_registry.get_filters(algo.symbol) is None:
+            raise ValueError(f"Unknown symbol: {algo.symbol}")
+        algo.id = f"{self.prefix}{next(self._ids)}"
+        self.algos[algo.id] = algo
+        self._schedule(algo, algo.start_time if algo.start_time is not None else self.clock())
+        logger.info(f"Submitted {algo}")
+        return algo.id
+
+    def cancel(self, algo_id: str) -> bool:
+        """Ask for a parent to stop: its working child is cancelled on the next wake-up (right away)."""
+        algo = self.algos.get(algo_id)
+        if algo is None or algo.is_finished:
+            return False
+        algo.cancel_requested = True
+        self._schedule(algo, self.clock())
+        return True
+
+    async def wait(self, algo_id: str) -> ExecutionAlgo:
+        algo = self.algos[algo_id]
+        await algo.done.wait()
+        return algo
+
+    # --- events ----------------------------------------------------------
+
+    def on_trade(self, symbol: str, quantity: Number) -> None:
+        """Count market volume for the participation algorithms of ``symbol``."""
+        quantity = to_decimal(quantity)
+        symbol = symbol.upper()
+        for algo in self.algos.values():
+            if isinstance(algo, VWAPAlgo) and algo.symbol == symbol:
+                algo.on_trade(quantity)
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        """Stream listener: child order updates and aggTrade volume."""
+        kind = event.get('e')
+        if kind == 'aggTrade' or kind == 'trade':
+            self.on_trade(event['s'], event['q'])
+            return
+        if kind != 'ORDER_TRADE_UPDATE':
+            return
+        o = event['o']
+        entry = self._children.get(o['c'])
+        if entry is None:
+            return
+        algo, child = entry
+        if o.get('x') == 'AMENDMENT':
+            child.price, child.quantity = to_decimal(o['p']), to_decimal(o['q'])
+        child.update(to_decimal(o['z']), to_decimal(o['ap']), o['X'], o['i'])
+        if not child.is_open:
+            self._child_closed(algo, child)
+            # Refill (iceberg) or finish without waiting for the next slice
+            self._schedule(algo, self.clock())
+
+    # --- driving ---------------------------------------------------------
+
+    async def run_due(self, now: Optional[float] = None) -> int:
+        """Step every parent whose wake-up is due at ``now``; returns how many were stepped."""
+        now = self.clock() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, algo = heapq.heappop(self._heap)
+            if self._wakes.get(algo.id) == when:
+                del self._wakes[algo.id]
+                due.append(algo)
+        if due:
+            await asyncio.gather(*(self._step(algo, now) for algo in due))
+        return len(due)
+
+    async def run(self) -> None:
+        """Work parents until ``stop`` is called, sleeping until the next wake-up or event."""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        while not self._stopping:
+            await self.run_due()
+            delay = self._heap[0][0] - self.clock() if self._heap else None
+            if delay is not None and delay <= 0:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def close(self) -> None:
+        """Cancel every active parent (and its working child) and stop ``run``."""
+        active = [algo for algo in self.algos.values() if not algo.is_finished]
+        await asyncio.gather(*(self._finish(algo, CANCELED, self.clock(), 'scheduler closed') for algo in active))
+        self.stop()
+
+    def _schedule(self, algo: ExecutionAlgo, when: float) -> None:
+        current = self._wakes.get(algo.id)
+        if current is not None and current <= when:
+            return
+        self._wakes[algo.id] = when
+        heapq.heappush(self._heap, (when, next(self._sequence), algo))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # --- working a parent ------------------------------------------------
+
+    async def _step(self, algo: ExecutionAlgo, now: float) -> None:
+        if algo.is_finished:
+            return
+        if algo.cancel_requested:
+            await self._finish(algo, CANCELED, now, 'cancelled')
+            return
+        if algo.status == PENDING:
+            algo.start(now)
+            logger.info(f"Started {algo}")
+        registry = self.manager.client.symbol_registry
+        if registry.is_stale:
+            await self.manager.client.refresh_symbols()
+        filters = registry.get_filters(algo.symbol)
+        if snap_quantity(filters, algo.remaining, 'LIMIT') <= 0 and (algo.working is None or not algo.working.is_open):
+            await self._finish(algo, FILLED, now)
+            return
+        if algo.end_time is not None and now >= algo.end_time:
+            await self._finish(algo, EXPIRED, now, 'duration elapsed')
+            return
+        wake = algo.next_wake(now)
+        try:
+            delay = await self._work(algo, now, filters)
+        except RiskRejected as e:
+            self.metrics.inc('execution_child_orders_total', symbol=algo.symbol, action='risk_rejected')
+            if e.check == 'kill_switch':
+                await self._finish(algo, FAILED, now, str(e))
+                return
+            logger.info(f"{algo}: child held back by risk check {e.check}")
+        except Exception as e:
+            algo.errors += 1
+            self.metrics.inc('execution_child_orders_total', symbol=algo.symbol, action='error')
+            logger.error(f"{algo} child order failed ({algo.errors}/{self.max_errors}): {e}")
+            if algo.errors >= self.max_errors:
+                await self._finish(algo, FAILED, now, f"too many errors, last: {e}")
+                return
+        else:
+            if delay:
+                wake = min(wake, now + delay)
+        self._schedule(algo, wake)
+
+    async def _work(self, algo: ExecutionAlgo, now: float, filters: SymbolFilters) -> Optional[float]:
+        """Place, amend or cancel the working child; returns a retry delay when over the order budget."""
+        reference = self.price_source(algo.symbol)
+        if reference is None:
+            logger.debug(f"{algo}: no reference price yet")
+            return None
+        reference = to_decimal(reference)
+        if algo.arrival_price is None:
+            algo.arrival_price = reference
+        quantity = algo.child_quantity(now, filters)
+        price = algo.child_price(reference, filters)
+        child = algo.working
+        tradable = quantity > 0 and check_order_filters(filters, algo.side, 'LIMIT', quantity, price) is None
+
+        if child is None:
+            if not tradable:
+                return None
+            delay = self._take_budget(now)
+            if delay:
+                return delay
+            await self._place_child(algo, price, quantity)
+            return None
+
+        if not tradable:
+            # Ahead of schedule (or the shortfall is below the minimum order): stop showing size
+            delay = self._take_budget(now)
+            if delay:
+                return delay
+            await self._cancel_child(algo, child)
+            return None
+        moved = price != child.price and abs(price - child.price) * _BPS >= algo.reprice_bps * child.price
+        if not moved and quantity == child.remaining:
+            return None
+        delay = self._take_budget(now)
+        if delay:
+            return delay
+        if not await self._amend_child(algo, child, price if moved else child.price, child.executed_qty + quantity):
+            # It filled or was cancelled in the meantime: size a fresh child from the updated fills
+            return await self._work(algo, now, filters)
+        return None
+
+    def _take_budget(self, now: float) -> float:
+        delay = self._budget.reserve(1, now)
+        if delay:
+            self._budget.tokens += 1  # Not spent; the parent retries when it is due
+            self.metrics.inc('execution_budget_waits_total')
+        return delay
+
+    async def _place_child(self, algo: ExecutionAlgo, price: Optional[Decimal], quantity: Decimal,
+                           order_type: str = 'LIMIT') -> ChildOrder:
+        child = ChildOrder(f"{algo.id}-{next(self._child_ids)}", price, quantity)
+        # Registered first: a simulated exchange reports fills before the call returns
+        self._children[child.client_order_id] = (algo, child)
+        order = Order.create(algo.symbol, algo.side, order_type, quantity, price, client_order_id=child.client_order_id,
+                             time_in_force='GTC' if order_type == 'LIMIT' else None)
+        try:
+            result = await self.manager.place_order(order)
+        except Exception:
+            self._children.pop(child.client_order_id, None)
+            raise
+        if not result.ok:
+            self._children.pop(child.client_order_id, None)
+            raise ValueError(f"Child order rejected: {result.error_msg}")
+        self.metrics.inc('execution_child_orders_total', symbol=algo.symbol, action='place')
+        algo.children.append(child)
+        if order_type == 'LIMIT':
+            algo.working = child
+        child.apply_result(result)
+        if not child.is_open:
+            self._child_closed(algo, child)
+        return child
+
+    async def _amend_child(self, algo: ExecutionAlgo, child: ChildOrder, price: Decimal, quantity: Decimal) -> bool:
+        """Amend the working child; returns False if it turned out to be closed already."""
+        try:
+            result = await self.manager.modify_order(client_order_id=child.client_order_id, price=price, quantity=quantity)
+        except RiskRejected:
+            raise
+        except Exception as e:
+            if await self._refresh_child(algo, child):
+                raise
+            logger.info(f"{algo}: child {child.client_order_id} closed before it could be amended ({e})")
+            return False
+        self.metrics.inc('execution_child_orders_total', symbol=algo.symbol, action='amend')
+        child.price, child.quantity = price, quantity
+        child.apply_result(result)
+        if not child.is_open:
+            self._child_closed(algo, child)
+        return True
+
+    async def _cancel_child(self, algo: ExecutionAlgo, child: ChildOrder) -> None:
+        try:
+            result = await self.manager.cancel_order(algo.symbol, client_order_id=child.client_order_id)
+        except Exception as e:
+            if await self._refresh_child(algo, child):
+                raise
+            logger.info(f"{algo}: child {child.client_order_id} closed before it could be cancelled ({e})")
+            return
+        self.metrics.inc('execution_child_orders_total', symbol=algo.symbol, action='cancel')
+        child.apply_result(result)
+        if child.is_open:
+            child.status = 'CANCELED'
+        self._child_closed(algo, child)
+
+    async def _refresh_child(self, algo: ExecutionAlgo, child: ChildOrder) -> bool:
+        """Bring ``child`` up to date from the exchange; returns whether it is still open."""
+        try:
+            result = await self.manager.client.query_order(algo.symbol, orig_client_order_id=child.client_order_id)
+        except Exception as e:
+            if error_code(e) not in (ORDER_DOES_NOT_EXIST, UNKNOWN_ORDER):
+                raise
+            child.status = 'EXPIRED'
+        else:
+            child.apply_result(result)
+        if child.is_open:
+            return True
+        self._child_closed(algo, child)
+        self.manager.open_orders.remove(client_order_id=child.client_order_id)
+        return False
+
+    def _child_closed(self, algo: ExecutionAlgo, child: ChildOrder) -> None:
+        if algo.working is child:
+            algo.working = None
+        self._children.pop(child.client_order_id, None)
+
+    async def _finish(self, algo: ExecutionAlgo, status: str, now: float, reason: Optional[str] = None) -> None:
+        if algo.is_finished:
+            return
+        child = algo.working
+        if child is not None:
+            try:
+                await self._cancel_child(algo, child)
+            except Exception as e:
+                logger.error(f"{algo}: could not cancel child {child.client_order_id}: {e}")
+        filters = self.manager.client.symbol_registry.get_filters(algo.symbol)
+        rest = snap_quantity(filters, algo.remaining, 'MARKET')
+        if status == EXPIRED and algo.finish_with_market and algo.working is None and rest > 0 \
+                and check_order_filters(filters, algo.side, 'MARKET', rest) is None:
+            try:
+                await self._place_child(algo, None, rest, 'MARKET')
+            except Exception as e:
+                logger.error(f"{algo}: final MARKET order failed: {e}")
+                reason = f"final MARKET order failed: {e}"
+        if snap_quantity(filters, algo.remaining, 'LIMIT') <= 0:
+            status = FILLED
+        algo.status = status
+        algo.reason = reason
+        algo.finish_time = now
+        self._wakes.pop(algo.id, None)
+        algo.done.set()
+        self.metrics.inc('execution_parents_total', kind=algo.kind, status=status)
+        slippage = algo.slippage_bps
+        logger.info(f"Finished {algo}: avg price {algo.avg_price}, "
+                    f"slippage {f'{slippage:.2f} bps' if slippage is not None else 'n/a'}" + (f" ({reason})" if reason else ""))
+
+    def _cached_price(self, symbol: str) -> Optional[Decimal]:
+        cache = self.manager.state_cache
+        ticker = cache.get_book_ticker(symbol)
+        if ticker is not None:
+            return (ticker.bid_price + ticker.ask_price) / 2
+        return cache.get_mark_price(symbol)
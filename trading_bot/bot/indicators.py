@@ -0,0 +1,409 @@
+import math
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Sequence, Tuple
+import numpy as np
+from .models import Number, Order, to_decimal
+
+# Every indicator comes in two forms that return bit-identical float64
+# values: a batch function over whole arrays for backtests, and a class
+# with an O(1) ``update`` for live ticks. Values before the indicator is
+# warmed up are NaN.
+#
+# Windowed statistics use running sums of deltas from a reference value,
+# computed as np.cumsum in batch and as a running total incrementally; both
+# add the same floats in the same order. So that the totals stay small on
+# an unbounded stream, both forms rebase every ``_REBASE_INTERVAL`` values
+# (or ``period``, if longer): the value at index ``r`` becomes the
+# reference and the totals restart from the ``period - 1`` values before
+# it. The recursive
+# indicators (EMA, RSI, ATR) have no exact vectorized form, so their batch
+# functions run the incremental update over the array.
+
+_NAN = math.nan
+_REBASE_INTERVAL = 1024
+
+
+def _as_array(values: Sequence[float]) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _window_sums(deltas: np.ndarray, period: int) -> np.ndarray:
+    """Sum of each trailing ``period`` window, as the difference of cumulative sums."""
+    cumulative = np.cumsum(deltas)
+    previous = np.concatenate(([0.0], cumulative[:-period]))
+    return cumulative[period - 1:] - previous
+
+
+def _rebase_interval(period: int) -> int:
+    return max(_REBASE_INTERVAL, period)
+
+
+def _rolling_mean_std(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    mean = np.full(len(values), _NAN)
+    std = np.full(len(values), _NAN)
+    interval = _rebase_interval(period)
+    # One block per reference; the windows ending in [start, end) use values[start]
+    for start in range(0, len(values), interval):
+        end = min(start + interval, len(values))
+        first = max(start - period + 1, 0)
+        if end - first < period:
+            break
+        reference = values[start]
+        deltas = values[first:end] - reference
+        mean_delta = _window_sums(deltas, period) / period
+        variance = _window_sums(deltas * deltas, period) / period - mean_delta * mean_delta
+        begin = first + period - 1
+        mean[begin:end] = mean_delta + reference
+        std[begin:end] = np.sqrt(np.maximum(variance, 0.0))
+    return mean, std
+
+
+class _RollingSums:
+    """Running sums of deltas and squared deltas, with a ring of past totals for an O(1) window difference.
+
+    Every ``_rebase_interval(period)`` values the reference moves to the
+    newest value and the totals are rebuilt from the last ``period - 1``
+    values, exactly as ``_rolling_mean_std`` does per block.
+    """
+
+    __slots__ = ('period', 'interval', 'reference', 'total', 'total_sq', 'ring', 'ring_sq', 'values', 'count')
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("Period must be at least 1")
+        self.period = period
+        self.interval = _rebase_interval(period)
+        self.reference: Optional[float] = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        # ring[i % period] holds the totals after value i was added
+        self.ring = [0.0] * period
+        self.ring_sq = [0.0] * period
+        # values[i % period] holds value i, for rebasing
+        self.values = [0.0] * period
+        self.count = 0
+
+    def _rebase(self, reference: float) -> None:
+        """Make ``reference`` the reference and recompute the totals of the last ``period - 1`` values."""
+        period, count = self.period, self.count
+        self.reference = reference
+        self.total = self.total_sq = 0.0
+        # The slot of value count - period starts the window difference from zero
+        self.ring[count % period] = self.ring_sq[count % period] = 0.0
+        for index in range(max(count - period + 1, 0), count):
+            delta = self.values[index % period] - reference
+            self.total += delta
+            self.total_sq += delta * delta
+            self.ring[index % period], self.ring_sq[index % period] = self.total, self.total_sq
+
+    def push(self, value: float) -> Tuple[float, float]:
+        """Add a value; return (window sum, window sum of squares) of deltas, or NaNs until warm."""
+        if self.count % self.interval == 0:
+            self._rebase(value)
+        self.values[self.count % self.period] = value
+        delta = value - self.reference
+        self.total += delta
+        self.total_sq += delta * delta
+        slot = self.count % self.period
+        old, old_sq = self.ring[slot], self.ring_sq[slot]
+        self.ring[slot], self.ring_sq[slot] = self.total, self.total_sq
+        self.count += 1
+        if self.count < self.period:
+            return _NAN, _NAN
+        return self.total - old, self.total_sq - old_sq
+
+
+# --- SMA -----------------------------------------------------------------
+
+def sma(values: Sequence[float], period: int) -> np.ndarray:
+    """Simple moving average."""
+    return _rolling_mean_std(_as_array(values), period)[0]
+
+
+class SMA:
+    __slots__ = ('_sums', 'value')
+
+    def __init__(self, period: int):
+        self._sums = _RollingSums(period)
+        self.value = _NAN
+
+    def update(self, value: float) -> float:
+        window_sum, _ = self._sums.push(value)
+        if window_sum == window_sum:
+            self.value = window_sum / self._sums.period + self._sums.reference
+        return self.value
+
+
+# --- rolling std: Bollinger bands and z-score ----------------------------
+
+def _finish_std(sums: _RollingSums, window_sum: float, window_sum_sq: float) -> Tuple[float, float]:
+    period = sums.period
+    mean_delta = window_sum / period
+    variance = window_sum_sq / period - mean_delta * mean_delta
+    return mean_delta + sums.reference, math.sqrt(variance if variance > 0.0 else 0.0)
+
+
+def bollinger(values: Sequence[float], period: int = 20, width: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger bands (middle, upper, lower) with a population standard deviation."""
+    mean, std = _rolling_mean_std(_as_array(values), period)
+    return mean, mean + width * std, mean - width * std
+
+
+class Bollinger:
+    __slots__ = ('_sums', 'width', 'middle', 'upper', 'lower')
+
+    def __init__(self, period: int = 20, width: float = 2.0):
+        self._sums = _RollingSums(period)
+        self.width = width
+        self.middle = self.upper = self.lower = _NAN
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        window_sum, window_sum_sq = self._sums.push(value)
+        if window_sum == window_sum:
+            mean, std = _finish_std(self._sums, window_sum, window_sum_sq)
+            self.middle, self.upper, self.lower = mean, mean + self.width * std, mean - self.width * std
+        return self.middle, self.upper, self.lower
+
+
+def zscore(values: Sequence[float], period: int = 20) -> np.ndarray:
+    """Rolling z-score of each value against its trailing window; NaN where the window is flat."""
+    array = _as_array(values)
+    mean, std = _rolling_mean_std(array, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (array - mean) / std
+    scores[std == 0.0] = _NAN
+    return scores
+
+
+class ZScore:
+    __slots__ = ('_sums', 'value')
+
+    def __init__(self, period: int = 20):
+        self._sums = _RollingSums(period)
+        self.value = _NAN
+
+    def update(self, value: float) -> float:
+        window_sum, window_sum_sq = self._sums.push(value)
+        if window_sum == window_sum:
+            mean, std = _finish_std(self._sums, window_sum, window_sum_sq)
+            self.value = (value - mean) / std if std != 0.0 else _NAN
+        return self.value
+
+
+# --- VWAP ------------------------------------------------------------------
+
+def vwap(prices: Sequence[float], volumes: Sequence[float]) -> np.ndarray:
+    """Cumulative (anchored) volume-weighted average price; NaN until volume is traded."""
+    prices, volumes = _as_array(prices), _as_array(volumes)
+    cumulative_volume = np.cumsum(volumes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.cumsum(prices * volumes) / cumulative_volume
+    result[cumulative_volume == 0.0] = _NAN
+    return result
+
+
+class VWAP:
+    """Anchored VWAP; start a new instance (or call ``reset``) at each session boundary."""
+
+    __slots__ = ('notional', 'volume', 'value')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.notional = 0.0
+        self.volume = 0.0
+        self.value = _NAN
+
+    def update(self, price: float, volume: float) -> float:
+        self.notional += price * volume
+        self.volume += volume
+        self.value = self.notional / self.volume if self.volume != 0.0 else _NAN
+        return self.value
+
+
+# --- EMA -------------------------------------------------------------------
+
+class EMA:
+    """Exponential moving average seeded with the SMA of the first ``period`` values."""
+
+    __slots__ = ('period', 'alpha', 'value', '_seed_sum', '_count')
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("Period must be at least 1")
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = _NAN
+        self._seed_sum = 0.0
+        self._count = 0
+
+    def update(self, value: float) -> float:
+        self._count += 1
+        if self._count > self.period:
+            self.value += self.alpha * (value - self.value)
+        else:
+            self._seed_sum += value
+            if self._count == self.period:
+                self.value = self._seed_sum / self.period
+        return self.value
+
+
+def ema(values: Sequence[float], period: int) -> np.ndarray:
+    return _run(EMA(period).update, values)
+
+
+# --- RSI -------------------------------------------------------------------
+
+class RSI:
+    """Wilder's relative strength index; the first value is produced after ``period`` price changes."""
+
+    __slots__ = ('period', 'value', '_previous', '_avg_gain', '_avg_loss', '_count')
+
+    def __init__(self, period: int = 14):
+        if period < 1:
+            raise ValueError("Period must be at least 1")
+        self.period = period
+        self.value = _NAN
+        self._previous: Optional[float] = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._count = 0
+
+    def update(self, value: float) -> float:
+        previous, self._previous = self._previous, value
+        if previous is None:
+            return self.value
+        change = value - previous
+        gain = change if change > 0.0 else 0.0
+        loss = -change if change < 0.0 else 0.0
+        self._count += 1
+        period = self.period
+        if self._count > period:
+            self._avg_gain = (self._avg_gain * (period - 1) + gain) / period
+            self._avg_loss = (self._avg_loss * (period - 1) + loss) / period
+        else:
+            self._avg_gain += gain
+            self._avg_loss += loss
+            if self._count < period:
+                return self.value
+            self._avg_gain /= period
+            self._avg_loss /= period
+        if self._avg_loss == 0.0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+        return self.value
+
+
+def rsi(values: Sequence[float], period: int = 14) -> np.ndarray:
+    return _run(RSI(period).update, values)
+
+
+# --- ATR -------------------------------------------------------------------
+
+class ATR:
+    """Wilder's average true range over (high, low, close) bars."""
+
+    __slots__ = ('period', 'value', '_previous_close', '_seed', '_count')
+
+    def __init__(self, period: int = 14):
+        if period < 1:
+            raise ValueError("Period must be at least 1")
+        self.period = period
+        self.value = _NAN
+        self._previous_close: Optional[float] = None
+        self._seed = 0.0
+        self._count = 0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if self._previous_close is not None:
+            true_range = max(true_range, abs(high - self._previous_close), abs(low - self._previous_close))
+        self._previous_close = close
+        self._count += 1
+        period = self.period
+        if self._count > period:
+            self.value = (self.value * (period - 1) + true_range) / period
+        else:
+            self._seed += true_range
+            if self._count == period:
+                self.value = self._seed / period
+        return self.value
+
+
+def atr(highs: Sequence[float], lows: Sequence[float], closes: Sequence[float], period: int = 14) -> np.ndarray:
+    update = ATR(period).update
+    return np.array([update(h, l, c) for h, l, c in zip(_as_array(highs).tolist(), _as_array(lows).tolist(),
+                                                        _as_array(closes).tolist())], dtype=np.float64)
+
+
+def _run(update: Callable[[float], float], values: Sequence[float]) -> np.ndarray:
+    return np.array([update(value) for value in _as_array(values).tolist()], dtype=np.float64)
+
+
+# --- signals ---------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class Signal:
+    """A trade suggestion from a strategy, turned into an Order by ``OrderManager.place_signal``."""
+
+    symbol: str
+    side: str
+    reason: str
+    price: Optional[Decimal] = None
+    time: Optional[int] = None
+
+    def to_order(self, quantity: Number, order_type: str = 'MARKET', price: Optional[Number] = None,
+                 reduce_only: bool = False) -> Order:
+        if price is None and order_type.upper() == 'LIMIT':
+            price = self.price
+        return Order.create(self.symbol, self.side, order_type, quantity, price, reduce_only=reduce_only)
+
+
+def crossover_signals(values: Sequence[float], fast: int = 12, slow: int = 26) -> np.ndarray:
+    """+1 where the fast EMA crosses above the slow EMA, -1 where it crosses below, else 0."""
+    slow_ema = ema(values, slow)
+    above = ema(values, fast) > slow_ema
+    warm = ~np.isnan(slow_ema)
+    signals = np.zeros(len(above), dtype=np.int8)
+    changed = np.flatnonzero(warm[1:] & warm[:-1] & (above[1:] != above[:-1])) + 1
+    signals[changed] = np.where(above[changed], 1, -1)
+    return signals
+
+
+class EMACrossover:
+    """Incremental counterpart of ``crossover_signals`` for one symbol."""
+
+    __slots__ = ('symbol', 'fast', 'slow', '_above')
+
+    def __init__(self, symbol: str, fast: int = 12, slow: int = 26):
+        self.symbol = symbol.upper()
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self._above: Optional[bool] = None
+
+    def update(self, price: float, time: Optional[int] = None) -> Optional[Signal]:
+        fast, slow = self.fast.update(price), self.slow.update(price)
+        if slow != slow:
+            return None
+        above, previous = fast > slow, self._above
+        self._above = above
+        if previous is None or above == previous:
+            return None
+        return Signal(self.symbol, 'BUY' if above else 'SELL', 'ema_crossover', to_decimal(price), time)
+
+
+class SignalEngine:
+    """Routes ticks to one strategy instance per symbol, created on first sight by ``factory(symbol)``."""
+
+    def __init__(self, factory: Callable[[str], EMACrossover]):
+        self.factory = factory
+        self.strategies: Dict[str, EMACrossover] = {}
+
+    def on_price(self, symbol: str, price: float, time: Optional[int] = None) -> Optional[Signal]:
+        strategy = self.strategies.get(symbol)
+        if strategy is None:
+            strategy = self.strategies[symbol] = self.factory(symbol)
+        return strategy.update(price, time)
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from .models import Order, OrderResult, format_decimal
+
+logger = logging.getLogger(__name__)
+
+# Binance error code for a query/cancel of an order the exchange has never seen
+ORDER_DOES_NOT_EXIST = -2013
+# Binance rejects a new order whose client order ID belongs to an open order
+DUPLICATE_CLIENT_ORDER_ID = -4116
+
+# newClientOrderId must match ^[.A-Z:/a-z0-9_-]{1,36}$
+MAX_CLIENT_ORDER_ID_LENGTH = 36
+
+
+def error_code(error: Exception) -> Optional[int]:
+    """Binance error code carried by a client exception, if any."""
+    error_data = getattr(error, 'error_data', None)
+    if error_data is None:
+        response = getattr(error, 'response', None)
+        if response is not None:
+            try:
+                error_data = response.json()
+            except ValueError:
+                return None
+    return error_data.get('code') if isinstance(error_data, dict) else None
+
+
+def is_ambiguous(error: Exception) -> bool:
+    """Whether a failed order request may still have reached the exchange.
+
+    True for timeouts, connection errors and 5xx responses; a 4xx response
+    or a local rejection means the order was definitely not placed.
+    """
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) if response is not None else getattr(error, 'status', None)
+    if status is not None:
+        return status >= 500
+    return isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+class OrderJournal:
+    """Append-only write-ahead log of order intents and their outcomes.
+
+    Every order gets a client order ID derived from the journal (its ID and
+    a sequence number) and an ``intent`` record that is fsynced before the
+    order is sent. The exchange's answer is appended as a ``result``; a
+    request whose outcome is unknown (timeout, 5xx) gets an ``unknown``
+    record and stays unresolved until ``OrderManager.reconcile_journal`` queries the
+    exchange for it. Records are JSON lines, so the file doubles as an
+    audit trail.
+
+    Writes are group-committed: callers that need durability at the same
+    time share one fsync. Outcome records are not waited for; they are
+    made durable by the next fsync, or at most ``sync_interval`` seconds
+    later, and a result lost in a crash is recovered by reconciliation.
+    """
+
+    def __init__(self, path: str = 'journal/orders.wal', prefix: str = 'tb', sync_interval: float = 1.0):
+        self.path = path
+        self.prefix = prefix
+        self.sync_interval = sync_interval
+        self.journal_id: Optional[str] = None
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self._sequence = 0
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._synced_cond = threading.Condition(self._lock)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        valid_bytes = self._replay() if os.path.exists(path) else 0
+        self._file = open(path, 'a+b')
+        if self._file.tell() > valid_bytes:
+            logger.warning(f"Order journal {path}: discarding torn record at offset {valid_bytes}")
+            self._file.truncate(valid_bytes)
+            self._file.seek(valid_bytes)
+        if self.journal_id is None:
+            self.journal_id = secrets.token_hex(4)
+            self._append({'type': 'open', 'journal': self.journal_id}, durable=True)
+        if self.pending:
+            logger.warning(f"Order journal {path}: {len(self.pending)} orders with unknown outcome")
+
+    # --- recovery --------------------------------------------------------
+
+    def _replay(self) -> int:
+        """Rebuild state from the file; returns the length of its intact prefix."""
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+                self._apply(record)
+        return valid_bytes
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        record_type = record.get('type')
+        if record_type == 'open':
+            self.journal_id = record['journal']
+        elif record_type == 'intent':
+            self.pending[record['client_order_id']] = record
+            self._sequence = max(self._sequence, record['seq'])
+        elif record_type == 'result':
+            self.pending.pop(record['client_order_id'], None)
+
+    # --- writing ---------------------------------------------------------
+
+    def _append(self, record: Dict[str, Any], durable: bool = False) -> None:
+        record['ts'] = int(time.time() * 1000)
+        line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self._lock:
+            self._file.write(line)
+            self._written += 1
+            self._apply(record)
+            target = self._written
+            if not durable and time.monotonic() - self._last_sync < self.sync_interval:
+                return
+            while self._synced < target:
+                if self._syncing:
+                    self._synced_cond.wait()
+                    continue
+                # Become the leader: sync everything written so far on behalf of all waiters
+                self._syncing = True
+                batch_end = self._written
+                self._file.flush()
+                self._lock.release()
+                try:
+                    os.fsync(self._file.fileno())
+                finally:
+                    self._lock.acquire()
+                    self._syncing = False
+                    self._synced_cond.notify_all()
+                self._synced = batch_end
+                self._last_sync = time.monotonic()
+
+    def next_client_order_id(self) -> str:
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        return f"{self.prefix}{self.journal_id}-{sequence}"[:MAX_CLIENT_ORDER_ID_LENGTH]
+
+    def assign_client_order_id(self, order: Order) -> Order:
+        """Give ``order`` a journal client order ID unless it already has one."""
+        if order.client_order_id is not None:
+            return order
+        return order.with_values(client_order_id=self.next_client_order_id())
+
+    def record_intent(self, order: Order) -> None:
+        """Durably record that ``order`` is about to be sent."""
+        self.record_intents([order])
+
+    def record_intents(self, orders: Iterable[Order]) -> None:
+        """Record several intents with a single fsync."""
+        orders = list(orders)
+        for index, order in enumerate(orders):
+            if order.client_order_id is None:
+                raise ValueError("Journaled orders need a client order ID")
+            sequence = self._sequence_of(order.client_order_id)
+            self._append({'type': 'intent', 'client_order_id': order.client_order_id, 'seq': sequence,
+                          'order': order.to_params()}, durable=index == len(orders) - 1)
+
+    def _sequence_of(self, client_order_id: str) -> int:
+        head, _, tail = client_order_id.rpartition('-')
+        if head == f"{self.prefix}{self.journal_id}" and tail.isdigit():
+            return int(tail)
+        return 0
+
+    def record_result(self, client_order_id: str, result: OrderResult, reconciled: bool = False) -> None:
+        """Record the exchange's answer; a failure without an exchange error code is treated as unknown."""
+        if not result.ok and result.error_code is None:
+            self.record_unknown(client_order_id, result.error_msg)
+            return
+        record = {'type': 'result', 'client_order_id': client_order_id, 'status': result.status,
+                  'order_id': result.order_id, 'executed_qty': format_decimal(result.executed_qty),
+                  'error_code': result.error_code, 'error_msg': result.error_msg}
+        if reconciled:
+            record['reconciled'] = True
+        self._append(record)
+
+    def record_unknown(self, client_order_id: str, reason: Any) -> None:
+        """Record that the order's fate is unknown; it stays pending until reconciled."""
+        self._append({'type': 'unknown', 'client_order_id': client_order_id, 'reason': str(reason)})
+
+    def unresolved(self) -> List[Dict[str, Any]]:
+        """Intent records that have no outcome yet, oldest first."""
+        with self._lock:
+            return sorted(self.pending.values(), key=lambda record: record['seq'])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self) -> 'OrderJournal':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def not_found_result(client_order_id: str, symbol: str) -> OrderResult:
+    """Outcome recorded for a journaled order the exchange never received."""
+    return OrderResult(client_order_id=client_order_id, symbol=symbol, status='NOT_FOUND',
+                       error_code=ORDER_DOES_NOT_EXIST, error_msg='Order does not exist on the exchange')
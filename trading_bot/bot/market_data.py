@@ -0,0 +1,268 @@
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from .client import BinanceFuturesClient
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 86_400_000
+HOUR_MS = 3_600_000
+
+KLINE_PAGE_LIMIT = 1000
+AGG_TRADE_PAGE_LIMIT = 1000
+
+# Column name and dtype, in the order of the /fapi/v1/klines row arrays
+KLINE_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('open_time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'), ('volume', 'f8'),
+    ('close_time', 'i8'), ('quote_volume', 'f8'), ('trades', 'i8'), ('taker_buy_volume', 'f8'),
+    ('taker_buy_quote_volume', 'f8'),
+)
+
+# Column name, /fapi/v1/aggTrades key and dtype
+AGG_TRADE_COLUMNS: Tuple[Tuple[str, str, str], ...] = (
+    ('agg_id', 'a', 'i8'), ('price', 'p', 'f8'), ('qty', 'q', 'f8'), ('first_id', 'f', 'i8'),
+    ('last_id', 'l', 'i8'), ('time', 'T', 'i8'), ('is_buyer_maker', 'm', '?'),
+)
+
+_INTERVAL_UNITS_MS = {'m': 60_000, 'h': HOUR_MS, 'd': DAY_MS, 'w': 7 * DAY_MS}
+
+Columns = Dict[str, np.ndarray]
+TimeLike = Union[int, float, str, date, datetime]
+
+
+def to_ms(value: TimeLike) -> int:
+    """Milliseconds since the epoch from ms, a datetime/date (UTC if naive) or an ISO date string."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def interval_ms(interval: str) -> int:
+    """Length of a kline interval such as '1m', '4h' or '1d'."""
+    if interval.endswith('M'):
+        raise ValueError("Monthly klines are not supported by the day-partitioned store")
+    try:
+        return int(interval[:-1]) * _INTERVAL_UNITS_MS[interval[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Invalid kline interval: {interval}")
+
+
+def day_start(ms: int) -> int:
+    return ms - ms % DAY_MS
+
+
+def day_name(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime('%Y-%m-%d')
+
+
+def kline_columns(rows: List[List[Any]]) -> Columns:
+    """Convert /fapi/v1/klines rows to typed column arrays."""
+    table = np.array([row[:len(KLINE_COLUMNS)] for row in rows], dtype=object).reshape(-1, len(KLINE_COLUMNS))
+    return {name: table[:, i].astype(dtype) for i, (name, dtype) in enumerate(KLINE_COLUMNS)}
+
+
+def agg_trade_columns(trades: List[Dict[str, Any]]) -> Columns:
+    """Convert /fapi/v1/aggTrades entries to typed column arrays."""
+    return {name: np.array([trade[key] for trade in trades], dtype=object).astype(dtype) for name, key, dtype in AGG_TRADE_COLUMNS}
+
+
+def concat_columns(parts: List[Columns], names: List[str]) -> Columns:
+    return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+
+class MarketDataStore:
+    """Columnar on-disk store of klines and aggregate trades.
+
+    Layout: ``<root>/<dataset>/<SYMBOL>/<YYYY-MM-DD>/<column>.npy`` where the
+    dataset is ``klines_<interval>`` or ``aggTrades``. Each day is written to
+    a temporary directory and renamed into place, so a partition is either
+    absent or whole; a ``_complete`` marker records that the day had ended
+    when it was downloaded. Reads memory-map the column files, so queries
+    within one day are views on the page cache with no copying or parsing.
+    """
+
+    def __init__(self, root: str = 'data'):
+        self.root = root
+
+    def partition_path(self, dataset: str, symbol: str, day_ms: int) -> str:
+        return os.path.join(self.root, dataset, symbol.upper(), day_name(day_ms))
+
+    def is_complete(self, dataset: str, symbol: str, day_ms: int) -> bool:
+        return os.path.exists(os.path.join(self.partition_path(dataset, symbol, day_ms), '_complete'))
+
+    def write_day(self, dataset: str, symbol: str, day_ms: int, columns: Columns, complete: bool) -> None:
+        """Atomically replace one day's partition."""
+        path = self.partition_path(dataset, symbol, day_ms)
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, values in columns.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+        if complete:
+            open(os.path.join(tmp_path, '_complete'), 'w').close()
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    def read_day(self, dataset: str, symbol: str, day_ms: int) -> Optional[Columns]:
+        """Memory-mapped columns of one day, or None if it has not been downloaded."""
+        path = self.partition_path(dataset, symbol, day_ms)
+        if not os.path.isdir(path):
+            return None
+        return {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r')
+                for name in os.listdir(path) if name.endswith('.npy')}
+
+    def iter_days(self, dataset: str, symbol: str, start: TimeLike, end: TimeLike, time_column: str) -> Iterator[Columns]:
+        """Yield zero-copy column views per day, trimmed to ``start <= time < end``."""
+        start_ms, end_ms = to_ms(start), to_ms(end)
+        for day_ms in range(day_start(start_ms), end_ms, DAY_MS):
+            columns = self.read_day(dataset, symbol, day_ms)
+            if columns is None or not len(columns[time_column]):
+                continue
+            times = columns[time_column]
+            lo, hi = np.searchsorted(times, [start_ms, end_ms], side='left')
+            if hi > lo:
+                yield {name: values[lo:hi] for name, values in columns.items()}
+
+    def query(self, dataset: str, symbol: str, start: TimeLike, end: TimeLike, time_column: str) -> Columns:
+        """Columns for ``start <= time < end``; views into the mmap when the range lies within one day."""
+        parts = list(self.iter_days(dataset, symbol, start, end, time_column))
+        if len(parts) == 1:
+            return parts[0]
+        names = [name for name, _, _ in AGG_TRADE_COLUMNS] if dataset == 'aggTrades' else [name for name, _ in KLINE_COLUMNS]
+        if not parts:
+            dtypes = {name: dtype for name, *_, dtype in (AGG_TRADE_COLUMNS if dataset == 'aggTrades' else KLINE_COLUMNS)}
+            return {name: np.empty(0, dtype=dtypes[name]) for name in names}
+        return concat_columns(parts, names)
+
+    def klines(self, symbol: str, interval: str, start: TimeLike, end: TimeLike) -> Columns:
+        """Klines with ``start <= open_time < end``."""
+        return self.query(f"klines_{interval}", symbol, start, end, 'open_time')
+
+    def agg_trades(self, symbol: str, start: TimeLike, end: TimeLike) -> Columns:
+        """Aggregate trades with ``start <= time < end``."""
+        return self.query('aggTrades', symbol, start, end, 'time')
+
+
+class HistoricalDataDownloader:
+    """Downloads kline and aggregate-trade history into a MarketDataStore.
+
+    Days are fetched concurrently (each day's pages in order) through the
+    client's shared rate limiter, so throughput adapts to the request-weight
+    budget. Days already complete on disk are skipped. Aggregate trades,
+    which can run to thousands of pages per day, are checkpointed every
+    ``checkpoint_pages`` pages and an interrupted day resumes from its last
+    checkpoint.
+    """
+
+    def __init__(self, client: BinanceFuturesClient, store: MarketDataStore, max_workers: int = 4,
+                 checkpoint_pages: int = 50):
+        self.client = client
+        self.store = store
+        self.max_workers = max_workers
+        self.checkpoint_pages = checkpoint_pages
+
+    def _run_days(self, start: TimeLike, end: TimeLike, dataset: str, symbol: str, fetch_day) -> int:
+        start_ms, end_ms = to_ms(start), to_ms(end)
+        days = [day for day in range(day_start(start_ms), end_ms, DAY_MS) if not self.store.is_complete(dataset, symbol, day)]
+        if not days:
+            return 0
+        logger.info(f"Downloading {dataset} for {symbol}: {len(days)} day(s)")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(days))) as executor:
+            return sum(executor.map(fetch_day, days))
+
+    def download_klines(self, symbol: str, interval: str, start: TimeLike, end: TimeLike) -> int:
+        """Fetch klines for every day overlapping ``[start, end)``; returns the number of rows written."""
+        symbol = symbol.upper()
+        step = interval_ms(interval)
+        dataset = f"klines_{interval}"
+
+        def fetch_day(day_ms: int) -> int:
+            rows: List[List[Any]] = []
+            cursor, day_end = day_ms, day_ms + DAY_MS
+            while cursor < day_end:
+                page = self.client.get_klines(symbol, interval, start_time=cursor, end_time=day_end - 1, limit=KLINE_PAGE_LIMIT)
+                if not page:
+                    break
+                rows.extend(page)
+                cursor = page[-1][0] + step
+                if len(page) < KLINE_PAGE_LIMIT:
+                    break
+            complete = day_end <= time.time() * 1000
+            self.store.write_day(dataset, symbol, day_ms, kline_columns(rows), complete)
+            return len(rows)
+
+        return self._run_days(start, end, dataset, symbol, fetch_day)
+
+    def download_agg_trades(self, symbol: str, start: TimeLike, end: TimeLike) -> int:
+        """Fetch aggregate trades for every day overlapping ``[start, end)``; returns the number of trades written."""
+        symbol = symbol.upper()
+        return self._run_days(start, end, 'aggTrades', symbol, lambda day_ms: self._fetch_agg_trade_day(symbol, day_ms))
+
+    def _first_agg_trades(self, symbol: str, day_ms: int) -> List[Dict[str, Any]]:
+        # Time windows are limited to one hour; walk them until the day's first trade
+        for window in range(day_ms, day_ms + DAY_MS, HOUR_MS):
+            trades = self.client.get_agg_trades(symbol, start_time=window, end_time=window + HOUR_MS - 1,
+                                                limit=AGG_TRADE_PAGE_LIMIT)
+            if trades:
+                return trades
+            if window + HOUR_MS > time.time() * 1000:
+                break
+        return []
+
+    def _fetch_agg_trade_day(self, symbol: str, day_ms: int) -> int:
+        day_end = day_ms + DAY_MS
+        names = [name for name, _, _ in AGG_TRADE_COLUMNS]
+        checkpoint_dir = f"{self.store.partition_path('aggTrades', symbol, day_ms)}.partial"
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        parts: List[Columns] = []
+        for name in sorted(n for n in os.listdir(checkpoint_dir) if n.endswith('.npz') and not n.endswith('.tmp.npz')):
+            with np.load(os.path.join(checkpoint_dir, name)) as saved:
+                parts.append({column: saved[column] for column in names})
+        if parts:
+            logger.info(f"Resuming aggTrades {symbol} {day_name(day_ms)} from {sum(len(p['agg_id']) for p in parts)} trades")
+            next_id: Optional[int] = int(parts[-1]['agg_id'][-1]) + 1
+            page = self.client.get_agg_trades(symbol, from_id=next_id, limit=AGG_TRADE_PAGE_LIMIT)
+        else:
+            page = self._first_agg_trades(symbol, day_ms)
+
+        pending: List[Dict[str, Any]] = []
+        pages = 0
+        finished = False
+        while page:
+            in_day = [trade for trade in page if trade['T'] < day_end]
+            pending.extend(in_day)
+            pages += 1
+            if len(in_day) < len(page) or len(page) < AGG_TRADE_PAGE_LIMIT:
+                finished = len(in_day) < len(page)
+                break
+            if pages % self.checkpoint_pages == 0:
+                self._checkpoint(checkpoint_dir, len(parts), pending)
+                parts.append(agg_trade_columns(pending))
+                pending = []
+            page = self.client.get_agg_trades(symbol, from_id=page[-1]['a'] + 1, limit=AGG_TRADE_PAGE_LIMIT)
+
+        if pending:
+            parts.append(agg_trade_columns(pending))
+        columns = concat_columns(parts, names) if parts else agg_trade_columns([])
+        complete = finished or day_end <= time.time() * 1000 - 60_000
+        self.store.write_day('aggTrades', symbol, day_ms, columns, complete)
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        return len(columns['agg_id'])
+
+    @staticmethod
+    def _checkpoint(checkpoint_dir: str, index: int, trades: List[Dict[str, Any]]) -> None:
+        tmp_path = os.path.join(checkpoint_dir, f"part-{index:05d}.tmp.npz")
+        np.savez(tmp_path, **agg_trade_columns(trades))
+        os.replace(tmp_path, os.path.join(checkpoint_dir, f"part-{index:05d}.npz"))
@@ -0,0 +1,247 @@
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# 2**5 sub-buckets per power of two keeps every recorded value within ~3% of the truth
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_LINEAR_LIMIT = _SUB_BUCKETS << 1
+
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_index(value: int) -> int:
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - _SUB_BUCKET_BITS - 1
+    return (shift << _SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_value(index: int) -> float:
+    """Midpoint of the values that map to ``index``."""
+    if index < _LINEAR_LIMIT:
+        return float(index)
+    shift = (index >> _SUB_BUCKET_BITS) - 1
+    mantissa = index - (shift << _SUB_BUCKET_BITS)
+    return (mantissa + 0.5) * (1 << shift)
+
+
+class Histogram:
+    """HDR-style latency histogram with log-linear buckets.
+
+    Durations are recorded in whole microseconds into buckets whose width
+    grows with the value, so memory stays constant (a few hundred counters
+    cover 1us..1h) and percentiles are accurate to a few percent. Recording
+    is an index computation plus one increment.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max', '_lock')
+
+    def __init__(self):
+        self.counts: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        micros = int(seconds * 1_000_000) if seconds > 0 else 0
+        index = _bucket_index(micros)
+        with self._lock:
+            counts = self.counts
+            if index >= len(counts):
+                counts.extend([0] * (index + 1 - len(counts)))
+            counts[index] += 1
+            self.count += 1
+            self.total += micros
+            if self.min is None or micros < self.min:
+                self.min = micros
+            if self.max is None or micros > self.max:
+                self.max = micros
+
+    def percentile(self, quantile: float) -> float:
+        """Value in seconds at ``quantile`` (0..1); 0.0 when empty."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, math.ceil(quantile * self.count))
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= rank:
+                    value = min(max(_bucket_value(index), self.min), self.max)
+                    return value / 1_000_000
+        return self.max / 1_000_000
+
+    def summary(self) -> Dict[str, float]:
+        summary = {f'p{format(q * 100, "g")}': self.percentile(q) for q in SUMMARY_QUANTILES}
+        summary.update({
+            'count': self.count,
+            'sum': self.total / 1_000_000,
+            'min': (self.min or 0) / 1_000_000,
+            'max': (self.max or 0) / 1_000_000,
+            'mean': self.total / self.count / 1_000_000 if self.count else 0.0,
+        })
+        return summary
+
+
+class MetricsRegistry:
+    """Process-wide histograms, counters and gauges for the order path.
+
+    Series are identified by a name plus keyword labels. ``histogram`` and
+    ``counter`` return cached objects, so hot code can hold on to them;
+    gauges are callbacks evaluated only when a snapshot is taken.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._gauges: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        if self.enabled:
+            self.histogram(name, **labels).record(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Record the duration of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_gauges(self, name: str, callback: Callable[[], Dict[str, Any]]) -> None:
+        """Expose the numeric values of ``callback()`` as ``<name>_<key>`` gauges."""
+        self._gauges[name] = callback
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def _gauge_values(self) -> Dict[str, float]:
+        values = {}
+        for name, callback in list(self._gauges.items()):
+            try:
+                for key, value in callback().items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        values[f'{name}_{key}'] = value
+            except Exception as e:
+                logger.warning(f"Gauge callback {name} failed: {e}")
+        return values
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values as plain dicts: histogram summaries, counters and gauges."""
+        with self._lock:
+            histograms = list(self._histograms.items())
+            counters = list(self._counters.items())
+        return {
+            'histograms': [{'name': name, 'labels': dict(labels), **histogram.summary()} for (name, labels), histogram in histograms],
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in counters],
+            'gauges': self._gauge_values(),
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format; histograms are exported as summaries in seconds."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        declared = set()
+        for (name, labels), histogram in histograms:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} summary')
+            for quantile in SUMMARY_QUANTILES:
+                lines.append(f'{name}{_format_labels(labels + (("quantile", str(quantile)),))} {histogram.percentile(quantile):.6f}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {histogram.total / 1_000_000:.6f}')
+            lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+        for (name, labels), value in counters:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name}{_format_labels(labels)} {value:g}')
+        for name, value in sorted(self._gauge_values().items()):
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def start_metrics_server(port: int = 9108, host: str = '127.0.0.1', registry: Optional['MetricsRegistry'] = None) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` (Prometheus text) and ``/metrics.json`` (snapshot) from a daemon thread."""
+    registry = registry or get_metrics()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = registry.render_prometheus().encode('utf-8'), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = json.dumps(registry.snapshot()).encode('utf-8'), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"Metrics available at http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the registry shared by every client in this process."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
@@ -0,0 +1,141 @@
+from dataclasses import dataclass, field, replace
+from decimal import Decimal
+from typing import Any, Dict, Optional, Union
+
+Number = Union[Decimal, float, int, str]
+
+# Order types that carry a limit price (and therefore a timeInForce) or a stop price
+_PRICE_TYPES = frozenset(('LIMIT', 'STOP'))
+_STOP_PRICE_TYPES = frozenset(('STOP', 'STOP_MARKET'))
+
+
+def to_decimal(value: Number) -> Decimal:
+    """Convert a number to Decimal without picking up binary float artifacts."""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def format_decimal(value: Decimal) -> str:
+    """Canonical plain-notation string for the API: no exponent, no trailing zeros."""
+    text = format(value, 'f')
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return text
+
+
+@dataclass(frozen=True, slots=True)
+class Order:
+    """A new-order request with normalized, precision-exact fields.
+
+    Build instances with ``Order.create`` so strings are upper-cased and
+    numbers converted to Decimal exactly once.
+    """
+
+    symbol: str
+    side: str
+    order_type: str
+    quantity: Decimal
+    price: Optional[Decimal] = None
+    stop_price: Optional[Decimal] = None
+    time_in_force: Optional[str] = None
+    client_order_id: Optional[str] = None
+    reduce_only: bool = False
+
+    @classmethod
+    def create(cls, symbol: str, side: str, order_type: str, quantity: Number, price: Optional[Number] = None,
+               stop_price: Optional[Number] = None, time_in_force: Optional[str] = None,
+               client_order_id: Optional[str] = None, reduce_only: bool = False) -> 'Order':
+        order_type = order_type.upper()
+        if time_in_force is None and order_type in _PRICE_TYPES:
+            time_in_force = 'GTC'  # Good Till Cancelled
+        return cls(
+            symbol.upper(),
+            side.upper(),
+            order_type,
+            to_decimal(quantity),
+            to_decimal(price) if price is not None else None,
+            to_decimal(stop_price) if stop_price is not None else None,
+            time_in_force,
+            client_order_id,
+            reduce_only,
+        )
+
+    def with_values(self, **changes: Any) -> 'Order':
+        """Return a copy with some fields replaced."""
+        return replace(self, **changes)
+
+    def to_params(self) -> Dict[str, str]:
+        """Request parameters for POST /fapi/v1/order (and batchOrders entries)."""
+        params = {
+            'symbol': self.symbol,
+            'side': self.side,
+            'type': self.order_type,
+            'quantity': format_decimal(self.quantity),
+        }
+
+        if self.order_type in _PRICE_TYPES:
+            if self.price is None:
+                raise ValueError(f"Price is required for {self.order_type} orders")
+            params['price'] = format_decimal(self.price)
+
+        if self.order_type in _STOP_PRICE_TYPES:
+            if self.stop_price is None:
+                raise ValueError(f"Stop price is required for {self.order_type} orders")
+            params['stopPrice'] = format_decimal(self.stop_price)
+
+        if self.time_in_force is not None:
+            params['timeInForce'] = self.time_in_force
+        if self.client_order_id is not None:
+            params['newClientOrderId'] = self.client_order_id
+        if self.reduce_only:
+            params['reduceOnly'] = 'true'
+        return params
+
+    def describe(self) -> str:
+        text = f"{self.side} {format_decimal(self.quantity)} {self.symbol} {self.order_type}"
+        if self.price is not None:
+            text += f" @ {format_decimal(self.price)}"
+        if self.stop_price is not None:
+            text += f" stop {format_decimal(self.stop_price)}"
+        return text
+
+
+@dataclass(frozen=True, slots=True)
+class OrderResult:
+    """Outcome of an order request: the exchange's order state, or the error that rejected it."""
+
+    order_id: Optional[int] = None
+    client_order_id: Optional[str] = None
+    symbol: Optional[str] = None
+    status: Optional[str] = None
+    executed_qty: Decimal = Decimal(0)
+    avg_price: Decimal = Decimal(0)
+    update_time: Optional[int] = None
+    error_code: Optional[int] = None
+    error_msg: Optional[str] = None
+    raw: Dict[str, Any] = field(default_factory=dict, compare=False, hash=False, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.error_msg is None
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> 'OrderResult':
+        """Build from an order response, or from a ``{'code', 'msg'}`` error entry."""
+        if 'orderId' not in response and 'code' in response:
+            return cls.failure(response.get('msg', 'Unknown error'), response.get('code'), raw=response)
+        return cls(
+            order_id=response.get('orderId'),
+            client_order_id=response.get('clientOrderId'),
+            symbol=response.get('symbol'),
+            status=response.get('status'),
+            executed_qty=Decimal(response.get('executedQty') or 0),
+            avg_price=Decimal(response.get('avgPrice') or 0),
+            update_time=response.get('updateTime'),
+            raw=response,
+        )
+
+    @classmethod
+    def failure(cls, message: str, code: Optional[int] = None, raw: Optional[Dict[str, Any]] = None) -> 'OrderResult':
+        return cls(error_code=code, error_msg=message, raw=raw or {})
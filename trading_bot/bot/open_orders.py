@@ -0,0 +1,106 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from .models import OrderResult
+from .streams import TERMINAL_ORDER_STATUSES, order_from_event
+
+# Binance error code for cancelling or amending an order that is not open
+UNKNOWN_ORDER = -2011
+
+# How many closed order IDs to remember, so a late "NEW" cannot resurrect a finished order
+_CLOSED_ORDER_MEMORY = 10000
+
+
+class OpenOrderIndex:
+    """Local index of open orders, keyed by orderId and by clientOrderId.
+
+    Entries are order dicts with the keys of the REST order endpoints. The
+    index is updated from the results of order requests and, when
+    ``handle_event`` is added as a user-data stream listener, from
+    ORDER_TRADE_UPDATE events, so fills and expiries remove orders too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        self.by_client_id: Dict[str, Dict[str, Any]] = {}
+        self._closed: 'OrderedDict[int, None]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, order_id: Optional[int] = None, client_order_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if order_id is not None:
+            return self.by_id.get(order_id)
+        return self.by_client_id.get(client_order_id)
+
+    def orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            orders = list(self.by_id.values())
+        if symbol is not None:
+            orders = [order for order in orders if order.get('symbol') == symbol.upper()]
+        return orders
+
+    def update(self, order: Dict[str, Any]) -> None:
+        """Apply an order dict: add or refresh it while open, drop it once terminal."""
+        order_id = order.get('orderId')
+        if order_id is None:
+            return
+        with self._lock:
+            if order.get('status') in TERMINAL_ORDER_STATUSES:
+                self._drop(order_id)
+                self._closed[order_id] = None
+                if len(self._closed) > _CLOSED_ORDER_MEMORY:
+                    self._closed.popitem(last=False)
+                return
+            if order_id in self._closed:
+                return
+            merged = dict(self.by_id.get(order_id, ()), **order)
+            self.by_id[order_id] = merged
+            if merged.get('clientOrderId'):
+                self.by_client_id[merged['clientOrderId']] = merged
+
+    def apply_result(self, result: OrderResult) -> None:
+        """Apply the result of a place, modify or cancel request."""
+        if not result.ok or result.order_id is None:
+            return
+        order = dict(result.raw)
+        order.setdefault('orderId', result.order_id)
+        order.setdefault('status', result.status)
+        if result.client_order_id:
+            order.setdefault('clientOrderId', result.client_order_id)
+        if result.symbol:
+            order.setdefault('symbol', result.symbol)
+        self.update(order)
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        """User-data stream listener."""
+        if event.get('e') == 'ORDER_TRADE_UPDATE':
+            self.update(order_from_event(event))
+
+    def remove(self, order_id: Optional[int] = None, client_order_id: Optional[str] = None) -> None:
+        with self._lock:
+            order = self.get(order_id, client_order_id)
+            if order is not None:
+                self._drop(order['orderId'])
+
+    def remove_symbol(self, symbol: str) -> None:
+        with self._lock:
+            for order in [order for order in self.by_id.values() if order.get('symbol') == symbol.upper()]:
+                self._drop(order['orderId'])
+
+    def replace(self, orders: Iterable[Dict[str, Any]], symbol: Optional[str] = None) -> None:
+        """Replace the index (or one symbol's part of it) with a GET /fapi/v1/openOrders response."""
+        if symbol is None:
+            with self._lock:
+                self.by_id.clear()
+                self.by_client_id.clear()
+        else:
+            self.remove_symbol(symbol)
+        for order in orders:
+            self.update(order)
+
+    def _drop(self, order_id: int) -> None:
+        order = self.by_id.pop(order_id, None)
+        if order is not None and order.get('clientOrderId'):
+            self.by_client_id.pop(order['clientOrderId'], None)
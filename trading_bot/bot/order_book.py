@@ -0,0 +1,342 @@
+import asyncio
+import json
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .metrics import MetricsRegistry, get_metrics
+from .rate_limiter import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Event type of snapshot records in depth recordings (REST snapshots have no 'e' of their own)
+SNAPSHOT_EVENT = 'depthSnapshot'
+# Events kept per symbol while its book waits for a snapshot; the oldest are dropped beyond this
+MAX_BUFFERED_EVENTS = 10000
+
+
+class OrderBookGap(Exception):
+    """A depth update that does not continue the book's update sequence."""
+
+
+class BookSide:
+    """One side of an L2 book as parallel sorted arrays, best level first.
+
+    ``keys`` holds the ask prices, or the negated bid prices, in ascending
+    order, so on both sides the best level is index 0 and a price is found
+    with one bisect. ``quantities[i]`` is the quantity at ``keys[i]``.
+    """
+
+    __slots__ = ('sign', 'keys', 'quantities')
+
+    def __init__(self, is_bid: bool):
+        self.sign = -1.0 if is_bid else 1.0
+        self.keys: List[float] = []
+        self.quantities: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def clear(self) -> None:
+        self.keys = []
+        self.quantities = []
+
+    def load(self, levels: Iterable[Sequence[str]]) -> None:
+        """Replace every level with ``[[price, quantity], ...]`` from a snapshot."""
+        sign = self.sign
+        pairs = sorted((sign * float(price), float(quantity)) for price, quantity in levels if float(quantity))
+        self.keys = [key for key, _ in pairs]
+        self.quantities = [quantity for _, quantity in pairs]
+
+    def apply(self, levels: Iterable[Sequence[str]]) -> None:
+        """Apply ``[[price, quantity], ...]`` from a diff event; a zero quantity removes the level."""
+        keys = self.keys
+        quantities = self.quantities
+        sign = self.sign
+        for price, quantity in levels:
+            key = sign * float(price)
+            quantity = float(quantity)
+            index = bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                if quantity:
+                    quantities[index] = quantity
+                else:
+                    del keys[index]
+                    del quantities[index]
+            elif quantity:
+                keys.insert(index, key)
+                quantities.insert(index, quantity)
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        """(price, quantity) of the best level, or None if the side is empty."""
+        if not self.keys:
+            return None
+        return self.sign * self.keys[0], self.quantities[0]
+
+    def levels(self, count: int) -> List[Tuple[float, float]]:
+        """The best ``count`` levels as (price, quantity), best first."""
+        sign = self.sign
+        return [(sign * key, quantity) for key, quantity in zip(self.keys[:count], self.quantities[:count])]
+
+    def depth(self, count: int) -> float:
+        """Total quantity of the best ``count`` levels."""
+        return sum(self.quantities[:count])
+
+    def quantity_within(self, price: float) -> float:
+        """Total quantity at prices at least as good as ``price``."""
+        return sum(self.quantities[:bisect_right(self.keys, self.sign * price)])
+
+    def sweep(self, quantity: float) -> Optional[Tuple[float, float]]:
+        """(average price, last price touched) of taking ``quantity``; None if the side is too thin."""
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        remaining = quantity
+        cost = 0.0
+        for key, available in zip(self.keys, self.quantities):
+            take = available if available < remaining else remaining
+            cost += take * key
+            remaining -= take
+            if remaining <= 0:
+                return self.sign * cost / quantity, self.sign * key
+        return None
+
+
+class OrderBook:
+    """Local L2 order book of one symbol: a REST snapshot plus depth diff events.
+
+    Prices and quantities are floats. The book is for reading the market
+    (best prices, depth, the cost of a size), and every query is a few
+    list operations; prices derived from it still go through the symbol's
+    filters when an order is placed.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.last_update_id: Optional[int] = None
+        self.event_time = 0
+        self.updates = 0
+        self._awaiting_first = False
+
+    def __repr__(self) -> str:
+        return (f"OrderBook({self.symbol}, bid={self.best_bid()}, ask={self.best_ask()}, "
+                f"levels={len(self.bids)}/{len(self.asks)}, last_update_id={self.last_update_id})")
+
+    @property
+    def synced(self) -> bool:
+        return self.last_update_id is not None
+
+    def clear(self) -> None:
+        """Drop every level and mark the book as needing a snapshot."""
+        self.bids.clear()
+        self.asks.clear()
+        self.last_update_id = None
+
+    # --- updates ---------------------------------------------------------
+
+    def apply_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Load a /fapi/v1/depth response."""
+        self.bids.load(snapshot['bids'])
+        self.asks.load(snapshot['asks'])
+        self.last_update_id = snapshot['lastUpdateId']
+        self.event_time = snapshot.get('E', self.event_time)
+        self._awaiting_first = True
+
+    def apply_diff(self, event: Dict[str, Any]) -> bool:
+        """Apply a depthUpdate event; False if it is older than the book.
+
+        The first event after a snapshot must span the snapshot's
+        ``lastUpdateId`` (``U <= lastUpdateId <= u``); every later one must
+        have ``pu`` equal to the previous event's ``u``. Raises OrderBookGap
+        otherwise, leaving the book unchanged.
+        """
+        last = self.last_update_id
+        if last is None:
+            raise OrderBookGap(f"{self.symbol} book has no snapshot")
+        final = event['u']
+        if final < last or (final == last and not self._awaiting_first):
+            return False
+        if self._awaiting_first:
+            if event['U'] > last:
+                raise OrderBookGap(f"{self.symbol}: first update {event['U']} is newer than snapshot {last}")
+            self._awaiting_first = False
+        elif event['pu'] != last:
+            raise OrderBookGap(f"{self.symbol}: update {final} follows {event['pu']}, expected {last}")
+
+        self.bids.apply(event['b'])
+        self.asks.apply(event['a'])
+        self.last_update_id = final
+        self.event_time = event.get('E', self.event_time)
+        self.updates += 1
+        return True
+
+    # --- queries ---------------------------------------------------------
+
+    def best_bid(self) -> Optional[float]:
+        return -self.bids.keys[0] if self.bids.keys else None
+
+    def best_ask(self) -> Optional[float]:
+        return self.asks.keys[0] if self.asks.keys else None
+
+    def mid_price(self) -> Optional[float]:
+        if not self.bids.keys or not self.asks.keys:
+            return None
+        return (self.asks.keys[0] - self.bids.keys[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        if not self.bids.keys or not self.asks.keys:
+            return None
+        return self.asks.keys[0] + self.bids.keys[0]
+
+    def _taker_side(self, side: str) -> BookSide:
+        """The side an order of ``side`` ('BUY'/'SELL') would trade against."""
+        return self.asks if side.upper() == 'BUY' else self.bids
+
+    def vwap(self, side: str, quantity: float) -> Optional[float]:
+        """Average price a taker order of ``side`` would fill ``quantity`` at; None if the book is too thin."""
+        swept = self._taker_side(side).sweep(quantity)
+        return swept[0] if swept is not None else None
+
+    def impact_price(self, side: str, quantity: float) -> Optional[float]:
+        """Worst price a taker order of ``side`` for ``quantity`` would reach; None if the book is too thin."""
+        swept = self._taker_side(side).sweep(quantity)
+        return swept[1] if swept is not None else None
+
+
+class OrderBookManager:
+    """Order books for many symbols, synced from snapshots and depth diff events.
+
+    Follows Binance's procedure for a local book: depth events are buffered
+    until a REST snapshot arrives, events older than the snapshot are
+    dropped, and from then on every event must chain on the previous one
+    (``pu``). A break in the chain, as after a reconnect, clears only that
+    symbol's book, which resyncs from a new snapshot while its events keep
+    buffering.
+
+    ``fetch_snapshot(symbol)`` is awaited for snapshots, at most
+    ``max_concurrent_snapshots`` at a time (a 1000-level snapshot costs 20
+    request weight). Without it, as in replays, books sync only from
+    snapshots passed to ``apply_snapshot``.
+    """
+
+    def __init__(self, symbols: Iterable[str],
+                 fetch_snapshot: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None,
+                 max_concurrent_snapshots: int = 4, metrics: Optional[MetricsRegistry] = None):
+        self.books: Dict[str, OrderBook] = {symbol.upper(): OrderBook(symbol.upper()) for symbol in symbols}
+        self.fetch_snapshot = fetch_snapshot
+        self.metrics = metrics or get_metrics()
+        self.resyncs = 0
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {symbol: [] for symbol in self.books}
+        self._resync_tasks: Dict[str, asyncio.Future] = {}
+        self._snapshot_slots = asyncio.Semaphore(max_concurrent_snapshots)
+        self.metrics.register_gauges('order_books', self.stats)
+
+    def get(self, symbol: str) -> Optional[OrderBook]:
+        """The symbol's book if it is synced, else None."""
+        book = self.books.get(symbol.upper())
+        return book if book is not None and book.synced else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'symbols': len(self.books),
+            'synced': sum(1 for book in self.books.values() if book.synced),
+            'resyncs': self.resyncs,
+            'buffered_events': sum(len(buffer) for buffer in self._buffers.values()),
+        }
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        """Stream listener: apply a depthUpdate event, or buffer it until the book is synced."""
+        if event.get('e') != 'depthUpdate':
+            return
+        symbol = event['s']
+        book = self.books.get(symbol)
+        if book is None:
+            return
+        if book.synced:
+            try:
+                book.apply_diff(event)
+                return
+            except OrderBookGap as e:
+                self._lost_sync(book, str(e))
+        buffer = self._buffers[symbol]
+        buffer.append(event)
+        if len(buffer) > MAX_BUFFERED_EVENTS:
+            del buffer[0]
+        self._request_snapshot(symbol)
+
+    def apply_snapshot(self, symbol: str, snapshot: Dict[str, Any]) -> bool:
+        """Load a snapshot and replay the buffered events onto it.
+
+        Returns False if the buffered events do not continue from the
+        snapshot (it predates them); the book then waits for a newer one.
+        """
+        book = self.books.get(symbol.upper())
+        if book is None:
+            return False
+        book.apply_snapshot(snapshot)
+        buffered, self._buffers[book.symbol] = self._buffers[book.symbol], []
+        for index, event in enumerate(buffered):
+            try:
+                book.apply_diff(event)
+            except OrderBookGap as e:
+                self._lost_sync(book, str(e))
+                self._buffers[book.symbol] = buffered[index:]
+                return False
+        logger.debug(f"Order book {book.symbol} synced at update {book.last_update_id}")
+        return True
+
+    def _lost_sync(self, book: OrderBook, reason: str) -> None:
+        logger.warning(f"Order book out of sync, resyncing: {reason}")
+        self.resyncs += 1
+        self.metrics.inc('order_book_resyncs_total', symbol=book.symbol)
+        book.clear()
+
+    def _request_snapshot(self, symbol: str) -> None:
+        if self.fetch_snapshot is None or symbol in self._resync_tasks:
+            return
+        self._resync_tasks[symbol] = asyncio.ensure_future(self._resync(symbol))
+
+    async def _resync(self, symbol: str) -> None:
+        attempt = 0
+        try:
+            while not self.books[symbol].synced:
+                async with self._snapshot_slots:
+                    try:
+                        snapshot = await self.fetch_snapshot(symbol)
+                    except Exception as e:
+                        logger.warning(f"Order book snapshot for {symbol} failed: {e}")
+                        snapshot = None
+                if snapshot is not None and self.apply_snapshot(symbol, snapshot):
+                    return
+                await asyncio.sleep(backoff_delay(attempt, base=0.5, cap=30.0))
+                attempt += 1
+        finally:
+            self._resync_tasks.pop(symbol, None)
+
+    async def close(self) -> None:
+        """Cancel pending snapshot fetches."""
+        tasks = list(self._resync_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def read_recording(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the events of a JSON-lines depth recording, unwrapping combined-stream messages."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                message = json.loads(line)
+                yield message.get('data', message)
+
+
+def replay_recording(manager: OrderBookManager, events: Iterable[Dict[str, Any]]) -> int:
+    """Feed recorded depth events and snapshot records to ``manager``; returns the number of records."""
+    count = 0
+    for event in events:
+        if event.get('e') == SNAPSHOT_EVENT:
+            manager.apply_snapshot(event['s'], event)
+        else:
+            manager.handle_event(event)
+        count += 1
+    return count
@@ -1,108 +1,697 @@
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from . import console
 from .client import BinanceFuturesClient
-from .validators import validate_symbol, validate_side, validate_order_type, validate_quantity, validate_price
+from .async_client import AsyncBinanceFuturesClient
+from .journal import DUPLICATE_CLIENT_ORDER_ID, ORDER_DOES_NOT_EXIST, OrderJournal, error_code, is_ambiguous, not_found_result
+from .logging_config import correlation_scope
+from .metrics import MetricsRegistry, get_metrics
+from .models import Number, Order, OrderResult
+from .open_orders import UNKNOWN_ORDER, OpenOrderIndex
+from .risk import RiskEngine, RiskRejected
+from .streams import AccountStateCache, BookTicker, Position
+from .validators import OrderFilterEngine, validate_symbol, validate_side, validate_order_type
+
+if TYPE_CHECKING:
+    from .indicators import Signal  # numpy; only needed for annotations
 
 logger = logging.getLogger(__name__)
 
 class OrderManager:
     """Handles order placement and management."""
     
-    def __init__(self, client: BinanceFuturesClient):
+    # After an ambiguous failure, how many times (and how far apart, in
+    # seconds) to query the order before concluding it never arrived
+    recovery_polls = 3
+    recovery_interval = 0.5
+    
+    def __init__(self, client: BinanceFuturesClient, state_cache: Optional[AccountStateCache] = None,
+                 metrics: Optional[MetricsRegistry] = None, journal: Optional[OrderJournal] = None,
+                 risk: Optional[RiskEngine] = None):
         self.client = client
+        self.state_cache = state_cache
+        self.filter_engine = OrderFilterEngine(client.symbol_registry)
+        self.metrics = metrics or get_metrics()
+        self.journal = journal
+        self.risk = risk
+        self.open_orders = OpenOrderIndex()
+    
+    def get_position(self, symbol: str, position_side: str = 'BOTH') -> Optional[Position]:
+        """Current position from the local stream cache (no network call)."""
+        if self.state_cache is None:
+            raise RuntimeError("OrderManager has no state cache; pass state_cache to read streamed state")
+        return self.state_cache.get_position(symbol, position_side)
+    
+    def get_best_bid_ask(self, symbol: str) -> Optional[BookTicker]:
+        """Best bid/ask from the local stream cache (no network call)."""
+        if self.state_cache is None:
+            raise RuntimeError("OrderManager has no state cache; pass state_cache to read streamed state")
+        return self.state_cache.get_book_ticker(symbol)
     
-    def validate_order_params(self, symbol: str, side: str, order_type: str, quantity: float, price: Optional[float] = None, stop_price: Optional[float] = None) -> bool:
+    def validate_order_params(self, order: Order) -> bool:
         """Validate order parameters."""
-        if not validate_symbol(symbol):
-            logger.error(f"Invalid symbol: {symbol}")
+        if not validate_symbol(order.symbol):
+            logger.error("Invalid symbol: %s", order.symbol)
             return False
         
-        if not validate_side(side):
-            logger.error(f"Invalid side: {side}. Must be BUY or SELL")
+        if not validate_side(order.side):
+            logger.error("Invalid side: %s. Must be BUY or SELL", order.side)
             return False
         
-        if not validate_order_type(order_type):
-            logger.error(f"Invalid order type: {order_type}. Must be MARKET, LIMIT, STOP_MARKET, or STOP")
+        if not validate_order_type(order.order_type):
+            logger.error("Invalid order type: %s. Must be MARKET, LIMIT, STOP_MARKET, or STOP", order.order_type)
             return False
         
-        if quantity <= 0:
-            logger.error(f"Invalid quantity: {quantity}. Must be positive")
+        if order.quantity <= 0:
+            logger.error("Invalid quantity: %s. Must be positive", order.quantity)
             return False
         
-        if order_type.upper() == 'LIMIT' and (price is None or price <= 0):
-            logger.error(f"Invalid price for LIMIT order: {price}. Must be positive")
+        if order.order_type in ('LIMIT', 'STOP') and (order.price is None or order.price <= 0):
+            logger.error("Invalid price for %s order: %s. Must be positive", order.order_type, order.price)
             return False
         
-        if order_type.upper() == 'STOP_MARKET' and (stop_price is None or stop_price <= 0):
-            logger.error(f"Invalid stop price for STOP_MARKET order: {stop_price}. Must be positive")
+        if order.order_type in ('STOP_MARKET', 'STOP') and (order.stop_price is None or order.stop_price <= 0):
+            logger.error("Invalid stop price for %s order: %s. Must be positive", order.order_type, order.stop_price)
             return False
         
-        if order_type.upper() == 'STOP':
-            if price is None or price <= 0:
-                logger.error(f"Invalid price for STOP order: {price}. Must be positive")
-                return False
-            if stop_price is None or stop_price <= 0:
-                logger.error(f"Invalid stop price for STOP order: {stop_price}. Must be positive")
-                return False
-        
         return True
     
-    def place_order(self, symbol: str, side: str, order_type: str, quantity: float, price: Optional[float] = None, stop_price: Optional[float] = None) -> Dict[str, Any]:
-        """Place an order with validation."""
-        logger.info(f"Attempting to place {order_type} {side} order for {quantity} {symbol}")
+    def place_order(self, order: Order) -> OrderResult:
+        """Place an order with validation.
+        
+        With a journal, the order is given a journal client order ID and its
+        intent is recorded before it is sent (see ``_submit``).
+        """
+        order = self._assign_client_order_id(order)
+        with correlation_scope(order.client_order_id):
+            started = time.perf_counter()
+            order = self._prepare_order(order)
+            result = None
+            try:
+                with self.metrics.timer('order_stage_seconds', stage='submit', symbol=order.symbol):
+                    result = self._submit(order)
+                return self._order_placed(order, result)
+            except Exception as e:
+                self._order_failed(order, e)
+                raise
+            finally:
+                self._order_finished(order, result, started)
+    
+    def _submit(self, order: Order) -> OrderResult:
+        """Send one order, journaling intent and outcome when a journal is configured.
+        
+        If the request fails without a definite answer (timeout, connection
+        error, 5xx), the exchange is asked for the order's client order ID,
+        ``recovery_polls`` times ``recovery_interval`` seconds apart, since
+        an order still on its way to the matching engine is reported as
+        unknown (-2013). Only an order not found by any of those queries is
+        resent under the same ID, and never a MARKET, IOC or FOK order: the
+        exchange's duplicate-ID check (-4116) only covers orders that are
+        still open, so a late original that filled at once would fill twice.
+        Such an order stays unresolved for ``reconcile_journal``.
+        """
+        if self.journal is None:
+            return self.client.place_order(order)
+        self.journal.record_intent(order)
+        try:
+            result = self.client.place_order(order)
+        except Exception as e:
+            if not self._journal_submit_error(order, e):
+                raise
+            result = self._recover(order)
+            if result is None:
+                raise
+        self.journal.record_result(order.client_order_id, result)
+        return result
+    
+    def _find_order(self, order: Order) -> Tuple[bool, Optional[OrderResult]]:
+        """Poll for an order by client order ID: (True, result) if found, (False, None) if never seen, (True, None) if unsure."""
+        for _ in range(self.recovery_polls):
+            time.sleep(self.recovery_interval)
+            try:
+                return True, self.client.query_order(order.symbol, orig_client_order_id=order.client_order_id)
+            except Exception as e:
+                if self._lookup_failed(order.client_order_id, e):
+                    return True, None
+        return False, None
+    
+    def _recover(self, order: Order) -> Optional[OrderResult]:
+        """Find out what happened to an order whose request failed ambiguously; None if still unknown."""
+        for resend in (True, False):
+            found, result = self._find_order(order)
+            if found:
+                return result
+            if not self._should_resend(order, resend):
+                return None
+            try:
+                return self.client.place_order(order)
+            except Exception as e:
+                done, result = self._resend_failed(e)
+                if done:
+                    return result
+        return None
+    
+    def reconcile_journal(self) -> List[OrderResult]:
+        """Resolve journaled orders with unknown outcome by querying the exchange; call once at startup.
         
-        # Validate parameters
-        if not self.validate_order_params(symbol, side, order_type, quantity, price, stop_price):
-            raise ValueError("Invalid order parameters")
+        Orders the exchange has never seen are recorded as NOT_FOUND. Returns
+        the outcomes recorded; entries that could not be queried stay unresolved.
+        """
+        results = []
+        for record in self.journal.unresolved():
+            try:
+                result = self.client.query_order(record['order']['symbol'], orig_client_order_id=record['client_order_id'])
+            except Exception as e:
+                result = self._reconcile_error(record, e)
+            if result is not None:
+                results.append(self._reconciled(record, result))
+        return results
+    
+    # --- order lifecycle -------------------------------------------------
+    
+    def cancel_order(self, symbol: str, order_id: Optional[int] = None, client_order_id: Optional[str] = None) -> OrderResult:
+        """Cancel an open order and drop it from the open-order index."""
+        with correlation_scope(client_order_id), self.metrics.timer('order_stage_seconds', stage='cancel', symbol=symbol.upper()):
+            try:
+                result = self.client.cancel_order(symbol, order_id, client_order_id)
+            except Exception as e:
+                self._lifecycle_failed('cancel', e, order_id, client_order_id)
+                raise
+        return self._lifecycle_done('cancelled', result)
+    
+    def cancel_orders(self, symbol: str, order_ids: Optional[List[int]] = None,
+                      client_order_ids: Optional[List[str]] = None) -> List[OrderResult]:
+        """Cancel many orders of one symbol through the batch endpoint; one result per ID, order IDs first."""
+        with self.metrics.timer('order_stage_seconds', stage='cancel', symbol=symbol.upper()):
+            results = self.client.cancel_orders(symbol, order_ids, client_order_ids)
+        self._apply_cancel_results(results, order_ids, client_order_ids)
+        return results
+    
+    def cancel_all_orders(self, symbol: str) -> Dict[str, Any]:
+        """Cancel every open order of ``symbol`` with one request."""
+        with self.metrics.timer('order_stage_seconds', stage='cancel', symbol=symbol.upper()):
+            response = self.client.cancel_all_orders(symbol)
+        self._all_cancelled(symbol)
+        return response
+    
+    def modify_order(self, order_id: Optional[int] = None, client_order_id: Optional[str] = None,
+                     price: Optional[Number] = None, quantity: Optional[Number] = None) -> OrderResult:
+        """Amend an open LIMIT order's price and/or quantity in place (one request, same orderId).
         
-        # Check symbol exists on exchange
-        symbol_info = self.client.get_symbol_info(symbol)
-        if not symbol_info:
-            raise ValueError(f"Symbol {symbol} not found on exchange")
+        The order must be in the open-order index, which supplies the symbol,
+        side and whichever of price/quantity is not changed. The new values
+        are snapped to the symbol's filters like a new order.
+        """
+        current, amended = self._prepare_amendment(order_id, client_order_id, price, quantity)
+        with correlation_scope(current.get('clientOrderId')), \
+                self.metrics.timer('order_stage_seconds', stage='modify', symbol=amended.symbol):
+            try:
+                result = self.client.modify_order(amended.symbol, amended.side, amended.quantity, amended.price,
+                                                  order_id=current['orderId'])
+            except Exception as e:
+                self._lifecycle_failed('modify', e, current['orderId'])
+                raise
+            finally:
+                # The amended order is back in the open-order index (or gone); nothing stays in flight
+                self._release(amended)
+        return self._lifecycle_done('modified', result)
+    
+    def replace_order(self, order: Order, order_id: Optional[int] = None, client_order_id: Optional[str] = None) -> OrderResult:
+        """Move an open order to ``order``.
         
-        logger.info(f"Symbol {symbol} validated successfully")
+        LIMIT to LIMIT on the same symbol and side is amended in place;
+        anything else is cancelled and placed anew (two requests).
+        """
+        current = self.open_orders.get(order_id, client_order_id)
+        if self._amendable(current, order):
+            return self.modify_order(current['orderId'], price=order.price, quantity=order.quantity)
+        self.cancel_order(current['symbol'] if current else order.symbol, order_id, client_order_id)
+        return self.place_order(order)
+    
+    def refresh_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Reload the open-order index (or one symbol's part of it) from the exchange."""
+        orders = self.client.get_open_orders(symbol)
+        self.open_orders.replace(orders, symbol)
+        return orders
+    
+    def get_position_risk(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Positions from the exchange (network call; see ``get_position`` for the streamed cache)."""
+        return self.client.get_position_risk(symbol)
+    
+    def place_signal(self, signal: 'Signal', quantity: Number, order_type: str = 'MARKET', reduce_only: bool = False) -> OrderResult:
+        """Turn a strategy signal into an order and place it (LIMIT orders use the signal's price)."""
+        return self.place_order(self._signal_order(signal, quantity, order_type, reduce_only))
+    
+    def place_orders(self, orders: List[Order]) -> List[OrderResult]:
+        """Validate and place many orders through the batch endpoint.
         
-        # Place the order
+        Every order is checked locally before anything is sent; orders that
+        fail validation are not sent. One result per order is returned in
+        input order, with failed OrderResults marking rejected orders.
+        """
+        to_send, errors = self._prepare_batch(orders)
         try:
-            result = self.client.place_order(symbol, side, order_type, quantity, price, stop_price)
-            logger.info(f"Order placed successfully: {result}")
-            return result
-        except Exception as e:
-            logger.error(f"Failed to place order: {e}")
+            if self.journal is not None and to_send:
+                self.journal.record_intents(to_send)
+            sent_results = self.client.place_orders(to_send) if to_send else []
+        except Exception:
+            self._release_batch(to_send, [])
             raise
+        return self._batch_sent(to_send, errors, sent_results)
+    
+    # --- shared steps (no I/O; used by both managers) --------------------
+    
+    def _assign_client_order_id(self, order: Order) -> Order:
+        return self.journal.assign_client_order_id(order) if self.journal is not None else order
+    
+    def _prepare_order(self, order: Order) -> Order:
+        """Validate, snap to the exchange filters and reserve risk; returns the order to send."""
+        logger.info("Attempting to place %s %s order for %s %s", order.order_type, order.side, order.quantity, order.symbol)
+        with self.metrics.timer('order_stage_seconds', stage='validate', symbol=order.symbol):
+            if not self.validate_order_params(order):
+                self.metrics.inc('orders_total', symbol=order.symbol, outcome='invalid')
+                raise ValueError("Invalid order parameters")
+        
+        # Check symbol exists on exchange and snap to its filters
+        with self.metrics.timer('order_stage_seconds', stage='filters', symbol=order.symbol):
+            order = self.apply_exchange_filters(order)
+        
+        logger.debug("Symbol %s validated successfully", order.symbol)
+        
+        if self.risk is not None:
+            with self.metrics.timer('order_stage_seconds', stage='risk', symbol=order.symbol):
+                self.apply_risk_checks(order)
+        return order
+    
+    def _order_placed(self, order: Order, result: OrderResult) -> OrderResult:
+        self.metrics.inc('orders_total', symbol=order.symbol, outcome='accepted' if result.ok else 'rejected')
+        self.open_orders.apply_result(result)
+        logger.info("Order placed successfully: %s", result)
+        return result
+    
+    def _order_failed(self, order: Order, error: Exception) -> None:
+        self.metrics.inc('orders_total', symbol=order.symbol, outcome='error')
+        logger.error("Failed to place order: %s", error)
+    
+    def _order_finished(self, order: Order, result: Optional[OrderResult], started: float) -> None:
+        self._release(order, result)
+        self.metrics.observe('order_stage_seconds', time.perf_counter() - started, stage='total', symbol=order.symbol)
+    
+    def _release(self, order: Order, result: Optional[OrderResult] = None) -> None:
+        """End the order's risk reservation, counting ``result``'s fills."""
+        if self.risk is not None:
+            self.risk.release(order, result)
+    
+    def _journal_submit_error(self, order: Order, error: Exception) -> bool:
+        """Journal a failed send; returns whether the outcome is unknown and worth recovering."""
+        if not is_ambiguous(error):
+            self.journal.record_result(order.client_order_id, OrderResult.failure(str(error), error_code(error)))
+            return False
+        self.journal.record_unknown(order.client_order_id, error)
+        logger.warning("Outcome of order %s unknown (%s); checking with the exchange", order.client_order_id, error)
+        return True
+    
+    @staticmethod
+    def _lookup_failed(client_order_id: str, error: Exception) -> bool:
+        """Whether a failed order query is a real error, not just "unknown order" (-2013)."""
+        if error_code(error) == ORDER_DOES_NOT_EXIST:
+            return False
+        logger.error("Could not query order %s: %s", client_order_id, error)
+        return True
+    
+    @staticmethod
+    def _may_resend(order: Order) -> bool:
+        """Whether a lost order can be resent: it rests on the book, so -4116 catches a late original."""
+        return order.order_type != 'MARKET' and order.time_in_force not in ('IOC', 'FOK')
+    
+    def _should_resend(self, order: Order, resend: bool) -> bool:
+        if not resend or not self._may_resend(order):
+            logger.warning("Order %s not found; leaving it unresolved rather than resending", order.client_order_id)
+            return False
+        logger.info("Order %s never reached the exchange; resending it", order.client_order_id)
+        return True
+    
+    @staticmethod
+    def _resend_failed(error: Exception) -> Tuple[bool, Optional[OrderResult]]:
+        """Classify a failed resend: (True, result or None if unknown) to stop, (False, None) to query again."""
+        if is_ambiguous(error):
+            return True, None
+        if error_code(error) != DUPLICATE_CLIENT_ORDER_ID:
+            return True, OrderResult.failure(str(error), error_code(error))
+        # The first attempt did land after all; query it
+        return False, None
+    
+    def _reconcile_error(self, record: Dict[str, Any], error: Exception) -> Optional[OrderResult]:
+        """NOT_FOUND for an order the exchange has never seen; None (left unresolved) for other errors."""
+        client_order_id = record['client_order_id']
+        if error_code(error) != ORDER_DOES_NOT_EXIST:
+            logger.error("Could not reconcile order %s: %s", client_order_id, error)
+            return None
+        return not_found_result(client_order_id, record['order']['symbol'])
+    
+    def _reconciled(self, record: Dict[str, Any], result: OrderResult) -> OrderResult:
+        client_order_id = record['client_order_id']
+        logger.info("Reconciled journaled order %s: %s", client_order_id, result.status)
+        self.journal.record_result(client_order_id, result, reconciled=True)
+        return result
+    
+    def _lifecycle_failed(self, action: str, error: Exception, order_id: Optional[int] = None,
+                          client_order_id: Optional[str] = None) -> None:
+        self._forget_if_closed(error, order_id, client_order_id)
+        logger.error("Failed to %s order %s: %s", action, order_id or client_order_id, error)
+    
+    def _lifecycle_done(self, action: str, result: OrderResult) -> OrderResult:
+        self.open_orders.apply_result(result)
+        logger.info("Order %s: %s", action, result)
+        return result
+    
+    def _all_cancelled(self, symbol: str) -> None:
+        self.open_orders.remove_symbol(symbol)
+        logger.info("All open %s orders cancelled", symbol.upper())
+    
+    def _prepare_amendment(self, order_id: Optional[int], client_order_id: Optional[str], price: Optional[Number],
+                           quantity: Optional[Number]) -> Tuple[Dict[str, Any], Order]:
+        """The open order and its snapped amendment, reserved with the risk engine (release it afterwards)."""
+        current = self.open_orders.get(order_id, client_order_id)
+        if current is None:
+            raise ValueError(f"Order {order_id or client_order_id} is not in the open-order index")
+        if current.get('type') != 'LIMIT':
+            raise ValueError(f"Only LIMIT orders can be modified, not {current.get('type')}")
+        amended = Order.create(current['symbol'], current['side'], 'LIMIT',
+                               quantity if quantity is not None else current['origQty'],
+                               price if price is not None else current['price'])
+        amended = self.apply_exchange_filters(amended)
+        if self.risk is not None:
+            self.apply_risk_checks(amended, replacing=current)
+        return current, amended
     
-    def print_order_summary(self, symbol: str, side: str, order_type: str, quantity: float, price: Optional[float] = None, stop_price: Optional[float] = None):
+    @staticmethod
+    def _amendable(current: Optional[Dict[str, Any]], order: Order) -> bool:
+        return (current is not None and current.get('type') == 'LIMIT' and order.order_type == 'LIMIT'
+                and current.get('symbol') == order.symbol and current.get('side') == order.side)
+    
+    def _forget_if_closed(self, error: Exception, order_id: Optional[int] = None, client_order_id: Optional[str] = None) -> None:
+        """Drop an order from the index when the exchange says it is not open (filled, cancelled or unknown)."""
+        if error_code(error) in (UNKNOWN_ORDER, ORDER_DOES_NOT_EXIST):
+            self.open_orders.remove(order_id, client_order_id)
+    
+    def _apply_cancel_results(self, results: List[OrderResult], order_ids: Optional[List[int]],
+                              client_order_ids: Optional[List[str]]) -> None:
+        keys = [(order_id, None) for order_id in order_ids or ()] + [(None, client_id) for client_id in client_order_ids or ()]
+        for (order_id, client_order_id), result in zip(keys, results):
+            if result.ok:
+                self.open_orders.apply_result(result)
+            elif result.error_code in (UNKNOWN_ORDER, ORDER_DOES_NOT_EXIST):
+                self.open_orders.remove(order_id, client_order_id)
+        failed = sum(1 for result in results if not result.ok)
+        logger.info("Batch cancel: %d cancelled, %d failed", len(results) - failed, failed)
+    
+    @staticmethod
+    def _signal_order(signal: 'Signal', quantity: Number, order_type: str, reduce_only: bool) -> Order:
+        logger.info("Acting on %s signal: %s %s @ %s", signal.reason, signal.side, signal.symbol, signal.price)
+        return signal.to_order(quantity, order_type, reduce_only=reduce_only)
+    
+    def apply_exchange_filters(self, order: Order) -> Order:
+        """Snap quantity/prices to the symbol's step and tick sizes and check exchange filters locally.
+        
+        Raises ValueError for unknown symbols and orders the exchange would reject.
+        """
+        mark_price = self.state_cache.get_mark_price(order.symbol) if self.state_cache is not None else None
+        try:
+            snapped = self.filter_engine.prepare(order, mark_price)
+        except ValueError:
+            self.metrics.inc('orders_total', symbol=order.symbol, outcome='filter_rejected')
+            raise
+        if snapped is not order:
+            logger.warning("Order adjusted to exchange filters: %s", snapped.describe())
+        return snapped
+    
+    def apply_risk_checks(self, order: Order, replacing: Optional[Dict[str, Any]] = None) -> None:
+        """Run the pre-trade risk checks against local position and price state.
+        
+        Raises RiskRejected (a ValueError) if the order would break a limit.
+        A passing order stays reserved in the risk engine until its result is
+        known, so callers must follow up with ``self.risk.release``.
+        """
+        try:
+            self.risk.check(order, self.open_orders, replacing)
+        except RiskRejected:
+            self.metrics.inc('orders_total', symbol=order.symbol, outcome='risk_rejected')
+            raise
+    
+    def _prepare_batch(self, orders: List[Order]) -> Tuple[List[Order], List[Optional[OrderResult]]]:
+        """Give a batch its client order IDs and check it locally.
+        
+        Returns the orders to send and, per input order, an error result or
+        None if it is among them.
+        """
+        logger.info("Attempting to place batch of %d orders", len(orders))
+        orders = [self._assign_client_order_id(order) for order in orders]
+        prepared, errors = self._validate_batch(orders)
+        return [order for order, error in zip(prepared, errors) if error is None], errors
+    
+    def _validate_batch(self, orders: List[Order]) -> Tuple[List[Order], List[Optional[OrderResult]]]:
+        """Validate and snap orders locally.
+        
+        Returns the prepared orders and, per order, an error result or None if it may be sent.
+        """
+        prepared = []
+        errors = []
+        for order in orders:
+            if not self.validate_order_params(order):
+                prepared.append(order)
+                errors.append(OrderResult.failure('Invalid order parameters'))
+                continue
+            try:
+                snapped = self.apply_exchange_filters(order)
+                if self.risk is not None:
+                    self.apply_risk_checks(snapped)
+                prepared.append(snapped)
+                errors.append(None)
+            except ValueError as e:
+                prepared.append(order)
+                errors.append(OrderResult.failure(str(e)))
+        return prepared, errors
+    
+    def _batch_sent(self, sent: List[Order], errors: List[Optional[OrderResult]],
+                    sent_results: List[OrderResult]) -> List[OrderResult]:
+        """Record a sent batch's results; returns one result per input order."""
+        self._journal_batch(sent, sent_results)
+        for result in sent_results:
+            self.open_orders.apply_result(result)
+        self._release_batch(sent, sent_results)
+        results = self._merge_batch_results(errors, sent_results)
+        
+        failed = sum(1 for result in results if not result.ok)
+        logger.info("Batch placed: %d succeeded, %d failed", len(results) - failed, failed)
+        return results
+    
+    def _journal_batch(self, sent: List[Order], results: List[OrderResult]) -> None:
+        """Record batch outcomes; a failed chunk request (no exchange error code) leaves its orders unresolved."""
+        if self.journal is None:
+            return
+        for order, result in zip(sent, results):
+            if result.ok or result.error_code is not None:
+                self.journal.record_result(order.client_order_id, result)
+            else:
+                self.journal.record_unknown(order.client_order_id, result.error_msg)
+    
+    def _release_batch(self, sent: List[Order], results: List[OrderResult]) -> None:
+        """End the risk reservations of a sent batch; orders without a result are released unfilled."""
+        for index, order in enumerate(sent):
+            self._release(order, results[index] if index < len(results) else None)
+    
+    @staticmethod
+    def _merge_batch_results(errors: List[Optional[OrderResult]], sent_results: List[OrderResult]) -> List[OrderResult]:
+        """Interleave exchange results back into the slots of locally accepted orders."""
+        sent = iter(sent_results)
+        return [error if error is not None else next(sent) for error in errors]
+    
+    def print_order_summary(self, order: Order):
         """Print order request summary."""
-        print("\n" + "="*50)
-        print("ORDER REQUEST SUMMARY")
-        print("="*50)
-        print(f"Symbol: {symbol.upper()}")
-        print(f"Side: {side.upper()}")
-        print(f"Type: {order_type.upper()}")
-        print(f"Quantity: {quantity}")
-        if price is not None:
-            print(f"Price: {price}")
-        if stop_price is not None:
-            print(f"Stop Price: {stop_price}")
-        print("="*50)
-    
-    def print_order_response(self, response: Dict[str, Any]):
+        console.print_order_summary(order)
+    
+    def print_batch_response(self, orders: List[Order], results: List[OrderResult]):
+        """Print per-order batch results."""
+        console.print_batch_response(orders, results)
+    
+    def print_order_response(self, response: OrderResult):
         """Print order response details."""
-        print("\nORDER RESPONSE DETAILS")
-        print("="*50)
-        print(f"Order ID: {response.get('orderId', 'N/A')}")
-        print(f"Status: {response.get('status', 'N/A')}")
-        print(f"Executed Quantity: {response.get('executedQty', 'N/A')}")
-        
-        if 'avgPrice' in response and response['avgPrice'] != '0':
-            print(f"Average Price: {response['avgPrice']}")
-        
-        print(f"Client Order ID: {response.get('clientOrderId', 'N/A')}")
-        print(f"Update Time: {response.get('updateTime', 'N/A')}")
-        print("="*50)
-        
-        # Success message
-        if response.get('status') in ['FILLED', 'NEW', 'PARTIALLY_FILLED']:
-            print("✅ ORDER PLACED SUCCESSFULLY!")
-        else:
-            print("⚠️  ORDER STATUS UNCLEAR - CHECK LOGS")
\ No newline at end of file
+        console.print_order_response(response)
+
+
+class AsyncOrderManager(OrderManager):
+    """Asyncio counterpart of OrderManager for AsyncBinanceFuturesClient.
+    
+    Only the I/O differs: every step that does not wait on the network or
+    the journal is the base class's. The symbol registry is refreshed here
+    when stale, since the async client cannot load it on first use.
+    """
+    
+    client: AsyncBinanceFuturesClient
+    
+    async def place_order(self, order: Order) -> OrderResult:
+        """Place an order with validation; see ``OrderManager.place_order``."""
+        order = self._assign_client_order_id(order)
+        with correlation_scope(order.client_order_id):
+            started = time.perf_counter()
+            await self._refresh_symbols_if_stale()
+            order = self._prepare_order(order)
+            result = None
+            try:
+                with self.metrics.timer('order_stage_seconds', stage='submit', symbol=order.symbol):
+                    result = await self._submit(order)
+                return self._order_placed(order, result)
+            except Exception as e:
+                self._order_failed(order, e)
+                raise
+            finally:
+                self._order_finished(order, result, started)
+    
+    async def _submit(self, order: Order) -> OrderResult:
+        """Async counterpart of ``OrderManager._submit``.
+        
+        Journal writes run in a worker thread, so intents of concurrent
+        orders share an fsync instead of blocking the loop one by one.
+        """
+        if self.journal is None:
+            return await self.client.place_order(order)
+        await asyncio.to_thread(self.journal.record_intent, order)
+        try:
+            result = await self.client.place_order(order)
+        except Exception as e:
+            if not self._journal_submit_error(order, e):
+                raise
+            result = await self._recover(order)
+            if result is None:
+                raise
+        self.journal.record_result(order.client_order_id, result)
+        return result
+    
+    async def _find_order(self, order: Order) -> Tuple[bool, Optional[OrderResult]]:
+        for _ in range(self.recovery_polls):
+            await asyncio.sleep(self.recovery_interval)
+            try:
+                return True, await self.client.query_order(order.symbol, orig_client_order_id=order.client_order_id)
+            except Exception as e:
+                if self._lookup_failed(order.client_order_id, e):
+                    return True, None
+        return False, None
+    
+    async def _recover(self, order: Order) -> Optional[OrderResult]:
+        for resend in (True, False):
+            found, result = await self._find_order(order)
+            if found:
+                return result
+            if not self._should_resend(order, resend):
+                return None
+            try:
+                return await self.client.place_order(order)
+            except Exception as e:
+                done, result = self._resend_failed(e)
+                if done:
+                    return result
+        return None
+    
+    async def reconcile_journal(self) -> List[OrderResult]:
+        """Async counterpart of ``OrderManager.reconcile_journal``; journaled orders are queried concurrently."""
+        async def _reconcile(record) -> Optional[OrderResult]:
+            try:
+                result = await self.client.query_order(record['order']['symbol'], orig_client_order_id=record['client_order_id'])
+            except Exception as e:
+                result = self._reconcile_error(record, e)
+            return self._reconciled(record, result) if result is not None else None
+        
+        results = await asyncio.gather(*(_reconcile(record) for record in self.journal.unresolved()))
+        return [result for result in results if result is not None]
+    
+    async def cancel_order(self, symbol: str, order_id: Optional[int] = None, client_order_id: Optional[str] = None) -> OrderResult:
+        """Cancel an open order and drop it from the open-order index."""
+        with correlation_scope(client_order_id), self.metrics.timer('order_stage_seconds', stage='cancel', symbol=symbol.upper()):
+            try:
+                result = await self.client.cancel_order(symbol, order_id, client_order_id)
+            except Exception as e:
+                self._lifecycle_failed('cancel', e, order_id, client_order_id)
+                raise
+        return self._lifecycle_done('cancelled', result)
+    
+    async def cancel_orders(self, symbol: str, order_ids: Optional[List[int]] = None,
+                            client_order_ids: Optional[List[str]] = None) -> List[OrderResult]:
+        """Cancel many orders of one symbol through the batch endpoint; one result per ID, order IDs first."""
+        with self.metrics.timer('order_stage_seconds', stage='cancel', symbol=symbol.upper()):
+            results = await self.client.cancel_orders(symbol, order_ids, client_order_ids)
+        self._apply_cancel_results(results, order_ids, client_order_ids)
+        return results
+    
+    async def cancel_all_orders(self, symbol: str) -> Dict[str, Any]:
+        """Cancel every open order of ``symbol`` with one request."""
+        with self.metrics.timer('order_stage_seconds', stage='cancel', symbol=symbol.upper()):
+            response = await self.client.cancel_all_orders(symbol)
+        self._all_cancelled(symbol)
+        return response
+    
+    async def modify_order(self, order_id: Optional[int] = None, client_order_id: Optional[str] = None,
+                           price: Optional[Number] = None, quantity: Optional[Number] = None) -> OrderResult:
+        """Amend an open LIMIT order in place; see ``OrderManager.modify_order``."""
+        await self._refresh_symbols_if_stale()
+        current, amended = self._prepare_amendment(order_id, client_order_id, price, quantity)
+        with correlation_scope(current.get('clientOrderId')), \
+                self.metrics.timer('order_stage_seconds', stage='modify', symbol=amended.symbol):
+            try:
+                result = await self.client.modify_order(amended.symbol, amended.side, amended.quantity, amended.price,
+                                                        order_id=current['orderId'])
+            except Exception as e:
+                self._lifecycle_failed('modify', e, current['orderId'])
+                raise
+            finally:
+                self._release(amended)
+        return self._lifecycle_done('modified', result)
+    
+    async def replace_order(self, order: Order, order_id: Optional[int] = None, client_order_id: Optional[str] = None) -> OrderResult:
+        """Move an open order to ``order``; see ``OrderManager.replace_order``."""
+        current = self.open_orders.get(order_id, client_order_id)
+        if self._amendable(current, order):
+            return await self.modify_order(current['orderId'], price=order.price, quantity=order.quantity)
+        await self.cancel_order(current['symbol'] if current else order.symbol, order_id, client_order_id)
+        return await self.place_order(order)
+    
+    async def refresh_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Reload the open-order index (or one symbol's part of it) from the exchange."""
+        orders = await self.client.get_open_orders(symbol)
+        self.open_orders.replace(orders, symbol)
+        return orders
+    
+    async def get_position_risk(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Positions from the exchange (network call; see ``get_position`` for the streamed cache)."""
+        return await self.client.get_position_risk(symbol)
+    
+    async def place_signal(self, signal: 'Signal', quantity: Number, order_type: str = 'MARKET', reduce_only: bool = False) -> OrderResult:
+        """Turn a strategy signal into an order and place it (LIMIT orders use the signal's price)."""
+        return await self.place_order(self._signal_order(signal, quantity, order_type, reduce_only))
+    
+    async def place_orders_concurrently(self, orders: List[Order]) -> List[Union[OrderResult, Exception]]:
+        """Submit many orders at once as individual requests; results (or exceptions) are returned in input order."""
+        return await asyncio.gather(*(self.place_order(order) for order in orders), return_exceptions=True)
+    
+    async def place_orders(self, orders: List[Order]) -> List[OrderResult]:
+        """Validate and place many orders through the batch endpoint.
+        
+        Same contract as ``OrderManager.place_orders``; all batch chunks are
+        sent concurrently.
+        """
+        await self._refresh_symbols_if_stale()
+        to_send, errors = self._prepare_batch(orders)
+        try:
+            if self.journal is not None and to_send:
+                await asyncio.to_thread(self.journal.record_intents, to_send)
+            sent_results = await self.client.place_orders(to_send) if to_send else []
+        except Exception:
+            self._release_batch(to_send, [])
+            raise
+        return self._batch_sent(to_send, errors, sent_results)
+    
+    async def _refresh_symbols_if_stale(self) -> None:
+        if self.client.symbol_registry.is_stale:
+            await self.client.refresh_symbols()
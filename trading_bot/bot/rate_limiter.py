@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (IP request weight, 10s order count, 1m order count) per endpoint, from the USD-M futures API docs.
+# Endpoints not listed cost one unit of request weight and no orders.
+ENDPOINT_WEIGHTS: Dict[Tuple[str, str], Tuple[int, int, int]] = {
+    ('GET', '/fapi/v1/exchangeInfo'): (1, 0, 0),
+    ('GET', '/fapi/v1/time'): (1, 0, 0),
+    ('GET', '/fapi/v2/account'): (5, 0, 0),
+    ('GET', '/fapi/v2/balance'): (5, 0, 0),
+    ('GET', '/fapi/v2/positionRisk'): (5, 0, 0),
+    ('GET', '/fapi/v1/order'): (1, 0, 0),
+    ('GET', '/fapi/v1/openOrders'): (1, 0, 0),
+    ('GET', '/fapi/v1/klines'): (5, 0, 0),
+    ('GET', '/fapi/v1/aggTrades'): (20, 0, 0),
+    ('GET', '/fapi/v1/depth'): (10, 0, 0),
+    ('GET', '/fapi/v1/premiumIndex'): (1, 0, 0),
+    ('POST', '/fapi/v1/order'): (0, 1, 1),
+    ('PUT', '/fapi/v1/order'): (1, 1, 1),
+    ('DELETE', '/fapi/v1/order'): (1, 0, 0),
+    ('POST', '/fapi/v1/batchOrders'): (5, 5, 1),
+    ('PUT', '/fapi/v1/batchOrders'): (5, 5, 1),
+    ('DELETE', '/fapi/v1/batchOrders'): (1, 0, 0),
+    ('DELETE', '/fapi/v1/allOpenOrders'): (1, 0, 0),
+    ('POST', '/fapi/v1/listenKey'): (1, 0, 0),
+    ('PUT', '/fapi/v1/listenKey'): (1, 0, 0),
+    ('DELETE', '/fapi/v1/listenKey'): (1, 0, 0),
+}
+
+# Order book snapshot weight by ``limit``: (largest limit in the tier, weight). No limit means 500.
+DEPTH_WEIGHTS = ((50, 2), (100, 5), (500, 10), (1000, 20))
+
+# HTTP statuses worth retrying. 429/418 mean the request was rejected by the
+# rate limiter and never processed; 5xx may or may not have been processed.
+RATE_LIMIT_STATUSES = (418, 429)
+RETRYABLE_STATUSES = RATE_LIMIT_STATUSES + (500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Continuously refilling token bucket approximating a per-window limit."""
+
+    __slots__ = ('capacity', 'window', 'rate', 'tokens', 'updated')
+
+    def __init__(self, capacity: float, window: float):
+        self.capacity = capacity
+        self.window = window
+        self.rate = capacity / window
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` tokens and return how long the caller must wait for them."""
+        self._refill(now)
+        self.tokens -= amount
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def sync_used(self, used: float, now: float) -> None:
+        """Align with the server's view of how much of the window is already used."""
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter:
+    """Process-wide client-side limiter for request weight and order counts.
+
+    Requests reserve capacity before they are sent and wait when a limit
+    would be breached. Budgets are resynced from the X-MBX-USED-WEIGHT-1M and
+    X-MBX-ORDER-COUNT-* response headers, and a 429/418 pauses all callers.
+    ``headroom`` keeps a fraction of each limit unused as a safety margin.
+
+    Request weight is limited per IP and order counts per account: a
+    limiter made by ``for_account`` has its own order budgets but draws
+    weight from (and pauses with) the limiter it was made from.
+    """
+
+    def __init__(self, request_weight_per_minute: int = 2400, orders_per_10s: int = 300, orders_per_minute: int = 1200,
+                 headroom: float = 0.1, ip_limiter: Optional['RateLimiter'] = None):
+        scale = 1.0 - headroom
+        self.headroom = headroom
+        self.ip_limiter = ip_limiter
+        self.weight = ip_limiter.weight if ip_limiter is not None else TokenBucket(request_weight_per_minute * scale, 60.0)
+        self.orders_10s = TokenBucket(orders_per_10s * scale, 10.0)
+        self.orders_1m = TokenBucket(orders_per_minute * scale, 60.0)
+        # One lock per IP: account limiters reserve weight from the shared bucket
+        self._lock = ip_limiter._lock if ip_limiter is not None else threading.Lock()
+        self._paused_until = 0.0
+
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.total_requests = 0
+        self.delayed_requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.server_used_weight: Optional[int] = None
+        self.server_order_count_10s: Optional[int] = None
+        self.server_order_count_1m: Optional[int] = None
+
+    @staticmethod
+    def endpoint_cost(method: str, endpoint: str, params: Optional[Mapping[str, Any]] = None) -> Tuple[int, int, int]:
+        """Return (request weight, 10s order count, 1m order count) for an endpoint."""
+        if endpoint == '/fapi/v1/depth':
+            limit = int((params or {}).get('limit', 500))
+            return next((weight for largest, weight in DEPTH_WEIGHTS if limit <= largest), DEPTH_WEIGHTS[-1][1]), 0, 0
+        return ENDPOINT_WEIGHTS.get((method.upper(), endpoint), (1, 0, 0))
+
+    def for_account(self, orders_per_10s: int = 300, orders_per_minute: int = 1200) -> 'RateLimiter':
+        """A limiter with its own order-count budgets that shares this one's request weight and pauses."""
+        return RateLimiter(orders_per_10s=orders_per_10s, orders_per_minute=orders_per_minute, headroom=self.headroom,
+                           ip_limiter=self._ip)
+
+    @property
+    def _ip(self) -> 'RateLimiter':
+        return self.ip_limiter if self.ip_limiter is not None else self
+
+    def reserve(self, method: str, endpoint: str, params: Optional[Mapping[str, Any]] = None) -> float:
+        """Reserve capacity for one request and return the delay before it may be sent."""
+        weight, orders_10s, orders_1m = self.endpoint_cost(method, endpoint, params)
+        with self._lock:
+            now = time.monotonic()
+            delay = self.weight.reserve(weight, now) if weight else 0.0
+            if orders_10s:
+                delay = max(delay, self.orders_10s.reserve(orders_10s, now), self.orders_1m.reserve(orders_1m, now))
+            delay = max(delay, self._ip._paused_until - now)
+
+            self.total_requests += 1
+            if delay > 0:
+                self.delayed_requests += 1
+                self.total_wait += delay
+                self.max_wait = max(self.max_wait, delay)
+                self.queue_depth += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            return delay
+
+    def _release(self) -> None:
+        with self._lock:
+            self.queue_depth -= 1
+
+    def acquire(self, method: str, endpoint: str, params: Optional[Mapping[str, Any]] = None) -> None:
+        """Block until a request to ``endpoint`` fits within the limits."""
+        delay = self.reserve(method, endpoint, params)
+        if delay > 0:
+            logger.debug("Rate limiter delaying %s %s by %.3fs", method, endpoint, delay)
+            try:
+                time.sleep(delay)
+            finally:
+                self._release()
+
+    async def acquire_async(self, method: str, endpoint: str, params: Optional[Mapping[str, Any]] = None) -> None:
+        """Asyncio variant of ``acquire``."""
+        delay = self.reserve(method, endpoint, params)
+        if delay > 0:
+            logger.debug("Rate limiter delaying %s %s by %.3fs", method, endpoint, delay)
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._release()
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Resync budgets from the server's usage headers."""
+        # requests' CaseInsensitiveDict and the async client's lower-cased dict both accept lower-case keys
+        used_weight = headers.get('x-mbx-used-weight-1m')
+        count_10s = headers.get('x-mbx-order-count-10s')
+        count_1m = headers.get('x-mbx-order-count-1m')
+        with self._lock:
+            now = time.monotonic()
+            if used_weight is not None:
+                self.server_used_weight = int(used_weight)
+                self.weight.sync_used(self.server_used_weight, now)
+            if count_10s is not None:
+                self.server_order_count_10s = int(count_10s)
+                self.orders_10s.sync_used(self.server_order_count_10s, now)
+            if count_1m is not None:
+                self.server_order_count_1m = int(count_1m)
+                self.orders_1m.sync_used(self.server_order_count_1m, now)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for ``seconds`` (after a 429/418)."""
+        with self._lock:
+            ip = self._ip
+            ip._paused_until = max(ip._paused_until, time.monotonic() + seconds)
+        logger.warning(f"Rate limited by server; pausing requests for {seconds:.1f}s")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of limiter state for tuning throughput."""
+        with self._lock:
+            now = time.monotonic()
+            for bucket in (self.weight, self.orders_10s, self.orders_1m):
+                bucket._refill(now)
+            return {
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'total_requests': self.total_requests,
+                'delayed_requests': self.delayed_requests,
+                'total_wait_seconds': self.total_wait,
+                'max_wait_seconds': self.max_wait,
+                'avg_wait_seconds': self.total_wait / self.delayed_requests if self.delayed_requests else 0.0,
+                'available_weight': self.weight.tokens,
+                'available_orders_10s': self.orders_10s.tokens,
+                'available_orders_1m': self.orders_1m.tokens,
+                'server_used_weight_1m': self.server_used_weight,
+                'server_order_count_10s': self.server_order_count_10s,
+                'server_order_count_1m': self.server_order_count_1m,
+                'paused_for_seconds': max(0.0, self._ip._paused_until - now),
+            }
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server Retry-After."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+
+def should_retry(method: str, status: int) -> bool:
+    """Whether a failed response may be retried.
+
+    Rate-limit rejections are always safe to resend. Server errors are only
+    retried for GET, since a POST that failed with 5xx may still have been
+    executed by the exchange.
+    """
+    if status in RATE_LIMIT_STATUSES:
+        return True
+    return status in RETRYABLE_STATUSES and method.upper() == 'GET'
+
+
+_shared_rate_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """Return the limiter shared by every client in this process."""
+    global _shared_rate_limiter
+    with _shared_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter()
+        return _shared_rate_limiter
@@ -0,0 +1,329 @@
+import logging
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+from .metrics import MetricsRegistry, get_metrics
+from .models import Number, Order, OrderResult, to_decimal
+from .open_orders import OpenOrderIndex
+from .streams import AccountStateCache
+
+logger = logging.getLogger(__name__)
+
+_ZERO = Decimal(0)
+_POSITION_SIDES = ('BOTH', 'LONG', 'SHORT')
+
+
+class RiskRejected(ValueError):
+    """An order refused by a pre-trade risk check; ``check`` names the limit it would break."""
+
+    def __init__(self, check: str, message: str):
+        super().__init__(message)
+        self.check = check
+
+
+class RiskLimits:
+    """Pre-trade limits; any limit left as None is not checked.
+
+    ``max_position`` caps the absolute position per symbol in base quantity
+    (e.g. ``{'BTCUSDT': '0.5'}``); ``max_position_notional`` caps it in USDT
+    for every symbol. ``max_gross_notional``/``max_net_notional`` cap the sum
+    of absolute/signed position notionals across symbols, and
+    ``max_leverage`` caps gross notional over the USDT wallet balance.
+    ``price_band`` rejects prices more than that fraction away from the
+    mark price (0.05 = 5%); ``stop_price_band`` does the same for stop
+    prices, which are unchecked by default so stop-losses can sit far from
+    the market. ``max_orders_per_minute`` trips the kill switch when
+    exceeded.
+    """
+
+    def __init__(self, max_position: Optional[Dict[str, Number]] = None, max_position_notional: Optional[Number] = None,
+                 max_gross_notional: Optional[Number] = None, max_net_notional: Optional[Number] = None,
+                 max_leverage: Optional[Number] = None, price_band: Optional[Number] = Decimal('0.05'),
+                 max_orders_per_minute: Optional[int] = None, require_reference_price: bool = False,
+                 stop_price_band: Optional[Number] = None):
+        self.max_position = {symbol.upper(): to_decimal(limit) for symbol, limit in (max_position or {}).items()}
+        self.max_position_notional = _optional_decimal(max_position_notional)
+        self.max_gross_notional = _optional_decimal(max_gross_notional)
+        self.max_net_notional = _optional_decimal(max_net_notional)
+        self.max_leverage = _optional_decimal(max_leverage)
+        self.price_band = _optional_decimal(price_band)
+        self.stop_price_band = _optional_decimal(stop_price_band)
+        self.max_orders_per_minute = max_orders_per_minute
+        self.require_reference_price = require_reference_price
+
+
+def _optional_decimal(value: Optional[Number]) -> Optional[Decimal]:
+    return to_decimal(value) if value is not None else None
+
+
+@lru_cache(maxsize=4096)
+def _unfilled(orig_qty: str, executed_qty: str) -> Decimal:
+    return Decimal(orig_qty) - Decimal(executed_qty)
+
+
+def _remaining(order: Dict[str, Any]) -> Decimal:
+    """Signed unfilled quantity of an open order dict."""
+    # Open orders carry quantities as strings; the same few values recur on every check
+    remaining = _unfilled(str(order.get('origQty') or 0), str(order.get('executedQty') or 0))
+    return remaining if order.get('side') == 'BUY' else -remaining
+
+
+class RiskEngine:
+    """Pre-trade risk checks computed from local state only.
+
+    Positions, balances and mark prices come from an ``AccountStateCache``;
+    open orders from the order manager's ``OpenOrderIndex``. Gross and net
+    notional are kept as running totals that ``handle_event`` updates for
+    the one symbol an event touches, so a check is a handful of dict reads
+    and Decimal operations and never does network I/O. Add ``handle_event``
+    as a stream listener (after the cache has applied the event), or call
+    ``sync`` after seeding the cache from REST snapshots.
+
+    An order that passes ``check`` is reserved as in-flight exposure until
+    ``release`` is called with its result, so concurrent orders and the
+    orders of one batch are checked against each other. Fills reported in
+    order results count towards the position, per order, until an
+    ACCOUNT_UPDATE for the symbol at or after the fill's update time
+    confirms them; a fill whose ACCOUNT_UPDATE was applied before the
+    result arrived is never counted twice.
+
+    Position and notional checks only refuse orders that increase exposure,
+    so a book over its limits can always be reduced. Reduce-only orders skip
+    them entirely; the price band, the order rate limit and the kill switch
+    apply to every order.
+    """
+
+    def __init__(self, limits: RiskLimits, state_cache: AccountStateCache, metrics: Optional[MetricsRegistry] = None):
+        self.limits = limits
+        self.state_cache = state_cache
+        self.metrics = metrics or get_metrics()
+        self.kill_switch_reason: Optional[str] = None
+        self._lock = threading.Lock()
+        self._notional: Dict[str, Decimal] = {}
+        self._gross = _ZERO
+        self._net = _ZERO
+        # symbol -> order ID -> (update time, signed executed quantity)
+        self._unconfirmed: Dict[str, Dict[Any, Tuple[Optional[int], Decimal]]] = {}
+        self._confirmed_until: Dict[str, int] = {}
+        self._in_flight: Dict[str, Decimal] = {}
+        self._order_times: Deque[float] = deque()
+        self.sync()
+        self.metrics.register_gauges('risk', self.stats)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'gross_notional': float(self._gross),
+            'net_notional': float(self._net),
+            'kill_switch': int(self.kill_switch_reason is not None),
+            'orders_last_minute': len(self._order_times),
+        }
+
+    # --- state -----------------------------------------------------------
+
+    def sync(self) -> None:
+        """Recompute every symbol's exposure from the cache."""
+        symbols = {symbol for symbol, _ in self.state_cache.positions} | set(self._unconfirmed)
+        with self._lock:
+            self._notional.clear()
+            self._gross = self._net = _ZERO
+            for symbol in symbols:
+                self._refresh_symbol(symbol)
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        """Stream listener: keep exposure totals current as positions and mark prices change."""
+        event_type = event.get('e')
+        if event_type == 'markPriceUpdate':
+            symbols: Iterable[str] = (event['s'],) if event['s'] in self._notional else ()
+        elif event_type == 'ACCOUNT_UPDATE':
+            symbols = {p['s'] for p in event['a'].get('P', [])}
+        else:
+            return
+        with self._lock:
+            for symbol in symbols:
+                if event_type == 'ACCOUNT_UPDATE':
+                    self._confirm(symbol, event.get('T') or event.get('E') or 0)
+                self._refresh_symbol(symbol)
+
+    def _confirm(self, symbol: str, event_time: int) -> None:
+        """Drop the fills an ACCOUNT_UPDATE at ``event_time`` includes; caller holds the lock."""
+        self._confirmed_until[symbol] = max(self._confirmed_until.get(symbol, 0), event_time)
+        fills = self._unconfirmed.get(symbol)
+        if fills is None:
+            return
+        for key, (update_time, _) in list(fills.items()):
+            # A fill without an update time is confirmed by the next update
+            if update_time is None or update_time <= event_time:
+                del fills[key]
+        if not fills:
+            del self._unconfirmed[symbol]
+
+    def _position(self, symbol: str) -> Decimal:
+        positions = self.state_cache.positions
+        fills = self._unconfirmed.get(symbol)
+        amount = sum((filled for _, filled in fills.values()), _ZERO) if fills else _ZERO
+        for position_side in _POSITION_SIDES:
+            position = positions.get((symbol, position_side))
+            if position is not None:
+                amount += position.amount
+        return amount
+
+    def _reference_price(self, symbol: str) -> Optional[Decimal]:
+        """Mark price, else the book mid, else None."""
+        mark = self.state_cache.mark_prices.get(symbol)
+        if mark is not None:
+            return mark
+        ticker = self.state_cache.book_tickers.get(symbol)
+        if ticker is not None:
+            return (ticker.bid_price + ticker.ask_price) / 2
+        return None
+
+    def _refresh_symbol(self, symbol: str) -> None:
+        """Replace ``symbol``'s contribution to the gross and net totals; caller holds the lock."""
+        amount = self._position(symbol)
+        price = self._reference_price(symbol)
+        if price is None:
+            position = self.state_cache.positions.get((symbol, 'BOTH'))
+            price = position.entry_price if position is not None else _ZERO
+        notional = amount * price
+        previous = self._notional.pop(symbol, _ZERO)
+        self._gross += abs(notional) - abs(previous)
+        self._net += notional - previous
+        if notional:
+            self._notional[symbol] = notional
+
+    # --- kill switch -----------------------------------------------------
+
+    def trip_kill_switch(self, reason: str) -> None:
+        """Refuse every order until ``reset_kill_switch`` is called."""
+        if self.kill_switch_reason is None:
+            logger.error(f"Risk kill switch tripped: {reason}")
+            self.metrics.inc('risk_kill_switch_total')
+        self.kill_switch_reason = reason
+
+    def reset_kill_switch(self) -> None:
+        logger.warning(f"Risk kill switch reset (was: {self.kill_switch_reason})")
+        self.kill_switch_reason = None
+        with self._lock:
+            self._order_times.clear()
+
+    # --- checks ----------------------------------------------------------
+
+    def check(self, order: Order, open_orders: Optional[OpenOrderIndex] = None,
+              replacing: Optional[Dict[str, Any]] = None) -> None:
+        """Raise RiskRejected if ``order`` breaks a limit; otherwise reserve it until ``release``.
+
+        ``replacing`` is the open order an amendment would change; its
+        remaining quantity is no longer counted as resting exposure.
+        """
+        with self._lock:
+            try:
+                self._check(order, open_orders, replacing)
+            except RiskRejected as e:
+                self.metrics.inc('risk_rejections_total', check=e.check, symbol=order.symbol)
+                logger.warning(f"Risk check {e.check} rejected {order.describe()}: {e}")
+                raise
+            signed = order.quantity if order.side == 'BUY' else -order.quantity
+            self._in_flight[order.symbol] = self._in_flight.get(order.symbol, _ZERO) + signed
+
+    def release(self, order: Order, result: Optional[OrderResult] = None) -> None:
+        """End ``order``'s reservation; fills in ``result`` count until the exchange confirms them."""
+        signed = order.quantity if order.side == 'BUY' else -order.quantity
+        with self._lock:
+            remaining = self._in_flight.get(order.symbol, _ZERO) - signed
+            if remaining:
+                self._in_flight[order.symbol] = remaining
+            else:
+                self._in_flight.pop(order.symbol, None)
+            if result is not None and result.ok and result.executed_qty:
+                update_time = result.update_time
+                if update_time is not None and update_time <= self._confirmed_until.get(order.symbol, -1):
+                    return  # The position in the cache already includes this fill
+                filled = result.executed_qty if order.side == 'BUY' else -result.executed_qty
+                # executedQty is cumulative, so a later result for the same order replaces the earlier one
+                key = result.order_id if result.order_id is not None else result.client_order_id or id(result)
+                self._unconfirmed.setdefault(order.symbol, {})[key] = (update_time, filled)
+                self._refresh_symbol(order.symbol)
+
+    def _check(self, order: Order, open_orders: Optional[OpenOrderIndex], replacing: Optional[Dict[str, Any]]) -> None:
+        limits = self.limits
+        if self.kill_switch_reason is not None:
+            raise RiskRejected('kill_switch', f"Kill switch is active: {self.kill_switch_reason}")
+
+        if limits.max_orders_per_minute is not None:
+            now = time.monotonic()
+            times = self._order_times
+            while times and now - times[0] > 60.0:
+                times.popleft()
+            if len(times) >= limits.max_orders_per_minute:
+                self.trip_kill_switch(f"more than {limits.max_orders_per_minute} orders in one minute")
+                raise RiskRejected('kill_switch', f"Kill switch is active: {self.kill_switch_reason}")
+
+        symbol = order.symbol
+        reference = self._reference_price(symbol)
+        if reference is None and limits.require_reference_price:
+            raise RiskRejected('reference_price', f"No mark price for {symbol}")
+        if reference is not None:
+            for name, price, band in (('price', order.price, limits.price_band),
+                                      ('stop price', order.stop_price, limits.stop_price_band)):
+                if price is not None and band is not None and abs(price - reference) > reference * band:
+                    raise RiskRejected('price_band', f"{name.capitalize()} {price} is more than {float(band):.1%} "
+                                                     f"away from the mark price {reference}")
+
+        if not order.reduce_only:
+            self._check_exposure(order, open_orders, replacing, reference)
+
+        if limits.max_orders_per_minute is not None:
+            self._order_times.append(time.monotonic())
+
+    def _check_exposure(self, order: Order, open_orders: Optional[OpenOrderIndex], replacing: Optional[Dict[str, Any]],
+                        reference: Optional[Decimal]) -> None:
+        limits = self.limits
+        symbol = order.symbol
+        position = self._position(symbol)
+        signed = order.quantity if order.side == 'BUY' else -order.quantity
+        # Worst case: every in-flight order and every resting order on the order's side fills
+        pending = self._in_flight.get(symbol, _ZERO)
+        replaced = _ZERO
+        if open_orders is not None:
+            for resting in open_orders.orders(symbol):
+                if resting.get('side') != order.side or resting.get('reduceOnly'):
+                    continue
+                if replacing is not None and resting.get('orderId') == replacing.get('orderId'):
+                    replaced = _remaining(resting)
+                else:
+                    pending += _remaining(resting)
+        before = position + pending + replaced
+        after = before - replaced + signed
+        if abs(after) <= abs(before):
+            return  # Reduces exposure
+
+        max_position = limits.max_position.get(symbol)
+        if max_position is not None and abs(after) > max_position:
+            raise RiskRejected('max_position', f"Position in {symbol} could reach {after}, above the limit of {max_position}")
+
+        price = reference if reference is not None else order.price or order.stop_price
+        if price is None:
+            return  # Market order without a mark price: notional limits cannot be evaluated
+        notional = after * price
+        if limits.max_position_notional is not None and abs(notional) > limits.max_position_notional:
+            raise RiskRejected('max_position_notional', f"{symbol} notional could reach {abs(notional):.2f}, "
+                                                        f"above the limit of {limits.max_position_notional}")
+        current = self._notional.get(symbol, _ZERO)
+        gross = self._gross - abs(current) + abs(notional)
+        if limits.max_gross_notional is not None and gross > limits.max_gross_notional:
+            raise RiskRejected('max_gross_notional', f"Gross notional could reach {gross:.2f}, "
+                                                     f"above the limit of {limits.max_gross_notional}")
+        net = self._net - current + notional
+        if limits.max_net_notional is not None and abs(net) > limits.max_net_notional:
+            raise RiskRejected('max_net_notional', f"Net notional could reach {net:.2f}, "
+                                                   f"above the limit of {limits.max_net_notional}")
+        if limits.max_leverage is not None:
+            balance = self.state_cache.balances.get('USDT')
+            if balance is None or balance.wallet_balance <= 0:
+                raise RiskRejected('max_leverage', "No USDT wallet balance to compute leverage against")
+            leverage = gross / balance.wallet_balance
+            if leverage > limits.max_leverage:
+                raise RiskRejected('max_leverage', f"Leverage could reach {leverage:.2f}x, above the limit of {limits.max_leverage}x")
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import signal
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from .indicators import EMACrossover, Signal, SignalEngine
+from .metrics import MetricsRegistry, get_metrics
+from .models import Number, to_decimal
+from .orders import AsyncOrderManager
+from .streams import MarketDataStream
+
+logger = logging.getLogger(__name__)
+
+Tick = Tuple[str, float, Optional[int]]
+
+# Strategy state of the current worker process; each shard is a one-process pool
+_worker_engine: Optional[SignalEngine] = None
+
+
+def shard_for(symbol: str, shards: int) -> int:
+    """Stable shard index for ``symbol`` (crc32, so it is the same in every process and run)."""
+    return zlib.crc32(symbol.upper().encode('ascii')) % shards
+
+
+def _init_worker(strategy_factory: Callable[[str], Any]) -> None:
+    global _worker_engine
+    _worker_engine = SignalEngine(strategy_factory)
+
+
+def _compute_signals(ticks: List[Tick], engine: Optional[SignalEngine] = None) -> List[Signal]:
+    """Feed a batch of ticks, in order, to the strategies and return the signals they emit."""
+    engine = engine or _worker_engine
+    signals = []
+    for symbol, price, time_ms in ticks:
+        result = engine.on_price(symbol, price, time_ms)
+        if result is not None:
+            signals.append(result)
+    return signals
+
+
+class StrategyRunner:
+    """Runs strategy instances for many symbols on one asyncio loop.
+
+    Ticks are routed to a shard by ``shard_for(symbol)``. Each shard is a
+    single-process pool, so a symbol's strategy state lives in one worker
+    for the whole run and its ticks are processed in order; ticks that
+    arrive while a shard is busy are sent as the next batch. With
+    ``workers=0`` strategies run inline on the loop.
+
+    Signals go into a bounded order queue drained by ``order_concurrency``
+    tasks that share one order manager, and therefore one client, rate
+    limiter and connection pool. When the queue is full, shards stop
+    taking new batches and incoming ticks are buffered up to
+    ``max_pending_ticks`` per shard, dropping the oldest. Signals that
+    waited longer than ``max_signal_age`` seconds are discarded instead of
+    being traded late.
+
+    A batch whose strategy raises is logged, counted in
+    ``runner_batch_errors_total`` and dropped, and the shard carries on. If
+    the shard's worker process dies, it gets a fresh one, with fresh
+    strategy state.
+    """
+
+    def __init__(self, manager: AsyncOrderManager, symbols: Iterable[str], quantity: Number,
+                 strategy_factory: Callable[[str], Any] = EMACrossover, workers: int = 2, order_type: str = 'MARKET',
+                 max_pending_orders: int = 100, max_pending_ticks: int = 10000, order_concurrency: int = 4,
+                 max_signal_age: float = 5.0, metrics: Optional[MetricsRegistry] = None):
+        self.manager = manager
+        self.symbols = sorted({symbol.upper() for symbol in symbols})
+        if not self.symbols:
+            raise ValueError("At least one symbol is required")
+        self.quantity = to_decimal(quantity)
+        self.strategy_factory = strategy_factory
+        self.workers = workers
+        self.order_type = order_type.upper()
+        self.order_concurrency = order_concurrency
+        self.max_signal_age = max_signal_age
+        self.metrics = metrics or get_metrics()
+        shards = max(workers, 1)
+        self.max_pending_orders = max_pending_orders
+        self._pending: List[Deque[Tick]] = [deque(maxlen=max_pending_ticks) for _ in range(shards)]
+        self._wakeups: List[asyncio.Event] = []
+        self._orders: Optional[asyncio.Queue] = None
+        self._executors: List[ProcessPoolExecutor] = []
+        self._inline_engine = SignalEngine(strategy_factory) if workers == 0 else None
+        self._stopping: Optional[asyncio.Event] = None
+        self._accepting = False
+        self.metrics.register_gauges('runner', self.stats)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'pending_ticks': sum(len(pending) for pending in self._pending),
+            'pending_orders': self._orders.qsize() if self._orders is not None else 0,
+        }
+
+    # --- inputs ----------------------------------------------------------
+
+    def on_tick(self, symbol: str, price: float, time_ms: Optional[int] = None) -> None:
+        """Queue a price for ``symbol``'s strategy; must be called on the runner's loop."""
+        if not self._accepting:
+            return
+        shard = shard_for(symbol, len(self._pending))
+        pending = self._pending[shard]
+        if len(pending) == pending.maxlen:
+            self.metrics.inc('runner_ticks_dropped_total', shard=str(shard))
+        pending.append((symbol, price, time_ms))
+        self._wakeups[shard].set()
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """Stream listener: bookTicker events tick at the mid price, aggTrade/trade events at the trade price."""
+        event_type = event.get('e')
+        if event_type == 'bookTicker':
+            self.on_tick(event['s'], (float(event['b']) + float(event['a'])) / 2, event.get('T', event.get('E')))
+        elif event_type in ('aggTrade', 'trade'):
+            self.on_tick(event['s'], float(event['p']), event.get('T', event.get('E')))
+
+    # --- lifecycle -------------------------------------------------------
+
+    def stop(self) -> None:
+        """Request a graceful shutdown (safe to call from a signal handler on the loop)."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def run(self, stream: Optional[MarketDataStream] = None, drain_timeout: float = 10.0) -> None:
+        """Run until ``stop`` is called or SIGINT/SIGTERM is received.
+
+        ``stream`` (if given) is consumed with ``on_event`` as a listener.
+        On shutdown, no new ticks are accepted, in-flight batches finish,
+        and queued orders are given ``drain_timeout`` seconds to be sent.
+        """
+        loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._orders = asyncio.Queue(maxsize=self.max_pending_orders)
+        self._wakeups = [asyncio.Event() for _ in self._pending]
+        self._executors = [self._new_executor() for _ in range(self.workers)]
+        installed = []
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+                installed.append(signum)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform/thread; KeyboardInterrupt still works
+
+        if self.manager.client.symbol_registry.is_stale:
+            await self.manager.client.refresh_symbols()
+        shard_tasks = [asyncio.ensure_future(self._run_shard(index)) for index in range(len(self._pending))]
+        order_tasks = [asyncio.ensure_future(self._run_orders()) for _ in range(self.order_concurrency)]
+        stream_task = None
+        if stream is not None:
+            stream.add_listener(self.on_event)
+            stream_task = asyncio.ensure_future(stream.run())
+        self._accepting = True
+        logger.info(f"Strategy runner started: {len(self.symbols)} symbols, {len(self._pending)} shards, "
+                    f"{'inline' if not self.workers else f'{self.workers} worker processes'}")
+
+        try:
+            await self._stopping.wait()
+        finally:
+            logger.info("Strategy runner stopping")
+            self._accepting = False
+            if stream is not None:
+                await stream.stop()
+                stream_task.cancel()
+            for task in shard_tasks:
+                task.cancel()
+            await asyncio.gather(*shard_tasks, return_exceptions=True)
+            try:
+                await asyncio.wait_for(self._orders.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Shutdown: {self._orders.qsize()} queued orders not sent")
+            for task in order_tasks:
+                task.cancel()
+            await asyncio.gather(*order_tasks, return_exceptions=True)
+            for executor in self._executors:
+                executor.shutdown(wait=True, cancel_futures=True)
+            for signum in installed:
+                loop.remove_signal_handler(signum)
+            logger.info("Strategy runner stopped")
+
+    # --- workers ---------------------------------------------------------
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(self.strategy_factory,))
+
+    async def _run_shard(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        pending, wakeup = self._pending[index], self._wakeups[index]
+        while True:
+            await wakeup.wait()
+            wakeup.clear()
+            while pending:
+                batch = list(pending)
+                pending.clear()
+                self.metrics.inc('runner_ticks_total', len(batch), shard=str(index))
+                executor = self._executors[index] if self._executors else None
+                try:
+                    with self.metrics.timer('runner_batch_seconds', shard=str(index)):
+                        if executor is None:
+                            signals = _compute_signals(batch, self._inline_engine)
+                        else:
+                            signals = await loop.run_in_executor(executor, _compute_signals, batch)
+                except Exception as e:
+                    self.metrics.inc('runner_batch_errors_total', shard=str(index))
+                    logger.exception(f"Shard {index} dropped a batch of {len(batch)} ticks")
+                    if isinstance(e, BrokenProcessPool):
+                        logger.warning(f"Shard {index} worker died; starting a new one with fresh strategy state")
+                        executor.shutdown(wait=False)
+                        self._executors[index] = self._new_executor()
+                    continue
+                for result in signals:
+                    self.metrics.inc('runner_signals_total', symbol=result.symbol, side=result.side)
+                    # Blocks this shard while the order queue is full
+                    await self._orders.put((time.monotonic(), result))
+
+    async def _run_orders(self) -> None:
+        while True:
+            queued_at, result = await self._orders.get()
+            try:
+                if time.monotonic() - queued_at > self.max_signal_age:
+                    self.metrics.inc('runner_signals_stale_total', symbol=result.symbol)
+                    logger.warning(f"Dropping stale {result.side} signal for {result.symbol}")
+                    continue
+                await self.manager.place_signal(result, self.quantity, self.order_type)
+            except Exception as e:
+                logger.error(f"Order for {result.side} {result.symbol} signal failed: {e}")
+            finally:
+                self._orders.task_done()
@@ -0,0 +1,69 @@
+import base64
+import hashlib
+import hmac
+from typing import Any, Dict, Optional, Union
+from urllib.parse import quote, urlencode
+
+
+class HmacSigner:
+    """HMAC-SHA256 request signer for classic API secret keys.
+
+    The HMAC is keyed once at construction; each signature copies the keyed
+    state instead of re-deriving it from the secret.
+    """
+
+    key_type = 'HMAC_SHA256'
+
+    def __init__(self, api_secret: str):
+        self._mac = hmac.new(api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+
+    def sign(self, payload: bytes) -> str:
+        mac = self._mac.copy()
+        mac.update(payload)
+        return mac.hexdigest()
+
+
+class Ed25519Signer:
+    """Ed25519 request signer for Ed25519 API keys.
+
+    Requires the optional ``cryptography`` package. ``private_key`` is a PEM
+    encoded private key (str or bytes).
+    """
+
+    key_type = 'ED25519'
+
+    def __init__(self, private_key: Union[str, bytes], password: Optional[bytes] = None):
+        try:
+            from cryptography.hazmat.primitives.serialization import load_pem_private_key
+        except ImportError as e:
+            raise ImportError("Ed25519 API keys require the 'cryptography' package: pip install cryptography") from e
+        if isinstance(private_key, str):
+            private_key = private_key.encode('utf-8')
+        self._key = load_pem_private_key(private_key, password=password)
+
+    def sign(self, payload: bytes) -> str:
+        return base64.b64encode(self._key.sign(payload)).decode('ascii')
+
+
+Signer = Union[HmacSigner, Ed25519Signer]
+
+
+def create_signer(api_secret: Optional[str] = None, private_key: Optional[Union[str, bytes]] = None) -> Signer:
+    """Pick a signer for the configured key type: Ed25519 when a private key is given, HMAC otherwise."""
+    if private_key is not None:
+        return Ed25519Signer(private_key)
+    if not api_secret:
+        raise ValueError("Either an API secret or an Ed25519 private key is required")
+    return HmacSigner(api_secret)
+
+
+def build_query_string(params: Dict[str, Any]) -> str:
+    """Encode request parameters once, in insertion order."""
+    return urlencode(params)
+
+
+def sign_query_string(query_string: str, signer: Signer) -> str:
+    """Append the signature of exactly these bytes to the query string."""
+    signature = signer.sign(query_string.encode('utf-8'))
+    # Hex digests are URL-safe; base64 Ed25519 signatures need escaping
+    return f"{query_string}&signature={quote(signature, safe='')}"
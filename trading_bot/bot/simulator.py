@@ -0,0 +1,936 @@
+import bisect
+import csv
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+from typing import Any, Callable, Deque, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from .models import Order, OrderResult, format_decimal, to_decimal
+from .symbols import SymbolRegistry
+from .validators import check_order_filters
+
+logger = logging.getLogger(__name__)
+
+# Binance error codes returned by the simulator
+INVALID_SYMBOL = -1121
+FILTER_FAILURE = -1013
+NO_MARKET_PRICE = -2010
+UNKNOWN_ORDER = -2011
+NO_SUCH_ORDER = -2013
+INVALID_ORDER_TYPE = -1116
+INVALID_SIDE = -1117
+MARGIN_INSUFFICIENT = -2019
+WOULD_IMMEDIATELY_TRIGGER = -2021
+REDUCE_ONLY_REJECTED = -2022
+DUPLICATE_CLIENT_ORDER_ID = -4116
+POST_ONLY_REJECTED = -5022
+
+_ZERO = Decimal(0)
+
+DEFAULT_SYMBOLS = {
+    'BTCUSDT': {'tick_size': '0.10', 'step_size': '0.001', 'min_qty': '0.001', 'max_qty': '1000', 'min_notional': '5'},
+    'ETHUSDT': {'tick_size': '0.01', 'step_size': '0.001', 'min_qty': '0.001', 'max_qty': '10000', 'min_notional': '5'},
+}
+
+
+def simulated_exchange_info(symbols: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Any]:
+    """Build an exchangeInfo response for the given ``{symbol: filter spec}`` mapping."""
+    entries = []
+    for symbol, spec in (symbols or DEFAULT_SYMBOLS).items():
+        entries.append({
+            'symbol': symbol,
+            'status': 'TRADING',
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'tickSize': spec['tick_size'], 'minPrice': spec.get('min_price', spec['tick_size']),
+                 'maxPrice': spec.get('max_price', '10000000')},
+                {'filterType': 'LOT_SIZE', 'stepSize': spec['step_size'], 'minQty': spec['min_qty'], 'maxQty': spec['max_qty']},
+                {'filterType': 'MARKET_LOT_SIZE', 'stepSize': spec['step_size'], 'minQty': spec['min_qty'], 'maxQty': spec['max_qty']},
+                {'filterType': 'MIN_NOTIONAL', 'notional': spec.get('min_notional', '5')},
+            ],
+        })
+    return {'timezone': 'UTC', 'symbols': entries}
+
+
+class SimulatorError(Exception):
+    """An order or request rejected by the simulated exchange, with its Binance error code."""
+
+    def __init__(self, code: int, msg: str):
+        self.code = code
+        self.msg = msg
+        self.error_data = {'code': code, 'msg': msg}
+        super().__init__(f"{code}: {msg}")
+
+
+class SimulatedClock:
+    """Exchange time in milliseconds.
+
+    With ``speed=None`` time only moves when the simulator sets it (replay)
+    or ``advance`` is called, so runs are deterministic and as fast as the
+    CPU allows. With a ``speed`` factor it runs off the wall clock that many
+    times faster than real time, and ``wait_until`` sleeps accordingly.
+    """
+
+    def __init__(self, start_ms: Optional[int] = None, speed: Optional[float] = None):
+        self.speed = speed
+        self._now_ms = start_ms if start_ms is not None else int(time.time() * 1000)
+        self._wall_start = time.monotonic()
+
+    def now_ms(self) -> int:
+        if self.speed is None:
+            return self._now_ms
+        return self._now_ms + int((time.monotonic() - self._wall_start) * 1000 * self.speed)
+
+    def time(self) -> float:
+        return self.now_ms() / 1000
+
+    def set(self, now_ms: int) -> None:
+        """Jump to ``now_ms``; time never moves backwards."""
+        if self.speed is None:
+            if now_ms > self._now_ms:
+                self._now_ms = now_ms
+        elif now_ms > self.now_ms():
+            self._now_ms, self._wall_start = now_ms, time.monotonic()
+
+    def advance(self, seconds: float) -> None:
+        self.set(self.now_ms() + int(seconds * 1000))
+
+    def wait_until(self, now_ms: int) -> None:
+        """Sleep until the clock reaches ``now_ms`` (returns at once for a manual clock)."""
+        if self.speed is None:
+            self.set(now_ms)
+            return
+        remaining = (now_ms - self.now_ms()) / 1000 / self.speed
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+class SimOrder:
+    __slots__ = ('order_id', 'client_order_id', 'symbol', 'side', 'order_type', 'orig_type', 'quantity', 'price',
+                 'stop_price', 'time_in_force', 'reduce_only', 'executed_qty', 'cum_quote', 'status', 'update_time', 'resting')
+
+    def __init__(self, order_id: int, order: Order, client_order_id: str, now_ms: int):
+        self.order_id = order_id
+        self.client_order_id = client_order_id
+        self.symbol = order.symbol
+        self.side = order.side
+        self.order_type = order.order_type
+        self.orig_type = order.order_type
+        self.quantity = order.quantity
+        self.price = order.price
+        self.stop_price = order.stop_price
+        self.time_in_force = order.time_in_force or 'GTC'
+        self.reduce_only = order.reduce_only
+        self.executed_qty = _ZERO
+        self.cum_quote = _ZERO
+        self.status = 'NEW'
+        self.update_time = now_ms
+        self.resting = False
+
+    @property
+    def remaining(self) -> Decimal:
+        return self.quantity - self.executed_qty
+
+    @property
+    def avg_price(self) -> Decimal:
+        return self.cum_quote / self.executed_qty if self.executed_qty else _ZERO
+
+    def to_response(self) -> Dict[str, Any]:
+        """The order in the shape of a /fapi/v1/order response."""
+        return {
+            'orderId': self.order_id,
+            'symbol': self.symbol,
+            'status': self.status,
+            'clientOrderId': self.client_order_id,
+            'price': format_decimal(self.price or _ZERO),
+            'avgPrice': format_decimal(self.avg_price),
+            'origQty': format_decimal(self.quantity),
+            'executedQty': format_decimal(self.executed_qty),
+            'cumQuote': format_decimal(self.cum_quote),
+            'timeInForce': self.time_in_force,
+            'type': self.order_type,
+            'origType': self.orig_type,
+            'reduceOnly': self.reduce_only,
+            'side': self.side,
+            'positionSide': 'BOTH',
+            'stopPrice': format_decimal(self.stop_price or _ZERO),
+            'updateTime': self.update_time,
+        }
+
+
+class OrderBook:
+    """Resting limit orders for one symbol in price-time priority.
+
+    Each side keeps a sorted list of price levels and a FIFO queue per
+    level. ``lo``/``hi`` are float trigger bounds: a trade strictly between
+    them can neither fill a resting order nor trigger a stop, which lets the
+    replay loop skip it with two comparisons.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids: Dict[Decimal, Deque[SimOrder]] = {}
+        self.asks: Dict[Decimal, Deque[SimOrder]] = {}
+        self.bid_prices: List[Decimal] = []  # ascending; best bid last
+        self.ask_prices: List[Decimal] = []  # ascending; best ask first
+        self.buy_stops: List[SimOrder] = []
+        self.sell_stops: List[SimOrder] = []
+        self.last_price: Optional[Decimal] = None
+        self.last_price_float = math.nan
+        self.lo = -math.inf
+        self.hi = math.inf
+
+    def best_bid(self) -> Optional[Decimal]:
+        return self.bid_prices[-1] if self.bid_prices else None
+
+    def best_ask(self) -> Optional[Decimal]:
+        return self.ask_prices[0] if self.ask_prices else None
+
+    def _side(self, side: str) -> Tuple[Dict[Decimal, Deque[SimOrder]], List[Decimal]]:
+        return (self.bids, self.bid_prices) if side == 'BUY' else (self.asks, self.ask_prices)
+
+    def add(self, order: SimOrder) -> None:
+        levels, prices = self._side(order.side)
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = deque()
+            bisect.insort(prices, order.price)
+        level.append(order)
+
+    def remove(self, order: SimOrder) -> None:
+        levels, prices = self._side(order.side)
+        level = levels.get(order.price)
+        if level is None:
+            return
+        try:
+            level.remove(order)
+        except ValueError:
+            return
+        if not level:
+            self._drop_level(levels, prices, order.price)
+
+    @staticmethod
+    def _drop_level(levels: Dict[Decimal, Deque[SimOrder]], prices: List[Decimal], price: Decimal) -> None:
+        del levels[price]
+        del prices[bisect.bisect_left(prices, price)]
+
+    def crossing(self, side: str, limit: Optional[Decimal]):
+        """Yield resting orders an incoming ``side`` order at ``limit`` (None = any price) would trade with, best first.
+
+        Levels emptied by the consumer are dropped as iteration moves past them.
+        """
+        levels, prices = self._side('SELL' if side == 'BUY' else 'BUY')
+        while prices:
+            price = prices[0] if side == 'BUY' else prices[-1]
+            if limit is not None and (price > limit if side == 'BUY' else price < limit):
+                return
+            level = levels[price]
+            while level:
+                resting = level[0]
+                yield resting
+                if resting.remaining > 0:
+                    return  # consumer stopped short of filling it
+                level.popleft()
+            self._drop_level(levels, prices, price)
+
+    def liquidity(self, side: str, limit: Optional[Decimal]) -> Decimal:
+        """Quantity an incoming ``side`` order at ``limit`` could take from the book."""
+        levels, prices = self._side('SELL' if side == 'BUY' else 'BUY')
+        total = _ZERO
+        for price in (prices if side == 'BUY' else reversed(prices)):
+            if limit is not None and (price > limit if side == 'BUY' else price < limit):
+                break
+            total += sum(order.remaining for order in levels[price])
+        return total
+
+    def refresh_bounds(self) -> None:
+        lo = float(self.bid_prices[-1]) if self.bid_prices else -math.inf
+        hi = float(self.ask_prices[0]) if self.ask_prices else math.inf
+        if self.sell_stops:
+            lo = max(lo, float(max(order.stop_price for order in self.sell_stops)))
+        if self.buy_stops:
+            hi = min(hi, float(min(order.stop_price for order in self.buy_stops)))
+        self.lo, self.hi = lo, hi
+
+
+class SimPosition:
+    __slots__ = ('symbol', 'amount', 'entry_price', 'realized_pnl')
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.amount = _ZERO
+        self.entry_price = _ZERO
+        self.realized_pnl = _ZERO
+
+
+class MarketData(NamedTuple):
+    """Columnar trade prints: parallel sequences of time (ms), price and quantity."""
+    times: Sequence[int]
+    prices: Sequence[float]
+    quantities: Sequence[float]
+
+
+class SimulatedExchange:
+    """In-process USDT-M futures exchange with the ``BinanceFuturesClient`` interface.
+
+    Orders from ``place_order``/``place_orders`` are matched in price-time
+    priority against resting orders, and against the market price (the
+    last replayed trade) for marketable remainders. Resting limits fill when
+    a replayed trade prints through their price; STOP and STOP_MARKET orders
+    trigger off the last price. Fills charge maker/taker fees and update a
+    one-way (BOTH) position with cross-margin checks on new orders.
+    Liquidation and funding are not modelled.
+
+    Fill and account events are delivered to ``add_listener`` callbacks in
+    the user-data stream format, so an ``AccountStateCache`` can track the
+    simulated account exactly as it tracks a live one.
+    """
+
+    def __init__(self, balance: Any = 10000, exchange_info: Optional[Dict[str, Any]] = None, leverage: int = 20,
+                 maker_fee: Any = '0.0002', taker_fee: Any = '0.0004', clock: Optional[SimulatedClock] = None,
+                 fill_on_touch: bool = False, cap_fills_to_volume: bool = True):
+        self.clock = clock or SimulatedClock()
+        self.exchange_info = exchange_info or simulated_exchange_info()
+        self.symbol_registry = SymbolRegistry(self.get_exchange_info, ttl=math.inf)
+        self.symbol_registry.load(self.exchange_info)
+        self.leverage = Decimal(leverage)
+        self.maker_fee = to_decimal(maker_fee)
+        self.taker_fee = to_decimal(taker_fee)
+        self.fill_on_touch = fill_on_touch
+        self.cap_fills_to_volume = cap_fills_to_volume
+        self.wallet_balance = to_decimal(balance)
+        self.fees_paid = _ZERO
+        self.books: Dict[str, OrderBook] = {}
+        self.positions: Dict[str, SimPosition] = {}
+        self.orders: Dict[int, SimOrder] = {}
+        # Every order ever accepted, for query_order
+        self.order_history: Dict[int, SimOrder] = {}
+        self.client_order_ids: Dict[str, SimOrder] = {}
+        self.trade_count = 0
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._order_margin = _ZERO
+        self._order_ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+    # --- client interface ------------------------------------------------
+
+    def get_exchange_info(self) -> Dict[str, Any]:
+        return self.exchange_info
+
+    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.symbol_registry.get_symbol_info(symbol)
+
+    def get_server_time(self) -> int:
+        return self.clock.now_ms()
+
+    def get_account_info(self) -> Dict[str, Any]:
+        with self._lock:
+            unrealized = self._unrealized_pnl()
+            position_margin = self._position_margin()
+            available = self.wallet_balance + unrealized - position_margin - self._order_margin
+            return {
+                'totalWalletBalance': format_decimal(self.wallet_balance),
+                'totalUnrealizedProfit': format_decimal(unrealized),
+                'totalMarginBalance': format_decimal(self.wallet_balance + unrealized),
+                'totalPositionInitialMargin': format_decimal(position_margin),
+                'totalOpenOrderInitialMargin': format_decimal(self._order_margin),
+                'availableBalance': format_decimal(available),
+                'maxWithdrawAmount': format_decimal(max(_ZERO, min(available, self.wallet_balance))),
+                'assets': [{
+                    'asset': 'USDT',
+                    'walletBalance': format_decimal(self.wallet_balance),
+                    'unrealizedProfit': format_decimal(unrealized),
+                    'marginBalance': format_decimal(self.wallet_balance + unrealized),
+                    'availableBalance': format_decimal(available),
+                    'crossWalletBalance': format_decimal(self.wallet_balance),
+                }],
+                'positions': [self._position_entry(position) for position in self.positions.values()],
+            }
+
+    def start_user_data_stream(self) -> str:
+        return 'simulated'
+
+    def keepalive_user_data_stream(self) -> None:
+        pass
+
+    def close_user_data_stream(self) -> None:
+        pass
+
+    def place_order(self, order: Order) -> OrderResult:
+        """Submit one order; raises SimulatorError when the exchange would reject it."""
+        with self._lock:
+            return OrderResult.from_response(self._submit(order).to_response())
+
+    def query_order(self, symbol: str, order_id: Optional[int] = None, orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Current state of an order; raises SimulatorError(-2013) if it was never accepted."""
+        with self._lock:
+            if order_id is not None:
+                sim = self.order_history.get(order_id)
+            else:
+                sim = self.client_order_ids.get(orig_client_order_id)
+            if sim is None or sim.symbol != symbol.upper():
+                raise SimulatorError(NO_SUCH_ORDER, 'Order does not exist.')
+            return OrderResult.from_response(sim.to_response())
+
+    def cancel_order(self, symbol: str, order_id: Optional[int] = None, orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Cancel an open order; raises SimulatorError(-2011) if it is not open."""
+        with self._lock:
+            sim = self._open_order(symbol, order_id, orig_client_order_id)
+            self._cancel(sim)
+            return OrderResult.from_response(sim.to_response())
+
+    def cancel_orders(self, symbol: str, order_ids: Optional[List[int]] = None,
+                      orig_client_order_ids: Optional[List[str]] = None) -> List[OrderResult]:
+        """Cancel several orders; failures come back as failed results, as from batchOrders."""
+        keys = [(order_id, None) for order_id in order_ids or ()] + [(None, client_id) for client_id in orig_client_order_ids or ()]
+        results = []
+        for order_id, client_order_id in keys:
+            try:
+                results.append(self.cancel_order(symbol, order_id, client_order_id))
+            except SimulatorError as e:
+                results.append(OrderResult.failure(e.msg, e.code, raw=e.error_data))
+        return results
+
+    def cancel_all_orders(self, symbol: str) -> Dict[str, Any]:
+        with self._lock:
+            for sim in [sim for sim in self.orders.values() if sim.symbol == symbol.upper()]:
+                self._cancel(sim)
+        return {'code': 200, 'msg': 'The operation of cancel all open order is done.'}
+
+    def modify_order(self, symbol: str, side: str, quantity: Any, price: Any, order_id: Optional[int] = None,
+                     orig_client_order_id: Optional[str] = None) -> OrderResult:
+        """Amend a resting LIMIT order.
+
+        As on Binance, the order keeps its queue position only when the price
+        is unchanged and the quantity does not grow; otherwise it is requeued
+        (and may trade immediately if the new price crosses).
+        """
+        quantity, price = to_decimal(quantity), to_decimal(price)
+        with self._lock:
+            sim = self._open_order(symbol, order_id, orig_client_order_id, NO_SUCH_ORDER)
+            if sim.order_type != 'LIMIT' or not sim.resting:
+                raise SimulatorError(INVALID_ORDER_TYPE, 'Only LIMIT orders can be modified.')
+            if side.upper() != sim.side:
+                raise SimulatorError(INVALID_SIDE, 'Invalid side.')
+            error = check_order_filters(self.symbol_registry.get_filters(sim.symbol), sim.side, 'LIMIT', quantity, price, None)
+            if error is None and quantity <= sim.executed_qty:
+                error = 'quantity must exceed the executed quantity'
+            if error is not None:
+                raise SimulatorError(FILTER_FAILURE, f"Filter failure: {error}")
+            book = self.books[sim.symbol]
+            keeps_priority = price == sim.price and quantity <= sim.quantity
+            if sim.time_in_force == 'GTX' and not keeps_priority:
+                current_price, sim.price = sim.price, price
+                marketable = self._is_marketable(book, sim)
+                sim.price = current_price
+                if marketable:
+                    raise SimulatorError(POST_ONLY_REJECTED, 'Due to the order could not be executed as maker, the Post Only order will be rejected.')
+            if not sim.reduce_only:
+                self._order_margin -= sim.remaining * sim.price / self.leverage
+            if not keeps_priority:
+                book.remove(sim)
+                sim.resting = False
+            sim.price, sim.quantity = price, quantity
+            sim.update_time = self.clock.now_ms()
+            self._emit_order(sim, 'AMENDMENT')
+            if keeps_priority:
+                if not sim.reduce_only:
+                    self._order_margin += sim.remaining * price / self.leverage
+            else:
+                self._execute(book, sim)
+            return OrderResult.from_response(sim.to_response())
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [sim.to_response() for sim in self.orders.values() if symbol is None or sim.symbol == symbol.upper()]
+
+    def get_position_risk(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        entries = []
+        with self._lock:
+            for position in self.positions.values():
+                if symbol is None or position.symbol == symbol.upper():
+                    entry = self._position_entry(position)
+                    entry['markPrice'] = format_decimal(self._mark_price(position.symbol))
+                    entry['unRealizedProfit'] = entry['unrealizedProfit']
+                    entries.append(entry)
+        return entries
+
+    def place_orders(self, orders: List[Order]) -> List[OrderResult]:
+        """Submit several orders; rejections come back as failed results, as from batchOrders."""
+        results = []
+        with self._lock:
+            for order in orders:
+                try:
+                    results.append(OrderResult.from_response(self._submit(order).to_response()))
+                except SimulatorError as e:
+                    results.append(OrderResult.failure(e.msg, e.code, raw=e.error_data))
+        return results
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Receive ORDER_TRADE_UPDATE / ACCOUNT_UPDATE events."""
+        self.listeners.append(callback)
+
+    # --- market data -----------------------------------------------------
+
+    def set_price(self, symbol: str, price: Any, quantity: Any = None) -> None:
+        """Print one market trade at ``price``, filling and triggering orders as a replayed trade would."""
+        with self._lock:
+            price = to_decimal(price)
+            self._on_trade(self._book(symbol.upper()), price, float(price),
+                           float(quantity) if quantity is not None else math.inf, self.clock.now_ms())
+
+    def get_last_price(self, symbol: str) -> Optional[Decimal]:
+        book = self.books.get(symbol.upper())
+        return book.last_price if book is not None else None
+
+    def replay(self, symbol: str, data: MarketData, on_tick: Optional[Callable[['SimulatedExchange', int], None]] = None,
+               tick_interval_ms: int = 60_000) -> int:
+        """Feed trade prints for ``symbol`` through the exchange; returns the number of events consumed.
+
+        ``on_tick(exchange, now_ms)`` is called every ``tick_interval_ms`` of
+        market time, before the first trade at or past the boundary, so a
+        strategy can place orders as the replay progresses. Trades that
+        cannot fill or trigger anything only move the last price and are
+        skipped in a tight loop. With a paced clock each event waits for its
+        timestamp.
+        """
+        times, prices, quantities = data
+        count = len(prices)
+        if not count:
+            return 0
+        book = self._book(symbol.upper())
+        paced = self.clock.speed is not None
+        interval = tick_interval_ms if on_tick is not None else 0
+        next_tick = times[0] if interval else math.inf
+        i = 0
+        while i < count:
+            lo, hi = book.lo, book.hi
+            j = i
+            if not paced:
+                for j in range(i, count):
+                    price = prices[j]
+                    if price <= lo or price >= hi or times[j] >= next_tick:
+                        break
+                else:
+                    j = count
+            if j > i:
+                # Nothing to match in between: just move the market
+                self._move_price(book, prices[j - 1], times[j - 1])
+                if j == count:
+                    break
+            if paced:
+                self.clock.wait_until(times[j])
+            if times[j] >= next_tick:
+                self.clock.set(times[j])
+                on_tick(self, times[j])
+                next_tick = times[j] - (times[j] - next_tick) % interval + interval
+            with self._lock:
+                price = prices[j]
+                self._on_trade(book, to_decimal(price), price, quantities[j] if self.cap_fills_to_volume else math.inf, times[j])
+            i = j + 1
+        return count
+
+    # --- matching --------------------------------------------------------
+
+    def _book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            if symbol not in self.symbol_registry:
+                raise SimulatorError(INVALID_SYMBOL, 'Invalid symbol.')
+            book = self.books[symbol] = OrderBook(symbol)
+        return book
+
+    def _move_price(self, book: OrderBook, price: float, now_ms: int) -> None:
+        if price != book.last_price_float:
+            book.last_price_float = price
+            book.last_price = to_decimal(price)
+        self.clock.set(now_ms)
+
+    def _submit(self, order: Order) -> SimOrder:
+        book = self._book(order.symbol)
+        filters = self.symbol_registry.get_filters(order.symbol)
+        error = check_order_filters(filters, order.side, order.order_type, order.quantity, order.price, order.stop_price)
+        if error is not None:
+            raise SimulatorError(FILTER_FAILURE, f"Filter failure: {error}")
+
+        existing = self.client_order_ids.get(order.client_order_id) if order.client_order_id is not None else None
+        if existing is not None and existing.status in ('NEW', 'PARTIALLY_FILLED'):
+            raise SimulatorError(DUPLICATE_CLIENT_ORDER_ID, 'ClientOrderId is duplicated.')
+
+        now_ms = self.clock.now_ms()
+        order_id = next(self._order_ids)
+        sim = SimOrder(order_id, order, order.client_order_id or f"sim{order_id}", now_ms)
+        position = self.positions.get(order.symbol)
+        amount = position.amount if position is not None else _ZERO
+
+        if order.reduce_only and not self._reduces_position(sim):
+            raise SimulatorError(REDUCE_ONLY_REJECTED, 'ReduceOnly Order is rejected.')
+
+        reference = order.price if order.price is not None else (order.stop_price or book.last_price)
+        if reference is None:
+            raise SimulatorError(NO_MARKET_PRICE, f"No market price for {order.symbol} yet")
+        if not order.reduce_only:
+            opening = order.quantity if (amount >= 0) == (order.side == 'BUY') else max(_ZERO, order.quantity - abs(amount))
+            required = opening * reference / self.leverage
+            if required > self._available_balance():
+                raise SimulatorError(MARGIN_INSUFFICIENT, 'Margin is insufficient.')
+
+        if order.order_type in ('STOP', 'STOP_MARKET'):
+            last = book.last_price
+            if last is not None and (last >= order.stop_price if order.side == 'BUY' else last <= order.stop_price):
+                raise SimulatorError(WOULD_IMMEDIATELY_TRIGGER, 'Order would immediately trigger.')
+            (book.buy_stops if order.side == 'BUY' else book.sell_stops).append(sim)
+            book.refresh_bounds()
+            self._accept(sim)
+            return sim
+
+        if sim.time_in_force == 'GTX' and order.order_type == 'LIMIT' and self._is_marketable(book, sim):
+            raise SimulatorError(POST_ONLY_REJECTED, 'Due to the order could not be executed as maker, the Post Only order will be rejected.')
+
+        self._accept(sim)
+        self._execute(book, sim)
+        return sim
+
+    def _open_order(self, symbol: str, order_id: Optional[int], client_order_id: Optional[str],
+                    missing_code: int = UNKNOWN_ORDER) -> SimOrder:
+        sim = self.order_history.get(order_id) if order_id is not None else self.client_order_ids.get(client_order_id)
+        if sim is None or sim.symbol != symbol.upper() or sim.order_id not in self.orders:
+            raise SimulatorError(missing_code, 'Unknown order sent.' if missing_code == UNKNOWN_ORDER else 'Order does not exist.')
+        return sim
+
+    def _cancel(self, sim: SimOrder) -> None:
+        book = self.books[sim.symbol]
+        if sim.resting:
+            book.remove(sim)
+            sim.resting = False
+            if not sim.reduce_only:
+                self._order_margin -= sim.remaining * sim.price / self.leverage
+        elif sim in book.buy_stops:
+            book.buy_stops.remove(sim)
+        elif sim in book.sell_stops:
+            book.sell_stops.remove(sim)
+        book.refresh_bounds()
+        self._finish(sim, 'CANCELED')
+
+    def _accept(self, sim: SimOrder) -> None:
+        self.orders[sim.order_id] = sim
+        self.order_history[sim.order_id] = sim
+        self.client_order_ids[sim.client_order_id] = sim
+        self._emit_order(sim, 'NEW')
+
+    def _is_marketable(self, book: OrderBook, order: SimOrder) -> bool:
+        best = book.best_ask() if order.side == 'BUY' else book.best_bid()
+        last = book.last_price
+        if order.side == 'BUY':
+            return (best is not None and order.price >= best) or (last is not None and order.price >= last)
+        return (best is not None and order.price <= best) or (last is not None and order.price <= last)
+
+    def _execute(self, book: OrderBook, order: SimOrder) -> None:
+        """Match an incoming MARKET/LIMIT order, then rest, expire or fill the remainder."""
+        limit = order.price if order.order_type == 'LIMIT' else None
+        last = book.last_price
+        market_fill = last is not None and (limit is None or (last <= limit if order.side == 'BUY' else last >= limit))
+
+        if order.time_in_force == 'FOK' and not market_fill and book.liquidity(order.side, limit) < order.quantity:
+            self._finish(order, 'EXPIRED')
+            return
+
+        for resting in book.crossing(order.side, limit):
+            quantity = min(order.remaining, resting.remaining)
+            self._fill(resting, quantity, resting.price, maker=True)
+            self._fill(order, quantity, resting.price, maker=False)
+            if order.remaining == 0:
+                break
+
+        if order.remaining > 0 and market_fill:
+            # Marketable remainder trades against outside liquidity at the last price
+            self._fill(order, order.remaining, last, maker=False)
+
+        if order.remaining > 0:
+            if order.order_type == 'MARKET' or order.time_in_force in ('IOC', 'FOK'):
+                self._finish(order, 'EXPIRED')
+            else:
+                book.add(order)
+                order.resting = True
+                if not order.reduce_only:
+                    self._order_margin += order.remaining * order.price / self.leverage
+        book.refresh_bounds()
+
+    def _on_trade(self, book: OrderBook, price: Decimal, price_float: float, volume: float, now_ms: int) -> None:
+        """Apply one market trade print: fill resting orders it traded through, then trigger stops."""
+        book.last_price, book.last_price_float = price, price_float
+        self.clock.set(now_ms)
+        remaining = Decimal(repr(volume)) if volume != math.inf else None
+
+        for side, prices in (('BUY', book.bid_prices), ('SELL', book.ask_prices)):
+            while prices and (remaining is None or remaining > 0):
+                level_price = prices[-1] if side == 'BUY' else prices[0]
+                if side == 'BUY':
+                    filled = level_price > price or (self.fill_on_touch and level_price == price)
+                else:
+                    filled = level_price < price or (self.fill_on_touch and level_price == price)
+                if not filled:
+                    break
+                resting = (book.bids if side == 'BUY' else book.asks)[level_price][0]
+                quantity = resting.remaining if remaining is None else min(resting.remaining, remaining)
+                self._fill(resting, quantity, resting.price, maker=True)
+                if remaining is not None:
+                    remaining -= quantity
+                if resting.remaining == 0:
+                    book.remove(resting)
+
+        triggered = [o for o in book.buy_stops if price >= o.stop_price] + [o for o in book.sell_stops if price <= o.stop_price]
+        if triggered:
+            book.buy_stops = [o for o in book.buy_stops if o not in triggered]
+            book.sell_stops = [o for o in book.sell_stops if o not in triggered]
+            for order in sorted(triggered, key=lambda o: o.order_id):
+                if order.reduce_only and not self._reduces_position(order):
+                    self._finish(order, 'EXPIRED')
+                    continue
+                order.order_type = 'LIMIT' if order.orig_type == 'STOP' else 'MARKET'
+                self._execute(book, order)
+        book.refresh_bounds()
+
+    def _fill(self, order: SimOrder, quantity: Decimal, price: Decimal, maker: bool) -> None:
+        if order.resting and not order.reduce_only:
+            self._order_margin -= quantity * order.price / self.leverage
+        notional = quantity * price
+        fee = notional * (self.maker_fee if maker else self.taker_fee)
+        order.executed_qty += quantity
+        order.cum_quote += notional
+        order.status = 'FILLED' if order.remaining == 0 else 'PARTIALLY_FILLED'
+        order.update_time = self.clock.now_ms()
+        realized = self._apply_position(order.symbol, quantity if order.side == 'BUY' else -quantity, price)
+        self.wallet_balance += realized - fee
+        self.fees_paid += fee
+        self.trade_count += 1
+        if order.status == 'FILLED':
+            order.resting = False
+            self.orders.pop(order.order_id, None)
+        if self.listeners:
+            self._emit_order(order, 'TRADE', last_qty=quantity, last_price=price, fee=fee, maker=maker, realized=realized)
+            self._emit_account(order.symbol)
+
+    def _finish(self, order: SimOrder, status: str) -> None:
+        order.status = status
+        order.update_time = self.clock.now_ms()
+        self.orders.pop(order.order_id, None)
+        self._emit_order(order, status)
+
+    # --- accounting ------------------------------------------------------
+
+    def _apply_position(self, symbol: str, signed_qty: Decimal, price: Decimal) -> Decimal:
+        """Update the position with a signed fill and return the realized PnL."""
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = SimPosition(symbol)
+        amount = position.amount
+        if amount == 0 or (amount > 0) == (signed_qty > 0):
+            new_amount = amount + signed_qty
+            position.entry_price = (abs(amount) * position.entry_price + abs(signed_qty) * price) / abs(new_amount)
+            position.amount = new_amount
+            return _ZERO
+
+        closed = min(abs(amount), abs(signed_qty))
+        realized = closed * (price - position.entry_price) * (1 if amount > 0 else -1)
+        position.amount = amount + signed_qty
+        if position.amount == 0:
+            position.entry_price = _ZERO
+        elif (position.amount > 0) != (amount > 0):
+            position.entry_price = price  # flipped: the remainder opened at this price
+        position.realized_pnl += realized
+        return realized
+
+    def _reduces_position(self, order: SimOrder) -> bool:
+        position = self.positions.get(order.symbol)
+        amount = position.amount if position is not None else _ZERO
+        return amount != 0 and (amount > 0) != (order.side == 'BUY') and order.remaining <= abs(amount)
+
+    def _mark_price(self, symbol: str) -> Decimal:
+        book = self.books.get(symbol)
+        position = self.positions.get(symbol)
+        if book is not None and book.last_price is not None:
+            return book.last_price
+        return position.entry_price if position is not None else _ZERO
+
+    def _unrealized_pnl(self) -> Decimal:
+        return sum((p.amount * (self._mark_price(s) - p.entry_price) for s, p in self.positions.items() if p.amount), _ZERO)
+
+    def _position_margin(self) -> Decimal:
+        return sum((abs(p.amount) * self._mark_price(s) / self.leverage for s, p in self.positions.items() if p.amount), _ZERO)
+
+    def _available_balance(self) -> Decimal:
+        return self.wallet_balance + self._unrealized_pnl() - self._position_margin() - self._order_margin
+
+    def _position_entry(self, position: SimPosition) -> Dict[str, Any]:
+        mark = self._mark_price(position.symbol)
+        return {
+            'symbol': position.symbol,
+            'positionSide': 'BOTH',
+            'positionAmt': format_decimal(position.amount),
+            'entryPrice': format_decimal(position.entry_price),
+            'unrealizedProfit': format_decimal(position.amount * (mark - position.entry_price)),
+            'notional': format_decimal(position.amount * mark),
+            'leverage': str(self.leverage),
+            'isolated': False,
+        }
+
+    # --- events ----------------------------------------------------------
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Simulator listener failed: {e}")
+
+    def _emit_order(self, order: SimOrder, execution_type: str, last_qty: Decimal = _ZERO, last_price: Decimal = _ZERO,
+                    fee: Decimal = _ZERO, maker: bool = False, realized: Decimal = _ZERO) -> None:
+        if not self.listeners:
+            return
+        now_ms = self.clock.now_ms()
+        self._emit({'e': 'ORDER_TRADE_UPDATE', 'E': now_ms, 'T': now_ms, 'o': {
+            's': order.symbol, 'c': order.client_order_id, 'S': order.side, 'o': order.order_type, 'f': order.time_in_force,
+            'q': format_decimal(order.quantity), 'p': format_decimal(order.price or _ZERO), 'ap': format_decimal(order.avg_price),
+            'sp': format_decimal(order.stop_price or _ZERO), 'x': execution_type, 'X': order.status, 'i': order.order_id,
+            'l': format_decimal(last_qty), 'z': format_decimal(order.executed_qty), 'L': format_decimal(last_price),
+            'N': 'USDT', 'n': format_decimal(fee), 'T': now_ms, 'm': maker, 'R': order.reduce_only, 'ps': 'BOTH',
+            'ot': order.orig_type, 'rp': format_decimal(realized),
+        }})
+
+    def _emit_account(self, symbol: str) -> None:
+        now_ms = self.clock.now_ms()
+        position = self.positions[symbol]
+        self._emit({'e': 'ACCOUNT_UPDATE', 'E': now_ms, 'T': now_ms, 'a': {
+            'm': 'ORDER',
+            'B': [{'a': 'USDT', 'wb': format_decimal(self.wallet_balance), 'cw': format_decimal(self.wallet_balance)}],
+            'P': [{'s': symbol, 'pa': format_decimal(position.amount), 'ep': format_decimal(position.entry_price),
+                   'up': format_decimal(position.amount * (self._mark_price(symbol) - position.entry_price)), 'ps': 'BOTH'}],
+        }})
+
+
+class AsyncSimulatedExchange:
+    """``AsyncBinanceFuturesClient`` interface over a SimulatedExchange.
+
+    Lets ``AsyncOrderManager`` (and anything built on it) run against the
+    simulator. Each call completes synchronously inside its coroutine, so
+    with a manual ``SimulatedClock`` a run is deterministic.
+    """
+
+    def __init__(self, exchange: SimulatedExchange):
+        self.exchange = exchange
+        self.symbol_registry = exchange.symbol_registry
+        self.clock = exchange.clock
+
+    async def refresh_symbols(self) -> None:
+        pass
+
+    async def get_exchange_info(self) -> Dict[str, Any]:
+        return self.exchange.get_exchange_info()
+
+    async def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.exchange.get_symbol_info(symbol)
+
+    async def get_server_time(self) -> int:
+        return self.exchange.get_server_time()
+
+    async def get_account_info(self) -> Dict[str, Any]:
+        return self.exchange.get_account_info()
+
+    async def place_order(self, order: Order) -> OrderResult:
+        return self.exchange.place_order(order)
+
+    async def place_orders(self, orders: List[Order]) -> List[OrderResult]:
+        return self.exchange.place_orders(orders)
+
+    async def query_order(self, symbol: str, order_id: Optional[int] = None,
+                          orig_client_order_id: Optional[str] = None) -> OrderResult:
+        return self.exchange.query_order(symbol, order_id, orig_client_order_id)
+
+    async def cancel_order(self, symbol: str, order_id: Optional[int] = None,
+                           orig_client_order_id: Optional[str] = None) -> OrderResult:
+        return self.exchange.cancel_order(symbol, order_id, orig_client_order_id)
+
+    async def cancel_orders(self, symbol: str, order_ids: Optional[List[int]] = None,
+                            orig_client_order_ids: Optional[List[str]] = None) -> List[OrderResult]:
+        return self.exchange.cancel_orders(symbol, order_ids, orig_client_order_ids)
+
+    async def cancel_all_orders(self, symbol: str) -> Dict[str, Any]:
+        return self.exchange.cancel_all_orders(symbol)
+
+    async def modify_order(self, symbol: str, side: str, quantity: Any, price: Any, order_id: Optional[int] = None,
+                           orig_client_order_id: Optional[str] = None) -> OrderResult:
+        return self.exchange.modify_order(symbol, side, quantity, price, order_id, orig_client_order_id)
+
+    async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.exchange.get_open_orders(symbol)
+
+    async def get_position_risk(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.exchange.get_position_risk(symbol)
+
+
+def market_data_from_columns(columns: Mapping[str, Sequence]) -> MarketData:
+    """Replay input from aggregate-trade columns (``time``, ``price``, ``qty``), e.g. ``MarketDataStore.agg_trades``."""
+    times, prices, quantities = (columns[name] for name in ('time', 'price', 'qty'))
+    # NumPy columns convert to Python scalars in one call
+    if hasattr(times, 'tolist'):
+        return MarketData(times.tolist(), prices.tolist(), quantities.tolist())
+    return MarketData([int(t) for t in times], [float(p) for p in prices], [float(q) for q in quantities])
+
+
+def load_market_csv(path: str) -> MarketData:
+    """Load trade prints from a Binance public-data CSV (aggTrades, trades or klines), with or without a header.
+
+    Klines are expanded into four prints per bar along open, the nearer
+    extreme, the farther extreme, close, each carrying a quarter of the
+    bar's volume.
+    """
+    times: List[int] = []
+    prices: List[float] = []
+    quantities: List[float] = []
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return MarketData(times, prices, quantities)
+        header = None
+        try:
+            float(first[0])
+        except ValueError:
+            header = [name.strip().lower() for name in first]
+            first = None
+        rows = itertools.chain([first], reader) if first is not None else reader
+        width = len(header) if header is not None else len(first)
+
+        if (header is not None and 'open' in header) or (header is None and width >= 11):
+            if header is not None:
+                t, o, h, l, c, v, ct = (header.index(n) for n in ('open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time'))
+            else:
+                t, o, h, l, c, v, ct = 0, 1, 2, 3, 4, 5, 6
+            for row in rows:
+                open_time, close_time = int(row[t]), int(row[ct])
+                step = (close_time - open_time) // 3
+                op, hi, lo, cl = float(row[o]), float(row[h]), float(row[l]), float(row[c])
+                quarter = float(row[v]) / 4
+                path_prices = (op, lo, hi, cl) if cl >= op else (op, hi, lo, cl)
+                for k, price in enumerate(path_prices):
+                    times.append(open_time + k * step)
+                    prices.append(price)
+                    quantities.append(quarter)
+            return MarketData(times, prices, quantities)
+
+        if header is not None:
+            p = header.index('price')
+            q = next(header.index(n) for n in ('qty', 'quantity') if n in header)
+            t = next(header.index(n) for n in ('transact_time', 'time', 'timestamp') if n in header)
+        elif width == 7:
+            p, q, t = 1, 2, 5  # aggTrades: id, price, qty, first id, last id, time, is_buyer_maker
+        else:
+            p, q, t = 1, 2, 4  # trades: id, price, qty, quote qty, time, is_buyer_maker
+        for row in rows:
+            times.append(int(row[t]))
+            prices.append(float(row[p]))
+            quantities.append(float(row[q]))
+    return MarketData(times, prices, quantities)
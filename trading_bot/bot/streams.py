@@ -0,0 +1,442 @@
+import asyncio
+import json
+import logging
+import threading
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .async_client import AsyncBinanceFuturesClient, AsyncHTTPError
+from .order_book import SNAPSHOT_EVENT, OrderBookManager
+from .rate_limiter import backoff_delay
+from .ws import ConnectionClosed, WebSocket, connect
+
+logger = logging.getLogger(__name__)
+
+TESTNET_WS_URL = "wss://stream.binancefuture.com"
+
+# Binance allows at most 200 streams on one combined-stream connection
+MAX_STREAMS_PER_CONNECTION = 200
+
+TERMINAL_ORDER_STATUSES = frozenset(('FILLED', 'CANCELED', 'EXPIRED', 'REJECTED', 'EXPIRED_IN_MATCH'))
+
+
+def order_from_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """An ORDER_TRADE_UPDATE event as an order dict with the same keys as the REST order endpoints."""
+    o = event['o']
+    return {
+        'orderId': o['i'],
+        'clientOrderId': o['c'],
+        'symbol': o['s'],
+        'side': o['S'],
+        'type': o['o'],
+        'timeInForce': o.get('f'),
+        'status': o['X'],
+        'price': o['p'],
+        'stopPrice': o.get('sp', '0'),
+        'origQty': o['q'],
+        'executedQty': o['z'],
+        'avgPrice': o.get('ap', '0'),
+        'positionSide': o.get('ps', 'BOTH'),
+        'reduceOnly': o.get('R', False),
+        'updateTime': o.get('T', event.get('E')),
+    }
+
+
+class Balance:
+    __slots__ = ('asset', 'wallet_balance', 'cross_wallet_balance')
+
+    def __init__(self, asset: str, wallet_balance: Decimal, cross_wallet_balance: Decimal):
+        self.asset = asset
+        self.wallet_balance = wallet_balance
+        self.cross_wallet_balance = cross_wallet_balance
+
+    def __repr__(self) -> str:
+        return f"Balance({self.asset}, wallet={self.wallet_balance})"
+
+
+class Position:
+    __slots__ = ('symbol', 'position_side', 'amount', 'entry_price', 'unrealized_pnl')
+
+    def __init__(self, symbol: str, position_side: str, amount: Decimal, entry_price: Decimal, unrealized_pnl: Decimal):
+        self.symbol = symbol
+        self.position_side = position_side
+        self.amount = amount
+        self.entry_price = entry_price
+        self.unrealized_pnl = unrealized_pnl
+
+    def __repr__(self) -> str:
+        return f"Position({self.symbol} {self.position_side}, amount={self.amount}, entry={self.entry_price})"
+
+
+class BookTicker:
+    __slots__ = ('symbol', 'bid_price', 'bid_qty', 'ask_price', 'ask_qty', 'update_id', 'time')
+
+    def __init__(self, symbol: str, bid_price: Decimal, bid_qty: Decimal, ask_price: Decimal, ask_qty: Decimal,
+                 update_id: int, time: int):
+        self.symbol = symbol
+        self.bid_price = bid_price
+        self.bid_qty = bid_qty
+        self.ask_price = ask_price
+        self.ask_qty = ask_qty
+        self.update_id = update_id
+        self.time = time
+
+    def __repr__(self) -> str:
+        return f"BookTicker({self.symbol}, bid={self.bid_price}, ask={self.ask_price})"
+
+
+class AccountStateCache:
+    """Local, incrementally updated view of account and market state.
+
+    Seeded from REST snapshots and kept current by user-data and market
+    stream events. Every getter is a local dict read, so order logic can
+    consult it without any network I/O. Updates happen under a lock; getters
+    return immutable values or copies.
+
+    Caches of several accounts can share their market state: a cache made
+    with ``market=other`` reads (and writes) ``other``'s book tickers, mark
+    prices and funding rates, so one market stream serves every account.
+    """
+
+    def __init__(self, market: Optional['AccountStateCache'] = None):
+        self._lock = threading.Lock()
+        self.balances: Dict[str, Balance] = {}
+        self.positions: Dict[Tuple[str, str], Position] = {}
+        self.open_orders: Dict[int, Dict[str, Any]] = {}
+        self.book_tickers: Dict[str, BookTicker] = market.book_tickers if market is not None else {}
+        self.mark_prices: Dict[str, Decimal] = market.mark_prices if market is not None else {}
+        self.funding_rates: Dict[str, Decimal] = market.funding_rates if market is not None else {}
+        self.last_event_time = 0
+
+    # --- snapshots -------------------------------------------------------
+
+    def apply_account_snapshot(self, account_info: Dict[str, Any]) -> None:
+        """Seed balances and positions from a /fapi/v2/account response."""
+        with self._lock:
+            for asset in account_info.get('assets', []):
+                self.balances[asset['asset']] = Balance(
+                    asset['asset'], Decimal(asset['walletBalance']), Decimal(asset.get('crossWalletBalance', asset['walletBalance'])))
+            for p in account_info.get('positions', []):
+                key = (p['symbol'], p.get('positionSide', 'BOTH'))
+                self.positions[key] = Position(
+                    p['symbol'], key[1], Decimal(p['positionAmt']), Decimal(p.get('entryPrice', '0')),
+                    Decimal(p.get('unrealizedProfit', '0')))
+
+    def apply_open_orders(self, orders: Iterable[Dict[str, Any]]) -> None:
+        """Replace the open order set with a /fapi/v1/openOrders response."""
+        with self._lock:
+            self.open_orders = {order['orderId']: dict(order) for order in orders}
+
+    # --- stream events ---------------------------------------------------
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        """Apply one user-data or market stream event."""
+        handler = self._handlers.get(event.get('e'))
+        if handler is not None:
+            handler(self, event)
+
+    def _on_order_update(self, event: Dict[str, Any]) -> None:
+        o = event['o']
+        with self._lock:
+            self.last_event_time = max(self.last_event_time, event.get('E', 0))
+            order_id = o['i']
+            if o['X'] in TERMINAL_ORDER_STATUSES:
+                self.open_orders.pop(order_id, None)
+                return
+            self.open_orders[order_id] = order_from_event(event)
+
+    def _on_account_update(self, event: Dict[str, Any]) -> None:
+        a = event['a']
+        with self._lock:
+            self.last_event_time = max(self.last_event_time, event.get('E', 0))
+            for b in a.get('B', []):
+                self.balances[b['a']] = Balance(b['a'], Decimal(b['wb']), Decimal(b.get('cw', b['wb'])))
+            for p in a.get('P', []):
+                key = (p['s'], p.get('ps', 'BOTH'))
+                self.positions[key] = Position(p['s'], key[1], Decimal(p['pa']), Decimal(p['ep']), Decimal(p.get('up', '0')))
+
+    def _on_book_ticker(self, event: Dict[str, Any]) -> None:
+        symbol = event['s']
+        current = self.book_tickers.get(symbol)
+        # Drop out-of-order updates
+        if current is not None and event['u'] < current.update_id:
+            return
+        self.book_tickers[symbol] = BookTicker(
+            symbol, Decimal(event['b']), Decimal(event['B']), Decimal(event['a']), Decimal(event['A']),
+            event['u'], event.get('T', event.get('E', 0)))
+
+    def _on_mark_price(self, event: Dict[str, Any]) -> None:
+        symbol = event['s']
+        self.mark_prices[symbol] = Decimal(event['p'])
+        if event.get('r'):
+            self.funding_rates[symbol] = Decimal(event['r'])
+
+    _handlers: Dict[str, Callable[['AccountStateCache', Dict[str, Any]], None]] = {
+        'ORDER_TRADE_UPDATE': _on_order_update,
+        'ACCOUNT_UPDATE': _on_account_update,
+        'bookTicker': _on_book_ticker,
+        'markPriceUpdate': _on_mark_price,
+    }
+
+    # --- readers ---------------------------------------------------------
+
+    def get_balance(self, asset: str = 'USDT') -> Optional[Balance]:
+        return self.balances.get(asset)
+
+    def get_position(self, symbol: str, position_side: str = 'BOTH') -> Optional[Position]:
+        return self.positions.get((symbol.upper(), position_side))
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            orders = list(self.open_orders.values())
+        if symbol is not None:
+            orders = [order for order in orders if order['symbol'] == symbol.upper()]
+        return orders
+
+    def get_book_ticker(self, symbol: str) -> Optional[BookTicker]:
+        return self.book_tickers.get(symbol.upper())
+
+    def get_mark_price(self, symbol: str) -> Optional[Decimal]:
+        return self.mark_prices.get(symbol.upper())
+
+
+class _ReconnectingStream:
+    """Websocket consumer that reconnects with backoff until stopped."""
+
+    def __init__(self, cache: Optional[AccountStateCache], ws_base_url: str = TESTNET_WS_URL):
+        self.cache = cache
+        self.ws_base_url = ws_base_url.rstrip('/')
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._stopped = False
+        self._sockets: List[WebSocket] = []
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call ``callback(event)`` for every event after it has been applied to the cache."""
+        self.listeners.append(callback)
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        if self.cache is not None:
+            self.cache.handle_event(event)
+        for callback in self.listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Stream listener failed: {e}")
+
+    async def _consume(self, url: str, on_connect: Optional[Callable[[], Any]] = None) -> None:
+        attempt = 0
+        while not self._stopped:
+            ws = None
+            try:
+                ws = await connect(url)
+                self._sockets.append(ws)
+                logger.info(f"Connected to stream {url.split('?')[0]}")
+                if on_connect is not None:
+                    await on_connect()
+                attempt = 0
+                async for message in ws:
+                    try:
+                        self._handle_message(json.loads(message))
+                    except Exception as e:
+                        # One bad frame must not end the stream
+                        logger.error(f"Dropped stream message {message[:200]!r}: {e!r}")
+                    if not self._should_reconnect():
+                        break
+            except (ConnectionClosed, OSError, asyncio.TimeoutError, AsyncHTTPError) as e:
+                # AsyncHTTPError: the resync after connecting failed; reconnecting retries it
+                logger.warning(f"Stream disconnected: {e}")
+                if ws is None:
+                    self._on_connect_failed()
+            finally:
+                if ws is not None:
+                    self._sockets.remove(ws)
+                    await ws.close()
+            if self._stopped or not self._should_reconnect():
+                return
+            delay = backoff_delay(attempt, base=1.0, cap=60.0)
+            attempt += 1
+            logger.info(f"Reconnecting stream in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _combined_urls(self, streams: List[str]) -> List[str]:
+        """Combined-stream URLs for ``streams``, at most 200 per connection."""
+        return [
+            f"{self.ws_base_url}/stream?streams=" + '/'.join(streams[i:i + MAX_STREAMS_PER_CONNECTION])
+            for i in range(0, len(streams), MAX_STREAMS_PER_CONNECTION)
+        ]
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        self._dispatch(message)
+
+    def _should_reconnect(self) -> bool:
+        return True
+
+    def _on_connect_failed(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        """Stop consuming and close open connections."""
+        self._stopped = True
+        for ws in list(self._sockets):
+            await ws.close()
+
+
+class UserDataStream(_ReconnectingStream):
+    """Consumes the user-data stream (order and account updates) into an AccountStateCache.
+
+    Manages the listenKey lifecycle: creates it, keeps it alive every
+    ``keepalive_interval`` seconds, and replaces it when it expires. The
+    account snapshot and the open orders are re-read after every
+    (re)connect, so changes made while disconnected are not lost;
+    ``add_snapshot_listener`` callbacks receive both, for indexes kept
+    outside the cache.
+    """
+
+    def __init__(self, client: AsyncBinanceFuturesClient, cache: AccountStateCache, ws_base_url: str = TESTNET_WS_URL,
+                 keepalive_interval: float = 30 * 60):
+        super().__init__(cache, ws_base_url)
+        self.client = client
+        self.keepalive_interval = keepalive_interval
+        self.listen_key: Optional[str] = None
+        self.snapshot_listeners: List[Callable[[Dict[str, Any], List[Dict[str, Any]]], None]] = []
+
+    def add_snapshot_listener(self, callback: Callable[[Dict[str, Any], List[Dict[str, Any]]], None]) -> None:
+        """Call ``callback(account_info, open_orders)`` after each resync has been applied to the cache."""
+        self.snapshot_listeners.append(callback)
+
+    async def _sync_snapshot(self) -> None:
+        account_info, open_orders = await asyncio.gather(self.client.get_account_info(), self.client.get_open_orders())
+        self.cache.apply_account_snapshot(account_info)
+        self.cache.apply_open_orders(open_orders)
+        for callback in self.snapshot_listeners:
+            try:
+                callback(account_info, open_orders)
+            except Exception as e:
+                logger.error(f"Snapshot listener failed: {e}")
+
+    async def _keepalive(self) -> None:
+        while not self._stopped:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self.client.keepalive_user_data_stream()
+            except Exception as e:
+                logger.warning(f"listenKey keepalive failed: {e}")
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        if message.get('e') == 'listenKeyExpired':
+            logger.warning("listenKey expired; reconnecting with a new key")
+            self.listen_key = None
+            return
+        self._dispatch(message)
+
+    async def run(self) -> None:
+        """Consume the stream until ``stop`` is called."""
+        keepalive = asyncio.ensure_future(self._keepalive())
+        attempt = 0
+        try:
+            while not self._stopped:
+                if self.listen_key is None:
+                    try:
+                        self.listen_key = await self.client.start_user_data_stream()
+                    except (OSError, asyncio.TimeoutError, AsyncHTTPError) as e:
+                        delay = backoff_delay(attempt, base=1.0, cap=60.0)
+                        attempt += 1
+                        logger.warning(f"Failed to create listenKey: {e}; retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    attempt = 0
+                await self._consume(f"{self.ws_base_url}/ws/{self.listen_key}", on_connect=self._sync_snapshot)
+        finally:
+            keepalive.cancel()
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self.listen_key is not None:
+            try:
+                await self.client.close_user_data_stream()
+            except Exception as e:
+                logger.warning(f"Failed to close listenKey: {e}")
+            self.listen_key = None
+
+    def _should_reconnect(self) -> bool:
+        # Return to run() so an expired listenKey is replaced before reconnecting
+        return self.listen_key is not None
+
+    def _on_connect_failed(self) -> None:
+        # The key may have expired while we were disconnected; request it again
+        self.listen_key = None
+
+
+class MarketDataStream(_ReconnectingStream):
+    """Consumes bookTicker and/or markPrice streams for a set of symbols into an AccountStateCache.
+
+    With ``agg_trade`` the symbols' aggTrade streams are subscribed too;
+    those events only reach listeners (e.g. an ExecutionScheduler counting
+    market volume).
+    """
+
+    def __init__(self, symbols: Iterable[str], cache: AccountStateCache, book_ticker: bool = True, mark_price: bool = True,
+                 ws_base_url: str = TESTNET_WS_URL, agg_trade: bool = False):
+        super().__init__(cache, ws_base_url)
+        self.streams = []
+        for symbol in symbols:
+            if book_ticker:
+                self.streams.append(f"{symbol.lower()}@bookTicker")
+            if mark_price:
+                self.streams.append(f"{symbol.lower()}@markPrice@1s")
+            if agg_trade:
+                self.streams.append(f"{symbol.lower()}@aggTrade")
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        # Combined streams wrap each event as {"stream": ..., "data": {...}}
+        self._dispatch(message.get('data', message))
+
+    async def run(self) -> None:
+        """Consume all streams until ``stop`` is called, one connection per 200 streams."""
+        await asyncio.gather(*(self._consume(url) for url in self._combined_urls(self.streams)))
+
+
+class DepthStream(_ReconnectingStream):
+    """Keeps local order books for a set of symbols from ``@depth`` diff streams.
+
+    The books live in ``self.books``, an OrderBookManager whose snapshots
+    come from ``client.get_order_book``. A reconnect needs no special
+    handling: the first event after it no longer chains on the last one
+    applied, so each affected book resyncs on its own. With ``record_path``
+    every event and snapshot is appended to a JSON-lines file that
+    ``order_book.replay_recording`` plays back.
+    """
+
+    def __init__(self, client: AsyncBinanceFuturesClient, symbols: Iterable[str], ws_base_url: str = TESTNET_WS_URL,
+                 update_speed: str = '100ms', snapshot_limit: int = 1000, max_concurrent_snapshots: int = 4,
+                 record_path: Optional[str] = None):
+        super().__init__(None, ws_base_url)
+        self.client = client
+        self.snapshot_limit = snapshot_limit
+        self.books = OrderBookManager(symbols, self._fetch_snapshot, max_concurrent_snapshots, client.metrics)
+        self.streams = [f"{symbol.lower()}@depth@{update_speed}" for symbol in self.books.books]
+        self._recording = open(record_path, 'a', encoding='utf-8') if record_path else None
+
+    async def _fetch_snapshot(self, symbol: str) -> Dict[str, Any]:
+        snapshot = await self.client.get_order_book(symbol, self.snapshot_limit)
+        self._record(dict(snapshot, e=SNAPSHOT_EVENT, s=symbol))
+        return snapshot
+
+    def _record(self, event: Dict[str, Any]) -> None:
+        if self._recording is not None:
+            self._recording.write(json.dumps(event, separators=(',', ':')) + '\n')
+
+    def _handle_message(self, message: Dict[str, Any]) -> None:
+        event = message.get('data', message)
+        self._record(event)
+        self.books.handle_event(event)
+        self._dispatch(event)
+
+    async def run(self) -> None:
+        """Consume all depth streams until ``stop`` is called, one connection per 200 symbols."""
+        try:
+            await asyncio.gather(*(self._consume(url) for url in self._combined_urls(self.streams)))
+        finally:
+            await self.books.close()
+            if self._recording is not None:
+                self._recording.close()
+                self._recording = None
@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolFilters:
+    """Pre-parsed trading rules for a single symbol."""
+
+    __slots__ = (
+        'symbol', 'status', 'price_precision', 'quantity_precision',
+        'tick_size', 'min_price', 'max_price',
+        'step_size', 'min_qty', 'max_qty',
+        'market_step_size', 'market_min_qty', 'market_max_qty',
+        'min_notional', 'multiplier_up', 'multiplier_down',
+    )
+
+    def __init__(self, symbol_info: Dict[str, Any]):
+        self.symbol = symbol_info['symbol']
+        self.status = symbol_info.get('status', 'TRADING')
+        self.price_precision = symbol_info.get('pricePrecision')
+        self.quantity_precision = symbol_info.get('quantityPrecision')
+        self.tick_size = self.min_price = self.max_price = None
+        self.step_size = self.min_qty = self.max_qty = None
+        self.market_step_size = self.market_min_qty = self.market_max_qty = None
+        self.min_notional = self.multiplier_up = self.multiplier_down = None
+
+        for f in symbol_info.get('filters', []):
+            filter_type = f.get('filterType')
+            if filter_type == 'PRICE_FILTER':
+                self.tick_size = _decimal(f.get('tickSize'))
+                self.min_price = _decimal(f.get('minPrice'))
+                self.max_price = _decimal(f.get('maxPrice'))
+            elif filter_type == 'LOT_SIZE':
+                self.step_size = _decimal(f.get('stepSize'))
+                self.min_qty = _decimal(f.get('minQty'))
+                self.max_qty = _decimal(f.get('maxQty'))
+            elif filter_type == 'MARKET_LOT_SIZE':
+                self.market_step_size = _decimal(f.get('stepSize'))
+                self.market_min_qty = _decimal(f.get('minQty'))
+                self.market_max_qty = _decimal(f.get('maxQty'))
+            elif filter_type == 'MIN_NOTIONAL':
+                # Futures uses 'notional', spot uses 'minNotional'
+                self.min_notional = _decimal(f.get('notional', f.get('minNotional')))
+            elif filter_type == 'PERCENT_PRICE':
+                self.multiplier_up = _decimal(f.get('multiplierUp'))
+                self.multiplier_down = _decimal(f.get('multiplierDown'))
+
+    @property
+    def is_trading(self) -> bool:
+        return self.status == 'TRADING'
+
+    def __repr__(self) -> str:
+        return f"SymbolFilters({self.symbol}, tick={self.tick_size}, step={self.step_size}, min_notional={self.min_notional})"
+
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    """Convert an exchangeInfo string to Decimal, treating zero as 'no limit'."""
+    if value is None:
+        return None
+    d = Decimal(str(value))
+    return d if d != 0 else None
+
+
+class SymbolRegistry:
+    """Cached, symbol-indexed view of /fapi/v1/exchangeInfo.
+
+    exchangeInfo is loaded once and kept for ``ttl`` seconds. Lookups are
+    plain dict reads; a stale registry is refreshed on the next lookup, or
+    continuously by a background thread started with ``start_background_refresh``.
+    Async callers without a blocking fetcher feed it through ``load``.
+    """
+
+    def __init__(self, fetch_exchange_info: Optional[Callable[[], Dict[str, Any]]] = None, ttl: float = 300.0):
+        self._fetch = fetch_exchange_info
+        self.ttl = ttl
+        self._symbols: Dict[str, Dict[str, Any]] = {}
+        self._filters: Dict[str, SymbolFilters] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.ttl
+
+    def refresh(self) -> None:
+        """Download exchangeInfo and rebuild the symbol index."""
+        if self._fetch is None:
+            raise RuntimeError("Symbol registry has no exchangeInfo source; call load() instead")
+        self.load(self._fetch())
+
+    def load(self, exchange_info: Dict[str, Any]) -> None:
+        """Rebuild the symbol index from an already downloaded exchangeInfo payload."""
+        symbols = {}
+        filters = {}
+        for symbol_info in exchange_info.get('symbols', []):
+            name = symbol_info['symbol']
+            symbols[name] = symbol_info
+            filters[name] = SymbolFilters(symbol_info)
+
+        # Swap both indexes in one step so readers never see a half-built view
+        self._symbols, self._filters = symbols, filters
+        self._loaded_at = time.monotonic()
+        logger.info(f"Symbol registry loaded {len(symbols)} symbols")
+
+    def _ensure_loaded(self) -> None:
+        if not self.is_stale:
+            return
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self.is_stale:
+                self.refresh()
+
+    def get_symbol_info(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get the raw exchangeInfo entry for a symbol."""
+        self._ensure_loaded()
+        return self._symbols.get(symbol.upper())
+
+    def get_filters(self, symbol: str) -> Optional[SymbolFilters]:
+        """Get pre-parsed filters for a symbol."""
+        self._ensure_loaded()
+        return self._filters.get(symbol.upper())
+
+    def __contains__(self, symbol: str) -> bool:
+        return self.get_filters(symbol) is not None
+
+    def start_background_refresh(self, interval: Optional[float] = None) -> None:
+        """Refresh exchangeInfo periodically on a daemon thread."""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        interval = interval if interval is not None else self.ttl / 2
+        self._stop_event.clear()
+
+        def _run():
+            while not self._stop_event.wait(interval):
+                try:
+                    with self._lock:
+                        self.refresh()
+                except Exception as e:
+                    # Keep serving the previous snapshot; the next tick retries
+                    logger.warning(f"Background symbol refresh failed: {e}")
+
+        self._refresh_thread = threading.Thread(target=_run, name='symbol-registry-refresh', daemon=True)
+        self._refresh_thread.start()
+
+    def stop_background_refresh(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=5)
+            self._refresh_thread = None
@@ -0,0 +1,114 @@
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Binance error code for "Timestamp for this request is outside of the recvWindow"
+TIMESTAMP_OUTSIDE_RECV_WINDOW = -1021
+
+
+class TimeSync:
+    """Estimates the offset between the local clock and Binance server time.
+
+    Each sample brackets a /fapi/v1/time call with local timestamps and
+    assumes the server stamped it half-way through the round trip. The
+    offset in use is taken from the lowest-RTT sample in a sliding window,
+    since that sample has the smallest error bound. ``timestamp()`` never
+    does I/O; callers run ``ensure_synced`` (or a background thread) to
+    keep samples fresh.
+    """
+
+    def __init__(self, fetch_server_time: Optional[Callable[[], int]] = None, window: int = 8, samples_per_sync: int = 3,
+                 resync_interval: float = 300.0):
+        self._fetch = fetch_server_time
+        self.samples_per_sync = samples_per_sync
+        self.resync_interval = resync_interval
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=window)  # (rtt_ms, offset_ms)
+        self._lock = threading.Lock()
+        self.offset_ms = 0.0
+        self.rtt_ms: Optional[float] = None
+        self.last_sync = 0.0
+        self.sync_count = 0
+        self._stop_event = threading.Event()
+        self._sync_thread: Optional[threading.Thread] = None
+
+    @property
+    def needs_sync(self) -> bool:
+        return self.last_sync == 0.0 or time.monotonic() - self.last_sync > self.resync_interval
+
+    def timestamp(self) -> int:
+        """Current server time estimate in milliseconds."""
+        return int(time.time() * 1000 + self.offset_ms)
+
+    def record_sample(self, sent_at: float, server_time_ms: int, received_at: float) -> None:
+        """Add one measurement; ``sent_at``/``received_at`` are local time.time() values around the request."""
+        rtt_ms = (received_at - sent_at) * 1000
+        offset_ms = server_time_ms - (sent_at + received_at) * 500
+        with self._lock:
+            self._samples.append((rtt_ms, offset_ms))
+            self.rtt_ms, self.offset_ms = min(self._samples)
+
+    def mark_synced(self) -> None:
+        self.last_sync = time.monotonic()
+        self.sync_count += 1
+        logger.info(f"Clock offset to server {self.offset_ms:+.1f}ms (rtt {self.rtt_ms:.1f}ms)")
+
+    def sync(self) -> None:
+        """Take ``samples_per_sync`` fresh samples from the server."""
+        if self._fetch is None:
+            raise RuntimeError("TimeSync has no server time source; record samples from the async client instead")
+        for _ in range(self.samples_per_sync):
+            sent_at = time.time()
+            server_time = self._fetch()
+            self.record_sample(sent_at, server_time, time.time())
+        self.mark_synced()
+
+    def ensure_synced(self) -> None:
+        """Sync if no sample has been taken yet or the last sync is older than ``resync_interval``."""
+        if self.needs_sync:
+            self.sync()
+
+    def reset(self) -> None:
+        """Drop all samples, e.g. after the exchange rejected our timestamp (-1021)."""
+        with self._lock:
+            self._samples.clear()
+        self.last_sync = 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Offset, RTT and jitter statistics over the current sample window."""
+        with self._lock:
+            offsets = [offset for _, offset in self._samples]
+        return {
+            'offset_ms': self.offset_ms,
+            'rtt_ms': self.rtt_ms,
+            'jitter_ms': statistics.pstdev(offsets) if len(offsets) > 1 else 0.0,
+            'samples': len(offsets),
+            'sync_count': self.sync_count,
+            'seconds_since_sync': time.monotonic() - self.last_sync if self.last_sync else None,
+        }
+
+    def start_background_sync(self) -> None:
+        """Resync every ``resync_interval`` seconds on a daemon thread."""
+        if self._sync_thread is not None and self._sync_thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def _run():
+            while not self._stop_event.wait(self.resync_interval):
+                try:
+                    self.sync()
+                except Exception as e:
+                    logger.warning(f"Background time sync failed: {e}")
+
+        self._sync_thread = threading.Thread(target=_run, name='time-sync', daemon=True)
+        self._sync_thread.start()
+
+    def stop_background_sync(self) -> None:
+        self._stop_event.set()
+        if self._sync_thread is not None:
+            self._sync_thread.join(timeout=5)
+            self._sync_thread = None
@@ -1,5 +1,8 @@
 import re
+from decimal import Decimal, InvalidOperation
 from typing import Optional
+from .models import Order, to_decimal
+from .symbols import SymbolFilters, SymbolRegistry
 
 def validate_symbol(symbol: str) -> bool:
     """Validate trading symbol format."""
@@ -18,25 +21,22 @@ def validate_order_type(order_type: str) -> bool:
     """Validate order type."""
     return order_type.upper() in ['MARKET', 'LIMIT', 'STOP_MARKET', 'STOP']
 
-def validate_quantity(quantity: str) -> Optional[float]:
-    """Validate and convert quantity to float."""
-    try:
-        qty = float(quantity)
-        if qty <= 0:
-            return None
-        return qty
-    except (ValueError, TypeError):
-        return None
+def validate_quantity(quantity: str) -> Optional[Decimal]:
+    """Validate and convert quantity to Decimal."""
+    return _positive_decimal(quantity)
+
+def validate_price(price: str) -> Optional[Decimal]:
+    """Validate and convert price to Decimal."""
+    return _positive_decimal(price)
 
-def validate_price(price: str) -> Optional[float]:
-    """Validate and convert price to float."""
+def _positive_decimal(value: str) -> Optional[Decimal]:
     try:
-        p = float(price)
-        if p <= 0:
-            return None
-        return p
-    except (ValueError, TypeError):
+        d = to_decimal(value.strip() if isinstance(value, str) else value)
+    except (InvalidOperation, ValueError, TypeError):
         return None
+    if not d.is_finite() or d <= 0:
+        return None
+    return d
 
 def validate_api_credentials(api_key: str, api_secret: str) -> bool:
     """Validate API credentials format."""
@@ -47,4 +47,113 @@ def validate_api_credentials(api_key: str, api_secret: str) -> bool:
     if len(api_key) < 10 or len(api_secret) < 10:
         return False
     
-    return True
\ No newline at end of file
+    return True
+
+# --- Exchange filter engine ------------------------------------------------
+
+def snap_to_step(value: Decimal, step: Optional[Decimal], rounding: str = 'down', origin: Optional[Decimal] = None) -> Decimal:
+    """Round value to ``origin`` plus a multiple of step ('down', 'up' or 'nearest').
+
+    Uses one remainder instead of divide, round and multiply, and returns
+    an already aligned value unchanged.
+    """
+    if step is None:
+        return value
+    remainder = (value - origin) % step if origin is not None else value % step
+    if not remainder:
+        return value
+    if remainder < 0:
+        # Decimal % takes the sign of the dividend; make it a floor remainder
+        remainder += step
+    down = value - remainder
+    if rounding == 'down':
+        return down
+    if rounding == 'up' or remainder * 2 >= step:
+        return down + step
+    return down
+
+def snap_quantity(filters: SymbolFilters, quantity: Decimal, order_type: str = 'LIMIT') -> Decimal:
+    """Round quantity down to the symbol's LOT_SIZE (or MARKET_LOT_SIZE) step."""
+    step = filters.step_size
+    if order_type == 'MARKET' and filters.market_step_size is not None:
+        step = filters.market_step_size
+    return snap_to_step(quantity, step, 'down')
+
+def snap_price(filters: SymbolFilters, price: Decimal, side: str) -> Decimal:
+    """Round price to the tick size, never in the direction that makes the order more aggressive."""
+    return snap_to_step(price, filters.tick_size, 'down' if side == 'BUY' else 'up', filters.min_price)
+
+def check_order_filters(filters: SymbolFilters, side: str, order_type: str, quantity: Decimal, price: Optional[Decimal] = None,
+                        stop_price: Optional[Decimal] = None, mark_price: Optional[Decimal] = None) -> Optional[str]:
+    """Check an order against exchange filters; return an error message or None if it passes."""
+    if not filters.is_trading:
+        return f"{filters.symbol} is not trading (status {filters.status})"
+    
+    if order_type == 'MARKET' and filters.market_min_qty is not None:
+        step, min_qty, max_qty = filters.market_step_size, filters.market_min_qty, filters.market_max_qty
+    else:
+        step, min_qty, max_qty = filters.step_size, filters.min_qty, filters.max_qty
+    if min_qty is not None and quantity < min_qty:
+        return f"Quantity {quantity} is below the minimum {min_qty}"
+    if max_qty is not None and quantity > max_qty:
+        return f"Quantity {quantity} is above the maximum {max_qty}"
+    if step is not None and quantity % step != 0:
+        return f"Quantity {quantity} is not a multiple of the step size {step}"
+    
+    min_price, tick_size = filters.min_price, filters.tick_size
+    for name, value in (('Price', price), ('Stop price', stop_price)):
+        if value is None:
+            continue
+        if min_price is not None and value < min_price:
+            return f"{name} {value} is below the minimum {min_price}"
+        if filters.max_price is not None and value > filters.max_price:
+            return f"{name} {value} is above the maximum {filters.max_price}"
+        # PRICE_FILTER: (price - minPrice) % tickSize == 0
+        if tick_size is not None and (value - (min_price or 0)) % tick_size != 0:
+            return f"{name} {value} is not a multiple of the tick size {filters.tick_size}"
+    
+    if price is not None and mark_price is not None and filters.multiplier_up is not None:
+        if side == 'BUY' and price > mark_price * filters.multiplier_up:
+            return f"Price {price} is more than {filters.multiplier_up}x the mark price {mark_price}"
+        if side == 'SELL' and price < mark_price * filters.multiplier_down:
+            return f"Price {price} is less than {filters.multiplier_down}x the mark price {mark_price}"
+    
+    reference_price = price if price is not None else (stop_price if stop_price is not None else mark_price)
+    if filters.min_notional is not None and reference_price is not None:
+        notional = quantity * reference_price
+        if notional < filters.min_notional:
+            return f"Order notional {notional} is below the minimum {filters.min_notional}"
+    
+    return None
+
+class OrderFilterEngine:
+    """Validates and snaps orders against cached exchangeInfo filters, with no network I/O."""
+    
+    def __init__(self, symbol_registry: SymbolRegistry):
+        self.symbol_registry = symbol_registry
+    
+    def prepare(self, order: Order, mark_price: Optional[Decimal] = None) -> Order:
+        """Snap quantity and prices to the symbol's step and tick sizes, then check every filter.
+        
+        Returns the snapped order (the same object if nothing changed). Raises
+        ValueError if the symbol is unknown or the exchange would reject the order.
+        """
+        filters = self.symbol_registry.get_filters(order.symbol)
+        if filters is None:
+            raise ValueError(f"Symbol {order.symbol} not found on exchange")
+        
+        qty = snap_quantity(filters, order.quantity, order.order_type)
+        price = snap_price(filters, order.price, order.side) if order.price is not None else None
+        stop_price = snap_to_step(order.stop_price, filters.tick_size, 'nearest', filters.min_price) if order.stop_price is not None else None
+        
+        error = check_order_filters(filters, order.side, order.order_type, qty, price, stop_price, mark_price)
+        if error is not None:
+            if qty != order.quantity:
+                error += f" (quantity {order.quantity} rounded down to the step size)"
+            raise ValueError(f"{filters.symbol}: {error}")
+        
+        if qty == order.quantity and price == order.price and stop_price == order.stop_price:
+            return order
+        # Positional construction: dataclasses.replace costs about as much as the rest of prepare
+        return Order(order.symbol, order.side, order.order_type, qty, price, stop_price, order.time_in_force,
+                     order.client_order_id, order.reduce_only)
@@ -0,0 +1,179 @@
+import asyncio
+import base64
+import hashlib
+import os
+import ssl
+import struct
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Minimal RFC 6455 client: enough for Binance's JSON text streams, with no
+# extensions or subprotocols.
+
+_WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class ConnectionClosed(Exception):
+    """The websocket was closed by either side."""
+
+    def __init__(self, code: Optional[int] = None, reason: str = ''):
+        self.code = code
+        self.reason = reason
+        super().__init__(f"WebSocket closed (code={code}, reason={reason!r})")
+
+
+def _mask(payload: bytes, key: bytes) -> bytes:
+    if not payload:
+        return payload
+    # XOR the whole payload at once as big integers instead of byte by byte
+    n = len(payload)
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(n, 'big')
+
+
+class WebSocket:
+    """Client side of an established websocket connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_size: int = 2 ** 22):
+        self.reader = reader
+        self.writer = writer
+        self.max_size = max_size
+        self.closed = False
+        self._write_lock = asyncio.Lock()
+
+    async def _send_frame(self, opcode: int, payload: bytes) -> None:
+        header = bytearray([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header.append(0x80 | length)
+        elif length < 2 ** 16:
+            header.append(0x80 | 126)
+            header += struct.pack('!H', length)
+        else:
+            header.append(0x80 | 127)
+            header += struct.pack('!Q', length)
+        key = os.urandom(4)
+        async with self._write_lock:
+            self.writer.write(bytes(header) + key + _mask(payload, key))
+            await self.writer.drain()
+
+    async def send(self, message: str) -> None:
+        """Send a text message."""
+        if self.closed:
+            raise ConnectionClosed()
+        await self._send_frame(OP_TEXT, message.encode('utf-8'))
+
+    async def ping(self, payload: bytes = b'') -> None:
+        await self._send_frame(OP_PING, payload)
+
+    async def _read_frame(self):
+        head = await self.reader.readexactly(2)
+        fin = head[0] & 0x80
+        opcode = head[0] & 0x0F
+        masked = head[1] & 0x80
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await self.reader.readexactly(8))[0]
+        if length > self.max_size:
+            raise ConnectionClosed(1009, 'message too big')
+        key = await self.reader.readexactly(4) if masked else None
+        payload = await self.reader.readexactly(length) if length else b''
+        if key:
+            payload = _mask(payload, key)
+        return fin, opcode, payload
+
+    async def recv(self) -> str:
+        """Receive the next text (or binary, decoded as UTF-8) message, answering pings transparently."""
+        if self.closed:
+            raise ConnectionClosed()
+        fragments = []
+        try:
+            while True:
+                fin, opcode, payload = await self._read_frame()
+                if opcode == OP_PING:
+                    await self._send_frame(OP_PONG, payload)
+                elif opcode == OP_PONG:
+                    continue
+                elif opcode == OP_CLOSE:
+                    code = struct.unpack('!H', payload[:2])[0] if len(payload) >= 2 else None
+                    await self._close_transport(code)
+                    raise ConnectionClosed(code, payload[2:].decode('utf-8', 'replace'))
+                else:
+                    fragments.append(payload)
+                    if fin:
+                        return b''.join(fragments).decode('utf-8')
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self.closed = True
+            self.writer.close()
+            raise ConnectionClosed(1006, str(e)) from e
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        try:
+            return await self.recv()
+        except ConnectionClosed:
+            raise StopAsyncIteration
+
+    async def _close_transport(self, code: Optional[int]) -> None:
+        if not self.closed:
+            self.closed = True
+            try:
+                await self._send_frame(OP_CLOSE, struct.pack('!H', code or 1000))
+            except (ConnectionError, RuntimeError):
+                pass
+            self.writer.close()
+
+    async def close(self, code: int = 1000) -> None:
+        """Close the connection."""
+        await self._close_transport(code)
+
+
+async def connect(url: str, timeout: float = 10.0, max_size: int = 2 ** 22) -> WebSocket:
+    """Open a websocket connection to a ws:// or wss:// URL."""
+    parts = urlsplit(url)
+    secure = parts.scheme == 'wss'
+    port = parts.port or (443 if secure else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{port}"
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port, ssl=ssl.create_default_context() if secure else None), timeout)
+
+    key = base64.b64encode(os.urandom(16))
+    request = (f"GET {path} HTTP/1.1\r\nHost: {host_header}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+               f"Sec-WebSocket-Key: {key.decode()}\r\nSec-WebSocket-Version: 13\r\n\r\n")
+    writer.write(request.encode('latin-1'))
+    await writer.drain()
+
+    try:
+        response = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout)
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+        writer.close()
+        raise ConnectionError(f"WebSocket handshake failed: {e}") from e
+
+    lines = response.decode('latin-1').split('\r\n')
+    status = lines[0].split(' ', 2)
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    expected_accept = base64.b64encode(hashlib.sha1(key + _WS_GUID).digest()).decode()
+    if len(status) < 2 or status[1] != '101' or headers.get('sec-websocket-accept') != expected_accept:
+        writer.close()
+        raise ConnectionError(f"WebSocket handshake failed: {lines[0]}")
+
+    return WebSocket(reader, writer, max_size=max_size)
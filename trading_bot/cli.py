@@ -4,16 +4,22 @@ Trading Bot CLI - Binance Futures Testnet
 """
 
 import argparse
+import csv
+import json
 import os
 import sys
-from typing import Optional
+from decimal import Decimal
+from typing import List
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from trading_bot.bot.logging_config import setup_logging
-from trading_bot.bot.client import BinanceFuturesClient
-from trading_bot.bot.orders import OrderManager
+# Only lightweight modules are imported up front; the HTTP clients (requests),
+# asyncio and numpy are imported by the code paths that use them, so --help,
+# argument errors and --via-daemon start in a fraction of the time.
+from trading_bot.bot import console
+from trading_bot.bot.daemon import DEFAULT_SOCKET_PATH
+from trading_bot.bot.models import Order
 from trading_bot.bot.validators import validate_api_credentials, validate_quantity, validate_price
 
 def get_api_credentials() -> tuple[str, str]:
@@ -55,6 +61,17 @@ Examples:
 
   # Check account info
   python cli.py --account-info
+
+  # Place every order in a CSV or JSON-lines file through the batch endpoint
+  python cli.py --batch-file orders.csv
+
+  # Trade EMA(12/26) crossovers continuously on several symbols (Ctrl+C to stop)
+  python cli.py --run --symbols BTCUSDT,ETHUSDT --quantity 0.01 --workers 2
+
+  # Keep a warm client in a local daemon, then send orders through it without prompting
+  python cli.py --daemon &
+  python cli.py --via-daemon --yes --symbol BTCUSDT --side BUY --type MARKET --quantity 0.001
+  python cli.py --stop-daemon
         """
     )
     
@@ -65,14 +82,84 @@ Examples:
     parser.add_argument('--price', type=str, help='Order price (required for LIMIT and STOP orders)')
     parser.add_argument('--stop-price', type=str, help='Stop price (required for STOP_MARKET and STOP orders)')
     parser.add_argument('--account-info', action='store_true', help='Show account information')
+    parser.add_argument('--batch-file', type=str, help='Place all orders from a .csv or .jsonl file (columns: symbol, side, type, quantity, price, stop_price)')
+    parser.add_argument('--run', action='store_true', help='Run strategies continuously on --symbols until interrupted')
+    parser.add_argument('--symbols', type=str, help='Comma-separated symbols for --run')
+    parser.add_argument('--workers', type=int, default=2, help='Strategy worker processes for --run (0 = inline)')
+    parser.add_argument('--fast', type=int, default=12, help='Fast EMA period for --run')
+    parser.add_argument('--slow', type=int, default=26, help='Slow EMA period for --run')
+    parser.add_argument('--max-pending-orders', type=int, default=100, help='Order queue size for --run before strategies are throttled')
+    parser.add_argument('--journal', type=str, default='journal/orders.wal', help='Order journal (write-ahead log) path')
+    parser.add_argument('--no-journal', action='store_true', help='Do not journal orders')
+    parser.add_argument('--log-format', choices=['text', 'json'], default='text', help='Log format: text, or JSON lines written from a background thread')
+    parser.add_argument('--daemon', action='store_true', help='Run a local daemon that keeps a warm client and serves --via-daemon calls')
+    parser.add_argument('--via-daemon', action='store_true', help='Send this order, batch or account query to the running daemon')
+    parser.add_argument('--stop-daemon', action='store_true', help='Ask the running daemon to shut down')
+    parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET_PATH, help='Daemon Unix socket path')
+    parser.add_argument('-y', '--yes', action='store_true', help='Place orders without asking for confirmation')
     
     return parser
 
+def load_batch_file(path: str) -> List[Order]:
+    """Load orders from a CSV (with header row) or JSON-lines file.
+    
+    Raises ValueError naming the offending line if any order is malformed.
+    """
+    with open(path, newline='') as f:
+        if path.lower().endswith(('.jsonl', '.json')):
+            rows = [(n, json.loads(line, parse_float=Decimal)) for n, line in enumerate(f, 1) if line.strip()]
+        else:
+            rows = list(enumerate(csv.DictReader(f), 2))
+    
+    orders = []
+    for line_no, row in rows:
+        row = {key.strip().lower().replace('-', '_'): value for key, value in row.items() if key}
+        order_type = str(row.get('type') or row.get('order_type') or '').upper()
+        quantity = validate_quantity(row.get('quantity'))
+        price = validate_price(row['price']) if row.get('price') not in (None, '') else None
+        stop_price = validate_price(row['stop_price']) if row.get('stop_price') not in (None, '') else None
+        
+        if not row.get('symbol') or not row.get('side') or not order_type:
+            raise ValueError(f"{path}:{line_no}: symbol, side and type are required")
+        if quantity is None:
+            raise ValueError(f"{path}:{line_no}: invalid quantity '{row.get('quantity')}'")
+        if row.get('price') not in (None, '') and price is None:
+            raise ValueError(f"{path}:{line_no}: invalid price '{row.get('price')}'")
+        if row.get('stop_price') not in (None, '') and stop_price is None:
+            raise ValueError(f"{path}:{line_no}: invalid stop price '{row.get('stop_price')}'")
+        
+        orders.append(Order.create(str(row['symbol']), str(row['side']), order_type, quantity, price, stop_price))
+    return orders
+
 def validate_args(args) -> bool:
     """Validate command line arguments."""
+    if args.daemon or args.stop_daemon:
+        return True
+    
     if args.account_info:
         return True
     
+    if args.batch_file:
+        if not os.path.isfile(args.batch_file):
+            print(f"❌ Error: Batch file '{args.batch_file}' not found!")
+            return False
+        return True
+    
+    if args.run:
+        if args.via_daemon:
+            print("❌ Error: --run cannot be used with --via-daemon")
+            return False
+        if not args.symbols or validate_quantity(args.quantity) is None:
+            print("❌ Error: --run requires --symbols and a valid --quantity")
+            return False
+        if args.type not in (None, 'MARKET'):
+            print("❌ Error: --run places MARKET orders only")
+            return False
+        if args.workers < 0 or not 0 < args.fast < args.slow:
+            print("❌ Error: --workers must be >= 0 and --fast must be below --slow")
+            return False
+        return True
+    
     # Check required arguments for order placement
     if not all([args.symbol, args.side, args.type, args.quantity]):
         print("❌ Error: Missing required arguments for order placement!")
@@ -109,12 +196,133 @@ def validate_args(args) -> bool:
     
     return True
 
+def confirm(args, prompt: str) -> bool:
+    """Ask before trading, unless --yes was given."""
+    if args.yes:
+        return True
+    return input(f"\n{prompt} (y/N): ").strip().lower() == 'y'
+
+def order_from_args(args) -> Order:
+    """Build the single order described by the command line."""
+    quantity = validate_quantity(args.quantity)
+    price = validate_price(args.price) if args.price else None
+    stop_price = validate_price(getattr(args, 'stop_price', None)) if getattr(args, 'stop_price', None) else None
+    return Order.create(args.symbol, args.side, args.type, quantity, price, stop_price)
+
+def open_journal(args):
+    """Open the order journal unless disabled."""
+    if args.no_journal:
+        return None
+    from trading_bot.bot.journal import OrderJournal
+    return OrderJournal(args.journal)
+
+def print_reconciled(results) -> None:
+    for result in results:
+        print(f"Journal: order {result.client_order_id} from a previous run is {result.status}")
+
+async def run_strategies(args, api_key: str, api_secret: str) -> None:
+    """Run the strategy runner with one shared async client until interrupted."""
+    from functools import partial
+    from trading_bot.bot.async_client import AsyncBinanceFuturesClient
+    from trading_bot.bot.indicators import EMACrossover
+    from trading_bot.bot.orders import AsyncOrderManager
+    from trading_bot.bot.runner import StrategyRunner
+    from trading_bot.bot.streams import AccountStateCache, MarketDataStream
+    
+    symbols = [symbol.strip().upper() for symbol in args.symbols.split(',') if symbol.strip()]
+    cache = AccountStateCache()
+    journal = open_journal(args)
+    async with AsyncBinanceFuturesClient(api_key, api_secret) as client:
+        manager = AsyncOrderManager(client, cache, journal=journal)
+        if journal is not None:
+            print_reconciled(await manager.reconcile_journal())
+        runner = StrategyRunner(
+            manager, symbols, validate_quantity(args.quantity),
+            strategy_factory=partial(EMACrossover, fast=args.fast, slow=args.slow),
+            workers=args.workers, max_pending_orders=args.max_pending_orders)
+        try:
+            await runner.run(MarketDataStream(symbols, cache, book_ticker=True, mark_price=True))
+        finally:
+            if journal is not None:
+                journal.close()
+
+def run_daemon(args, api_key: str, api_secret: str) -> None:
+    """Serve --via-daemon calls from one warm client until stopped."""
+    from trading_bot.bot.client import BinanceFuturesClient
+    from trading_bot.bot.daemon import TradingDaemon
+    from trading_bot.bot.orders import OrderManager
+    
+    journal = open_journal(args)
+    try:
+        order_manager = OrderManager(BinanceFuturesClient(api_key, api_secret), journal=journal)
+        if journal is not None:
+            print_reconciled(order_manager.reconcile_journal())
+        print(f"Daemon listening on {args.socket} (stop with --stop-daemon or Ctrl+C)")
+        TradingDaemon(order_manager, args.socket).serve_forever()
+    finally:
+        if journal is not None:
+            journal.close()
+
+def run_via_daemon(args) -> int:
+    """Send this invocation's request to the daemon; returns the exit status.
+    
+    Needs no credentials, log file or HTTP client: the daemon has them.
+    """
+    from trading_bot.bot.daemon import DaemonClient, DaemonError, order_to_wire, result_from_wire
+    
+    # Read the orders first, so a bad batch file or order is not reported as a missing daemon
+    orders = order = None
+    if not (args.stop_daemon or args.account_info):
+        try:
+            if args.batch_file:
+                orders = load_batch_file(args.batch_file)
+            else:
+                order = order_from_args(args)
+        except (OSError, ValueError) as e:
+            print(f"\n❌ Error: {e}")
+            return 1
+    
+    try:
+        daemon = DaemonClient(args.socket)
+    except OSError as e:
+        print(f"❌ Error: no daemon reachable at {args.socket} ({e}); start one with --daemon")
+        return 1
+    
+    try:
+        with daemon:
+            if args.stop_daemon:
+                daemon.call('shutdown')
+                print("Daemon stopping")
+                return 0
+            
+            if args.account_info:
+                console.print_account_info(daemon.call('account_info'))
+                return 0
+            
+            if orders is not None:
+                for order in orders:
+                    console.print_order_summary(order)
+                if not confirm(args, f"Do you want to place these {len(orders)} orders?"):
+                    print("Orders cancelled by user.")
+                    return 0
+                results = [result_from_wire(result) for result in daemon.call('place_orders', orders=[order_to_wire(order) for order in orders])]
+                console.print_batch_response(orders, results)
+                return 0 if all(result.ok for result in results) else 1
+            
+            console.print_order_summary(order)
+            if not confirm(args, "Do you want to place this order?"):
+                print("Order cancelled by user.")
+                return 0
+            console.print_order_response(result_from_wire(daemon.call('place_order', order=order_to_wire(order))))
+            return 0
+    except DaemonError as e:
+        print(f"\n❌ Error: {e}")
+    except OSError as e:
+        print(f"\n❌ Error: lost the connection to the daemon at {args.socket} ({e})")
+    return 1
+
 def main():
     """Main CLI entry point."""
-    # Setup logging
-    logger = setup_logging()
-    logger.info("Trading Bot CLI started")
-    
     # Parse arguments
     parser = create_parser()
     args = parser.parse_args()
@@ -124,48 +332,83 @@ def main():
         parser.print_help()
         sys.exit(1)
     
+    if args.via_daemon or args.stop_daemon:
+        sys.exit(run_via_daemon(args))
+    
+    # Setup logging
+    from trading_bot.bot.logging_config import setup_logging
+    logger = setup_logging(structured=args.log_format == 'json')
+    logger.info("Trading Bot CLI started")
+    
     try:
         # Get API credentials
         api_key, api_secret = get_api_credentials()
         
+        if args.daemon:
+            run_daemon(args, api_key, api_secret)
+            return
+        
+        if args.run:
+            print(f"Strategy: EMA({args.fast}/{args.slow}) crossover, MARKET orders of {args.quantity}")
+            print(f"Symbols: {args.symbols}")
+            if not confirm(args, "Do you want to start trading?"):
+                print("Run cancelled by user.")
+                sys.exit(0)
+            import asyncio
+            asyncio.run(run_strategies(args, api_key, api_secret))
+            return
+        
+        from trading_bot.bot.client import BinanceFuturesClient
+        from trading_bot.bot.orders import OrderManager
+        
         # Initialize client and order manager
         client = BinanceFuturesClient(api_key, api_secret)
-        order_manager = OrderManager(client)
+        journal = open_journal(args) if not args.account_info else None
+        order_manager = OrderManager(client, journal=journal)
+        if journal is not None:
+            print_reconciled(order_manager.reconcile_journal())
         
         if args.account_info:
             # Show account information
             print("Fetching account information...")
-            account_info = client.get_account_info()
+            console.print_account_info(client.get_account_info())
+            
+        elif args.batch_file:
+            # Place batch of orders
+            orders = load_batch_file(args.batch_file)
+            print(f"Loaded {len(orders)} orders from {args.batch_file}")
+            for order in orders:
+                console.print_order_summary(order)
+            
+            if not confirm(args, f"Do you want to place these {len(orders)} orders?"):
+                print("Orders cancelled by user.")
+                sys.exit(0)
+            
+            print("\nPlacing orders...")
+            results = order_manager.place_orders(orders)
+            console.print_batch_response(orders, results)
             
-            print("\n" + "="*50)
-            print("ACCOUNT INFORMATION")
-            print("="*50)
-            print(f"Total Wallet Balance: {account_info.get('totalWalletBalance', 'N/A')} USDT")
-            print(f"Available Balance: {account_info.get('availableBalance', 'N/A')} USDT")
-            print(f"Total Unrealized PnL: {account_info.get('totalUnrealizedProfit', 'N/A')} USDT")
-            print("="*50)
+            if not all(result.ok for result in results):
+                sys.exit(1)
             
         else:
             # Place order
-            quantity = validate_quantity(args.quantity)
-            price = validate_price(args.price) if args.price else None
-            stop_price = validate_price(getattr(args, 'stop_price', None)) if getattr(args, 'stop_price', None) else None
+            order = order_from_args(args)
             
             # Print order summary
-            order_manager.print_order_summary(args.symbol, args.side, args.type, quantity, price, stop_price)
+            console.print_order_summary(order)
             
             # Confirm order placement
-            confirm = input("\nDo you want to place this order? (y/N): ").strip().lower()
-            if confirm != 'y':
+            if not confirm(args, "Do you want to place this order?"):
                 print("Order cancelled by user.")
                 sys.exit(0)
             
             # Place the order
             print("\nPlacing order...")
-            response = order_manager.place_order(args.symbol, args.side, args.type, quantity, price, stop_price)
+            response = order_manager.place_order(order)
             
             # Print response
-            order_manager.print_order_response(response)
+            console.print_order_response(response)
     
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user.")
@@ -176,4 +419,4 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()